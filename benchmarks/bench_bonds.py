@@ -0,0 +1,78 @@
+"""
+Bond-side hot paths: Z-spreads of the CDS-bond basis and the rolling
+outlier filter of the Treasury spot-futures basis.
+"""
+
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from .common import import_module, quiet
+
+
+class ZSpread:
+    """``merge_z_spread_bond.add_z_spread_columns`` on TRACE bond-months.
+
+    One NSS curve is fitted per month-end from synthetic CRSP Treasury
+    quotes, as the module does from ``CRSP_TFZ_with_runness.parquet``.
+    """
+
+    params = [[3, 12, 36]]
+    param_names = ["n_months"]
+    timeout = 1800
+
+    def setup(self, n_months):
+        from synthetic_data import crsp_treasury_quotes, trace_bond_months
+
+        self.merge = import_module("merge_z_spread_bond", "cds_bond_basis")
+        self.yc = import_module("gsw2006_yield_curve", "cds_bond_basis")
+        self.z = import_module("process_z_spread", "cds_bond_basis")
+
+        self.bonds = trace_bond_months(n_bonds=50, n_months=n_months)
+        quote_dates = pd.date_range(
+            self.bonds["date"].min() - pd.offsets.MonthBegin(1),
+            self.bonds["date"].max(),
+            freq="BME",
+        )
+        self._tmp = tempfile.TemporaryDirectory()
+        tmp = Path(self._tmp.name)
+        crsp_path = tmp / "CRSP_TFZ_with_runness.parquet"
+        crsp_treasury_quotes(quote_dates).to_parquet(crsp_path)
+
+        self._paths = (self.yc.CRSP_TREASURY_PATH, self.z.FED_CURVE_PATH)
+        self.yc.CRSP_TREASURY_PATH = crsp_path
+        # No Fed GSW fallback: every date uses the CRSP fit
+        self.z.FED_CURVE_PATH = tmp / "fed_yield_curve_all.parquet"
+
+    def teardown(self, n_months):
+        self.yc.CRSP_TREASURY_PATH, self.z.FED_CURVE_PATH = self._paths
+        self._tmp.cleanup()
+
+    def time_add_z_spread_columns(self, n_months):
+        with quiet():
+            self.merge.add_z_spread_columns(self.bonds)
+
+
+class RollingOutlierFlag:
+    """``calc_basis_treas_sf.rolling_outlier_flag`` (±45-day MAD filter)."""
+
+    params = [[250, 1000, 2500]]
+    param_names = ["n_days"]
+    timeout = 1800
+
+    def setup(self, n_days):
+        from synthetic_data import treasury_basis_spreads
+
+        self.basis = import_module("calc_basis_treas_sf", "basis_treas_sf")
+        self.spreads = treasury_basis_spreads(n_days)
+
+    def time_rolling_outlier_flag(self, n_days):
+        self.basis.rolling_outlier_flag(
+            self.spreads,
+            group_col="Tenor",
+            date_col="Date",
+            value_col="arb",
+            window_days=45,
+            threshold=10,
+        )
@@ -0,0 +1,47 @@
+"""
+Markit CDS contract returns (He, Kelly and Manela, 2017).
+"""
+
+import tempfile
+from pathlib import Path
+
+from .common import import_module, quiet
+
+
+class CDSContractReturns:
+    """``calc_cds_returns.calc_cds_return_for_contracts`` on daily curves."""
+
+    params = [[10, 50, 200]]
+    param_names = ["n_tickers"]
+    timeout = 1800
+
+    def setup(self, n_tickers):
+        from synthetic_data import fed_yield_curve, fred_rates, markit_cds_curves
+
+        self.calc = import_module("calc_cds_returns", "cds_returns")
+        curves = markit_cds_curves(n_tickers, n_days=250)
+        dates = curves["date"].unique().to_list()
+        self.start, self.end = min(dates), max(dates)
+
+        # calc_discount reads the FRED short rates from data_dir
+        self._tmp = tempfile.TemporaryDirectory()
+        self.data_dir = Path(self._tmp.name)
+        fred_rates(dates).to_parquet(self.data_dir / "fred.parquet")
+        self.raw_rates = fed_yield_curve(dates)
+        with quiet():
+            self.contract_data = self.calc.get_contract_data(
+                self.start, self.end, curves.lazy()
+            )
+
+    def teardown(self, n_tickers):
+        self._tmp.cleanup()
+
+    def time_calc_cds_return_for_contracts(self, n_tickers):
+        with quiet():
+            self.calc.calc_cds_return_for_contracts(
+                self.contract_data,
+                self.raw_rates,
+                self.start,
+                self.end,
+                data_dir=self.data_dir,
+            )
@@ -0,0 +1,78 @@
+"""
+Forecasting hot paths: preprocessing of the formatted panels and the
+cross-validation metrics every forecasting job computes, and the batched
+baseline engine.
+"""
+
+from .common import import_module, quiet
+
+N_OBS = {"ME": 240, "B": 2520}
+
+
+class RobustPreprocess:
+    """``robust_preprocessing.robust_preprocess_pipeline`` on a long panel."""
+
+    params = [["ME", "B"], [100, 1000, 5000]]
+    param_names = ["frequency", "n_series"]
+    timeout = 900
+
+    def setup(self, frequency, n_series):
+        from synthetic_data import ftsfr_panel
+
+        self.preprocessing = import_module("robust_preprocessing", "forecasting")
+        forecast_utils = import_module("forecast_utils", "forecasting")
+        self.test_size = forecast_utils.get_test_size_from_frequency(frequency)
+        self.panel = ftsfr_panel(n_series, N_OBS[frequency], frequency)
+
+    def time_robust_preprocess_pipeline(self, frequency, n_series):
+        with quiet():
+            self.preprocessing.robust_preprocess_pipeline(
+                self.panel,
+                frequency=frequency,
+                test_size=self.test_size,
+                seasonality=12 if frequency == "ME" else 5,
+                apply_train_imputation=True,
+            )
+
+
+class EvaluateCV:
+    """``forecast_utils.evaluate_cv`` (MASE, MSE, RMSE, R2oos) on CV output."""
+
+    params = [[100, 1000, 10000]]
+    param_names = ["n_series"]
+    timeout = 600
+
+    def setup(self, n_series):
+        from synthetic_data import cv_frame, ftsfr_panel
+
+        self.forecast_utils = import_module("forecast_utils", "forecasting")
+        panel = ftsfr_panel(n_series, 240, "ME")
+        self.cv_df, train_df = cv_frame(
+            panel, h=1, n_windows=self.forecast_utils.MAX_CV_WINDOWS
+        )
+        self.train_df = self.forecast_utils.align_train_data_with_cutoffs(
+            train_df, self.cv_df
+        )
+
+    def time_evaluate_cv(self, n_series):
+        with quiet():
+            self.forecast_utils.evaluate_cv(self.cv_df, self.train_df, 12)
+
+
+class BatchedBaselines:
+    """``batched_baselines.cross_validation`` for the cheap classical models."""
+
+    params = [["historic_average", "ses", "theta"], [1000, 10000]]
+    param_names = ["model", "n_series"]
+    timeout = 900
+
+    def setup(self, model, n_series):
+        from synthetic_data import ftsfr_panel
+
+        self.batched_baselines = import_module("batched_baselines", "forecasting")
+        self.panel = ftsfr_panel(n_series, 240, "ME", missing_frac=0.0)
+
+    def time_cross_validation(self, model, n_series):
+        self.batched_baselines.cross_validation(
+            self.panel, model, h=1, n_windows=6, season_length=12
+        )
@@ -0,0 +1,59 @@
+"""
+OptionMetrics level 3 filters (IV smile fit and put-call parity).
+"""
+
+import numpy as np
+import pandas as pd
+
+from .common import import_module, quiet
+
+
+class Level3Filters:
+    """IV and put-call-parity outlier filters of ``options/level_3_filters.py``.
+
+    Both benchmarks run the steps of ``IV_filter``/``put_call_filter``
+    without their file output.
+    """
+
+    params = [[20, 100, 250]]
+    param_names = ["n_dates"]
+    timeout = 1800
+
+    def setup(self, n_dates):
+        from synthetic_data import optionmetrics_chain
+
+        self.l3 = import_module("level_3_filters", "options")
+        self.chain = optionmetrics_chain(n_dates, n_expiries=4, n_strikes=20)
+        self.chain["mid_price"] = (
+            self.chain["best_bid"] + self.chain["best_offer"]
+        ) / 2
+
+    def time_iv_filter(self, n_dates):
+        l2_data = self.chain.copy()
+        l2_data["log_iv"] = np.log(l2_data["IV"])
+        with quiet():
+            l2_data = self.l3.apply_quadratic_iv_fit(l2_data)
+            self.l3.iv_filter_outliers(l2_data, "percent", 2.0)
+
+    def time_pcp_filter(self, n_dates):
+        chain = self.chain
+        calls = chain[chain["cp_flag"] == "C"].drop(columns="cp_flag")
+        puts = chain[chain["cp_flag"] == "P"].drop(columns="cp_flag")
+        with quiet():
+            matching_calls, matching_puts = self.l3.build_put_call_pairs(
+                calls.reset_index(drop=True), puts.reset_index(drop=True)
+            )
+            matched = pd.merge(
+                matching_calls,
+                matching_puts,
+                on=["date", "exdate", "moneyness"],
+                suffixes=("_C", "_P"),
+            )
+            matched = self.l3.calc_implied_interest_rate(matched)
+            daily_median = (
+                matched.groupby("date")["tb_m3_C"]
+                .median()
+                .reset_index(name="daily_median_rate")
+            )
+            matched = matched.join(daily_median.set_index("date"), on="date")
+            self.l3.pcp_filter_outliers(matched, "percent", 2.0)
@@ -0,0 +1,39 @@
+"""
+Shared setup for the benchmark suite.
+
+Puts ``src/`` and the data-module directories on ``sys.path`` the way the
+pipeline scripts do, and silences the progress prints of the code under
+test so timings are not dominated by terminal output.
+"""
+
+import contextlib
+import importlib
+import io
+import os
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+SRC_DIR = PROJECT_DIR / "src"
+
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+# Some modules read WRDS_USERNAME at import; the benchmarks never connect
+os.environ.setdefault("WRDS_USERNAME", "")
+
+
+def import_module(name, module_dir=None):
+    """Import ``name`` from ``src/{module_dir}`` (or ``src/``)."""
+    if module_dir is not None:
+        path = str(SRC_DIR / module_dir)
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    return importlib.import_module(name)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Discard stdout (the pipeline functions print progress)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
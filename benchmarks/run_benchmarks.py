@@ -0,0 +1,149 @@
+"""
+run_benchmarks.py - Run the benchmark suite in the current environment
+
+The ``bench_*.py`` modules follow asv's conventions (classes with
+``params``/``param_names``, ``setup``/``teardown`` and ``time_*`` methods),
+so ``asv run`` (configured in ``asv.conf.json``) tracks them across commits.
+This runner executes the same benchmarks without asv, on synthetic data
+from ``src/synthetic_data.py``, and records every timed call as a stage in
+``_output/traces/benchmarks.jsonl``, so the instrumentation report flags
+scales that got slower than in earlier runs.
+
+Usage (from the project root):
+    python -m benchmarks.run_benchmarks                # every benchmark and scale
+    python -m benchmarks.run_benchmarks --quick        # smallest scale only (CI)
+    python -m benchmarks.run_benchmarks -k cds -k ZSpread --repeat 5
+    python ./src/instrumentation.py report --script benchmarks --by params
+"""
+
+import argparse
+import importlib
+import inspect
+import itertools
+import pkgutil
+import statistics
+import sys
+from pathlib import Path
+
+from .common import quiet
+
+BENCH_DIR = Path(__file__).resolve().parent
+
+
+def discover(patterns=()):
+    """[(name, class, method)] of the ``time_*`` benchmarks matching ``patterns``.
+
+    Names are ``{module}.{class}.{method}`` without the ``bench_`` prefix;
+    a benchmark matches if any pattern is a case-insensitive substring.
+    """
+    found = []
+    for module_info in sorted(pkgutil.iter_modules([str(BENCH_DIR)])):
+        if not module_info.name.startswith("bench_"):
+            continue
+        module = importlib.import_module(f"{__package__}.{module_info.name}")
+        for class_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for method in sorted(m for m in dir(cls) if m.startswith("time_")):
+                name = f"{module_info.name[len('bench_'):]}.{class_name}.{method}"
+                if patterns and not any(p.lower() in name.lower() for p in patterns):
+                    continue
+                found.append((name, cls, method))
+    return found
+
+
+def param_grid(cls, quick=False):
+    """Parameter combinations of an asv benchmark class."""
+    params = getattr(cls, "params", [])
+    if not params:
+        return [()]
+    if not isinstance(params[0], (list, tuple)):
+        params = [params]
+    if quick:
+        params = [p[:1] for p in params]
+    return list(itertools.product(*params))
+
+
+def run_benchmark(name, cls, method, args, repeat):
+    """Time ``repeat`` calls of one benchmark; returns the wall times."""
+    from instrumentation import stage
+
+    label = ", ".join(str(a) for a in args)
+    bench = cls()
+    with quiet():
+        if hasattr(bench, "setup"):
+            bench.setup(*args)
+    times = []
+    try:
+        for _ in range(repeat):
+            with stage(
+                name, params=label, param_names=getattr(cls, "param_names", [])
+            ) as st:
+                getattr(bench, method)(*args)
+            times.append(st.wall_s)
+    finally:
+        if hasattr(bench, "teardown"):
+            bench.teardown(*args)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the ftsfr benchmark suite")
+    parser.add_argument(
+        "-k",
+        dest="patterns",
+        action="append",
+        default=[],
+        help="Only benchmarks whose name contains this (repeatable)",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="Smallest scale of each benchmark only"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--list", action="store_true", help="List the benchmarks and exit"
+    )
+    args = parser.parse_args()
+
+    from instrumentation import configure_trace
+
+    configure_trace("benchmarks")
+    benchmarks = discover(args.patterns)
+
+    if args.list:
+        for name, cls, _ in benchmarks:
+            names = ", ".join(getattr(cls, "param_names", []))
+            print(f"{name}  [{names}]  {getattr(cls, 'params', [])}")
+        return 0
+
+    print("=" * 60)
+    print(f"Running {len(benchmarks)} benchmarks (repeat={args.repeat})")
+    print("=" * 60)
+    failed = []
+    for name, cls, method in benchmarks:
+        print(f"\n{name}")
+        print("-" * 40)
+        for params in param_grid(cls, args.quick):
+            label = ", ".join(str(p) for p in params)
+            try:
+                times = run_benchmark(name, cls, method, params, args.repeat)
+            except (ImportError, NotImplementedError) as e:
+                print(f"  ({label}): skipped ({e})")
+                continue
+            except Exception as e:
+                print(f"  ({label}): FAILED ({type(e).__name__}: {e})")
+                failed.append(f"{name}({label})")
+                continue
+            print(
+                f"  ({label}): min {min(times):.3f}s, "
+                f"median {statistics.median(times):.3f}s"
+            )
+
+    if failed:
+        print(f"\n{len(failed)} benchmarks failed: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
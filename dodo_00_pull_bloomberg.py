@@ -10,6 +10,7 @@ from dodo_common import (
     DATA_DIR,
     load_subscriptions,
     load_all_module_requirements,
+    parallel_safe,
 )
 
 DOIT_CONFIG = {
@@ -34,6 +35,7 @@ for module_name, required_sources in module_requirements_dict.items():
 use_cache = subscriptions_toml["cache"]["use_cache"]
 
 
+@parallel_safe("pull", resources=["bloomberg"])
 def task_pull():
     """Pull Bloomberg Terminal data sources"""
 
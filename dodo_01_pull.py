@@ -11,6 +11,9 @@ This file contains all tasks related to:
 import sys
 from pathlib import Path
 
+from doit import create_after
+from doit.tools import config_changed
+
 # Import common utilities
 from dodo_common import (
     DATA_DIR,
@@ -21,6 +24,7 @@ from dodo_common import (
     load_all_module_requirements,
     debug_action,
     get_docs_task_dependencies,
+    parallel_safe,
 )
 
 DOIT_CONFIG = {
@@ -62,6 +66,7 @@ def task_config():
     }
 
 
+@parallel_safe("pull")
 def task_pull():
     """Pull selected data_sources based on subscriptions.toml configuration"""
 
@@ -106,6 +111,7 @@ def task_pull():
     if module_requirements[data_module] and not use_cache:
         yield {
             "name": data_module,
+            "resources": ["wrds"],
             "actions": [
                 f"python ./src/{data_module}/pull_wrds_bond_ret.py --DATA_DIR={DATA_DIR}",
                 f"python ./src/{data_module}/pull_wrds_markit.py --DATA_DIR={DATA_DIR / data_module}",
@@ -131,13 +137,14 @@ def task_pull():
     if module_requirements[data_module] and not use_cache:
         yield {
             "name": data_module,
+            "resources": ["wrds"],
             "actions": [
                 f"python ./src/{data_module}/pull_fed_yield_curve.py --DATA_DIR={DATA_DIR / data_module}",
                 f"python ./src/{data_module}/pull_markit_cds.py --DATA_DIR={DATA_DIR / data_module}",
                 f"python ./src/{data_module}/pull_fred.py --DATA_DIR={DATA_DIR / data_module}",
             ],
             "targets": [
-                DATA_DIR / data_module / "markit_cds.parquet",
+                DATA_DIR / data_module / "markit_cds",
                 DATA_DIR / data_module / "fed_yield_curve.parquet",
                 DATA_DIR / data_module / "fred.parquet",
             ],
@@ -173,6 +180,7 @@ def task_pull():
     if module_requirements[data_module] and not use_cache:
         yield {
             "name": data_module,
+            "resources": ["wrds"],
             "actions": [
                 f"python ./src/{data_module}/pull_wrds_fx.py --DATA_DIR={DATA_DIR / data_module}",
             ],
@@ -248,6 +256,7 @@ def task_pull():
     if module_requirements[data_module] and not use_cache:
         yield {
             "name": data_module,
+            "resources": ["wrds"],
             "actions": [
                 f"python ./src/{data_module}/pull_option_data.py --DATA_DIR={DATA_DIR / data_module}"
             ],
@@ -266,6 +275,7 @@ def task_pull():
 
         yield {
             "name": data_module,
+            "resources": ["wrds"],
             "actions": [
                 f"python ./src/{data_module}/pull_treasury_auction_stats.py --DATA_DIR={DATA_DIR / data_module}",
                 f"python ./src/{data_module}/pull_CRSP_treasury.py --DATA_DIR={DATA_DIR / data_module}",
@@ -290,6 +300,7 @@ def task_pull():
     if module_requirements[data_module] and not use_cache:
         yield {
             "name": data_module,
+            "resources": ["wrds"],
             "actions": [
                 f"python ./src/{data_module}/pull_wrds_bank_premium.py --DATA_DIR={DATA_DIR / data_module}"
             ],
@@ -311,6 +322,7 @@ def task_pull():
     if module_requirements[data_module] and not use_cache:
         yield {
             "name": data_module,
+            "resources": ["wrds"],
             "actions": [
                 f"python ./src/{data_module}/pull_CRSP_Compustat.py --DATA_DIR={DATA_DIR / data_module}",
                 f"python ./src/{data_module}/create_ftsfr_datasets.py --DATA_DIR={DATA_DIR / data_module}",
@@ -326,6 +338,7 @@ def task_pull():
         }
 
 
+@parallel_safe("format")
 def task_format():
     """Format and process pulled data into standardized datasets"""
 
@@ -821,42 +834,58 @@ def task_determine_available_datasets():
     }
 
 
+@create_after(executed="format")
 def task_organize_ftsfr_datasets():
-    """Organize ftsfr datasets into formatted structure"""
-    # Get all Python files in src directory as dependencies
-    src_files = list(Path("./src").rglob("*.py"))
-
-    # Find all existing ftsfr files to generate targets
-    formatted_targets = []
-    if DATA_DIR.exists():
-        for module_dir in DATA_DIR.iterdir():
-            if module_dir.is_dir():
-                module_name = module_dir.name
-                # Find ftsfr files in this module
-                for ftsfr_file in module_dir.glob("ftsfr_*.parquet"):
-                    # Create corresponding target path in formatted structure
-                    formatted_path = (
-                        DATA_DIR / "formatted" / module_name / ftsfr_file.name
-                    )
-                    formatted_targets.append(formatted_path)
-
-    return {
-        "actions": [(debug_action, ["python ./src/organize_ftsfr_datasets.py"])],
-        "file_dep": [
-            "./src/organize_ftsfr_datasets.py",
-            *[str(f) for f in src_files],
-        ],
-        "targets": formatted_targets,
-        "verbosity": 0,
-    }
+    """Organize ftsfr datasets into formatted structure, one subtask per file
+
+    Each subtask depends only on its source parquet (doit checks its
+    timestamp/size before hashing) and the organizer script, so unchanged
+    datasets are skipped. Subtasks are created after ``format`` has run so
+    freshly built ftsfr files are picked up in the same invocation.
+    """
+    if not DATA_DIR.exists():
+        return
+
+    for ftsfr_file in sorted(DATA_DIR.glob("*/ftsfr_*.parquet")):
+        module_name = ftsfr_file.parent.name
+        if module_name == "formatted":
+            continue
+        formatted_path = DATA_DIR / "formatted" / module_name / ftsfr_file.name
+        yield {
+            "name": f"{module_name}.{ftsfr_file.stem}",
+            "actions": [
+                (
+                    debug_action,
+                    [f"python ./src/organize_ftsfr_datasets.py --files {ftsfr_file}"],
+                )
+            ],
+            "file_dep": [
+                "./src/organize_ftsfr_datasets.py",
+                "./src/panel_storage.py",
+                str(ftsfr_file),
+            ],
+            "targets": [formatted_path],
+            "verbosity": 0,
+        }
 
 
+@create_after(executed="organize_ftsfr_datasets")
 def task_create_data_glimpses():
-    """Create data glimpses"""
-    # Get all files in the src directory recursively
-    src_files = list(Path("./src").rglob("*"))
-    # Filter to only include actual files (not directories) and exclude .ipynb files
-    src_files = [str(f) for f in src_files if f.is_file() and f.suffix != ".ipynb"]
+    """Create data glimpses
+
+    Reruns when the glimpse script, the task definitions or any data file
+    changes (by path/size/mtime fingerprint). Per-file reports are cached in
+    OUTPUT_DIR, so a rerun only rescans the files that changed.
+    """
+    data_files = []
+    if DATA_DIR.exists():
+        data_files = sorted(
+            f for pattern in ("*.parquet", "*.csv") for f in DATA_DIR.rglob(pattern)
+        )
+    fingerprints = {}
+    for f in data_files:
+        stat = f.stat()
+        fingerprints[str(f)] = [stat.st_size, stat.st_mtime_ns]
 
     return {
         "actions": [
@@ -867,7 +896,11 @@ def task_create_data_glimpses():
         "targets": [
             "./docs_src/data_glimpses.md",
         ],
-        "file_dep": src_files,
+        "file_dep": [
+            "./src/create_data_glimpses.py",
+            "./dodo_01_pull.py",
+        ],
+        "uptodate": [config_changed(fingerprints)],
     }
 
 
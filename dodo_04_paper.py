@@ -52,6 +52,7 @@ def task_create_dataset_statistics():
         ],
         "file_dep": [
             "./src/forecasting/create_dataset_statistics.py",
+            "./src/forecasting/dataset_stats_cache.py",
             "./datasets.toml",  # Primary dependency - drives which datasets to include
             *dataset_parquet_files,  # Secondary dependencies - actual data files
         ],
@@ -80,6 +81,8 @@ def task_create_filtered_dataset_statistics():
         "file_dep": [
             "./src/forecasting/create_filtered_dataset_statistics.py",
             "./src/forecasting/forecast_utils.py",  # Contains filtering logic we're applying
+            "./src/forecasting/robust_preprocessing.py",
+            "./src/forecasting/dataset_stats_cache.py",
             "./datasets.toml",  # Primary dependency - drives which datasets to include
             *dataset_parquet_files,  # Secondary dependencies - actual data files
         ],
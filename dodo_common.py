@@ -4,6 +4,8 @@ Common utilities and configuration shared across all dodo files.
 
 import sys
 import os
+import functools
+from contextlib import ExitStack, contextmanager
 from pathlib import Path
 import shutil
 import tomli
@@ -15,6 +17,8 @@ import pandas as pd
 sys.path.insert(1, str((Path(__file__).parent / "src").resolve()))
 
 from settings import config
+from dataset_registry import load_registry
+from notebook_runner import run_notebook_action
 
 
 # --------------------------------------------------------------------
@@ -96,6 +100,9 @@ BASE_DIR = Path(config("BASE_DIR"))
 DATA_DIR = Path(config("DATA_DIR"))
 OUTPUT_DIR = Path(config("OUTPUT_DIR"))
 OS_TYPE = config("OS_TYPE")
+# "nbconvert" (a fresh kernel per notebook) or "kernel" (shared warm kernels,
+# see src/notebook_runner.py)
+NOTEBOOK_RUNNER = config("NOTEBOOK_RUNNER", default="nbconvert")
 
 
 # Get pixi executable path
@@ -108,14 +115,14 @@ if not PIXI_EXECUTABLE:
         PIXI_EXECUTABLE = "pixi"  # Hope it's in PATH at runtime
 
 
-def debug_action(cmd):
+def debug_action(cmd, env=None):
     """Action function that prints command before executing"""
     print(f"\n🔍 DEBUG: About to execute: {cmd}")
     print("=" * 60)
 
     # Start timing
     start_time = time.time()
-    result = subprocess.run(cmd, shell=True)
+    result = subprocess.run(cmd, shell=True, env=env)
     end_time = time.time()
     wall_time_seconds = end_time - start_time
 
@@ -157,6 +164,144 @@ def debug_action(cmd):
     return result.returncode == 0
 
 
+# --------------------------------------------------------------------
+# Parallel execution (doit -n N)
+# --------------------------------------------------------------------
+# Concurrency limits per resource class. A task holds one slot of every
+# class it uses for as long as it runs; tasks wait for a free slot instead
+# of failing, so `doit -n 8` never opens more WRDS/Bloomberg sessions or
+# runs more memory-heavy steps at once than allowed here.
+RESOURCE_LIMITS = {
+    "wrds": config("WRDS_MAX_CONNECTIONS", default=2, cast=int),
+    "bloomberg": config("BLOOMBERG_MAX_CONNECTIONS", default=1, cast=int),
+    "heavy_memory": config("HEAVY_MEMORY_MAX_TASKS", default=2, cast=int),
+}
+
+# Modules whose pull/format steps hold large WRDS extracts or panels in memory
+HEAVY_MEMORY_MODULES = {
+    "cds_bond_basis",
+    "cds_returns",
+    "corp_bond_returns",
+    "nyu_call_report",
+    "options",
+    "us_treasury_returns",
+    "wrds_bank_premium",
+    "wrds_crsp_compustat",
+}
+
+RESOURCE_LOCK_DIR = OUTPUT_DIR / "_locks"
+SCRATCH_DIR = OUTPUT_DIR / "_scratch"
+
+
+def _try_lock(lock_file):
+    """Take a non-blocking exclusive lock on an open file; False if held."""
+    try:
+        if OS_TYPE == "windows":
+            import msvcrt
+
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+@contextmanager
+def resource_slot(resource, poll_seconds=2):
+    """Hold one of the RESOURCE_LIMITS[resource] slots of a resource class.
+
+    Slots are lock files under RESOURCE_LOCK_DIR, so the limit holds across
+    doit's worker processes; the OS releases a lock when its holder dies.
+    """
+    lock_dir = RESOURCE_LOCK_DIR / resource
+    lock_dir.mkdir(parents=True, exist_ok=True)
+    waited = False
+    while True:
+        for slot in range(RESOURCE_LIMITS[resource]):
+            lock_file = open(lock_dir / f"slot{slot}.lock", "a+")
+            if _try_lock(lock_file):
+                try:
+                    yield slot
+                finally:
+                    # Closing the file releases the lock
+                    lock_file.close()
+                return
+            lock_file.close()
+        if not waited:
+            print(f"⏳ Waiting for a free '{resource}' slot...")
+            waited = True
+        time.sleep(poll_seconds)
+
+
+def resource_action(cmd, resources=(), scratch_dir=None):
+    """debug_action holding a slot of each resource class in a private scratch dir.
+
+    The command runs with TMPDIR/TEMP/TMP, IPYTHONDIR and FTSFR_SCRATCH_DIR
+    pointing at ``scratch_dir``, so concurrent tasks don't share temporary
+    files or the IPython history database of notebook kernels.
+    """
+    env = None
+    if scratch_dir is not None:
+        scratch_dir = Path(scratch_dir)
+        (scratch_dir / "ipython").mkdir(parents=True, exist_ok=True)
+        env = {
+            **os.environ,
+            "TMPDIR": str(scratch_dir),
+            "TEMP": str(scratch_dir),
+            "TMP": str(scratch_dir),
+            "IPYTHONDIR": str(scratch_dir / "ipython"),
+            "FTSFR_SCRATCH_DIR": str(scratch_dir),
+        }
+    with ExitStack() as stack:
+        # Acquire in a fixed order so two tasks can't deadlock
+        for resource in sorted(resources):
+            stack.enter_context(resource_slot(resource))
+        return debug_action(cmd, env=env)
+
+
+def parallel_safe(basename, resources=()):
+    """Decorator making a task generator's subtasks safe under ``doit -n``.
+
+    Every shell action of every subtask runs through ``resource_action``
+    with a scratch dir of its own (SCRATCH_DIR/<basename>.<subtask>), holding
+    ``resources`` plus any classes listed under the subtask's optional
+    "resources" key. Subtasks of HEAVY_MEMORY_MODULES also hold a
+    "heavy_memory" slot.
+    """
+
+    def decorator(task_creator):
+        @functools.wraps(task_creator)
+        def wrapper():
+            for task in task_creator():
+                task = dict(task)
+                name = task["name"]
+                task_resources = set(resources) | set(task.pop("resources", []))
+                if name.split(":")[-1] in HEAVY_MEMORY_MODULES:
+                    task_resources.add("heavy_memory")
+                kwargs = {
+                    "resources": sorted(task_resources),
+                    "scratch_dir": str(
+                        SCRATCH_DIR / f"{basename}.{name.replace(':', '_')}"
+                    ),
+                }
+                actions = []
+                for action in task["actions"]:
+                    if isinstance(action, str):
+                        action = (resource_action, [action], kwargs)
+                    elif isinstance(action, tuple) and action[0] is debug_action:
+                        action = (resource_action, list(action[1]), kwargs)
+                    actions.append(action)
+                task["actions"] = actions
+                yield task
+
+        return wrapper
+
+    return decorator
+
+
 # Helper functions for handling Jupyter Notebook tasks
 def jupyter_execute_notebook(notebook_path):
     # Pin to the `ftsfr` kernel so execution uses the project conda env even
@@ -214,16 +359,7 @@ def copy_dir_contents_to_folder(dir_path, destination_folder):
 
 def load_module_requirements(datasets_toml_path="datasets.toml"):
     """Load module requirements from datasets.toml."""
-    with open(datasets_toml_path, "rb") as f:
-        datasets_config = tomli.load(f)
-
-    module_requirements = {}
-
-    for module_name, module_config in datasets_config.items():
-        if isinstance(module_config, dict) and "required_data_sources" in module_config:
-            module_requirements[module_name] = module_config["required_data_sources"]
-
-    return module_requirements
+    return load_registry(datasets_toml_path).module_requirements()
 
 
 def check_module_availability(module_requirements, data_sources):
@@ -251,8 +387,7 @@ def get_available_datasets(
     module_requirements, data_dir, datasets_toml_path="datasets.toml"
 ):
     """Return dataset metadata for modules that have all prerequisites satisfied."""
-    with open(datasets_toml_path, "rb") as f:
-        datasets_config = tomli.load(f)
+    registry = load_registry(datasets_toml_path)
 
     available_datasets = {}
 
@@ -260,30 +395,20 @@ def get_available_datasets(
         if not is_available:
             continue
 
-        if module_name in datasets_config and isinstance(
-            datasets_config[module_name], dict
-        ):
-            module_config = datasets_config[module_name]
-
-            for key, value in module_config.items():
-                if (
-                    key.startswith("ftsfr_")
-                    and isinstance(value, dict)
-                    and "description" in value
-                ):
-                    dataset_name = key.replace("ftsfr_", "")
-
-                    available_datasets[dataset_name] = {
-                        "path": Path(data_dir)
-                        / "formatted"
-                        / module_name
-                        / f"{key}.parquet",
-                        "module": module_name,
-                        "frequency": value.get("frequency", "D"),
-                        "seasonality": value.get("seasonality"),
-                        "is_balanced": value.get("is_balanced", False),
-                        "description": value.get("description", ""),
-                    }
+        for key in registry.by_module.get(module_name, []):
+            value = registry[key]
+            if "description" not in value:
+                continue
+            dataset_name = key.replace("ftsfr_", "")
+
+            available_datasets[dataset_name] = {
+                "path": registry.formatted_path(key, data_dir),
+                "module": module_name,
+                "frequency": value.get("frequency", "D"),
+                "seasonality": value.get("seasonality"),
+                "is_balanced": value.get("is_balanced", False),
+                "description": value.get("description", ""),
+            }
 
     return available_datasets
 
@@ -323,7 +448,9 @@ def notebook_subtask(task_config):
 
     Creates a two-stage process:
     1. Normalize: Convert source to stable .py file in OUTPUT_DIR
-    2. Execute & Render: Run .py, convert to notebook, execute, generate HTML
+    2. Execute & Render: Run .py, convert to notebook, execute, generate HTML.
+       With NOTEBOOK_RUNNER=kernel the notebook runs on a warm kernel shared
+       by all notebook tasks of the doit process instead.
 
     Parameters:
     - task_config: dict with keys:
@@ -373,6 +500,30 @@ def notebook_subtask(task_config):
     }
 
     # Stage 2: Execute and render
+    if NOTEBOOK_RUNNER == "kernel":
+        # On a warm kernel shared by the notebook tasks (see
+        # src/notebook_runner.py). Cells run in the source directory to
+        # preserve relative paths; nothing is written next to the source.
+        yield {
+            "name": name,
+            "actions": [
+                (run_notebook_action, [str(source_path), name, str(OUTPUT_DIR)]),
+            ],
+            "file_dep": [
+                str(py_path),  # Depend on normalized .py for stability
+                "./src/notebook_runner.py",
+                *file_dep,
+            ],
+            "targets": [
+                OUTPUT_DIR / f"{name}.html",
+                OUTPUT_DIR / "_notebook_build" / f"{name}.ipynb",
+                *targets,
+            ],
+            "clean": True,
+        }
+        return
+
+    # nbconvert in a fresh kernel per notebook
     # Work in the source directory to preserve relative paths
     working_notebook = source_path.with_suffix(".ipynb")
 
@@ -5,6 +5,7 @@ import polars as pl
 
 sys.path.append("..")
 from settings import config
+from data_sources import bloomberg
 
 START_DATE: str = config("START_DATE", default="2000-01-01")
 END_DATE: str = config("END_DATE", default=str(date.today()))
@@ -25,7 +26,7 @@ def pull_treasury_inflation_swaps(
     :param end_date: End date in 'YYYY-MM-DD' format (str).
     :return: A pandas DataFrame containing the replicated data.
     """
-    from xbbg import blp
+    blp = bloomberg()
 
     # Tickers to replicate. Adjust as needed for 1M, 3M, 6M, etc.
     tickers = [
@@ -112,6 +112,7 @@ import warnings
 import polars as pl
 
 from settings import config
+from data_sources import bloomberg
 
 
 # Configuration via settings.py
@@ -152,7 +153,7 @@ def pull_ois_history(
     $ USSOF CMPN Curncy           <f64> 1.058, 1.077
     $ USSO1 CMPN Curncy           <f64> 1.29, 1.353
     """
-    from xbbg import blp
+    blp = bloomberg(cached=True)
 
     tickers = ois_tickers()
     df = blp.bdh(
@@ -260,7 +261,7 @@ def pull_futures_for_tenor(
     $ CNVS_FACTOR_EOD                <f64> None, 0.8762
 
     """
-    from xbbg import blp
+    blp = bloomberg(cached=True)
 
     tenor_to_tickers = futures_ticker_map()
     if tenor not in tenor_to_tickers:
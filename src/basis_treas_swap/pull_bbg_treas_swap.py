@@ -16,6 +16,7 @@ from pathlib import Path
 import pandas as pd
 
 from settings import config
+from data_sources import bloomberg
 
 DATA_DIR: Path = config("DATA_DIR")
 START_DATE: str = config("START_DATE", default="2000-01-01")
@@ -31,7 +32,7 @@ def pull_raw_tyields(
     Returns
     - pd.DataFrame: MultiIndex columns by ticker with daily PX_LAST values.
     """
-    from xbbg import blp
+    blp = bloomberg(cached=True)
 
     months = [1, 2, 3, 4, 6, 12]
     years = [2, 3, 5, 7, 10, 20, 30]
@@ -53,7 +54,7 @@ def pull_raw_syields(
     Returns
     - pd.DataFrame: MultiIndex columns by ticker with daily PX_LAST values.
     """
-    from xbbg import blp
+    blp = bloomberg(cached=True)
 
     years = [1, 2, 3, 5, 10, 20, 30]
     tickers = [f"USSO{x} CMPN Curncy" for x in years]
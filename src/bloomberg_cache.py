@@ -0,0 +1,267 @@
+"""
+bloomberg_cache.py - Incremental Bloomberg history with a local parquet store
+
+The Bloomberg pulls ask for the full history since 1950 on every run. With
+``data_sources.bloomberg(cached=True)`` they get a ``BloombergCache`` that
+has the same ``bdh`` as ``xbbg.blp``. It keeps every (ticker, field) series
+it has seen in ``{BLOOMBERG_CACHE_DIR}/{field}/{ticker}.parquet``. That file
+holds a ``date`` and a ``value`` column, and the covered date range in its
+metadata. A call then only requests:
+
+- the dates after the covered range, plus the last ``BLOOMBERG_REVISION_DAYS``
+  days again so that revised values are picked up;
+- the dates before the covered range, if an earlier start is asked for.
+
+Coverage only grows for series that come back with data, so a request that
+fails (xbbg returns an empty frame) is asked for again on the next call.
+
+Tickers that need the same range and fields are requested together, in
+batches of at most ``batch_size``. ``bdh`` calls with options that change
+the data (periodicity, fill, adjustments) bypass the cache.
+
+Usage:
+    blp = bloomberg(cached=True)
+    df = blp.bdh(tickers, ["PX_LAST"], start_date="1950-01-01", end_date=END_DATE)
+
+    python ./src/bloomberg_cache.py          # list the cached series
+"""
+
+import os
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from settings import config
+
+BLOOMBERG_CACHE_DIR = Path(
+    config("BLOOMBERG_CACHE_DIR", default=Path(config("DATA_DIR")) / "_bloomberg_cache")
+)
+BLOOMBERG_REVISION_DAYS = int(config("BLOOMBERG_REVISION_DAYS", default=10))
+
+# Tickers per bdh request
+BATCH_SIZE = 25
+
+# bdh options that don't change the returned values; any other option
+# (Per, Fill, Days, adjust, ...) sends the call straight to the client
+PASSTHROUGH_SAFE_KWARGS = {"timeout"}
+
+_COVERAGE_START = b"ftsfr_covered_start"
+_COVERAGE_END = b"ftsfr_covered_end"
+
+
+def _safe_name(name):
+    return re.sub(r"[^\w.-]+", "_", name)
+
+
+def _as_list(value):
+    return [value] if isinstance(value, str) else list(value)
+
+
+class BloombergCache:
+    """``bdh`` of ``client`` backed by an incremental per-series store.
+
+    Args:
+        client: ``xbbg.blp`` or anything with the same ``bdh``
+        directory: Store root (default ``BLOOMBERG_CACHE_DIR``)
+        revision_days: Days before the end of the covered range that are
+            requested again on every update
+        batch_size: Tickers per request
+    """
+
+    def __init__(
+        self,
+        client,
+        directory=None,
+        revision_days=BLOOMBERG_REVISION_DAYS,
+        batch_size=BATCH_SIZE,
+    ):
+        self.client = client
+        self.directory = Path(directory or BLOOMBERG_CACHE_DIR)
+        self.revision_days = revision_days
+        self.batch_size = batch_size
+
+    def _path(self, ticker, field):
+        return self.directory / _safe_name(field) / f"{_safe_name(ticker)}.parquet"
+
+    def read(self, ticker, field):
+        """Cached (values, covered_start, covered_end); (None, None, None)
+        if the series isn't cached."""
+        import pyarrow.parquet as pq
+
+        path = self._path(ticker, field)
+        if not path.exists():
+            return None, None, None
+        table = pq.read_table(path)
+        meta = table.schema.metadata or {}
+        values = table.to_pandas().set_index("date")["value"]
+        return (
+            values,
+            pd.Timestamp(meta[_COVERAGE_START].decode()),
+            pd.Timestamp(meta[_COVERAGE_END].decode()),
+        )
+
+    def _write(self, ticker, field, values, start, end):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        frame = values.rename("value").rename_axis("date").reset_index()
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        table = table.replace_schema_metadata(
+            {
+                **(table.schema.metadata or {}),
+                _COVERAGE_START: start.date().isoformat().encode(),
+                _COVERAGE_END: end.date().isoformat().encode(),
+            }
+        )
+        path = self._path(ticker, field)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    def missing_ranges(self, ticker, field, start, end):
+        """Date ranges to request so the cache covers ``[start, end]``."""
+        _, covered_start, covered_end = self.read(ticker, field)
+        if covered_start is None:
+            return [(start, end)]
+        ranges = []
+        if start < covered_start:
+            ranges.append((start, covered_start - pd.Timedelta(days=1)))
+        refresh_from = covered_end - pd.Timedelta(days=self.revision_days)
+        if end > refresh_from:
+            ranges.append((max(start, refresh_from), end))
+        return ranges
+
+    def update(self, tickers, fields, start, end, **kwargs):
+        """Request what ``[start, end]`` is missing and merge it into the store.
+
+        Returns the number of bdh requests made.
+        """
+        needed = defaultdict(set)
+        for ticker in tickers:
+            for field in fields:
+                for date_range in self.missing_ranges(ticker, field, start, end):
+                    needed[(ticker, date_range)].add(field)
+
+        # Tickers with the same range and fields share a request
+        groups = defaultdict(list)
+        for (ticker, date_range), needed_fields in needed.items():
+            field_key = tuple(f for f in fields if f in needed_fields)
+            groups[(date_range, field_key)].append(ticker)
+
+        today = pd.Timestamp.today().normalize()
+        n_requests = 0
+        for ((range_start, range_end), group_fields), group_tickers in groups.items():
+            for i in range(0, len(group_tickers), self.batch_size):
+                batch = group_tickers[i : i + self.batch_size]
+                df = self.client.bdh(
+                    tickers=batch,
+                    flds=list(group_fields),
+                    start_date=range_start.strftime("%Y-%m-%d"),
+                    end_date=range_end.strftime("%Y-%m-%d"),
+                    **kwargs,
+                )
+                n_requests += 1
+                for ticker in batch:
+                    for field in group_fields:
+                        if df.empty or (ticker, field) not in df.columns:
+                            continue
+                        fetched = df[(ticker, field)].dropna()
+                        # xbbg returns nothing on timeouts and errors; the range
+                        # stays uncovered so that the next call asks for it again
+                        if fetched.empty:
+                            continue
+                        fetched.index = pd.DatetimeIndex(fetched.index)
+                        self._merge(
+                            ticker,
+                            field,
+                            fetched,
+                            range_start,
+                            min(range_end, today),
+                        )
+        return n_requests
+
+    def _merge(self, ticker, field, fetched, start, end):
+        cached, covered_start, covered_end = self.read(ticker, field)
+        if cached is None:
+            merged = fetched
+            covered_start, covered_end = start, end
+        else:
+            # The fetched range replaces what was cached for it, so values
+            # revised or withdrawn by Bloomberg are updated too
+            kept = cached[(cached.index < start) | (cached.index > end)]
+            merged = pd.concat([kept, fetched])
+            covered_start = min(covered_start, start)
+            covered_end = max(covered_end, end)
+        self._write(ticker, field, merged.sort_index(), covered_start, covered_end)
+
+    def bdh(self, tickers, flds=None, start_date=None, end_date="today", **kwargs):
+        """Daily history with (ticker, field) columns, like ``xbbg.blp.bdh``."""
+        if set(kwargs) - PASSTHROUGH_SAFE_KWARGS:
+            return self.client.bdh(
+                tickers=tickers,
+                flds=flds,
+                start_date=start_date,
+                end_date=end_date,
+                **kwargs,
+            )
+        tickers = _as_list(tickers)
+        fields = _as_list(["Last_Price"] if flds is None else flds)
+        end = pd.Timestamp(end_date).normalize()
+        start = (
+            pd.Timestamp(start_date).normalize()
+            if start_date is not None
+            else end - pd.Timedelta(weeks=8)
+        )
+
+        self.update(tickers, fields, start, end, **kwargs)
+
+        columns = {}
+        for ticker in tickers:
+            for field in fields:
+                values, _, _ = self.read(ticker, field)
+                if values is not None:
+                    values = values[(values.index >= start) & (values.index <= end)]
+                    if not values.empty:
+                        columns[(ticker, field)] = values
+        if not columns:
+            return pd.DataFrame()
+        df = pd.concat(columns, axis=1).sort_index()
+        df.index.name = None
+        return df.dropna(how="all")
+
+    def series(self):
+        """One row per cached series with its covered range and count."""
+        import pyarrow.parquet as pq
+
+        rows = []
+        for path in sorted(self.directory.glob("*/*.parquet")):
+            meta = pq.read_schema(path).metadata or {}
+            rows.append(
+                {
+                    "field": path.parent.name,
+                    "ticker": path.stem,
+                    "covered_start": meta.get(_COVERAGE_START, b"").decode(),
+                    "covered_end": meta.get(_COVERAGE_END, b"").decode(),
+                    "observations": pq.read_metadata(path).num_rows,
+                }
+            )
+        return pd.DataFrame(rows)
+
+
+def main():
+    series = BloombergCache(client=None).series()
+    if series.empty:
+        print(f"No cached Bloomberg series in {BLOOMBERG_CACHE_DIR}")
+        return 0
+    print(series.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
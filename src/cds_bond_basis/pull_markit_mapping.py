@@ -11,9 +11,9 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pandas as pd
-import wrds
 
 from settings import config
+from data_sources import wrds_connection
 
 DATA_DIR = Path(config("DATA_DIR"))
 WRDS_USERNAME = config("WRDS_USERNAME")
@@ -31,7 +31,7 @@ def get_mapping(wrds_username=WRDS_USERNAME):
         dict: A dictionary where each key is a year from 2001 to 2023 and each value is a DataFrame containing
         the date, ticker, and parspread for that year.
     """
-    db = wrds.Connection(wrds_username=wrds_username)
+    db = wrds_connection(wrds_username=wrds_username)
     bond_data = {}
 
     table_name = "markit_red.redobllookup"
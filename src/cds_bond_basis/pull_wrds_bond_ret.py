@@ -15,9 +15,9 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pandas as pd
-import wrds
 
 from settings import config
+from data_sources import wrds_connection
 
 DATA_DIR = Path(config("DATA_DIR")) / "cds_bond_basis"
 WRDS_USERNAME = config("WRDS_USERNAME")
@@ -52,7 +52,7 @@ def get_bondret_data_as_dict(
     end_date=END_DATE,
 ):
     """Pull WRDS Bond Returns data year-by-year and return as {year: df}."""
-    db = wrds.Connection(wrds_username=wrds_username)
+    db = wrds_connection(wrds_username=wrds_username)
 
     yearly_data = {}
     for year in range(start_date.year, end_date.year + 1):
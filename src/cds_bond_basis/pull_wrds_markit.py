@@ -10,10 +10,10 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pandas as pd
-import wrds
 from thefuzz import fuzz
 
 from settings import config
+from data_sources import wrds_connection
 
 DATA_DIR = Path(config("DATA_DIR"))
 WRDS_USERNAME = config("WRDS_USERNAME")
@@ -32,7 +32,7 @@ def get_cds_data_as_dict(wrds_username=WRDS_USERNAME):
         dict: A dictionary where each key is a year from 2001 to 2023 and each value is a DataFrame containing
         the date, ticker, and parspread for that year.
     """
-    db = wrds.Connection(wrds_username=wrds_username)
+    db = wrds_connection(wrds_username=wrds_username)
     cds_data = {}
     for year in range(2001, END_DATE.year + 1):
         table_name = f"markit.CDS{year}"  # Generate table name dynamically
@@ -95,7 +95,7 @@ def get_value_counts(variable, wrds_username=WRDS_USERNAME):
     Retrieves all unique values across all Markit CDS tables
     and counts their total frequency of occurrence.
     """
-    db = wrds.Connection(wrds_username=wrds_username)
+    db = wrds_connection(wrds_username=wrds_username)
     yearly_counts = []
 
     for year in range(2001, 2024):
@@ -157,7 +157,7 @@ def pull_markit_red_crsp_link(wrds_username=WRDS_USERNAME):
     We strongly advise our users to carefully examine the linking output, and set
     their own quality criteria suitable for their individual research agenda.
     """
-    conn = wrds.Connection(wrds_username=wrds_username)
+    conn = wrds_connection(wrds_username=wrds_username)
 
     ### Get red entity information
     redent = conn.get_table(library="markit", table="redent")
@@ -285,7 +285,7 @@ def _demo():
     # 0   EOD  1023341647
 
     ## Explore quotes
-    db = wrds.Connection(wrds_username=WRDS_USERNAME)
+    db = wrds_connection(wrds_username=WRDS_USERNAME)
     year = 2021
     table_name = f"markit.CDS{year}"  # Generate table name dynamically
     query = f"""
@@ -53,6 +53,7 @@ import pull_fred
 import pull_markit_cds
 from scipy.interpolate import CubicSpline
 
+from instrumentation import stage
 from settings import config
 
 DATA_DIR = config("DATA_DIR")
@@ -222,8 +223,15 @@ def _get_filtered_cds_data_with_quantiles(
         cds_spreads = cds_spreads.lazy()
 
     # Build the query lazily - filter and clean data
+    # The year bounds prune whole partitions of a load_cds_data scan
+    year_bounds = (
+        [pl.col("year").is_between(start_date.year, end_date.year)]
+        if "year" in cds_spreads.collect_schema().names()
+        else []
+    )
     cds_spread_clean = (
         cds_spreads.filter(
+            *year_bounds,
             (pl.col("date") >= start_date)
             & (pl.col("date") <= end_date)
             & (pl.col("country") == "United States")
@@ -416,7 +424,9 @@ def calc_cds_return_for_contracts(
                     credit_quantile, daily_return.
     """
     # Step 1: Compute discount rates
-    quarterly_discount = _get_quarterly_discount_polars(raw_rates, start_date, end_date)
+    quarterly_discount = _get_quarterly_discount_polars(
+        raw_rates, start_date, end_date, data_dir=data_dir
+    )
 
     # Step 2: Calculate lambda for each contract based on 5Y spreads within same credit quantile
     # First, get 5Y spreads for lambda calculation
@@ -921,49 +931,54 @@ def run_cds_calculation(
 
     # Get contract-level data
     print("\n1. Loading and filtering CDS data...")
-    step_start = time.time()
-    contract_data = get_contract_data(start_date, end_date, cds_spreads)
+    with stage("contract_data") as st:
+        contract_data = get_contract_data(start_date, end_date, cds_spreads)
+        st.rows = len(contract_data)
     print(f"   Loaded {len(contract_data):,} contract-date observations")
-    print(f"   Time: {_format_elapsed_time(time.time() - step_start)}")
+    print(f"   Time: {_format_elapsed_time(st.wall_s)}")
 
     # Calculate contract-level returns
     print("\n2. Calculating daily contract-level returns...")
-    step_start = time.time()
-    daily_contract_returns = calc_cds_return_for_contracts(
-        contract_data, raw_rates, start_date, end_date, data_dir=data_dir
-    )
+    with stage("daily_contract_returns") as st:
+        daily_contract_returns = calc_cds_return_for_contracts(
+            contract_data, raw_rates, start_date, end_date, data_dir=data_dir
+        )
+        st.rows = len(daily_contract_returns)
     print(f"   Generated {len(daily_contract_returns):,} daily returns")
-    print(f"   Time: {_format_elapsed_time(time.time() - step_start)}")
+    print(f"   Time: {_format_elapsed_time(st.wall_s)}")
 
     print("\n3. Aggregating to monthly contract returns...")
-    step_start = time.time()
-    monthly_contract_returns = calculate_monthly_contract_returns(
-        daily_contract_returns
-    )
+    with stage("monthly_contract_returns") as st:
+        monthly_contract_returns = calculate_monthly_contract_returns(
+            daily_contract_returns
+        )
+        st.rows = len(monthly_contract_returns)
     print(f"   Generated {len(monthly_contract_returns):,} monthly contract returns")
-    print(f"   Time: {_format_elapsed_time(time.time() - step_start)}")
+    print(f"   Time: {_format_elapsed_time(st.wall_s)}")
 
     # Calculate portfolio-level returns
     print("\n4. Creating portfolio structure...")
-    step_start = time.time()
-    portfolio_dict = get_portfolio_dict(start_date, end_date, cds_spreads)
+    with stage("portfolio_dict") as st:
+        portfolio_dict = get_portfolio_dict(start_date, end_date, cds_spreads)
+        st.rows = len(portfolio_dict)
     print(f"   Created {len(portfolio_dict)} portfolios")
-    print(f"   Time: {_format_elapsed_time(time.time() - step_start)}")
+    print(f"   Time: {_format_elapsed_time(st.wall_s)}")
 
     print("\n5. Calculating daily portfolio returns...")
-    step_start = time.time()
-    daily_returns_dict = calc_cds_return_for_portfolios(
-        portfolio_dict, raw_rates, start_date, end_date, data_dir=data_dir
-    )
-    print(f"   Time: {_format_elapsed_time(time.time() - step_start)}")
+    with stage("daily_portfolio_returns") as st:
+        daily_returns_dict = calc_cds_return_for_portfolios(
+            portfolio_dict, raw_rates, start_date, end_date, data_dir=data_dir
+        )
+    print(f"   Time: {_format_elapsed_time(st.wall_s)}")
 
     print("\n6. Aggregating and scaling monthly portfolio returns...")
-    step_start = time.time()
-    monthly_portfolio_returns = calculate_monthly_returns(daily_returns_dict)
+    with stage("monthly_portfolio_returns") as st:
+        monthly_portfolio_returns = calculate_monthly_returns(daily_returns_dict)
+        st.rows = len(monthly_portfolio_returns)
     print(
         f"   Generated returns for {len(monthly_portfolio_returns.columns) - 1} portfolios"
     )
-    print(f"   Time: {_format_elapsed_time(time.time() - step_start)}")
+    print(f"   Time: {_format_elapsed_time(st.wall_s)}")
 
     total_elapsed = time.time() - overall_start
     print("\n" + "=" * 60)
@@ -1004,8 +1019,8 @@ if __name__ == "__main__":
     raw_rates = pull_fed_yield_curve.load_fed_yield_curve(data_dir=data_dir)
 
     print("Loading CDS spread data...")
-    # Load CDS data as LazyFrame for memory efficiency
-    cds_spreads = pl.scan_parquet(data_dir / "markit_cds.parquet")
+    # Lazy scan of the year partitions; the filters below are pushed into it
+    cds_spreads = pull_markit_cds.load_cds_data(data_dir=data_dir)
 
     # Calculate both contract and portfolio returns
     contract_returns, portfolio_returns = run_cds_calculation(
@@ -1017,14 +1032,14 @@ if __name__ == "__main__":
 
     # Save both contract and portfolio returns
     print("\nSaving results...")
-    save_start = time.time()
-    contract_returns.write_parquet(data_dir / "markit_cds_contract_returns.parquet")
-    print(
-        f"  Saved contract returns: {data_dir / 'markit_cds_contract_returns.parquet'}"
-    )
+    with stage("save") as st:
+        contract_returns.write_parquet(data_dir / "markit_cds_contract_returns.parquet")
+        print(
+            f"  Saved contract returns: {data_dir / 'markit_cds_contract_returns.parquet'}"
+        )
 
-    portfolio_returns.write_parquet(data_dir / "markit_cds_returns.parquet")
-    print(f"  Saved portfolio returns: {data_dir / 'markit_cds_returns.parquet'}")
-    print(f"  Save time: {_format_elapsed_time(time.time() - save_start)}")
+        portfolio_returns.write_parquet(data_dir / "markit_cds_returns.parquet")
+        print(f"  Saved portfolio returns: {data_dir / 'markit_cds_returns.parquet'}")
+    print(f"  Save time: {_format_elapsed_time(st.wall_s)}")
 
     print("\nCalculation complete!")
@@ -4,78 +4,172 @@ Code by Kausthub Kesheva
 """
 
 # Add src directory to Python path
+import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pandas as pd
 import polars as pl
-import wrds
 from thefuzz import fuzz
 
 from settings import config
+from data_sources import wrds_connection
 
 DATA_DIR = config("DATA_DIR")
 WRDS_USERNAME = config("WRDS_USERNAME")
 START_DATE = pd.Timestamp("2001-01-01")
 END_DATE = pd.Timestamp("2025-01-01")
 
+# markit.CDS{year} tables pulled, and how many are queried at once
+CDS_YEARS = range(2001, 2024)
+MAX_CONCURRENT_YEARS = 4
+CDS_PARTITION_DIR = "markit_cds"
 
-def get_cds_data_as_dict(wrds_username=WRDS_USERNAME):
+
+def _cds_query(year):
+    """SQL for the USD, no-restructuring curves of ``markit.CDS{year}``."""
+    table_name = f"markit.CDS{year}"  # Generate table name dynamically
+    return f"""
+    SELECT DISTINCT
+        date, -- The date on which points on a curve were calculated
+        ticker, -- The Markit ticker for the organization.
+        RedCode, -- The RED Code for identification of the entity. 
+        parspread, -- The par spread associated to the contributed CDS curve.
+        convspreard, -- The conversion spread associated to the contributed CDS curve.
+        tenor,
+        country,
+        creditdv01, -- If the submission is in par spread, the values will match
+        -- those in ContributedLevel(X).
+        riskypv01, -- The risky annuity of a trade of the maturity of the CDS
+        -- instrument calculated from the CDS Composite curve.
+        irdv01, -- The change in the mark to market from a basis point change
+        -- in the interest rate
+        rec01, -- The change in the mark to market from a change in the
+        -- recovery rate by 1 percent
+        dp, -- The implied default probability of the reference entity,
+        jtd, -- The jump to default of the reference entity. The change in 
+        -- mark to market assuming an instantaneous credit event
+        dtz -- The jump to zero. The change in the mark to market
+        -- assuming an instantaneous credit event and a recovery rate of 0
+    FROM
+        {table_name}
+    WHERE
+        -- country = 'United States'
+        currency = 'USD' AND
+        docclause LIKE 'XR%%' AND 
+            -- The documentation clause. Values are: MM (Modified
+            -- Modified Restructuring), MR (Modified Restructuring), CR
+            -- (Old Restructuring), XR (No Restructuring).
+            -- Among all the data, these are the unique values for docclause:
+            --  CR, CR14, MM, MM14, MR, MR14, XR, XR14
+        CompositeDepth5Y >= 3 AND
+        tenor IN ('1Y', '3Y', '5Y', '7Y', '10Y')
+    """
+
+
+def _map_years(
+    func, years, wrds_username=WRDS_USERNAME, max_workers=MAX_CONCURRENT_YEARS
+):
+    """{year: func(db, year)}, running up to ``max_workers`` years at once.
+
+    A WRDS connection can't be shared between threads, so each worker
+    thread opens its own and reuses it for the years it picks up.
+    """
+    local = threading.local()
+    connections = []
+    lock = threading.Lock()
+
+    def run(year):
+        if not hasattr(local, "db"):
+            local.db = wrds_connection(wrds_username=wrds_username)
+            with lock:
+                connections.append(local.db)
+        return func(local.db, year)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            return dict(zip(years, pool.map(run, years)))
+    finally:
+        for db in connections:
+            db.close()
+
+
+def get_cds_data_as_dict(
+    wrds_username=WRDS_USERNAME, years=CDS_YEARS, max_workers=MAX_CONCURRENT_YEARS
+):
     """
     Connects to a WRDS (Wharton Research Data Services) database and fetches Credit Default Swap (CDS) data
     for each year from 2001 to 2023 from tables named `markit.CDS{year}`. The data fetched includes the date,
     ticker, and parspread where the tenor is '5Y' and the country is 'United States'. The fetched data for each
     year is stored in a dictionary with the year as the key. The function finally returns this dictionary.
+    Up to ``max_workers`` years are queried at once.
 
     Returns:
         dict: A dictionary where each key is a year from 2001 to 2023 and each value is a DataFrame containing
         the date, ticker, and parspread for that year.
     """
-    db = wrds.Connection(wrds_username=wrds_username)
-    cds_data = {}
-    for year in range(2001, 2024):  # Loop from 2001 to 2005
-        table_name = f"markit.CDS{year}"  # Generate table name dynamically
-        query = f"""
-        SELECT DISTINCT
-            date, -- The date on which points on a curve were calculated
-            ticker, -- The Markit ticker for the organization.
-            RedCode, -- The RED Code for identification of the entity. 
-            parspread, -- The par spread associated to the contributed CDS curve.
-            convspreard, -- The conversion spread associated to the contributed CDS curve.
-            tenor,
-            country,
-            creditdv01, -- If the submission is in par spread, the values will match
-            -- those in ContributedLevel(X).
-            riskypv01, -- The risky annuity of a trade of the maturity of the CDS
-            -- instrument calculated from the CDS Composite curve.
-            irdv01, -- The change in the mark to market from a basis point change
-            -- in the interest rate
-            rec01, -- The change in the mark to market from a change in the
-            -- recovery rate by 1 percent
-            dp, -- The implied default probability of the reference entity,
-            jtd, -- The jump to default of the reference entity. The change in 
-            -- mark to market assuming an instantaneous credit event
-            dtz -- The jump to zero. The change in the mark to market
-            -- assuming an instantaneous credit event and a recovery rate of 0
-        FROM
-            {table_name}
-        WHERE
-            -- country = 'United States'
-            currency = 'USD' AND
-            docclause LIKE 'XR%%' AND 
-                -- The documentation clause. Values are: MM (Modified
-                -- Modified Restructuring), MR (Modified Restructuring), CR
-                -- (Old Restructuring), XR (No Restructuring).
-                -- Among all the data, these are the unique values for docclause:
-                --  CR, CR14, MM, MM14, MR, MR14, XR, XR14
-            CompositeDepth5Y >= 3 AND
-            tenor IN ('1Y', '3Y', '5Y', '7Y', '10Y')
-        """
-        cds_data[year] = db.raw_sql(query, date_cols=["date"])
-    # cds_data = cds_data.drop_duplicates()
-    return cds_data
+    return _map_years(
+        lambda db, year: db.raw_sql(_cds_query(year), date_cols=["date"]),
+        years,
+        wrds_username=wrds_username,
+        max_workers=max_workers,
+    )
+
+
+def cds_partition_path(data_dir, year):
+    """Parquet file of one year of ``markit_cds/`` (hive-partitioned by year)."""
+    return Path(data_dir) / CDS_PARTITION_DIR / f"year={year}" / "data.parquet"
+
+
+def pull_cds_partitions(
+    data_dir=DATA_DIR,
+    wrds_username=WRDS_USERNAME,
+    years=CDS_YEARS,
+    refresh_years=None,
+    max_workers=MAX_CONCURRENT_YEARS,
+):
+    """
+    Pulls each year of CDS data into its own parquet partition under
+    ``data_dir/markit_cds/year={year}/``.
+
+    Years already on disk are skipped, except ``refresh_years`` (default: the
+    last year, which WRDS is still appending to). Each year is written by the
+    worker that queried it, so at most ``max_workers`` years are in memory.
+    Years without any rows aren't written and are queried again next time.
+
+    Returns:
+        dict: Rows written per pulled year (skipped years are left out).
+    """
+    years = list(years)
+    refresh_years = set(years[-1:] if refresh_years is None else refresh_years)
+    to_pull = [
+        year
+        for year in years
+        if year in refresh_years or not cds_partition_path(data_dir, year).exists()
+    ]
+    skipped = len(years) - len(to_pull)
+    if skipped:
+        print(f"Skipping {skipped} CDS years already in {data_dir / CDS_PARTITION_DIR}")
+
+    def pull_year(db, year):
+        df = db.raw_sql(_cds_query(year), date_cols=["date"])
+        if df.empty:
+            return 0
+        path = cds_partition_path(data_dir, year)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        print(f"  markit.CDS{year}: {len(df):,} rows")
+        return len(df)
+
+    return _map_years(
+        pull_year, to_pull, wrds_username=wrds_username, max_workers=max_workers
+    )
 
 
 def combine_cds_data(cds_data: dict) -> pd.DataFrame:
@@ -122,10 +216,10 @@ def get_value_counts(variable, wrds_username=WRDS_USERNAME):
     Retrieves all unique values across all Markit CDS tables
     and counts their total frequency of occurrence.
     """
-    db = wrds.Connection(wrds_username=wrds_username)
+    db = wrds_connection(wrds_username=wrds_username)
     yearly_counts = []
 
-    for year in range(2001, 2024):
+    for year in CDS_YEARS:
         query = f"""
         SELECT 
             {variable}, 
@@ -184,7 +278,7 @@ def pull_markit_red_crsp_link(wrds_username=WRDS_USERNAME):
     We strongly advise our users to carefully examine the linking output, and set
     their own quality criteria suitable for their individual research agenda.
     """
-    conn = wrds.Connection(wrds_username=wrds_username)
+    conn = wrds_connection(wrds_username=wrds_username)
 
     ### Get red entity information
     redent = conn.get_table(library="markit", table="redent")
@@ -260,8 +354,16 @@ def right_merge_cds_crsp(
 ):
     """
     Right merge the CDS data with the CRSP data.
+
+    A Polars LazyFrame (``load_cds_data``) is merged lazily, so the result
+    can be streamed to disk without loading every year.
     """
     columns_to_keep = ["redcode", "permno", "permco", "flg", "nameRatio"]
+    if isinstance(cds_data, pl.LazyFrame):
+        link = pl.from_pandas(cds_crsp_link[columns_to_keep]).filter(
+            pl.col("nameRatio") >= ratio_threshold
+        )
+        return cds_data.join(link.lazy(), on="redcode", how="right")
     merged_df = pd.merge(
         cds_data, cds_crsp_link[columns_to_keep], how="right", on="redcode"
     )
@@ -270,8 +372,15 @@ def right_merge_cds_crsp(
 
 
 def load_cds_data(data_dir=DATA_DIR):
-    path = data_dir / "markit_cds.parquet"
-    return pd.read_parquet(path)
+    """
+    Lazily scans the year partitions written by ``pull_cds_partitions``.
+
+    Returns a Polars LazyFrame with a ``year`` column from the partition
+    names, so filters on date, country, tenor or parspread are pushed down
+    into the parquet scan, and years outside a ``year`` filter aren't read.
+    """
+    path = Path(data_dir) / CDS_PARTITION_DIR
+    return pl.scan_parquet(path / "**" / "*.parquet", hive_partitioning=True)
 
 
 def load_cds_crsp_link(data_dir=DATA_DIR):
@@ -286,7 +395,7 @@ def load_cds_subsetted_to_crsp(data_dir=DATA_DIR):
 
 def _demo():
     cds_data = load_cds_data(data_dir=DATA_DIR)
-    cds_data.info()
+    print(cds_data.collect_schema())
 
     cds_crsp_link = load_cds_crsp_link(data_dir=DATA_DIR)
     cds_crsp_link.info()
@@ -312,7 +421,7 @@ def _demo():
     # 0   EOD  1023341647
 
     ## Explore quotes
-    db = wrds.Connection(wrds_username=WRDS_USERNAME)
+    db = wrds_connection(wrds_username=WRDS_USERNAME)
     year = 2021
     table_name = f"markit.CDS{year}"  # Generate table name dynamically
     query = f"""
@@ -371,12 +480,13 @@ def _demo():
 
 
 if __name__ == "__main__":
-    cds_data = pull_cds_data(wrds_username=WRDS_USERNAME)
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-    cds_data.to_parquet(DATA_DIR / "markit_cds.parquet")
+    pull_cds_partitions(data_dir=DATA_DIR, wrds_username=WRDS_USERNAME)
 
     cds_crsp_link = pull_markit_red_crsp_link(wrds_username=WRDS_USERNAME)
     cds_crsp_link.to_parquet(DATA_DIR / "markit_red_crsp_link.parquet")
 
-    cds_crsp_merged = right_merge_cds_crsp(cds_data, cds_crsp_link, ratio_threshold=50)
-    cds_crsp_merged.to_parquet(DATA_DIR / "markit_cds_subsetted_to_crsp.parquet")
+    cds_crsp_merged = right_merge_cds_crsp(
+        load_cds_data(data_dir=DATA_DIR), cds_crsp_link, ratio_threshold=50
+    )
+    cds_crsp_merged.sink_parquet(DATA_DIR / "markit_cds_subsetted_to_crsp.parquet")
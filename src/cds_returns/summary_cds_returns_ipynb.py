@@ -100,11 +100,11 @@ Following He et al. and Palhares, we use Markit as the source for CDS-related in
 cds_df = pull_markit_cds.load_cds_data(data_dir=DATA_DIR)
 
 # %%
-cds_df.columns
+cds_df.collect_schema().names()
 
 # %%
 """
-> **Columns in `markit_cds.parquet`**
+> **Columns in `markit_cds/` (one parquet partition per year)**
 > 
 > 
 > 
@@ -147,7 +147,7 @@ We have also generated two additional CDS tables, which are not used directly in
 A mapping table that links Markit RED codes to CRSP Permnos using CUSIP and Ticker, supplemented by a fuzzy-matched name similarity score (nameRatio) and a linking flag (flg), indicating the method used (CUSIP or Ticker).
 
 2. `markit_cds_subsetted_to_crsp.parquet`:
-A filtered subset of markit_cds.parquet that includes only records with RED codes successfully matched to CRSP Permnos (where nameRatio >= 50). This table is intended for use when merging CDS data with CRSP equity or financial datasets.
+A filtered subset of the `markit_cds/` data that includes only records with RED codes successfully matched to CRSP Permnos (where nameRatio >= 50). This table is intended for use when merging CDS data with CRSP equity or financial datasets.
 """
 
 # %%
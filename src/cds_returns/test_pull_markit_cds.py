@@ -0,0 +1,101 @@
+"""
+Tests for the year-partitioned Markit CDS pull and its lazy loader.
+
+The pull runs against the local (synthetic) WRDS store of data_sources.py.
+"""
+
+import os
+import sys
+from datetime import date
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pull_markit_cds reads WRDS_USERNAME at import; the local backend needs none
+os.environ.setdefault("WRDS_USERNAME", "")
+
+import data_sources  # noqa: E402
+import pull_markit_cds  # noqa: E402
+
+pytest.importorskip("duckdb")
+
+YEARS = range(2019, 2022)
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("local_sources")
+    data_sources.build_local_wrds(
+        directory, scale=0.1, start=date(2020, 1, 1), end=date(2021, 3, 31)
+    )
+    return directory
+
+
+@pytest.fixture
+def local_backend(store, monkeypatch):
+    monkeypatch.setattr(data_sources, "DATA_SOURCE_BACKEND", "local")
+    monkeypatch.setattr(data_sources, "LOCAL_SOURCE_DIR", store)
+    return store
+
+
+def test_partitions_are_written_once_and_match_the_query(local_backend, tmp_path):
+    rows = pull_markit_cds.pull_cds_partitions(
+        data_dir=tmp_path, years=YEARS, max_workers=2
+    )
+    # 2019 has no rows in the store, so it isn't written
+    assert rows[2019] == 0 and rows[2020] > 0 and rows[2021] > 0
+    assert not pull_markit_cds.cds_partition_path(tmp_path, 2019).exists()
+
+    by_year = pull_markit_cds.get_cds_data_as_dict(years=YEARS, max_workers=1)
+    cds = pull_markit_cds.load_cds_data(tmp_path).collect()
+    assert cds.height == sum(len(df) for df in by_year.values())
+    assert cds.filter(pl.col("year") == 2021).height == len(by_year[2021])
+
+    # Rerun: years on disk are skipped, the last year is refreshed
+    rows = pull_markit_cds.pull_cds_partitions(data_dir=tmp_path, years=YEARS)
+    assert sorted(rows) == [2019, 2021]
+
+
+def test_filters_are_pushed_into_the_scan(local_backend, tmp_path):
+    pull_markit_cds.pull_cds_partitions(data_dir=tmp_path, years=YEARS)
+    cds = pull_markit_cds.load_cds_data(tmp_path)
+
+    plan = (
+        cds.filter(
+            pl.col("year").is_between(2021, 2021),
+            pl.col("country") == "United States",
+            pl.col("parspread") <= 0.5,
+        )
+        .select("date", "ticker", "parspread")
+        .explain()
+    )
+    scan = plan[plan.index("Parquet SCAN") :]
+    # Only the 2021 partition is scanned, with the row filter applied there
+    assert "year=2021" in scan and "year=2020" not in scan
+    assert "SELECTION" in scan
+
+
+def test_lazy_merge_with_the_crsp_link(local_backend, tmp_path):
+    pull_markit_cds.pull_cds_partitions(data_dir=tmp_path, years=YEARS)
+    cds = pull_markit_cds.load_cds_data(tmp_path)
+    redcodes = cds.select(pl.col("redcode").unique()).collect()["redcode"]
+    link = pl.DataFrame(
+        {
+            "redcode": redcodes[:2].to_list() + ["NOCDS1"],
+            "permno": [1, 2, 3],
+            "permco": [10, 20, 30],
+            "flg": ["ticker"] * 3,
+            "nameRatio": [100, 20, 90],
+        }
+    ).to_pandas()
+
+    merged = pull_markit_cds.right_merge_cds_crsp(cds, link)
+    assert isinstance(merged, pl.LazyFrame)
+    merged = merged.collect()
+    # The low name-ratio link is dropped; the link without CDS keeps one row
+    assert set(merged["permno"]) == {1, 3}
+    assert merged.filter(pl.col("permno") == 3)["parspread"].is_null().all()
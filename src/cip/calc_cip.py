@@ -4,6 +4,7 @@ Calculate Covered Interest Parity (CIP) spreads from foreign exchange data.
 Code adapted with permission from https://github.com/Kunj121/CIP
 """
 
+import os
 import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
@@ -19,6 +20,13 @@ import pull_bbg_foreign_exchange
 DATA_DIR = config("DATA_DIR")
 OUTPUT_DIR = config("OUTPUT_DIR")
 
+# Window of the rolling outlier filter (see clean_outliers)
+OUTLIER_WINDOW = 45
+
+# Trailing rows of the previous output recomputed by an incremental update,
+# so that revised Bloomberg values near the end are picked up
+REFRESH_ROWS = 10
+
 
 def prepare_fx_data(spot_rates, forward_points, interest_rates):
     """
@@ -181,7 +189,7 @@ def compute_cip_spreads(df_merged):
     return df_merged
 
 
-def clean_outliers(df_merged, window_size=45, threshold=10):
+def clean_outliers(df_merged, window_size=OUTLIER_WINDOW, threshold=10):
     """
     Clean outliers using rolling median absolute deviation.
 
@@ -282,6 +290,44 @@ def plot_cip_spreads(
     plt.close()
 
 
+def load_merged_fx_data(end_date="2025-03-01", data_dir=DATA_DIR):
+    """Load the Bloomberg FX data and prepare it with ``prepare_fx_data``."""
+    data_dir = Path(data_dir)
+    spot_rates = pull_bbg_foreign_exchange.load_fx_spot_rates(data_dir=data_dir)
+    forward_points = pull_bbg_foreign_exchange.load_fx_forward_points(data_dir=data_dir)
+    interest_rates = pull_bbg_foreign_exchange.load_fx_interest_rates(data_dir=data_dir)
+
+    df_merged = prepare_fx_data(spot_rates, forward_points, interest_rates)
+    # Filter by end date
+    if end_date:
+        date = pd.Timestamp(end_date).date()
+        df_merged = df_merged.loc[:date]
+    return df_merged
+
+
+def cip_spreads_from_merged(df_merged, window_size=OUTLIER_WINDOW):
+    """
+    CIP spreads (outliers removed) from the output of ``prepare_fx_data``.
+
+    Returns
+    -------
+    pd.DataFrame
+        One column per currency, on the index of ``df_merged``
+    """
+    df_merged = compute_cip_spreads(df_merged.copy())
+    df_merged = clean_outliers(df_merged, window_size=window_size)
+
+    # Extract just the CIP columns
+    currencies = ["AUD", "CAD", "CHF", "EUR", "GBP", "JPY", "NZD", "SEK"]
+    cip_cols = [f"CIP_{c}_ln" for c in currencies if f"CIP_{c}_ln" in df_merged.columns]
+    spreads = df_merged[cip_cols].copy()
+
+    # Shorten column names for display
+    spreads.columns = [c[4:7] for c in spreads.columns]  # e.g., CIP_AUD_ln -> AUD
+
+    return spreads
+
+
 def calculate_cip(end_date="2025-03-01", data_dir=DATA_DIR):
     """
     Calculate CIP spreads from foreign exchange data.
@@ -300,33 +346,76 @@ def calculate_cip(end_date="2025-03-01", data_dir=DATA_DIR):
     pd.DataFrame
         DataFrame with CIP spreads
     """
-    data_dir = Path(data_dir)
-    # Load data
-    spot_rates = pull_bbg_foreign_exchange.load_fx_spot_rates(data_dir=data_dir)
-    forward_points = pull_bbg_foreign_exchange.load_fx_forward_points(data_dir=data_dir)
-    interest_rates = pull_bbg_foreign_exchange.load_fx_interest_rates(data_dir=data_dir)
+    df_merged = load_merged_fx_data(end_date=end_date, data_dir=data_dir)
+    return cip_spreads_from_merged(df_merged)
 
-    # Prepare data
-    df_merged = prepare_fx_data(spot_rates, forward_points, interest_rates)
-    # Filter by end date
-    if end_date:
-        date = pd.Timestamp(end_date).date()
-        df_merged = df_merged.loc[:date]
 
-    # Compute CIP spreads
-    df_merged = compute_cip_spreads(df_merged)
-    # Clean outliers
-    df_merged = clean_outliers(df_merged)
+def update_cip_spreads(
+    previous, df_merged, refresh_rows=REFRESH_ROWS, window_size=OUTLIER_WINDOW
+):
+    """
+    Extend previously computed CIP spreads to the dates of ``df_merged``.
 
-    # Extract just the CIP columns
-    currencies = ["AUD", "CAD", "CHF", "EUR", "GBP", "JPY", "NZD", "SEK"]
-    cip_cols = [f"CIP_{c}_ln" for c in currencies if f"CIP_{c}_ln" in df_merged.columns]
-    spreads = df_merged[cip_cols].copy()
+    Only the new dates and the last ``refresh_rows`` previous dates are
+    recomputed. The spreads are row by row, but the outlier filter at a date
+    looks back two rolling windows (a rolling MAD of deviations from a rolling
+    median), so the recomputation starts ``2 * (window_size - 1)`` rows
+    earlier and those context rows are discarded. Rows before that are taken
+    from ``previous`` unchanged. If the currencies differ from ``previous``,
+    everything is recomputed.
 
-    # Shorten column names for display
-    spreads.columns = [c[4:7] for c in spreads.columns]  # e.g., CIP_AUD_ln -> AUD
+    Parameters
+    ----------
+    previous : pd.DataFrame
+        Earlier output of ``calculate_cip`` (or of this function)
+    df_merged : pd.DataFrame
+        Output of ``prepare_fx_data`` covering at least the previous dates
+
+    Returns
+    -------
+    pd.DataFrame
+        Equal to ``cip_spreads_from_merged(df_merged)``
+    """
+    n_previous = (
+        0 if previous.empty else int((df_merged.index <= previous.index[-1]).sum())
+    )
+    start = max(0, n_previous - refresh_rows)
+    context_start = max(0, start - 2 * (window_size - 1))
+
+    tail = cip_spreads_from_merged(
+        df_merged.iloc[context_start:], window_size=window_size
+    ).iloc[start - context_start :]
+    if list(tail.columns) != list(previous.columns):
+        return cip_spreads_from_merged(df_merged, window_size=window_size)
+
+    kept = (
+        previous.loc[previous.index < df_merged.index[start]]
+        if start
+        else previous.iloc[:0]
+    )
+    return pd.concat([kept, tail])
 
-    return spreads
+
+def update_cip(previous, end_date="2025-03-01", data_dir=DATA_DIR):
+    """Incremental ``calculate_cip``: see ``update_cip_spreads``."""
+    df_merged = load_merged_fx_data(end_date=end_date, data_dir=data_dir)
+    return update_cip_spreads(previous, df_merged)
+
+
+def check_incremental(updated, end_date="2025-03-01", data_dir=DATA_DIR):
+    """Raise AssertionError unless ``updated`` equals a full rebuild."""
+    pd.testing.assert_frame_equal(
+        updated, calculate_cip(end_date=end_date, data_dir=data_dir)
+    )
+
+
+def write_parquet_atomic(df, path):
+    """Write ``df`` next to ``path`` and move it into place."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    df.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
 
 
 def load_cip_spreads(data_dir=DATA_DIR):
@@ -585,9 +674,16 @@ def plot_cip_from_data(
 
 
 if __name__ == "__main__":
-    # Calculate CIP spreads
-    cip_spreads = calculate_cip(end_date="2025-03-01")
+    path = DATA_DIR / "cip_spreads.parquet"
+
+    # --INCREMENTAL=1 extends the existing output instead of rebuilding it
+    if config("INCREMENTAL", default="0") != "0" and path.exists():
+        cip_spreads = update_cip(load_cip_spreads(DATA_DIR), end_date="2025-03-01")
+        if config("CHECK_INCREMENTAL", default="0") != "0":
+            check_incremental(cip_spreads, end_date="2025-03-01")
+    else:
+        # Calculate CIP spreads
+        cip_spreads = calculate_cip(end_date="2025-03-01")
 
     # Save to parquet
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    cip_spreads.to_parquet(DATA_DIR / "cip_spreads.parquet")
+    write_parquet_atomic(cip_spreads, path)
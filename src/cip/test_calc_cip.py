@@ -0,0 +1,76 @@
+"""
+Tests for the incremental update of the CIP spreads in calc_cip.py.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import calc_cip  # noqa: E402
+
+CURRENCIES = ["AUD", "CAD", "CHF", "EUR", "GBP", "JPY", "NZD", "SEK"]
+RATES = ["ADS", "CDS", "SFS", "EUS", "BPS", "JYS", "NDS", "SKS", "USS"]
+
+
+def bloomberg_frame(dates, tickers, values):
+    df = pd.DataFrame(values, columns=[f"{t} Curncy_PX_LAST" for t in tickers])
+    df.insert(0, "index", [d.date() for d in dates])
+    return df
+
+
+@pytest.fixture
+def df_merged():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2020-01-01", periods=300)
+    n, k = len(dates), len(CURRENCIES)
+    spot = np.exp(rng.normal(0, 0.005, (n, k)).cumsum(axis=0)) * np.linspace(
+        0.7, 110, k
+    )
+    points = rng.normal(20, 5, (n, k))
+    rates = 1.5 + rng.normal(0, 0.02, (n, k + 1)).cumsum(axis=0)
+    # Outliers and gaps, some of them close to the update boundaries
+    points[[50, 240, 291], [0, 3, 5]] = 5000
+    spot[[120, 288], [2, 6]] = np.nan
+    rates[289, -1] = np.nan
+
+    return calc_cip.prepare_fx_data(
+        bloomberg_frame(dates, CURRENCIES, spot),
+        bloomberg_frame(dates, [f"{c}3M" for c in CURRENCIES], points),
+        bloomberg_frame(dates, [f"{r}OA" for r in RATES], rates),
+    )
+
+
+@pytest.mark.parametrize("n_previous", [1, 100, 280])
+def test_update_matches_a_full_rebuild(df_merged, n_previous):
+    full = calc_cip.cip_spreads_from_merged(df_merged)
+    previous = calc_cip.cip_spreads_from_merged(df_merged.iloc[:n_previous])
+
+    updated = calc_cip.update_cip_spreads(previous, df_merged)
+    pd.testing.assert_frame_equal(updated, full)
+    # An update without new dates changes nothing
+    pd.testing.assert_frame_equal(calc_cip.update_cip_spreads(full, df_merged), full)
+
+
+def test_revised_values_in_the_refresh_window_are_picked_up(df_merged):
+    previous = calc_cip.cip_spreads_from_merged(df_merged.iloc[:280])
+
+    revised = df_merged.copy()
+    revised.iloc[275, revised.columns.get_loc("EUR_CURNCY3M")] *= 1.01
+    updated = calc_cip.update_cip_spreads(previous, revised)
+
+    pd.testing.assert_frame_equal(updated, calc_cip.cip_spreads_from_merged(revised))
+    assert updated["EUR"].iloc[275] != previous["EUR"].iloc[275]
+
+
+def test_write_parquet_atomic(df_merged, tmp_path):
+    spreads = calc_cip.cip_spreads_from_merged(df_merged)
+    path = tmp_path / "cip_spreads.parquet"
+    calc_cip.write_parquet_atomic(spreads, path)
+
+    pd.testing.assert_frame_equal(calc_cip.load_cip_spreads(tmp_path), spreads)
+    assert [p.name for p in tmp_path.iterdir()] == ["cip_spreads.parquet"]
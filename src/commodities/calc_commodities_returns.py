@@ -3,9 +3,11 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import commodity_returns_engine as engine
 import extract_hkm_cmdty
 import load_futures_data
 import pandas as pd
+import polars as pl
 from replicate_cmdty import generate_corr_matrix, decide_optimal_pairs
 from settings import config
 
@@ -47,36 +49,6 @@ ticker_to_commodity = {
 }
 
 
-def wide_to_long_returns(df, list_of_return_ticker):
-    """
-    Converts a wide-format return DataFrame to long-format with columns: ds, unique_id, y
-    """
-
-    if "yyyymm" in df.columns:
-        id_col = "yyyymm"
-    elif "Date" in df.columns:
-        id_col = "Date"
-    else:
-        raise ValueError("No date column found!")
-
-    cols = [id_col] + list_of_return_ticker
-    df_sub = df[cols].copy()
-
-    df_long = df_sub.melt(
-        id_vars=id_col,
-        value_vars=list_of_return_ticker,
-        var_name="unique_id",
-        value_name="y",
-    )
-    df_long = df_long.rename(columns={id_col: "ds"})
-
-    df_long = df_long.dropna(subset=["y"])
-
-    df_long = df_long.sort_values(["unique_id", "ds"]).reset_index(drop=True)
-
-    return df_long[["unique_id", "ds", "y"]]
-
-
 def calc_return_manual(df):
     df = df[df["Contract"] <= 4]
     df["Date"] = pd.to_datetime(df["Date"])
@@ -104,8 +76,28 @@ def calc_return_manual(df):
     return monthly_return
 
 
+def calc_gsci_monthly_returns(gsci_df, date_col="index"):
+    """
+    Monthly returns of the GSCI indices, as ``"{ticker}_PX_LAST_Return"``.
+
+    Same values as ``load_futures_data.load_gsci_data``, on month-end dates.
+    """
+    columns = {c: f"{c}_Return" for c in gsci_df.columns if str(c).endswith("_PX_LAST")}
+    daily = engine.bloomberg_frame(gsci_df, date_col=date_col, columns=columns)
+    return engine.monthly_returns(engine.month_end_prices(daily), fill_method="pad")
+
+
+def _selected_returns(monthly, list_of_return_ticker):
+    """FTSFR long output of the selected return columns of ``monthly``."""
+    selected = [c for c in list_of_return_ticker if c not in engine.MONTH_COLUMNS]
+    return engine.to_ftsfr(monthly.select(*engine.MONTH_COLUMNS, *selected))
+
+
 def generate_replication_gsci(data_dir=DATA_DIR):
-    df_return1 = load_futures_data.load_gsci_data(data_dir=data_dir)
+    gsci_monthly = calc_gsci_monthly_returns(
+        load_futures_data.load_gsci_indices(data_dir=data_dir)
+    )
+    df_return1 = gsci_monthly.to_pandas().set_index("yyyymm")
     hkm_df = extract_hkm_cmdty.extract_hkm_cmdty(
         data_dir=BASE_DIR / "_data" / "he_kelly_manela"
     )
@@ -117,41 +109,22 @@ def generate_replication_gsci(data_dir=DATA_DIR):
     )
     # optimal_pairs_df1 = optimal_pairs_df1.rename(columns={"Commodity_2": "HKM Column Name"})
     list_of_return_ticker = optimal_pairs_df1["Commodity_1"].to_list()
-    gsci_replication_df = wide_to_long_returns(df_return1, list_of_return_ticker)
+    gsci_replication_df = _selected_returns(gsci_monthly, list_of_return_ticker)
 
     return gsci_replication_df
 
 
 def calc_lme_monthly_1mprice(lme_df, metal_map, date_col="index", price_func=None):
-    df = lme_df.copy()
-    df["Date"] = pd.to_datetime(df[date_col])
-    df = df.sort_values("Date").drop(columns=[date_col])
-
-    for cash_col, m3_col in metal_map.values():
-        df[cash_col] = pd.to_numeric(df[cash_col], errors="coerce")
-        df[m3_col] = pd.to_numeric(df[m3_col], errors="coerce")
-
-    if price_func is None:
-        price_func = lambda cash, m3: cash + (m3 - cash) / 3
-
-    price_df = pd.DataFrame(index=df.index)
-    for metal, (cash_col, m3_col) in metal_map.items():
-        price_df[metal] = price_func(df[cash_col], df[m3_col])
-
-    price_df["Date"] = df["Date"]
-    price_df["Month"] = price_df["Date"].dt.to_period("M")
-    price_df = price_df.sort_values("Date")
-    price_monthly = price_df.groupby("Month").last()
-
-    price_monthly["yyyymm"] = price_monthly.index.strftime("%Y%m")
-    price_monthly["Date"] = price_monthly.index.to_timestamp("M")
-
-    cols = ["yyyymm", "Date"] + [
-        c for c in price_monthly.columns if c not in ["yyyymm", "Date", "Month"]
-    ]
-    price_monthly = price_monthly[cols].reset_index(drop=True)
+    """
+    Month-end 1M LME prices, interpolated from the cash and 3M prices.
 
-    return price_monthly
+    ``price_func(cash, m3)`` receives Polars expressions; arithmetic works
+    as it does on pandas Series (see ``commodity_returns_engine``).
+    """
+    columns = [c for pair in metal_map.values() for c in pair]
+    daily = engine.bloomberg_frame(lme_df, date_col=date_col, columns=columns)
+    prices = engine.lme_1m_prices(daily, metal_map, price_func=price_func)
+    return engine.month_end_prices(prices).to_pandas()
 
 
 def calc_lme_monthly_return(price_monthly):
@@ -169,27 +142,21 @@ def calc_lme_monthly_return(price_monthly):
 
 
 def compute_second_contract_return(commodity_futures_df, date_col="index"):
-    df = commodity_futures_df.copy()
-    df["Date"] = pd.to_datetime(df[date_col])
-    df = df.sort_values("Date").drop(columns=[date_col])
-    df["Month"] = df["Date"].dt.to_period("M")
-    df_monthly = df.groupby("Month").last()
+    """
+    Monthly returns of the second generic contracts ("... 2 Comdty_PX_LAST").
 
+    A month without a price gives missing returns on both sides of it.
+    """
     second_contract_cols = [
-        col for col in df_monthly.columns if col.endswith("2 Comdty_PX_LAST")
+        col
+        for col in commodity_futures_df.columns
+        if str(col).endswith("2 Comdty_PX_LAST")
     ]
-    for col in second_contract_cols:
-        df_monthly[col] = pd.to_numeric(df_monthly[col], errors="coerce")
-
-    ret_df = df_monthly[second_contract_cols].pct_change(fill_method=None)
-    ret_df["yyyymm"] = ret_df.index.strftime("%Y%m")
-    ret_df["Date"] = ret_df.index.to_timestamp("M")
-
-    ret_df = ret_df.reset_index(drop=True)
-    cols = ["yyyymm", "Date"] + second_contract_cols
-    ret_df = ret_df[cols]
-
-    return ret_df
+    daily = engine.bloomberg_frame(
+        commodity_futures_df, date_col=date_col, columns=second_contract_cols
+    )
+    monthly = engine.month_end_prices(daily)
+    return engine.monthly_returns(monthly, fill_method=None).to_pandas()
 
 
 def generate_replication_future_ticker(data_dir=DATA_DIR):
@@ -220,7 +187,9 @@ def generate_replication_future_ticker(data_dir=DATA_DIR):
         ticker_to_commodity
     )
     list_of_return_ticker = optimal_pairs_df2["Commodity_2"].to_list()
-    gsci_replication_df = wide_to_long_returns(combined_df, list_of_return_ticker)
+    gsci_replication_df = _selected_returns(
+        pl.from_pandas(combined_df.reset_index()), list_of_return_ticker
+    )
     return gsci_replication_df
 
 
@@ -251,85 +220,45 @@ def monthly_returns_mixed_prices(
         ["yyyymm", "Date", <one column per selected instrument>],
         where each instrument column is the monthly simple return.
     """
-    df = df_in.copy()
-
-    # 1) Parse and sort by date to ensure month-end selection is correct
-    df["Date"] = pd.to_datetime(df[date_col], errors="coerce")
-    df = df.sort_values("Date")
-
-    # 2) Extract price columns for the requested suffixes
-    if isinstance(df.columns, pd.MultiIndex):
-        # Collect sub-frames for each suffix level and merge them
-        collected = []
-        for sfx in suffixes:
-            if sfx in df.columns.get_level_values(-1):
-                sub = df.xs(sfx, axis=1, level=-1)  # remaining levels become columns
-                # Avoid name collisions by appending a short tag when needed
-                short_tag = "curncy" if "Curncy" in sfx else "comdty"
-                new_cols = []
-                seen = set()
-                for c in sub.columns.astype(str):
-                    name = c
-                    if name in seen:
-                        name = f"{name}_{short_tag}"
-                    seen.add(name)
-                    new_cols.append(name)
-                sub.columns = new_cols
-                collected.append(sub)
-
-        if not collected:
-            raise ValueError(
-                f"No MultiIndex columns with last level in {suffixes} found."
-            )
-        price_df = pd.concat(collected, axis=1)
-
-    else:
-        # Single-level columns: keep those that end with any of the suffixes
-        sel_cols = [
-            c for c in df.columns if any(str(c).endswith(sfx) for sfx in suffixes)
-        ]
-        if not sel_cols:
-            raise ValueError(f"No columns ending with any of {suffixes} were found.")
-        price_df = df[sel_cols].copy()
-
-        # Normalize names by stripping the matched suffix; if collision, append a tag
-        normalized = []
-        seen = set()
-        for c in price_df.columns:
-            s = str(c)
-            matched = None
-            for sfx in suffixes:
-                if s.endswith(sfx):
-                    matched = sfx
-                    break
-            base = s[: -len(matched)].rstrip() if matched else s
-            name = base
-            if name in seen:
-                tag = "curncy" if matched and "Curncy" in matched else "comdty"
-                name = f"{base}_{tag}"
-            seen.add(name)
-            normalized.append(name)
-        price_df.columns = normalized
+    price_columns = _price_columns(df_in.columns, suffixes)
+    if not price_columns:
+        raise ValueError(f"No columns ending with any of {suffixes} were found.")
 
-    # Convert to numeric in case of object dtypes
-    price_df = price_df.apply(pd.to_numeric, errors="coerce")
+    # Month-end prices = last available obs in each calendar month. Simple
+    # monthly returns; missing month-end prices are carried forward.
+    daily = engine.bloomberg_frame(df_in, date_col=date_col, columns=price_columns)
+    rets = engine.monthly_returns(engine.month_end_prices(daily), fill_method="pad")
 
-    # 3) Month-end prices = last available obs in each calendar month
-    price_df["Month"] = df["Date"].dt.to_period("M")
-    monthly_px = price_df.groupby("Month").last()
+    # Package output: 'yyyymm' index + month-end 'Date' column
+    return rets.to_pandas().set_index("yyyymm")
 
-    # 4) Simple monthly returns; for log returns use: np.log(monthly_px).diff()
-    rets = monthly_px.pct_change()
 
-    # 5) Package output: 'yyyymm' index + month-end 'Date' column
-    out = rets.copy()
-    out["yyyymm"] = out.index.strftime("%Y%m")
-    out["Date"] = out.index.to_timestamp("M")
+def _price_columns(columns, suffixes):
+    """
+    {column: output name} for the price columns ending with ``suffixes``.
 
-    cols = ["yyyymm", "Date"] + [c for c in rets.columns]
-    out = out.reset_index(drop=True)[cols]
-    out = out.set_index("yyyymm")
-    return out
+    Single-level names lose the matched suffix; MultiIndex columns whose
+    last level is a suffix are named after the remaining levels. A name
+    already taken gets a "_curncy"/"_comdty" tag.
+    """
+    selected = {}
+    seen = set()
+    for c in columns:
+        if isinstance(columns, pd.MultiIndex):
+            matched = c[-1] if c[-1] in suffixes else None
+            base = str(c[0] if len(c) == 2 else c[:-1])
+        else:
+            s = str(c)
+            matched = next((sfx for sfx in suffixes if s.endswith(sfx)), None)
+            base = s[: -len(matched)].rstrip() if matched else s
+        if matched is None:
+            continue
+        name = base
+        if name in seen:
+            name = f"{base}_{'curncy' if 'Curncy' in matched else 'comdty'}"
+        seen.add(name)
+        selected[c] = name
+    return selected
 
 
 def load_commodities_returns(data_dir=DATA_DIR):
@@ -347,10 +276,10 @@ if __name__ == "__main__":
 
     # Generate and save replication data
     df_gsci = generate_replication_gsci(data_dir=DATA_DIR)
-    df_gsci.to_parquet(path_gsci)
+    df_gsci.write_parquet(path_gsci)
 
     df_ticker = generate_replication_future_ticker(data_dir=DATA_DIR)
-    df_ticker.to_parquet(path_ticker)
+    df_ticker.write_parquet(path_ticker)
 
     print("Replication outputs saved as pickle files:")
     print(f" - GSCI-based: {path_gsci}")
@@ -27,6 +27,11 @@ def load_lme_metals(data_dir=DATA_DIR):
     return pd.read_parquet(path)
 
 
+def load_gsci_indices(data_dir=DATA_DIR):
+    path = data_dir / "gsci_indices.parquet"
+    return pd.read_parquet(path)
+
+
 def load_gsci_data(data_dir=DATA_DIR):
     df = pd.read_parquet(data_dir / "gsci_indices.parquet")
     df["Date"] = pd.to_datetime(df["index"])
@@ -23,6 +23,7 @@ import warnings
 import pandas as pd
 
 from settings import config
+from data_sources import bloomberg
 
 
 DATA_DIR = config("DATA_DIR")
@@ -89,7 +90,7 @@ def pull_active_commodities_prices(
     Returns a wide DataFrame with one column per active ticker (e.g., "CLA Comdty_PX_LAST"),
     date index reset to a column named "index" for consistency with other loaders.
     """
-    from xbbg import blp
+    blp = bloomberg()
 
     if end_date is None:
         end_date = pd.Timestamp.today().strftime("%Y-%m-%d")
@@ -39,6 +39,7 @@ import pandas as pd
 import warnings
 
 from settings import config
+from data_sources import bloomberg
 
 DATA_DIR = config("DATA_DIR")
 END_DATE = pd.Timestamp.today().strftime("%Y-%m-%d")
@@ -156,7 +157,7 @@ def pull_commodity_futures(start_date="1950-01-01", end_date=END_DATE):
         DataFrame with prices for 1st, 2nd, 3rd nearest contracts
     """
     # import here to enhance compatibility with devices that don't support xbbg
-    from xbbg import blp
+    blp = bloomberg(cached=True)
 
     # Commodity futures tickers (1st, 2nd, 3rd nearest contracts)
     commodity_futures_tickers = [
@@ -303,7 +304,7 @@ def pull_lme_metals(start_date="1950-01-01", end_date=END_DATE):
         DataFrame with LME spot and 3-month forward prices
     """
     # import here to enhance compatibility with devices that don't support xbbg
-    from xbbg import blp
+    blp = bloomberg(cached=True)
 
     # LME metals tickers (spot and 3-month forward)
     lme_metals_tickers = [
@@ -355,7 +356,7 @@ def pull_precious_metals_spot(start_date="1950-01-01", end_date=END_DATE):
     Returns a wide DataFrame with PX_LAST columns and a date index reset to
     an "index" column.
     """
-    from xbbg import blp
+    blp = bloomberg(cached=True)
 
     tickers = [
         "XAUUSD Curncy",  # Gold spot USD
@@ -425,7 +426,7 @@ def pull_gsci_indices(start_date="1950-01-01", end_date=END_DATE):
         DataFrame with GSCI excess return indices
     """
     # import here to enhance compatibility with devices that don't support xbbg
-    from xbbg import blp
+    blp = bloomberg(cached=True)
 
     # GSCI excess return indices
     gsci_indices_tickers = [
@@ -3,10 +3,10 @@ from pathlib import Path
 
 import pandas as pd
 import polars as pl
-import wrds
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from settings import config
+from data_sources import wrds_connection
 
 DATA_DIR = Path(config("DATA_DIR"))
 WRDS_USERNAME = config("WRDS_USERNAME")
@@ -26,7 +26,7 @@ def fetch_wrds_contract_info(product_contract_code):
     pandas.DataFrame
         Columns include: futcode, contrcode, contrname, contrdate, startdate, lasttrddate.
     """
-    db = wrds.Connection(wrds_username=WRDS_USERNAME)
+    db = wrds_connection(wrds_username=WRDS_USERNAME)
     query = f"""
     SELECT futcode, contrcode, contrname, contrdate, startdate, lasttrddate
     FROM tr_ds_fut.wrds_contract_info
@@ -51,7 +51,7 @@ def fetch_wrds_fut_contract(futcodes_contrdates):
     pandas.DataFrame
         Columns include: futcode, date_, settlement, and a 'contrdate' column mapped from futcodes_contrdates.
     """
-    db = wrds.Connection(wrds_username=WRDS_USERNAME)
+    db = wrds_connection(wrds_username=WRDS_USERNAME)
     query = f"""
     SELECT futcode, date_, settlement
     FROM tr_ds_fut.wrds_fut_contract
@@ -147,7 +147,7 @@ def pull_wrds_tables(data_dir=DATA_DIR):
     """
     Pull selected tables from WRDS.
     """
-    db = wrds.Connection(wrds_username=WRDS_USERNAME)
+    db = wrds_connection(wrds_username=WRDS_USERNAME)
     df = db.get_table(library="tr_ds_fut", table="wrds_cseries_info")
     df.to_csv(data_dir / "wrds_cseries_info.csv")
     df.to_parquet(data_dir / "wrds_cseries_info.parquet")
@@ -0,0 +1,156 @@
+"""
+Tests for the columnar monthly returns in commodity_returns_engine.py.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import calc_commodities_returns  # noqa: E402
+import commodity_returns_engine as engine  # noqa: E402
+
+
+@pytest.fixture
+def panel():
+    """Daily prices over Jan-Apr 2020, with no rows at all in March."""
+    dates = pd.to_datetime(
+        ["2020-01-15", "2020-01-31", "2020-02-14", "2020-02-28", "2020-04-30"]
+    )
+    df = pd.DataFrame(
+        {
+            "index": dates,
+            "CL2 Comdty_PX_LAST": [10.0, 11.0, 12.0, np.nan, 15.0],
+            "CL1 Comdty_PX_LAST": [1.0, 2.0, 3.0, 4.0, 5.0],
+            # Nothing in February
+            "NG2 Comdty_PX_LAST": [2.0, 4.0, np.nan, np.nan, 3.0],
+        }
+    )
+    # Month-end selection doesn't depend on the row order
+    return df.iloc[[4, 2, 0, 3, 1]].reset_index(drop=True)
+
+
+def test_month_end_prices_take_the_last_price_of_each_month(panel):
+    monthly = engine.month_end_prices(engine.bloomberg_frame(panel)).to_pandas()
+
+    assert monthly["yyyymm"].tolist() == ["202001", "202002", "202004"]
+    assert monthly["Date"].tolist() == list(
+        pd.to_datetime(["2020-01-31", "2020-02-29", "2020-04-30"])
+    )
+    assert monthly["CL2 Comdty_PX_LAST"].tolist() == [11.0, 12.0, 15.0]
+    assert monthly["NG2 Comdty_PX_LAST"].isna().tolist() == [False, True, False]
+
+
+def test_fill_method_controls_returns_across_missing_months(panel):
+    monthly = engine.month_end_prices(engine.bloomberg_frame(panel))
+
+    padded = engine.monthly_returns(monthly, fill_method="pad").to_pandas()
+    np.testing.assert_allclose(
+        padded["NG2 Comdty_PX_LAST"], [np.nan, 0.0, 3.0 / 4.0 - 1]
+    )
+    unfilled = engine.monthly_returns(monthly, fill_method=None).to_pandas()
+    assert unfilled["NG2 Comdty_PX_LAST"].isna().all()
+    np.testing.assert_allclose(
+        unfilled["CL1 Comdty_PX_LAST"], [np.nan, 4.0 / 2.0 - 1, 5.0 / 4.0 - 1]
+    )
+
+
+def test_ftsfr_output(panel):
+    monthly = engine.monthly_returns(
+        engine.month_end_prices(engine.bloomberg_frame(panel))
+    )
+
+    ftsfr = engine.to_ftsfr(monthly)
+    assert ftsfr.columns == ["unique_id", "ds", "y"]
+    assert ftsfr["y"].null_count() == 0
+    assert ftsfr.height == 3 * 2  # the first month has no return
+    assert ftsfr.equals(ftsfr.sort("unique_id", "ds"))
+
+
+def test_non_numeric_entries_become_missing(panel):
+    panel["CL1 Comdty_PX_LAST"] = panel["CL1 Comdty_PX_LAST"].astype(object)
+    panel.loc[panel["index"] == "2020-04-30", "CL1 Comdty_PX_LAST"] = "#N/A"
+
+    daily = engine.bloomberg_frame(panel).to_pandas()
+    assert daily["CL1 Comdty_PX_LAST"].isna().sum() == 1
+
+
+def test_lme_1m_prices_interpolate_cash_and_3m():
+    lme = pd.DataFrame(
+        {
+            "index": pd.to_datetime(["2020-01-30", "2020-01-31", "2020-02-28"]),
+            "LMCADY Comdty_PX_LAST": [100.0, 103.0, np.nan],
+            "LMCADS03 Comdty_PX_LAST": [106.0, 109.0, 120.0],
+        }
+    )
+    metal_map = {"Copper": ("LMCADY Comdty_PX_LAST", "LMCADS03 Comdty_PX_LAST")}
+
+    prices = calc_commodities_returns.calc_lme_monthly_1mprice(lme, metal_map)
+    assert list(prices.columns) == ["yyyymm", "Date", "Copper"]
+    assert prices["Copper"].iloc[0] == 103.0 + (109.0 - 103.0) / 3
+    # No cash price in February, so no 1M price either
+    assert np.isnan(prices["Copper"].iloc[1])
+
+
+def test_second_contract_returns_keep_the_wide_layout(panel):
+    ret = calc_commodities_returns.compute_second_contract_return(panel)
+
+    assert list(ret.columns) == [
+        "yyyymm",
+        "Date",
+        "CL2 Comdty_PX_LAST",
+        "NG2 Comdty_PX_LAST",
+    ]
+    np.testing.assert_allclose(
+        ret["CL2 Comdty_PX_LAST"], [np.nan, 12.0 / 11.0 - 1, 15.0 / 12.0 - 1]
+    )
+
+
+def test_mixed_prices_strip_and_tag_suffixes():
+    df = pd.DataFrame(
+        {
+            "index": pd.to_datetime(["2020-01-31", "2020-02-28"]),
+            "XAU Comdty_PX_LAST": [1.0, 2.0],
+            "XAU Curncy_PX_LAST": [3.0, 6.0],
+            "SPX Index_PX_LAST": [1.0, 1.0],
+        }
+    )
+    ret = calc_commodities_returns.monthly_returns_mixed_prices(df)
+
+    assert ret.index.tolist() == ["202001", "202002"]
+    assert list(ret.columns) == ["Date", "XAU", "XAU_curncy"]
+    assert ret.loc["202002", "XAU_curncy"] == 1.0
+
+
+def test_gsci_returns_match_the_pandas_loader(tmp_path):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2019-01-01", "2020-12-31")
+    gsci = pd.DataFrame(
+        {
+            "index": dates.date,
+            "SPGCCLP Index_PX_LAST": 100 * np.exp(rng.normal(0, 0.01, len(dates))),
+            "SPGCGCP Index_PX_LAST": 50 * np.exp(rng.normal(0, 0.01, len(dates))),
+        }
+    )
+    gsci.iloc[-3:, 2] = np.nan
+    gsci.to_parquet(tmp_path / "gsci_indices.parquet")
+    expected = calc_commodities_returns.load_futures_data.load_gsci_data(tmp_path)
+
+    monthly = calc_commodities_returns.calc_gsci_monthly_returns(
+        calc_commodities_returns.load_futures_data.load_gsci_indices(tmp_path)
+    )
+    result = monthly.to_pandas().set_index("yyyymm")
+    pd.testing.assert_frame_equal(
+        result.drop(columns="Date"), expected.drop(columns="Date")
+    )
+
+    ftsfr = calc_commodities_returns._selected_returns(
+        monthly, ["Date", "SPGCGCP Index_PX_LAST_Return"]
+    )
+    assert ftsfr["unique_id"].unique().to_list() == ["SPGCGCP Index_PX_LAST_Return"]
+    assert ftsfr.height == len(expected) - 1
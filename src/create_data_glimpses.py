@@ -6,10 +6,13 @@ data glimpse reports in both XML (machine-readable) and TXT (human-readable) for
 """
 
 import argparse
+import json
 import os
 import xml.sax.saxutils as saxutils
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from contextlib import redirect_stdout
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
 from io import StringIO
 from pathlib import Path
 
@@ -99,6 +102,37 @@ def process_task_dict(task_dict, base_name, task_files):
         task_files[task_name] = sorted(files)
 
 
+NUMERIC_TYPES = {
+    pl.Int8,
+    pl.Int16,
+    pl.Int32,
+    pl.Int64,
+    pl.UInt8,
+    pl.UInt16,
+    pl.UInt32,
+    pl.UInt64,
+    pl.Float32,
+    pl.Float64,
+}
+
+# Reports are cached here keyed by file path, size and mtime (plus the report
+# options), so regenerating the glimpses only rescans files that changed.
+REPORT_CACHE_FILE = OUTPUT_DIR / "data_glimpses_cache.json"
+REPORT_CACHE_VERSION = 2
+
+# Files are scanned concurrently; Polars releases the GIL while collecting.
+MAX_REPORT_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def _format_date_value(value):
+    """Format a date/datetime stat for display."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value)
+
+
 def get_dataset_report(
     filepath,
     include_stats=True,
@@ -108,7 +142,13 @@ def get_dataset_report(
     max_columns=None,
     ftsfr_enhanced=False,
 ):
-    """Return a dict with file metadata, shape, columns, sample values, numeric stats, and glimpse."""
+    """Return a dict with file metadata, shape, columns, sample values, numeric stats, and glimpse.
+
+    All aggregates (row count, null counts, numeric/date stats, null
+    fractions) are computed in a single select, and that select, the 100-row
+    head and the optional uniqueness count run together in one
+    ``pl.collect_all`` so the file is scanned once.
+    """
     if verbose and file_num is not None and total_files is not None:
         print(f"Processing {Path(filepath).name} ({file_num}/{total_files})...")
 
@@ -130,10 +170,6 @@ def get_dataset_report(
         report["n_cols"] = len(schema)
         report["n_cols_total"] = len(schema)  # Keep track of total columns
 
-        # Get row count efficiently
-        row_count_df = lf.select(pl.len().alias("count")).collect()
-        report["n_rows"] = row_count_df["count"][0]
-
         # Determine which columns to process
         all_columns = list(schema.keys())
         if max_columns and len(all_columns) > max_columns:
@@ -145,17 +181,56 @@ def get_dataset_report(
             report["columns_truncated"] = False
             report["n_cols_shown"] = len(all_columns)
 
-        # Get null counts efficiently (only for columns we're showing)
-        null_count_exprs = [
-            pl.col(col).null_count().alias(col) for col in columns_to_process
+        # Only consider numeric/date columns that are being shown
+        numeric_cols = [c for c in columns_to_process if schema[c] in NUMERIC_TYPES]
+        date_cols = [
+            c
+            for c in columns_to_process
+            if schema[c] == pl.Date
+            or (
+                hasattr(schema[c], "base_type") and schema[c].base_type() == pl.Datetime
+            )
+        ]
+
+        # One select for every aggregate
+        agg_exprs = [pl.len().alias("__n_rows")]
+        agg_exprs += [
+            pl.col(col).null_count().alias(f"{col}__null") for col in columns_to_process
         ]
-        null_counts = lf.select(null_count_exprs).collect().to_dicts()[0]
+        if include_stats:
+            for c in numeric_cols:
+                agg_exprs += [
+                    pl.col(c).min().alias(f"{c}__min"),
+                    pl.col(c).max().alias(f"{c}__max"),
+                    pl.col(c).mean().alias(f"{c}__mean"),
+                    pl.col(c).median().alias(f"{c}__median"),
+                ]
+            for c in date_cols:
+                agg_exprs += [
+                    pl.col(c).min().alias(f"{c}__min"),
+                    pl.col(c).max().alias(f"{c}__max"),
+                ]
+        if ftsfr_enhanced:
+            # Null fractions for all columns (not just processed ones)
+            agg_exprs += [
+                pl.col(col).null_count().alias(f"{col}__null_all")
+                for col in all_columns
+            ]
+
+        queries = [lf.select(agg_exprs), lf.select(columns_to_process).head(100)]
+        if ftsfr_enhanced:
+            queries.append(lf.unique().select(pl.len().alias("unique_count")))
+        results = pl.collect_all(queries)
+        aggs = results[0].to_dicts()[0]
+        glimpse_df = results[1]
+
+        report["n_rows"] = aggs["__n_rows"]
 
         # Columns info
         columns = []
         for col in columns_to_process:
             dtype = str(schema[col])
-            n_null = null_counts.get(col, 0)
+            n_null = aggs.get(f"{col}__null", 0)
             pct_null = (
                 (n_null / report["n_rows"] * 100) if report["n_rows"] > 0 else 0.0
             )
@@ -164,13 +239,9 @@ def get_dataset_report(
             )
         report["columns"] = columns
 
-        # Sample values - only collect first 5 rows
-        if max_columns and len(all_columns) > max_columns:
-            sample_df = lf.select(columns_to_process).head(5).collect()
-        else:
-            sample_df = lf.head(5).collect()
-        sample = sample_df.to_dicts()
-        report["sample_values"] = sample
+        # Sample values - first 5 rows
+        sample_df = glimpse_df.head(5)
+        report["sample_values"] = sample_df.to_dicts()
 
         # Capture polars text representation of first 5 rows
         output = StringIO()
@@ -179,112 +250,38 @@ def get_dataset_report(
         report["sample_text"] = output.getvalue()
 
         # Numeric stats (only if requested)
-        numeric_types = {
-            pl.Int8,
-            pl.Int16,
-            pl.Int32,
-            pl.Int64,
-            pl.UInt8,
-            pl.UInt16,
-            pl.UInt32,
-            pl.UInt64,
-            pl.Float32,
-            pl.Float64,
-        }
-        # Only consider numeric columns that are being shown
-        numeric_cols = [c for c in columns_to_process if schema[c] in numeric_types]
         numeric_stats = []
-
-        if include_stats and numeric_cols:
-            stats_exprs = []
-            for c in numeric_cols:
-                stats_exprs.extend(
-                    [
-                        pl.col(c).min().alias(f"{c}_min"),
-                        pl.col(c).max().alias(f"{c}_max"),
-                        pl.col(c).mean().alias(f"{c}_mean"),
-                        pl.col(c).median().alias(f"{c}_median"),
-                    ]
-                )
-
-            stats_df = lf.select(stats_exprs).collect()
-            stats_dict = stats_df.to_dicts()[0]
-
+        if include_stats:
             for col in numeric_cols:
                 numeric_stats.append(
                     {
                         "name": col,
-                        "min": stats_dict.get(f"{col}_min"),
-                        "max": stats_dict.get(f"{col}_max"),
-                        "mean": stats_dict.get(f"{col}_mean"),
-                        "median": stats_dict.get(f"{col}_median"),
+                        "min": aggs.get(f"{col}__min"),
+                        "max": aggs.get(f"{col}__max"),
+                        "mean": aggs.get(f"{col}__mean"),
+                        "median": aggs.get(f"{col}__median"),
                     }
                 )
         report["numeric_stats"] = numeric_stats
 
         # Date/Datetime stats (only if requested)
-        # Check for date/datetime columns
-        date_cols = []
-        for c in columns_to_process:
-            dtype = schema[c]
-            # Check if it's a Date or Datetime type
-            if dtype == pl.Date or (
-                hasattr(dtype, "base_type") and dtype.base_type() == pl.Datetime
-            ):
-                date_cols.append(c)
-
         date_stats = []
-        if include_stats and date_cols:
-            date_stats_exprs = []
-            for c in date_cols:
-                date_stats_exprs.extend(
-                    [
-                        pl.col(c).min().alias(f"{c}_min"),
-                        pl.col(c).max().alias(f"{c}_max"),
-                    ]
-                )
-
-            date_stats_df = lf.select(date_stats_exprs).collect()
-            date_stats_dict = date_stats_df.to_dicts()[0]
-
+        if include_stats:
             for col in date_cols:
-                min_val = date_stats_dict.get(f"{col}_min")
-                max_val = date_stats_dict.get(f"{col}_max")
-
-                # Format dates appropriately
-                if min_val is not None:
-                    if isinstance(min_val, datetime):
-                        min_str = min_val.strftime("%Y-%m-%d %H:%M:%S")
-                    else:
-                        min_str = str(min_val)
-                else:
-                    min_str = None
-
-                if max_val is not None:
-                    if isinstance(max_val, datetime):
-                        max_str = max_val.strftime("%Y-%m-%d %H:%M:%S")
-                    else:
-                        max_str = str(max_val)
-                else:
-                    max_str = None
-
+                min_val = aggs.get(f"{col}__min")
+                max_val = aggs.get(f"{col}__max")
                 date_stats.append(
                     {
                         "name": col,
-                        "min": min_str,
-                        "max": max_str,
+                        "min": _format_date_value(min_val),
+                        "max": _format_date_value(max_val),
                         "min_raw": min_val,
                         "max_raw": max_val,
                     }
                 )
-
         report["date_stats"] = date_stats
 
-        # Glimpse - need a larger sample for better representation
-        if max_columns and len(all_columns) > max_columns:
-            glimpse_df = lf.select(columns_to_process).head(100).collect()
-        else:
-            glimpse_df = lf.head(100).collect()
+        # Glimpse of the 100-row head for better representation
         output = StringIO()
         with redirect_stdout(output):
             glimpse_df.glimpse(max_items_per_column=0)
@@ -292,18 +289,11 @@ def get_dataset_report(
 
         # Enhanced FTSFR analysis - null fractions and row uniqueness
         if ftsfr_enhanced:
-            # Calculate null fractions for all columns (not just processed ones)
-            null_fraction_exprs = [
-                (pl.col(col).null_count() / pl.len()).alias(f"{col}_null_fraction")
-                for col in all_columns
-            ]
-            null_fractions_df = lf.select(null_fraction_exprs).collect()
-            null_fractions_dict = null_fractions_df.to_dicts()[0]
-
-            # Store null fractions for each column
+            total_rows = report["n_rows"]
             null_fractions = []
             for col in all_columns:
-                fraction = null_fractions_dict.get(f"{col}_null_fraction", 0.0)
+                n_null = aggs.get(f"{col}__null_all", 0)
+                fraction = n_null / total_rows if total_rows > 0 else 0.0
                 null_fractions.append(
                     {
                         "name": col,
@@ -314,12 +304,7 @@ def get_dataset_report(
             report["null_fractions"] = null_fractions
 
             # Check row uniqueness - compare total rows to unique rows
-            unique_row_count_df = (
-                lf.unique().select(pl.len().alias("unique_count")).collect()
-            )
-            unique_row_count = unique_row_count_df["unique_count"][0]
-            total_rows = report["n_rows"]
-
+            unique_row_count = results[2]["unique_count"][0]
             report["row_uniqueness"] = {
                 "total_rows": total_rows,
                 "unique_rows": unique_row_count,
@@ -335,6 +320,143 @@ def get_dataset_report(
     return report
 
 
+def _report_cache_key(filepath, include_stats, max_columns, ftsfr_enhanced):
+    """Cache key for a report: path, size, mtime and the report options."""
+    stat = os.stat(filepath)
+    return json.dumps(
+        [
+            str(Path(filepath).resolve()),
+            stat.st_size,
+            stat.st_mtime_ns,
+            include_stats,
+            max_columns,
+            ftsfr_enhanced,
+        ]
+    )
+
+
+# Values in reports (sample rows, raw date stats) that JSON has no type for
+# are stored as {"__type__": name, "value": ...} and restored on load, so a
+# cached report equals a freshly computed one.
+_CACHE_DECODERS = {
+    "datetime": datetime.fromisoformat,
+    "date": date.fromisoformat,
+    "time": time.fromisoformat,
+    "timedelta": lambda value: timedelta(*value),
+    "decimal": Decimal,
+}
+
+
+def _encode_cache_value(value):
+    """``json.dump`` default for report values (see _CACHE_DECODERS)."""
+    # datetime before date: it is a subclass
+    if isinstance(value, datetime):
+        return {"__type__": "datetime", "value": value.isoformat()}
+    if isinstance(value, date):
+        return {"__type__": "date", "value": value.isoformat()}
+    if isinstance(value, time):
+        return {"__type__": "time", "value": value.isoformat()}
+    if isinstance(value, timedelta):
+        return {
+            "__type__": "timedelta",
+            "value": [value.days, value.seconds, value.microseconds],
+        }
+    if isinstance(value, Decimal):
+        return {"__type__": "decimal", "value": str(value)}
+    return str(value)
+
+
+def _decode_cache_value(obj):
+    """``json.load`` object hook undoing _encode_cache_value."""
+    if obj.keys() == {"__type__", "value"} and obj["__type__"] in _CACHE_DECODERS:
+        return _CACHE_DECODERS[obj["__type__"]](obj["value"])
+    return obj
+
+
+def load_report_cache(cache_file=REPORT_CACHE_FILE):
+    """Load cached reports ({cache key: report}); empty if missing or stale."""
+    try:
+        with open(cache_file, encoding="utf-8") as f:
+            cache = json.load(f, object_hook=_decode_cache_value)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != REPORT_CACHE_VERSION:
+        return {}
+    return cache.get("reports", {})
+
+
+def save_report_cache(reports, cache_file=REPORT_CACHE_FILE):
+    """Write cached reports atomically (dates and times tagged, see above)."""
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_name(cache_file.name + ".tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(
+            {"version": REPORT_CACHE_VERSION, "reports": reports},
+            f,
+            default=_encode_cache_value,
+        )
+    tmp_file.replace(cache_file)
+
+
+def get_dataset_reports(
+    filepaths,
+    include_stats=True,
+    verbose=False,
+    max_columns=None,
+    ftsfr_enhanced=False,
+    cache_file=REPORT_CACHE_FILE,
+    max_workers=MAX_REPORT_WORKERS,
+):
+    """Reports for many files: {filepath: report}.
+
+    Unchanged files are served from the JSON cache; the rest are scanned
+    concurrently in a thread pool and added to the cache. Reports that
+    failed to read are not cached.
+    """
+    filepaths = sorted(filepaths)
+    cache = load_report_cache(cache_file)
+    keys = {
+        f: _report_cache_key(f, include_stats, max_columns, ftsfr_enhanced)
+        for f in filepaths
+    }
+    reports = {f: cache[keys[f]] for f in filepaths if keys[f] in cache}
+    missing = [f for f in filepaths if f not in reports]
+
+    if verbose:
+        print(f"{len(reports)} reports cached, scanning {len(missing)} files...")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(
+                get_dataset_report,
+                f,
+                include_stats=include_stats,
+                verbose=verbose,
+                file_num=i,
+                total_files=len(missing),
+                max_columns=max_columns,
+                ftsfr_enhanced=ftsfr_enhanced,
+            ): f
+            for i, f in enumerate(missing, 1)
+        }
+        for future in as_completed(futures):
+            f = futures[future]
+            reports[f] = future.result()
+
+    if missing:
+        for f in missing:
+            if "error" not in reports[f]:
+                cache[keys[f]] = reports[f]
+        # Drop superseded entries of the files just rescanned
+        rescanned = {json.loads(keys[f])[0] for f in missing}
+        for key in list(cache):
+            if json.loads(key)[0] in rescanned and key not in keys.values():
+                del cache[key]
+        save_report_cache(cache, cache_file)
+
+    return reports
+
+
 def format_task_name(task_name):
     """Format task name for display."""
     # Handle subtask names like "pull:cds_bond_basis"
@@ -480,17 +602,15 @@ def create_txt_report(
     output_lines.append("---")
 
     # Process each file
-    total_files = len(existing_files)
-    for i, f in enumerate(sorted(existing_files), 1):
+    reports = get_dataset_reports(
+        existing_files,
+        include_stats=include_stats,
+        verbose=verbose,
+        max_columns=max_columns,
+    )
+    for f in sorted(existing_files):
         filename = Path(f).name
-        report = get_dataset_report(
-            f,
-            include_stats=include_stats,
-            verbose=verbose,
-            file_num=i,
-            total_files=total_files,
-            max_columns=max_columns,
-        )
+        report = reports[f]
 
         output_lines.append("")
         output_lines.append(f"## {filename}")
@@ -656,18 +776,16 @@ def create_ftsfr_enhanced_report(
     output_lines.append("---")
 
     # Process each file with enhanced analysis
-    total_files = len(ftsfr_files)
-    for i, f in enumerate(sorted(ftsfr_files), 1):
+    reports = get_dataset_reports(
+        ftsfr_files,
+        include_stats=include_stats,
+        verbose=verbose,
+        max_columns=max_columns,
+        ftsfr_enhanced=True,
+    )
+    for f in sorted(ftsfr_files):
         filename = Path(f).name
-        report = get_dataset_report(
-            f,
-            include_stats=include_stats,
-            verbose=verbose,
-            file_num=i,
-            total_files=total_files,
-            max_columns=max_columns,
-            ftsfr_enhanced=True,
-        )
+        report = reports[f]
 
         output_lines.append("")
         output_lines.append(f"## {filename}")
@@ -783,17 +901,15 @@ def create_xml_report(
     output_lines.append("  <datasets>")
 
     # Add each dataset
-    total_files = len(existing_files)
-    for i, f in enumerate(sorted(existing_files), 1):
+    reports = get_dataset_reports(
+        existing_files,
+        include_stats=include_stats,
+        verbose=verbose,
+        max_columns=max_columns,
+    )
+    for f in sorted(existing_files):
         filename = Path(f).name
-        report = get_dataset_report(
-            f,
-            include_stats=include_stats,
-            verbose=verbose,
-            file_num=i,
-            total_files=total_files,
-            max_columns=max_columns,
-        )
+        report = reports[f]
         output_lines.append(
             f'    <dataset filename="{saxutils.escape(filename)}" path="{saxutils.escape(str(f))}">'
         )
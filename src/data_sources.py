@@ -0,0 +1,396 @@
+"""
+data_sources.py - WRDS and Bloomberg connections, with an offline backend
+
+The ``pull_*`` modules get their WRDS connection and Bloomberg client from
+here instead of calling ``wrds.Connection`` or ``xbbg.blp`` directly. The
+backend is chosen with ``DATA_SOURCE_BACKEND`` (via ``settings.config``, so
+``.env``, the environment or ``--DATA_SOURCE_BACKEND=local`` all work):
+
+- ``vendor`` (default): the real ``wrds.Connection`` and ``xbbg.blp``;
+- ``local``: stand-ins under ``LOCAL_SOURCE_DIR`` that need no credentials
+  or network access:
+
+  - WRDS: the pulls' SQL runs unchanged against a DuckDB file
+    (``wrds.duckdb``, one schema per WRDS library) holding synthetic
+    versions of the tables, built at a configurable scale;
+  - Bloomberg: ``bdh`` reads one parquet file per ticker; fields a file
+    doesn't have yet are generated (seeded by ticker and field) and added.
+
+Either Bloomberg client can be wrapped in the incremental local cache of
+bloomberg_cache.py with ``bloomberg(cached=True)``.
+
+With the local backend, ``doit`` runs pull -> format -> forecast end to end
+on synthetic data, e.g. for load testing and profiling.
+
+Usage:
+    python ./src/data_sources.py build --scale 2 --start 2010-01-01
+    DATA_SOURCE_BACKEND=local doit
+    python ./src/data_sources.py tables
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from settings import config
+
+DATA_SOURCE_BACKEND = config("DATA_SOURCE_BACKEND", default="vendor")
+LOCAL_SOURCE_DIR = Path(config("LOCAL_SOURCE_DIR"))
+BACKENDS = ("vendor", "local")
+
+WRDS_DB_NAME = "wrds.duckdb"
+MANIFEST_NAME = "manifest.json"
+BLOOMBERG_DIR_NAME = "bloomberg"
+DEFAULT_START = date(2015, 1, 1)
+DEFAULT_END = date(2023, 12, 31)
+
+
+def _backend(backend=None):
+    backend = backend or DATA_SOURCE_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown DATA_SOURCE_BACKEND {backend!r}; expected one of {BACKENDS}"
+        )
+    return backend
+
+
+def wrds_connection(wrds_username=None, backend=None, **kwargs):
+    """WRDS connection for the configured backend.
+
+    Drop-in for ``wrds.Connection(wrds_username=...)``: both backends
+    provide ``raw_sql``, ``get_table`` and ``close``.
+    """
+    if _backend(backend) == "local":
+        return LocalWRDSConnection()
+    import wrds
+
+    return wrds.Connection(wrds_username=wrds_username, **kwargs)
+
+
+def bloomberg(backend=None, cached=False):
+    """Bloomberg client for the configured backend (``xbbg.blp`` or a
+    ``LocalBloomberg`` with the same ``bdh``).
+
+    With ``cached=True`` the client is wrapped in a ``BloombergCache``, so
+    ``bdh`` only requests the dates missing from the local store (see
+    bloomberg_cache.py). ``BLOOMBERG_CACHE=0`` turns that off.
+    """
+    if _backend(backend) == "local":
+        client = LocalBloomberg()
+    else:
+        from xbbg import blp
+
+        client = blp
+    if cached and config("BLOOMBERG_CACHE", default="1") != "0":
+        from bloomberg_cache import BloombergCache
+
+        return BloombergCache(client)
+    return client
+
+
+# --------------------------------------------------------------------
+# WRDS stand-in
+# --------------------------------------------------------------------
+_PYFORMAT_PARAM = re.compile(r"%\((\w+)\)s")
+_US_DATE = re.compile(r"'(\d{2})/(\d{2})/(\d{4})'")
+# WRDS column names that DuckDB parses as keywords (comp.funda's "at")
+_KEYWORD_COLUMN = re.compile(r"(?<![\w.\"'])(at)(?![\w\"'(])")
+
+
+def to_duckdb_sql(sql):
+    """Adapt the PostgreSQL the pulls send to WRDS to DuckDB.
+
+    Named ``%(name)s`` parameters become ``$name``, the ``%%`` escapes of
+    the psycopg2 paramstyle become ``%``, ``'MM/DD/YYYY'`` date literals
+    (which PostgreSQL accepts) become ISO dates and column names DuckDB
+    reserves are quoted.
+    """
+    sql = _PYFORMAT_PARAM.sub(r"$\1", sql)
+    sql = sql.replace("%%", "%")
+    sql = _KEYWORD_COLUMN.sub(r'"\1"', sql)
+    return _US_DATE.sub(r"'\3-\1-\2'", sql)
+
+
+class LocalWRDSConnection:
+    """Read-only stand-in for ``wrds.Connection`` backed by ``wrds.duckdb``.
+
+    WRDS libraries are DuckDB schemas, so ``markit.cds2020`` or
+    ``crspm.tfz_dly`` resolve as they do on WRDS. Column names come back in
+    lower case, as PostgreSQL folds unquoted identifiers.
+    """
+
+    def __init__(self, path=None):
+        import duckdb
+
+        self.path = Path(path or LOCAL_SOURCE_DIR / WRDS_DB_NAME)
+        if not self.path.exists():
+            raise FileNotFoundError(
+                f"No local WRDS store at {self.path}. Build it with "
+                "`python ./src/data_sources.py build`."
+            )
+        self._con = duckdb.connect(str(self.path), read_only=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._con.close()
+
+    def raw_sql(
+        self, sql, coerce_float=True, date_cols=None, index_col=None, params=None
+    ):
+        df = self._con.execute(to_duckdb_sql(sql), params or None).df()
+        df.columns = [c.lower() for c in df.columns]
+        # Match the dtypes WRDS (psycopg2 + pandas.read_sql) returns: integer
+        # columns with nulls are float, dates are datetime.date objects
+        # unless listed in date_cols
+        date_cols = set(date_cols or [])
+        for col in df.columns:
+            dtype = df[col].dtype
+            if pd.api.types.is_integer_dtype(
+                dtype
+            ) and pd.api.types.is_extension_array_dtype(dtype):
+                df[col] = df[col].astype(
+                    "float64" if df[col].isna().any() else dtype.numpy_dtype
+                )
+            elif col in date_cols:
+                df[col] = pd.to_datetime(df[col]).astype("datetime64[ns]")
+            elif pd.api.types.is_datetime64_dtype(dtype):
+                df[col] = df[col].dt.date
+        if index_col is not None:
+            df = df.set_index(index_col)
+        return df
+
+    def get_table(
+        self,
+        library,
+        table,
+        obs=None,
+        offset=None,
+        columns=None,
+        coerce_float=None,
+        index_col=None,
+        date_cols=None,
+    ):
+        cols = ", ".join(columns) if columns else "*"
+        sql = f"SELECT {cols} FROM {library}.{table}"
+        if obs is not None:
+            sql += f" LIMIT {int(obs)}"
+        if offset is not None:
+            sql += f" OFFSET {int(offset)}"
+        return self.raw_sql(sql, date_cols=date_cols, index_col=index_col)
+
+    def list_libraries(self):
+        return sorted(
+            r[0]
+            for r in self._con.execute(
+                "SELECT DISTINCT schema_name FROM information_schema.schemata "
+                "WHERE catalog_name = current_database() AND schema_name <> 'main'"
+            ).fetchall()
+        )
+
+    def list_tables(self, library):
+        return sorted(
+            r[0]
+            for r in self._con.execute(
+                "SELECT table_name FROM information_schema.tables "
+                "WHERE table_schema = ?",
+                [library],
+            ).fetchall()
+        )
+
+    def describe_table(self, library, table):
+        return self._con.execute(
+            "SELECT column_name AS name, data_type AS type "
+            "FROM information_schema.columns "
+            "WHERE table_schema = ? AND table_name = ? ORDER BY ordinal_position",
+            [library, table],
+        ).df()
+
+
+def build_local_wrds(
+    directory=None, scale=1.0, start=DEFAULT_START, end=DEFAULT_END, seed=0
+):
+    """Write the synthetic WRDS tables to ``directory/wrds.duckdb``.
+
+    ``scale`` multiplies the number of firms, CDS names, Treasury issues and
+    option strikes (see ``synthetic_data.wrds_tables``). The file is
+    replaced atomically, and the settings are recorded in
+    ``manifest.json`` next to it.
+
+    Returns:
+        dict of "library.table" -> row count
+    """
+    import duckdb
+
+    import synthetic_data
+
+    directory = Path(directory or LOCAL_SOURCE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / WRDS_DB_NAME
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.unlink(missing_ok=True)
+
+    tables = synthetic_data.wrds_tables(start=start, end=end, scale=scale, seed=seed)
+    counts = {}
+    con = duckdb.connect(str(tmp_path))
+    try:
+        for (library, table), frame in sorted(tables.items()):
+            con.execute(f"CREATE SCHEMA IF NOT EXISTS {library}")
+            con.register("_frame", frame.to_arrow())
+            con.execute(f"CREATE TABLE {library}.{table} AS SELECT * FROM _frame")
+            con.unregister("_frame")
+            counts[f"{library}.{table}"] = frame.height
+    finally:
+        con.close()
+    os.replace(tmp_path, path)
+
+    _write_manifest(
+        directory,
+        wrds={
+            "scale": scale,
+            "start": str(start),
+            "end": str(end),
+            "seed": seed,
+            "tables": counts,
+        },
+    )
+    return counts
+
+
+def _read_manifest(directory):
+    path = Path(directory) / MANIFEST_NAME
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def _write_manifest(directory, **sections):
+    manifest = _read_manifest(directory)
+    manifest.update(sections)
+    path = Path(directory) / MANIFEST_NAME
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2))
+    os.replace(tmp_path, path)
+
+
+# --------------------------------------------------------------------
+# Bloomberg stand-in
+# --------------------------------------------------------------------
+class LocalBloomberg:
+    """Stand-in for ``xbbg.blp`` serving ``bdh`` from per-ticker parquet.
+
+    Each ticker's history lives in ``bloomberg/{ticker}.parquet`` (a
+    ``date`` column plus one column per field) over the manifest's date
+    range. Fields a file doesn't have are generated with
+    ``synthetic_data.bloomberg_history`` and written back, so any pull can
+    run against the store; a file with real history can be dropped in
+    instead.
+    """
+
+    def __init__(self, directory=None, seed=0):
+        self.directory = Path(directory or LOCAL_SOURCE_DIR) / BLOOMBERG_DIR_NAME
+        self.seed = seed
+        settings = _read_manifest(self.directory.parent).get("bloomberg", {})
+        self.start = pd.Timestamp(settings.get("start", DEFAULT_START))
+        self.end = pd.Timestamp(settings.get("end", DEFAULT_END))
+
+    def _path(self, ticker):
+        return self.directory / (re.sub(r"[^\w.-]+", "_", ticker) + ".parquet")
+
+    def history(self, ticker, fields):
+        """Full stored history of ``fields`` for ``ticker`` (DatetimeIndex)."""
+        import synthetic_data
+
+        path = self._path(ticker)
+        stored = pd.read_parquet(path) if path.exists() else None
+        if stored is None:
+            stored = pd.DataFrame({"date": pd.bdate_range(self.start, self.end)})
+        missing = [f for f in fields if f not in stored.columns]
+        if missing:
+            dates = pd.DatetimeIndex(stored["date"])
+            for field in missing:
+                stored[field] = synthetic_data.bloomberg_history(
+                    ticker, field, dates, seed=self.seed
+                ).to_numpy()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            stored.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        return stored.set_index("date")[list(fields)]
+
+    def bdh(self, tickers, flds=None, start_date=None, end_date="today", **kwargs):
+        """Daily history with (ticker, field) columns, like ``xbbg.blp.bdh``."""
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        flds = ["Last_Price"] if flds is None else flds
+        flds = [flds] if isinstance(flds, str) else list(flds)
+        end = pd.Timestamp(end_date).normalize()
+        start = (
+            pd.Timestamp(start_date)
+            if start_date is not None
+            else end - pd.Timedelta(weeks=8)
+        )
+        frames = {}
+        for ticker in tickers:
+            hist = self.history(ticker, flds)
+            frames[ticker] = hist.loc[(hist.index >= start) & (hist.index <= end)]
+        df = pd.concat(frames, axis=1)
+        df.index.name = None
+        return df
+
+    def generate(self, tickers, fields=("PX_LAST",)):
+        """Write the stored history of ``fields`` for every ticker."""
+        for ticker in tickers:
+            self.history(ticker, list(fields))
+
+
+def set_bloomberg_range(directory=None, start=DEFAULT_START, end=DEFAULT_END):
+    """Date range that newly generated Bloomberg histories cover."""
+    _write_manifest(
+        Path(directory or LOCAL_SOURCE_DIR),
+        bloomberg={"start": str(start), "end": str(end)},
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build and inspect the local (offline) data-source backend"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Generate the local WRDS store")
+    build.add_argument("--scale", type=float, default=1.0)
+    build.add_argument("--start", type=date.fromisoformat, default=DEFAULT_START)
+    build.add_argument("--end", type=date.fromisoformat, default=DEFAULT_END)
+    build.add_argument("--seed", type=int, default=0)
+    build.add_argument("--dir", type=Path, default=LOCAL_SOURCE_DIR)
+    tables = sub.add_parser("tables", help="List the tables of the local store")
+    tables.add_argument("--dir", type=Path, default=LOCAL_SOURCE_DIR)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        print(f"Building local WRDS store in {args.dir} (scale={args.scale})")
+        counts = build_local_wrds(
+            args.dir, scale=args.scale, start=args.start, end=args.end, seed=args.seed
+        )
+        # Bloomberg histories generated from now on cover the same range
+        set_bloomberg_range(args.dir, start=args.start, end=args.end)
+        print(f"  {len(counts)} tables, {sum(counts.values()):,} rows")
+        return 0
+
+    with LocalWRDSConnection(Path(args.dir) / WRDS_DB_NAME) as db:
+        for library in db.list_libraries():
+            print(f"{library}: {', '.join(db.list_tables(library))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+dataset_registry.py
+
+One parsed, indexed view of datasets.toml for the dodo files, the
+forecasting scripts and the paper tables.
+
+datasets.toml is parsed at most once per process (per path) and indexed by
+dataset name, by module and by group. The index is also written to a JSON
+snapshot in OUTPUT_DIR, keyed by the SHA-256 of the TOML bytes, so a later
+process reads the snapshot instead of re-parsing the TOML; editing
+datasets.toml changes the hash and the snapshot is rebuilt on next use.
+
+Dataset entries are the ``[module.ftsfr_*]`` tables. Every other key of a
+module section (data_module_name, required_data_sources, ...) is module
+metadata.
+
+Usage:
+    from dataset_registry import load_registry
+
+    registry = load_registry()
+    registry["ftsfr_cds_portfolio_returns"]["frequency"]
+    registry.module_requirements()
+    registry.by_group["basis_spreads"]
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DATASETS_TOML = REPO_ROOT / "datasets.toml"
+SNAPSHOT_NAME = "dataset_registry.json"
+
+SNAPSHOT_VERSION = 1
+
+DATASET_PREFIX = "ftsfr_"
+
+
+class DatasetRegistry:
+    """Dataset entries of datasets.toml, indexed by name, module and group.
+
+    Each entry is the dataset's TOML table plus a "module" key naming the
+    section it is defined in. Iteration follows the order of datasets.toml.
+    """
+
+    def __init__(self, modules, datasets):
+        # {module name: module metadata (no dataset entries)}
+        self.modules = modules
+        # {dataset name: entry}
+        self.datasets = datasets
+        self.by_module = {module_name: [] for module_name in modules}
+        self.by_group = {}
+        for dataset_name, entry in datasets.items():
+            self.by_module[entry["module"]].append(dataset_name)
+            self.by_group.setdefault(entry.get("group", "other"), []).append(
+                dataset_name
+            )
+
+    @classmethod
+    def from_config(cls, datasets_config):
+        """Build the registry from the parsed datasets.toml dict."""
+        modules = {}
+        datasets = {}
+        for module_name, module_config in datasets_config.items():
+            if not isinstance(module_config, dict):
+                continue
+            modules[module_name] = {}
+            for key, value in module_config.items():
+                if isinstance(value, dict) and key.startswith(DATASET_PREFIX):
+                    datasets[key] = {**value, "module": module_name}
+                else:
+                    modules[module_name][key] = value
+        return cls(modules, datasets)
+
+    def __getitem__(self, dataset_name):
+        return self.datasets[dataset_name]
+
+    def __contains__(self, dataset_name):
+        return dataset_name in self.datasets
+
+    def __iter__(self):
+        return iter(self.datasets)
+
+    def __len__(self):
+        return len(self.datasets)
+
+    def get(self, dataset_name, default=None):
+        return self.datasets.get(dataset_name, default)
+
+    def names(self):
+        """All dataset names, in datasets.toml order."""
+        return list(self.datasets)
+
+    def items(self):
+        return self.datasets.items()
+
+    def active(self):
+        """Names of the datasets used in the main results tables.
+
+        Sensitivity-only datasets (paper_use = "sensitivity_only") belong to
+        the dedicated cleaning-sensitivity section and are left out.
+        """
+        return [
+            dataset_name
+            for dataset_name, entry in self.datasets.items()
+            if entry.get("paper_use") != "sensitivity_only"
+        ]
+
+    def module_requirements(self):
+        """{module name: required_data_sources} for modules that declare them."""
+        return {
+            module_name: metadata["required_data_sources"]
+            for module_name, metadata in self.modules.items()
+            if "required_data_sources" in metadata
+        }
+
+    def formatted_path(self, dataset_name, data_dir):
+        """Path of the formatted parquet of a dataset under ``data_dir``."""
+        module_name = self.datasets[dataset_name]["module"]
+        return Path(data_dir) / "formatted" / module_name / f"{dataset_name}.parquet"
+
+    def to_json(self):
+        return {"modules": self.modules, "datasets": self.datasets}
+
+
+def default_snapshot_path():
+    from settings import config
+
+    return Path(config("OUTPUT_DIR")) / SNAPSHOT_NAME
+
+
+def _read_snapshot(snapshot_path, toml_hash):
+    try:
+        with open(snapshot_path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (
+        snapshot.get("version") != SNAPSHOT_VERSION
+        or snapshot.get("toml_sha256") != toml_hash
+    ):
+        return None
+    return DatasetRegistry(snapshot["modules"], snapshot["datasets"])
+
+
+def _write_snapshot(registry, snapshot_path, toml_hash):
+    """Write the snapshot atomically; a read-only OUTPUT_DIR is not an error."""
+    snapshot_path = Path(snapshot_path)
+    tmp_path = snapshot_path.with_name(f"{snapshot_path.name}.{os.getpid()}.tmp")
+    try:
+        snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": SNAPSHOT_VERSION,
+                    "toml_sha256": toml_hash,
+                    **registry.to_json(),
+                },
+                f,
+                default=str,
+            )
+        os.replace(tmp_path, snapshot_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+
+
+@lru_cache(maxsize=None)
+def _load_registry(datasets_toml, snapshot_path):
+    raw = Path(datasets_toml).read_bytes()
+    toml_hash = hashlib.sha256(raw).hexdigest()
+
+    if snapshot_path is not None:
+        registry = _read_snapshot(snapshot_path, toml_hash)
+        if registry is not None:
+            return registry
+
+    import tomli
+
+    registry = DatasetRegistry.from_config(tomli.loads(raw.decode("utf-8")))
+    if snapshot_path is not None:
+        _write_snapshot(registry, snapshot_path, toml_hash)
+    return registry
+
+
+def load_registry(datasets_toml=None, snapshot_path="default"):
+    """The DatasetRegistry of ``datasets_toml`` (the repo's datasets.toml by default).
+
+    Parsed once per process; repeated calls return the same object.
+    ``snapshot_path=None`` skips the on-disk JSON snapshot.
+
+    Raises:
+        FileNotFoundError: If ``datasets_toml`` does not exist
+    """
+    datasets_toml = Path(datasets_toml or DATASETS_TOML).resolve()
+    if not datasets_toml.exists():
+        raise FileNotFoundError(f"datasets.toml not found at {datasets_toml}")
+    if snapshot_path == "default":
+        # Snapshots of other TOML files (tests, sensitivity copies) get their
+        # own name so they never evict the main one.
+        snapshot_path = default_snapshot_path()
+        if datasets_toml != DATASETS_TOML.resolve():
+            digest = hashlib.sha256(str(datasets_toml).encode()).hexdigest()[:12]
+            snapshot_path = snapshot_path.with_name(f"dataset_registry_{digest}.json")
+    elif snapshot_path is not None:
+        snapshot_path = Path(snapshot_path).resolve()
+    return _load_registry(datasets_toml, snapshot_path)
+
+
+def clear_cache():
+    """Forget the registries parsed by this process."""
+    _load_registry.cache_clear()
+
+
+if __name__ == "__main__":
+    registry = load_registry()
+    print(f"{len(registry)} datasets in {len(registry.modules)} modules")
+    for group, dataset_names in registry.by_group.items():
+        print(f"  {group}: {len(dataset_names)}")
+    print(f"Snapshot: {default_snapshot_path()}")
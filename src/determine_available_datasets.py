@@ -6,7 +6,6 @@ as parquet files in the data directory. It creates a CSV file listing all
 available datasets with their paths and metadata.
 """
 
-import tomli
 import pandas as pd
 from pathlib import Path
 import sys
@@ -15,12 +14,22 @@ import os
 # Add current directory to path for imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from dataset_registry import load_registry
+
 
 def load_datasets_config():
-    """Load the datasets configuration from TOML file."""
-    config_path = Path(__file__).parent.parent / "datasets.toml"
-    with open(config_path, "rb") as f:
-        return tomli.load(f)
+    """Load the datasets registry (see dataset_registry.py) for datasets.toml."""
+    return load_registry(Path(__file__).parent.parent / "datasets.toml")
+
+
+def _locate_dataset(data_dir, section, dataset_name):
+    """Parquet path of a dataset: the section subdirectory, else the root data directory."""
+    # The dataset_name already includes the ftsfr_ prefix, so just add .parquet
+    dataset_file = f"{dataset_name}.parquet"
+    for dataset_path in (data_dir / section / dataset_file, data_dir / dataset_file):
+        if dataset_path.exists():
+            return dataset_path
+    return None
 
 
 def find_available_datasets(data_dir, datasets_config):
@@ -29,46 +38,27 @@ def find_available_datasets(data_dir, datasets_config):
 
     Args:
         data_dir: Path to the data directory
-        datasets_config: Loaded datasets configuration
+        datasets_config: DatasetRegistry from load_datasets_config()
 
     Returns:
         List of dictionaries with dataset information
     """
     available_datasets = []
 
-    # Search through all sections in the config
-    for section, content in datasets_config.items():
-        if isinstance(content, dict):
-            # Check if this section has dataset subsections
-            for dataset_name, dataset_config in content.items():
-                if isinstance(dataset_config, dict) and "frequency" in dataset_config:
-                    # This is a dataset configuration
-                    # The dataset_name already includes the ftsfr_ prefix, so just add .parquet
-                    dataset_file = f"{dataset_name}.parquet"
-                    # Look in the section subdirectory first, then in the root data directory
-                    dataset_path = data_dir / section / dataset_file
-
-                    if dataset_path.exists():
-                        available_datasets.append(
-                            {
-                                "full_name": f"{section}.{dataset_name}",
-                                "file_path": str(dataset_path),
-                                "frequency": dataset_config.get("frequency", "D"),
-                                "seasonality": dataset_config.get("seasonality", 7),
-                            }
-                        )
-                    else:
-                        # Try looking in the root data directory as fallback
-                        dataset_path = data_dir / dataset_file
-                        if dataset_path.exists():
-                            available_datasets.append(
-                                {
-                                    "full_name": f"{section}.{dataset_name}",
-                                    "file_path": str(dataset_path),
-                                    "frequency": dataset_config.get("frequency", "D"),
-                                    "seasonality": dataset_config.get("seasonality", 7),
-                                }
-                            )
+    for dataset_name, dataset_config in datasets_config.items():
+        if "frequency" not in dataset_config:
+            continue
+        section = dataset_config["module"]
+        dataset_path = _locate_dataset(data_dir, section, dataset_name)
+        if dataset_path is not None:
+            available_datasets.append(
+                {
+                    "full_name": f"{section}.{dataset_name}",
+                    "file_path": str(dataset_path),
+                    "frequency": dataset_config.get("frequency", "D"),
+                    "seasonality": dataset_config.get("seasonality", 7),
+                }
+            )
 
     return available_datasets
 
@@ -80,65 +70,46 @@ def find_available_datasets_with_requirements(data_dir, datasets_config, data_so
 
     Args:
         data_dir: Path to the data directory
-        datasets_config: Loaded datasets configuration
+        datasets_config: DatasetRegistry from load_datasets_config()
         data_sources: Dictionary of data source availability (True/False)
 
     Returns:
         List of dictionaries with dataset information
     """
     available_datasets = []
-
-    # Search through all sections in the config
-    for section, content in datasets_config.items():
-        if isinstance(content, dict):
-            # Check if this module's required data sources are available
-            module_required_sources = content.get("required_data_sources", [])
-            if module_required_sources:
-                # Check if all required data sources are available
-                if not all(
-                    data_sources.get(source, False)
-                    for source in module_required_sources
-                ):
-                    continue  # Skip this module if required sources aren't available
-
-            # Check if this section has dataset subsections
-            for dataset_name, dataset_config in content.items():
-                if isinstance(dataset_config, dict) and "frequency" in dataset_config:
-                    # This is a dataset configuration
-                    # The dataset_name already includes the ftsfr_ prefix, so just add .parquet
-                    dataset_file = f"{dataset_name}.parquet"
-                    # Look in the section subdirectory first, then in the root data directory
-                    dataset_path = data_dir / section / dataset_file
-
-                    if dataset_path.exists():
-                        available_datasets.append(
-                            {
-                                "full_name": f"{section}.{dataset_name}",
-                                "file_path": str(dataset_path),
-                                "frequency": dataset_config.get("frequency", "D"),
-                                "seasonality": dataset_config.get("seasonality", 7),
-                            }
-                        )
-                    else:
-                        # Try looking in the root data directory as fallback
-                        dataset_path = data_dir / dataset_file
-                        if dataset_path.exists():
-                            available_datasets.append(
-                                {
-                                    "section": section,
-                                    "dataset_name": dataset_name,
-                                    "full_name": f"{section}.{dataset_name}",
-                                    "file_path": str(dataset_path),
-                                    "frequency": dataset_config.get("frequency", "D"),
-                                    "seasonality": dataset_config.get("seasonality", 7),
-                                    "description": dataset_config.get(
-                                        "description", ""
-                                    ),
-                                    "required_data_sources": content.get(
-                                        "required_data_sources", []
-                                    ),
-                                }
-                            )
+    module_requirements = datasets_config.module_requirements()
+
+    for section, dataset_names in datasets_config.by_module.items():
+        # Skip this module if its required data sources aren't available
+        module_required_sources = module_requirements.get(section, [])
+        if not all(
+            data_sources.get(source, False) for source in module_required_sources
+        ):
+            continue
+
+        for dataset_name in dataset_names:
+            dataset_config = datasets_config[dataset_name]
+            if "frequency" not in dataset_config:
+                continue
+            dataset_path = _locate_dataset(data_dir, section, dataset_name)
+            if dataset_path is None:
+                continue
+            dataset_info = {
+                "full_name": f"{section}.{dataset_name}",
+                "file_path": str(dataset_path),
+                "frequency": dataset_config.get("frequency", "D"),
+                "seasonality": dataset_config.get("seasonality", 7),
+            }
+            if dataset_path.parent != data_dir / section:
+                # Found by the root-directory fallback
+                dataset_info = {
+                    "section": section,
+                    "dataset_name": dataset_name,
+                    **dataset_info,
+                    "description": dataset_config.get("description", ""),
+                    "required_data_sources": module_required_sources,
+                }
+            available_datasets.append(dataset_info)
 
     return available_datasets
 
@@ -0,0 +1,284 @@
+"""
+AutoARIMA cross-validation with the order selected once per series
+
+``StatsForecast.cross_validation`` reruns the full AutoARIMA stepwise order
+search at every cutoff. For monthly and quarterly panels the selected order
+rarely changes between adjacent windows, so this module selects the order
+once per series, at the first cutoff, and at later cutoffs either
+
+- ``refit``: re-estimates the coefficients of that order on the longer
+  training window, or
+- ``forward``: keeps the coefficients too and only filters the model
+  forward over the new observations.
+
+The first window is exactly the StatsForecast AutoARIMA forecast. Series on
+which AutoARIMA fails fall back to SeasonalNaive (as StatsForecast's
+``fallback_model`` does); a later window whose refit fails reruns the full
+selection for that window.
+
+Besides the cv_df (same schema as StatsForecast), every run returns the
+selected order and the selection/reuse time of each series. forecast_stats.py
+writes them to ``_output/forecasting/arima_orders/{dataset}/`` and, with
+``--compare-order-reuse``, the metrics against full re-selection to
+``_output/forecasting/arima_order_reuse/``. Summarize those with:
+
+    python arima_order_reuse.py report
+"""
+
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+REUSE_MODES = ("refit", "forward")
+
+FORECAST_DIR = Path(__file__).resolve().parent.parent.parent / "_output" / "forecasting"
+ORDERS_DIR = FORECAST_DIR / "arima_orders"
+COMPARISON_DIR = FORECAST_DIR / "arima_order_reuse"
+
+ORDER_COLUMNS = ["p", "d", "q", "P", "D", "Q", "m"]
+
+# Series handed to each worker process at a time
+CHUNK_SIZE = 16
+
+
+def order_spec(model):
+    """Order, seasonal order and constant terms of a fitted statsforecast ARIMA."""
+    from statsforecast.arima import arima_string
+
+    p, q, P, Q, m, d, D = model["arma"][:7]
+    return {
+        "order": arima_string(model),
+        **dict(zip(ORDER_COLUMNS, (p, d, q, P, D, Q, m))),
+        "include_mean": "intercept" in model["coef"],
+        "include_drift": "drift" in model["coef"],
+    }
+
+
+def refit_order(y, spec):
+    """Re-estimate the coefficients of a selected order on ``y``."""
+    from statsforecast.arima import Arima
+
+    return Arima(
+        x=y,
+        order=(spec["p"], spec["d"], spec["q"]),
+        seasonal={"order": (spec["P"], spec["D"], spec["Q"]), "period": spec["m"]},
+        include_mean=spec["include_mean"],
+        include_drift=spec["include_drift"],
+        method="CSS-ML",
+    )
+
+
+def series_forecasts(y, train_lengths, h, season_length, mode):
+    """Forecasts of one series at every cutoff, selecting the order once.
+
+    Returns:
+        (forecasts [n_windows, h], record dict with the order and timings)
+    """
+    from statsforecast.arima import forecast_arima
+    from statsforecast.models import AutoARIMA, SeasonalNaive
+
+    record = {
+        "order": None,
+        **{c: None for c in ORDER_COLUMNS},
+        "include_mean": None,
+        "include_drift": None,
+        "select_s": 0.0,
+        "reuse_s": 0.0,
+        "n_reselected": 0,
+    }
+    fcst = np.empty((len(train_lengths), h))
+
+    start = time.perf_counter()
+    auto = AutoARIMA(season_length=season_length)
+    try:
+        with np.errstate(invalid="ignore"):
+            auto.fit(y[: train_lengths[0]])
+    except Exception:
+        fallback = SeasonalNaive(season_length=season_length)
+        for w, n in enumerate(train_lengths):
+            fcst[w] = fallback.forecast(y[:n], h)["mean"]
+        record["order"] = "fallback: SeasonalNaive"
+        record["select_s"] = time.perf_counter() - start
+        return fcst, record
+    fcst[0] = auto.predict(h)["mean"]
+    record.update(order_spec(auto.model_))
+    record["select_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for w, n in enumerate(train_lengths[1:], start=1):
+        try:
+            with np.errstate(invalid="ignore"):
+                if mode == "forward":
+                    fcst[w] = auto.forward(y[:n], h)["mean"]
+                else:
+                    fcst[w] = forecast_arima(refit_order(y[:n], record), h)["mean"]
+        except Exception:
+            # The reused order does not fit this window; select afresh
+            fcst[w] = AutoARIMA(season_length=season_length).forecast(y[:n], h)["mean"]
+            record["n_reselected"] += 1
+    record["reuse_s"] = time.perf_counter() - start
+    return fcst, record
+
+
+def _forecast_chunk(task):
+    series, h, season_length, mode = task
+    return [
+        series_forecasts(y, train_lengths, h, season_length, mode)
+        for y, train_lengths in series
+    ]
+
+
+def cross_validation(
+    df, h, n_windows, season_length, mode="refit", step_size=None, n_jobs=-1
+):
+    """AutoARIMA cross-validation with one order selection per series.
+
+    Args:
+        df: polars DataFrame of unique_id, ds, y
+        h: Forecast horizon
+        n_windows: Number of CV windows
+        season_length: Seasonal period for AutoARIMA
+        mode: "refit" or "forward" (see the module docstring)
+        step_size: Periods between cutoffs (defaults to h)
+        n_jobs: Worker processes (-1: all CPUs available to the job, 1:
+            in-process)
+
+    Returns:
+        (cv_df like StatsForecast.cross_validation with an "AutoARIMA"
+        column, orders DataFrame with one row per series)
+    """
+    from batched_baselines import cv_frame, cv_train_lengths, padded_panel
+
+    if mode not in REUSE_MODES:
+        raise ValueError(f"Unknown order-reuse mode '{mode}'. Use one of {REUSE_MODES}")
+    step_size = h if step_size is None else step_size
+
+    df, offsets, lengths, Y = padded_panel(df.select("unique_id", "ds", "y"))
+    train_lengths = cv_train_lengths(lengths, h, n_windows, step_size)
+    series = [(Y[i, : lengths[i]], train_lengths[i]) for i in range(len(lengths))]
+    tasks = [
+        (series[start : start + CHUNK_SIZE], h, season_length, mode)
+        for start in range(0, len(series), CHUNK_SIZE)
+    ]
+
+    if n_jobs == -1:
+        from thread_budget import available_cpus
+
+        n_jobs = available_cpus()[0]
+    if n_jobs == 1 or len(tasks) == 1:
+        results = [r for task in tasks for r in _forecast_chunk(task)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as pool:
+            results = [r for chunk in pool.map(_forecast_chunk, tasks) for r in chunk]
+
+    fcst = np.stack([f for f, _ in results])
+    cv_df = cv_frame(df, offsets, train_lengths, fcst, "AutoARIMA")
+
+    unique_ids = df["unique_id"].gather(offsets)
+    orders = pl.DataFrame([r for _, r in results], infer_schema_length=None)
+    orders = orders.select(
+        unique_ids.alias("unique_id"),
+        pl.lit(mode).alias("mode"),
+        pl.all(),
+    )
+    return cv_df, orders
+
+
+def cv_metrics(cv_df, df, train_df, seasonality):
+    """Panel metrics of a cv_df, clipped and scored as in forecast_stats.py."""
+    from forecast_utils import (
+        CLIP_IQR_MULTIPLIER,
+        align_train_data_with_cutoffs,
+        clip_cv_forecasts,
+        compute_clip_bounds,
+        evaluate_cv,
+    )
+
+    model_cols = [
+        c for c in cv_df.columns if c not in ("unique_id", "ds", "cutoff", "y")
+    ]
+    clip_bounds = compute_clip_bounds(df, cv_df, k=CLIP_IQR_MULTIPLIER)
+    cv_df = clip_cv_forecasts(cv_df, clip_bounds, model_cols)
+    train_data = align_train_data_with_cutoffs(train_df, cv_df)
+    mase, mse, rmse, _, r2oos_pooled, cols = evaluate_cv(cv_df, train_data, seasonality)
+    col = cols[0]
+    return {
+        "MASE": mase[col].mean(),
+        "MSE": mse[col].mean(),
+        "RMSE": rmse[col].mean(),
+        "R2oos": r2oos_pooled.get(col, float("nan")),
+    }
+
+
+def compare_runs(
+    full_cv_df, reuse_cv_df, df, train_df, seasonality, full_time, reuse_time
+):
+    """One-row frame of metrics and CV time, full re-selection vs. order reuse.
+
+    ``*_diff`` columns are reuse minus full, so a positive MASE_diff means
+    order reuse forecasts worse.
+    """
+    full = cv_metrics(full_cv_df, df, train_df, seasonality)
+    reuse = cv_metrics(reuse_cv_df, df, train_df, seasonality)
+    row = {}
+    for metric in full:
+        row[f"{metric}_full"] = full[metric]
+        row[f"{metric}_reuse"] = reuse[metric]
+        row[f"{metric}_diff"] = reuse[metric] - full[metric]
+    row["time_full_s"] = full_time
+    row["time_reuse_s"] = reuse_time
+    row["speedup"] = full_time / reuse_time if reuse_time > 0 else float("nan")
+    return pl.DataFrame([row])
+
+
+def summarize_comparisons(comparison_dir=COMPARISON_DIR):
+    """One row per (dataset, mode) comparison written by forecast_stats.py."""
+    files = sorted(Path(comparison_dir).glob("*.csv"))
+    if not files:
+        return pl.DataFrame()
+    return pl.concat([pl.read_csv(f) for f in files], how="diagonal_relaxed")
+
+
+def main(argv=None):
+    import argparse
+
+    from tabulate import tabulate
+
+    parser = argparse.ArgumentParser(description="AutoARIMA order-reuse reports")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("report", help="Metric and time differences vs. full selection")
+    args = parser.parse_args(argv)
+
+    if args.command == "report":
+        summary = summarize_comparisons()
+        if summary.is_empty():
+            print(f"No comparisons in {COMPARISON_DIR}")
+            print("Run forecast_stats.py --model auto_arima --compare-order-reuse")
+            return 1
+        print(
+            tabulate(
+                summary.to_pandas(), headers="keys", tablefmt="grid", showindex=False
+            )
+        )
+        by_mode = summary.group_by("mode").agg(
+            pl.len().alias("datasets"),
+            pl.col("MASE_diff").mean().alias("mean_MASE_diff"),
+            pl.col("R2oos_diff").mean().alias("mean_R2oos_diff"),
+            (pl.col("time_full_s").sum() / pl.col("time_reuse_s").sum()).alias(
+                "speedup"
+            ),
+        )
+        print(
+            tabulate(
+                by_mode.to_pandas(), headers="keys", tablefmt="grid", showindex=False
+            )
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,470 @@
+"""
+Batched cross-validation for the cheap classical baselines
+
+StatsForecast fits every series and every cross-validation window through
+its per-series model objects. For HistoricAverage, SeasonalNaive, SES and
+Theta the arithmetic is tiny, so on panels with thousands of series that
+overhead dominates the run. This module computes all series x all CV
+cutoffs at once on padded 2-D arrays (one row per series, left-aligned, NaN
+padded):
+
+- HistoricAverage: expanding means from row-wise cumulative sums
+- SeasonalNaive: a gather of the last season before each cutoff
+- SES: the smoothing recursion as a row-wise linear filter
+- Theta: StatsForecast's standard theta model (STM): seasonal test and
+  classical decomposition, the OLS drift, and (level, alpha) chosen by a
+  Nelder-Mead search that runs for all fits in lockstep
+
+``cross_validation`` returns the same frame as
+``StatsForecast(models=[...]).cross_validation(df, h, step_size, n_windows)``
+(unique_id, ds, cutoff, y, <alias>) and agrees with it to numerical
+tolerance (see test_batched_baselines.py).
+"""
+
+import numpy as np
+import polars as pl
+
+# --model name -> StatsForecast column alias
+BATCHED_MODELS = {
+    "historic_average": "HistoricAverage",
+    "seasonal_naive": "SeasonalNaive",
+    "ses": "SES",
+    "theta": "Theta",
+}
+
+# Theta fits are optimized in chunks of this many (series, window) pairs to
+# bound the memory of the padded arrays.
+THETA_CHUNK_SIZE = 4096
+
+# Settings of StatsForecast's Theta optimizer (theta.py / _lib.theta)
+THETA_NMSE = 3
+THETA_LOWER = np.array([-1e10, 0.1])  # initial level, alpha
+THETA_UPPER = np.array([1e10, 0.99])
+NM_INIT_STEP = 0.05
+NM_ZERO_PERT = 1e-4
+NM_TOL_STD = 1e-4
+NM_MAX_ITER = 1000
+
+# One-sided 95% normal quantile of the theta seasonality test
+_SEASONAL_TEST_Z = 1.6448536269514722
+
+
+def padded_panel(df):
+    """Sorted panel, per-series offsets/lengths and the padded y matrix."""
+    df = df.sort("unique_id", "ds")
+    lengths = (
+        df.group_by("unique_id", maintain_order=True).len()["len"].to_numpy()
+    ).astype(np.int64)
+    offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+
+    y = df["y"].to_numpy().astype(np.float64)
+    t_max = int(lengths.max())
+    col = np.arange(len(df)) - np.repeat(offsets, lengths)
+    row = np.repeat(np.arange(len(lengths)), lengths)
+    Y = np.full((len(lengths), t_max), np.nan)
+    Y[row, col] = y
+    return df, offsets, lengths, Y
+
+
+def cv_train_lengths(lengths, h, n_windows, step_size):
+    """Training length of every (series, window); windows as in StatsForecast."""
+    test_size = h + step_size * (n_windows - 1)
+    first = lengths - test_size
+    if (first < 1).any():
+        raise ValueError(
+            f"Series shorter than h + step_size * (n_windows - 1) + 1 = "
+            f"{test_size + 1} observations"
+        )
+    return first[:, None] + step_size * np.arange(n_windows)[None, :]
+
+
+def cv_frame(df, offsets, train_lengths, fcst, alias):
+    """StatsForecast-style cv_df from forecasts of shape [series, window, h].
+
+    ``df`` and ``offsets`` are the sorted panel and series offsets from
+    padded_panel; ds, cutoff and y are gathered from the panel's own rows.
+    """
+    h = fcst.shape[-1]
+    start = offsets[:, None] + train_lengths
+    target_rows = (start[:, :, None] + np.arange(h)[None, None, :]).ravel()
+    cutoff_rows = np.repeat((start - 1).ravel(), h)
+    return pl.DataFrame(
+        {
+            "unique_id": df["unique_id"].gather(target_rows),
+            "ds": df["ds"].gather(target_rows),
+            "cutoff": df["ds"].gather(cutoff_rows),
+            "y": df["y"].gather(target_rows),
+            alias: pl.Series(fcst.ravel()).cast(df.schema["y"]),
+        }
+    )
+
+
+def historic_average(Y, train_lengths, h):
+    """Mean of the first L observations, for every (series, window)."""
+    csum = np.cumsum(Y, axis=1)
+    rows = np.arange(len(Y))[:, None]
+    mean = csum[rows, train_lengths - 1] / train_lengths
+    return np.repeat(mean[:, :, None], h, axis=2)
+
+
+def seasonal_naive(Y, train_lengths, h, season_length):
+    """Last season before each cutoff, repeated over the horizon.
+
+    Like StatsForecast, a training history shorter than one season leaves
+    the seasonal positions without an observation NaN.
+    """
+    step = np.arange(h)[None, None, :]
+    cols = train_lengths[:, :, None] - season_length + step % season_length
+    fcst = Y[np.arange(len(Y))[:, None, None], np.maximum(cols, 0)]
+    return np.where(cols >= 0, fcst, np.nan)
+
+
+def ses(Y, train_lengths, h, alpha):
+    """Simple exponential smoothing level at each cutoff, over the horizon.
+
+    l_0 = y_0 and l_t = alpha * y_t + (1 - alpha) * l_{t-1}, for all series
+    at once.
+    """
+    from scipy.signal import lfilter
+
+    zi = (1 - alpha) * Y[:, :1]
+    level, _ = lfilter([alpha], [1.0, -(1 - alpha)], Y, axis=1, zi=zi)
+    rows = np.arange(len(Y))[:, None]
+    last = level[rows, train_lengths - 1]
+    return np.repeat(last[:, :, None], h, axis=2)
+
+
+def _seasonal_indices(X, n, m):
+    """Classical (moving-average) seasonal indices of each row.
+
+    Mirrors statsforecast.theta.auto_theta: rows with n >= 2m pass an ACF
+    test at lag m; those are decomposed multiplicatively when positive (and
+    no index is below 0.01), additively otherwise.
+
+    Returns:
+        season [B, m] indexed by position % m, the multiplicative flag of
+        each row and the mask of rows to deseasonalize
+    """
+    B, T = X.shape
+    valid = np.arange(T)[None, :] < n[:, None]
+    decompose = np.zeros(B, dtype=bool)
+    season = np.zeros((B, m))
+    multiplicative = np.zeros(B, dtype=bool)
+    if m < 4:
+        return season, multiplicative, decompose
+
+    testable = n >= 2 * m
+    if not testable.any():
+        return season, multiplicative, decompose
+
+    # ACF up to lag m (statsmodels acf, adjusted=False)
+    Xz = np.where(valid, X, 0.0)
+    mean = Xz.sum(axis=1) / n
+    D = np.where(valid, X - mean[:, None], 0.0)
+    acov = np.empty((B, m + 1))
+    for k in range(m + 1):
+        acov[:, k] = (D[:, : T - k] * D[:, k:]).sum(axis=1) / n
+    with np.errstate(invalid="ignore", divide="ignore"):
+        r = acov[:, 1:] / acov[:, :1]
+        stat = np.sqrt((1 + 2 * np.sum(r[:, :-1] ** 2, axis=1)) / n)
+        decompose = testable & (np.abs(r[:, -1]) / stat > _SEASONAL_TEST_Z)
+    if not decompose.any():
+        return season, multiplicative, decompose
+
+    # Centered moving average (2 x m for even m), NaN within m/2 of the ends
+    half = m // 2
+    if m % 2 == 0:
+        weights = np.r_[0.5, np.ones(m - 1), 0.5] / m
+    else:
+        weights = np.ones(m) / m
+    width = len(weights)
+    trend = np.full((B, T), np.nan)
+    trend[:, half : T - width + 1 + half] = sum(
+        w * Xz[:, k : T - width + 1 + k] for k, w in enumerate(weights)
+    )
+    t_idx = np.arange(T)[None, :]
+    trend[(t_idx < half) | (t_idx > (n - 1 - half)[:, None])] = np.nan
+
+    positive = np.where(valid, X, np.inf).min(axis=1) > 0
+    phase = np.arange(T) % m
+
+    def indices(detrended, mult):
+        ok = np.isfinite(detrended)
+        sums = np.zeros((B, m))
+        counts = np.zeros((B, m))
+        for p in range(m):
+            cols = phase == p
+            sums[:, p] = np.where(ok[:, cols], detrended[:, cols], 0.0).sum(axis=1)
+            counts[:, p] = ok[:, cols].sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            avg = sums / counts
+        centre = avg.mean(axis=1, keepdims=True)
+        return np.where(mult[:, None], avg / centre, avg - centre)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mult_season = indices(X / trend, np.ones(B, dtype=bool))
+    add_season = indices(X - trend, np.zeros(B, dtype=bool))
+    multiplicative = positive & ~(mult_season < 0.01).any(axis=1)
+    season = np.where(multiplicative[:, None], mult_season, add_season)
+    return season, multiplicative, decompose
+
+
+def _theta_trend(X, n):
+    """STM drift: OLS intercept An and slope Bn of y on t = 1..n."""
+    T = X.shape[1]
+    t = np.arange(1, T + 1)[None, :]
+    valid = t <= n[:, None]
+    Xz = np.where(valid, X, 0.0)
+    mean_y = Xz.sum(axis=1) / n
+    mean_ty = (Xz * t).sum(axis=1) / n
+    Bn = 6 * (2 * mean_ty - (1 + n) * mean_y) / (n**2 - 1)
+    An = mean_y - (n + 1) * Bn / 2
+    return An, Bn
+
+
+def _theta_objective(params, XT, fit_mask, An, Bn, scale):
+    """StatsForecast's STM fit criterion, sum(e[3:]^2) / mean|y|, per fit.
+
+    ``XT`` is the zero-padded data with one column per fit (time along axis
+    0, so each step reads a contiguous row) and ``fit_mask`` marks the steps
+    whose one-step errors enter the criterion.
+    """
+    level0 = params[:, 0]
+    alpha = params[:, 1]
+    beta = 1 - alpha
+    # mu_i = level_{i-1} + (An (1-a)^i + Bn (1 - (1-a)^(i+1)) / a) / 2
+    drift = 0.5 * Bn / alpha
+    decay_coef = 0.5 * (An - Bn * beta / alpha)
+    level = alpha * XT[0] + beta * level0
+    decay = beta.copy()  # (1 - alpha) ** i
+    sse = np.zeros(XT.shape[1])
+    err = np.empty_like(sse)
+    for i in range(1, len(XT)):
+        # err = y_i - mu_i
+        np.subtract(XT[i], level, out=err)
+        err -= drift
+        err -= decay * decay_coef
+        err *= fit_mask[i]
+        sse += err * err
+        level *= beta
+        level += alpha * XT[i]
+        decay *= beta
+    mse = sse / scale
+    return np.where(np.isnan(mse), -np.inf, np.maximum(mse, -1e10))
+
+
+def _nelder_mead(fn, x0, lower, upper):
+    """Bounded Nelder-Mead for many independent problems in lockstep.
+
+    Each row of ``x0`` is one problem; ``fn(points, rows)`` evaluates the
+    objective of problems ``rows`` at ``points``. Steps, coefficients and
+    stopping rule follow StatsForecast's optimizer, so every row takes the
+    same path as its own sequential run.
+    """
+    B, k = x0.shape
+    rows_all = np.arange(B)
+    simplex = np.repeat(np.clip(x0, lower, upper)[:, None, :], k + 1, axis=1)
+    for j in range(k):
+        v = simplex[:, j + 1, j]
+        simplex[:, j + 1, j] = np.where(v != 0, v * (1 + NM_INIT_STEP), NM_ZERO_PERT)
+    simplex = np.clip(simplex, lower, upper)
+    fsim = np.stack([fn(simplex[:, i], rows_all) for i in range(k + 1)], axis=1)
+
+    # Adaptive coefficients (for k = 2 these equal the classic 1, 2, 0.5, 0.5)
+    gamma = 1 + 2 / k
+    rho = 0.75 - 1 / (2 * k)
+    sigma = 1 - 1 / k
+
+    active = np.ones(B, dtype=bool)
+    for _ in range(NM_MAX_ITER):
+        active &= np.std(fsim, axis=1) >= NM_TOL_STD
+        idx = np.flatnonzero(active)
+        if len(idx) == 0:
+            break
+        S = simplex[idx]
+        F = fsim[idx]
+        order = np.argsort(F, axis=1)
+        pick = np.arange(len(idx))
+        best, second_worst, worst = order[:, 0], order[:, -2], order[:, -1]
+        f_best = F[pick, best]
+        f_sw = F[pick, second_worst]
+        f_worst = F[pick, worst]
+        x_worst = S[pick, worst]
+
+        centroid = (S.sum(axis=1) - x_worst) / k
+        x_r = np.clip(centroid + (centroid - x_worst), lower, upper)
+        f_r = fn(x_r, idx)
+
+        new_x = np.full_like(x_r, np.nan)
+        new_f = np.full_like(f_r, np.nan)
+
+        reflect = (f_best <= f_r) & (f_r < f_sw)
+        new_x[reflect], new_f[reflect] = x_r[reflect], f_r[reflect]
+
+        expand = f_r < f_best
+        if expand.any():
+            x_e = np.clip(
+                centroid[expand] + gamma * (x_r[expand] - centroid[expand]),
+                lower,
+                upper,
+            )
+            f_e = fn(x_e, idx[expand])
+            use_e = f_e < f_r[expand]
+            new_x[expand] = np.where(use_e[:, None], x_e, x_r[expand])
+            new_f[expand] = np.where(use_e, f_e, f_r[expand])
+
+        outside = ~reflect & ~expand & (f_sw <= f_r) & (f_r < f_worst)
+        inside = ~reflect & ~expand & ~outside
+        shrink = np.zeros(len(idx), dtype=bool)
+        contract = outside | inside
+        if contract.any():
+            direction = np.where(outside, rho, -rho)[contract, None]
+            x_c = np.clip(
+                centroid[contract] + direction * (x_r[contract] - centroid[contract]),
+                lower,
+                upper,
+            )
+            f_c = fn(x_c, idx[contract])
+            accept = np.where(
+                outside[contract], f_c <= f_r[contract], f_c < f_worst[contract]
+            )
+            where = np.flatnonzero(contract)
+            new_x[where[accept]] = x_c[accept]
+            new_f[where[accept]] = f_c[accept]
+            shrink[where[~accept]] = True
+
+        replace = ~shrink
+        S[pick[replace], worst[replace]] = new_x[replace]
+        F[pick[replace], worst[replace]] = new_f[replace]
+
+        if shrink.any():
+            s_pick = pick[shrink]
+            x_best = S[s_pick, best[shrink]]
+            for r in range(1, k + 1):
+                vertex = order[shrink, r]
+                moved = np.clip(
+                    x_best + sigma * (S[s_pick, vertex] - x_best), lower, upper
+                )
+                S[s_pick, vertex] = moved
+                F[s_pick, vertex] = fn(moved, idx[shrink])
+
+        simplex[idx] = S
+        fsim[idx] = F
+
+    best = np.argmin(fsim, axis=1)
+    return simplex[rows_all, best]
+
+
+def _theta_chunk(X, n, h, season_length):
+    """Fit STM Theta to each row of X (first n[b] values) and forecast h steps."""
+    season, multiplicative, decompose = _seasonal_indices(X, n, season_length)
+    T = X.shape[1]
+    phase = np.arange(T) % max(season_length, 1)
+    if decompose.any():
+        seas = season[:, phase]
+        X = np.where(
+            decompose[:, None],
+            np.where(multiplicative[:, None], X / seas, X - seas),
+            X,
+        )
+
+    An, Bn = _theta_trend(X, n)
+    valid = np.arange(T)[None, :] < n[:, None]
+    scale = np.where(valid, np.abs(X), 0.0).sum(axis=1) / n
+    scale = np.where(scale == 0.0, 1e-10, scale)
+
+    XT = np.ascontiguousarray(np.where(valid, X, 0.0).T)
+    fit_mask = (valid & (np.arange(T)[None, :] >= THETA_NMSE)).T.astype(np.float64)
+
+    def objective(params, rows):
+        return _theta_objective(
+            params, XT[:, rows], fit_mask[:, rows], An[rows], Bn[rows], scale[rows]
+        )
+
+    x0 = np.column_stack([X[:, 0] / 2, np.full(len(X), 0.5)])
+    level0, alpha = _nelder_mead(objective, x0, THETA_LOWER, THETA_UPPER).T
+
+    # Filter to the end of the training window, then forecast with y = mu
+    beta = 1 - alpha
+    level = alpha * X[:, 0] + beta * level0
+    for i in range(1, T):
+        level = np.where(i < n, alpha * X[:, i] + beta * level, level)
+    fcst = np.empty((len(X), h))
+    for j in range(h):
+        i = n + j
+        decay = beta**i
+        mu = level + 0.5 * (An * decay + Bn * (1 - decay * beta) / alpha)
+        fcst[:, j] = mu
+        level = alpha * mu + beta * level
+
+    if decompose.any():
+        seas = season[
+            np.arange(len(X))[:, None], (n[:, None] + np.arange(h)) % season_length
+        ]
+        fcst = np.where(
+            decompose[:, None],
+            np.where(multiplicative[:, None], fcst * seas, fcst + seas),
+            fcst,
+        )
+    return fcst
+
+
+def theta(Y, train_lengths, h, season_length, chunk_size=THETA_CHUNK_SIZE):
+    """STM Theta forecasts for every (series, window)."""
+    n_series, n_windows = train_lengths.shape
+    series = np.repeat(np.arange(n_series), n_windows)
+    n = train_lengths.ravel()
+    fcst = np.empty((len(n), h))
+    order = np.argsort(n, kind="stable")  # similar lengths share a chunk
+    for start in range(0, len(order), chunk_size):
+        fits = order[start : start + chunk_size]
+        width = int(n[fits].max())
+        fcst[fits] = _theta_chunk(Y[series[fits], :width], n[fits], h, season_length)
+    return fcst.reshape(n_series, n_windows, h)
+
+
+def cross_validation(
+    df, model, h, n_windows, step_size=None, season_length=1, alpha=0.1
+):
+    """Expanding-window cross-validation of a baseline on a whole panel.
+
+    Args:
+        df: polars DataFrame of unique_id, ds, y (no nulls before the last
+            cutoff)
+        model: One of BATCHED_MODELS
+        h: Forecast horizon
+        n_windows: Number of CV windows
+        step_size: Periods between cutoffs (defaults to h)
+        season_length: Season length for SeasonalNaive and Theta
+        alpha: SES smoothing parameter
+
+    Returns:
+        polars DataFrame of unique_id, ds, cutoff, y and the model's
+        StatsForecast alias, like StatsForecast.cross_validation
+
+    Raises:
+        ValueError: If a series is too short for the windows or has null
+            training values (StatsForecast would fit those differently)
+    """
+    if model not in BATCHED_MODELS:
+        raise ValueError(
+            f"Unknown batched model '{model}'. Available: {list(BATCHED_MODELS)}"
+        )
+    step_size = h if step_size is None else step_size
+
+    df, offsets, lengths, Y = padded_panel(df.select("unique_id", "ds", "y"))
+    train_lengths = cv_train_lengths(lengths, h, n_windows, step_size)
+    in_train = np.arange(Y.shape[1])[None, :] < train_lengths[:, -1:]
+    if np.isnan(Y[in_train]).any():
+        raise ValueError("Null y values before the last cutoff")
+
+    if model == "historic_average":
+        fcst = historic_average(Y, train_lengths, h)
+    elif model == "seasonal_naive":
+        fcst = seasonal_naive(Y, train_lengths, h, season_length)
+    elif model == "ses":
+        fcst = ses(Y, train_lengths, h, alpha)
+    else:
+        fcst = theta(Y, train_lengths, h, season_length)
+
+    return cv_frame(df, offsets, train_lengths, fcst, BATCHED_MODELS[model])
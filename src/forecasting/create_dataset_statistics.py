@@ -11,13 +11,14 @@ The output includes both CSV and LaTeX table formats grouped by dataset category
 import sys
 from pathlib import Path
 import polars as pl
-import tomli
 
 # Add paths for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 sys.path.insert(0, str(Path(__file__).parent.parent / "models"))
 
 from settings import config
+from dataset_registry import load_registry
+from dataset_stats_cache import compute_cached
 
 # Configuration
 DATA_DIR = Path(config("DATA_DIR"))
@@ -28,37 +29,22 @@ PAPER_DIR = FORECAST_DIR / "paper"
 
 def load_active_datasets():
     """Load active (uncommented) datasets from datasets.toml"""
-    datasets_toml_path = Path(__file__).parent.parent.parent / "datasets.toml"
+    registry = load_registry(Path(__file__).parent.parent.parent / "datasets.toml")
 
-    if not datasets_toml_path.exists():
-        raise FileNotFoundError(f"datasets.toml not found at {datasets_toml_path}")
-
-    with open(datasets_toml_path, "rb") as f:
-        datasets_config = tomli.load(f)
-
-    # Extract active dataset information
+    # Extract active dataset information (sensitivity-only datasets excluded)
     active_datasets = []
-
-    for module_name, module_config in datasets_config.items():
-        if isinstance(module_config, dict):
-            # Look for dataset entries within each module
-            for key, value in module_config.items():
-                if isinstance(value, dict) and key.startswith("ftsfr_"):
-                    # Skip sensitivity-only datasets: they belong to the
-                    # dedicated cleaning-sensitivity section, not the main
-                    # results tables.
-                    if value.get("paper_use") == "sensitivity_only":
-                        continue
-                    dataset_info = {
-                        "dataset_name": key,
-                        "table_name": value.get("table_name", key),
-                        "short_name": value.get("short_name", key),
-                        "group": value.get("group", "other"),
-                        "frequency": value.get("frequency", "ME"),
-                        "seasonality": value.get("seasonality", 12),
-                        "module_name": module_name,
-                    }
-                    active_datasets.append(dataset_info)
+    for dataset_name in registry.active():
+        entry = registry[dataset_name]
+        dataset_info = {
+            "dataset_name": dataset_name,
+            "table_name": entry.get("table_name", dataset_name),
+            "short_name": entry.get("short_name", dataset_name),
+            "group": entry.get("group", "other"),
+            "frequency": entry.get("frequency", "ME"),
+            "seasonality": entry.get("seasonality", 12),
+            "module_name": entry["module"],
+        }
+        active_datasets.append(dataset_info)
 
     print(f"Found {len(active_datasets)} active datasets in datasets.toml")
     return active_datasets
@@ -91,6 +77,54 @@ def simplify_frequency(freq_code):
     return freq_mapping.get(freq_code, freq_code)  # Return original if not found
 
 
+def formatted_dataset_path(dataset_info):
+    """Path to a dataset's parquet file in the formatted directory"""
+    return (
+        DATA_DIR
+        / "formatted"
+        / dataset_info["module_name"]
+        / f"{dataset_info['dataset_name']}.parquet"
+    )
+
+
+def parquet_date_range(dataset_path, date_col):
+    """
+    Min/max of a date column from parquet row-group statistics
+
+    Args:
+        dataset_path: Path to the parquet file
+        date_col: Name of a Date/Datetime column
+
+    Returns:
+        (min_date, max_date), or None if any row group lacks statistics
+    """
+    try:
+        import pyarrow.parquet as pq
+
+        metadata = pq.ParquetFile(dataset_path).metadata
+        col_idx = metadata.schema.names.index(date_col)
+    except (ImportError, ValueError):
+        return None
+
+    mins, maxs = [], []
+    for i in range(metadata.num_row_groups):
+        column = metadata.row_group(i).column(col_idx)
+        stats = column.statistics
+        if stats is None or not stats.has_min_max:
+            return None
+        # Row groups with only nulls have no meaningful min/max
+        if stats.null_count == column.num_values:
+            continue
+        mins.append(stats.min)
+        maxs.append(stats.max)
+
+    if not mins:
+        return None
+    if not all(hasattr(v, "strftime") for v in mins + maxs):
+        return None
+    return min(mins), max(maxs)
+
+
 def calculate_dataset_statistics(dataset_info):
     """
     Calculate comprehensive statistics for a single dataset using Polars
@@ -102,10 +136,9 @@ def calculate_dataset_statistics(dataset_info):
         Dictionary containing all calculated statistics
     """
     dataset_name = dataset_info["dataset_name"]
-    module_name = dataset_info["module_name"]
 
     # Construct path to parquet file in formatted directory
-    dataset_path = DATA_DIR / "formatted" / module_name / f"{dataset_name}.parquet"
+    dataset_path = formatted_dataset_path(dataset_info)
 
     if not dataset_path.exists():
         print(f"  Warning: Parquet file not found for {dataset_name} at {dataset_path}")
@@ -123,8 +156,10 @@ def calculate_dataset_statistics(dataset_info):
         }
 
     try:
-        # Load the dataset with Polars
-        df = pl.read_parquet(dataset_path)
+        # Scan lazily; only the identifier and date columns are ever read
+        lf = pl.scan_parquet(dataset_path)
+        schema = lf.collect_schema()
+        columns = schema.names()
 
         # Identify date and identifier columns
         date_col = None
@@ -133,55 +168,68 @@ def calculate_dataset_statistics(dataset_info):
         # Look for common date column names
         date_candidates = ["ds", "date", "time", "timestamp"]
         for col in date_candidates:
-            if col in df.columns:
+            if col in columns:
                 date_col = col
                 break
 
         # Look for common ID column names
         id_candidates = ["unique_id", "id", "entity_id", "series_id"]
         for col in id_candidates:
-            if col in df.columns:
+            if col in columns:
                 id_col = col
                 break
 
         # If we don't find standard columns, try to infer from data types
         if date_col is None:
-            for col in df.columns:
-                if df[col].dtype in [pl.Date, pl.Datetime]:
+            for col in columns:
+                if schema[col] in [pl.Date, pl.Datetime]:
                     date_col = col
                     break
 
         if id_col is None:
             # Look for string columns that could be identifiers
-            for col in df.columns:
-                if df[col].dtype == pl.Utf8 and col != date_col:
+            for col in columns:
+                if schema[col] == pl.Utf8 and col != date_col:
                     id_col = col
                     break
 
-        # If still no ID column, create one (assuming single time series)
-        if id_col is None:
-            df = df.with_columns(pl.lit("series_1").alias("unique_id"))
-            id_col = "unique_id"
-
         # If no date column found, raise error
         if date_col is None:
             raise ValueError(f"Could not identify date column in {dataset_path}")
 
-        # Ensure date column is properly typed
-        if df[date_col].dtype not in [pl.Date, pl.Datetime]:
-            df = df.with_columns(pl.col(date_col).str.to_datetime().alias(date_col))
-
-        # Calculate basic date statistics
-        min_date = df[date_col].min()
-        max_date = df[date_col].max()
+        date_is_temporal = schema[date_col] in [pl.Date, pl.Datetime]
+        date_expr = pl.col(date_col)
+        if not date_is_temporal:
+            # Ensure date column is properly typed
+            date_expr = date_expr.str.to_datetime()
 
-        # Calculate entity and time series statistics
-        unique_entities = df[id_col].n_unique()
-        unique_timestamps = df[date_col].n_unique()
-
-        # Calculate time series lengths per entity
-        entity_lengths = df.group_by(id_col).agg(pl.len().alias("length"))["length"]
+        # Date range from parquet row-group statistics when available
+        date_range = (
+            parquet_date_range(dataset_path, date_col) if date_is_temporal else None
+        )
 
+        # Time series lengths per entity (no ID column: single time series)
+        if id_col is None:
+            lengths_query = lf.select(pl.len().alias("length"))
+        else:
+            lengths_query = lf.group_by(id_col).agg(pl.len().alias("length"))
+        queries = [lengths_query]
+        if date_range is None:
+            queries.append(
+                lf.select(
+                    date_expr.min().alias("min_date"),
+                    date_expr.max().alias("max_date"),
+                )
+            )
+        results = pl.collect_all(queries)
+
+        if date_range is None:
+            min_date, max_date = results[1].row(0)
+        else:
+            min_date, max_date = date_range
+
+        entity_lengths = results[0]["length"]
+        unique_entities = len(entity_lengths)
         min_length = entity_lengths.min()
         median_length = entity_lengths.median()
         max_length = entity_lengths.max()
@@ -425,18 +473,17 @@ def main():
         print("No active datasets found in datasets.toml")
         return
 
-    # Calculate statistics for each dataset
-    all_stats = []
-    failed_datasets = []
-
+    # Calculate statistics for each dataset (in parallel, cached by file
+    # fingerprint)
     print("Calculating statistics for each dataset...")
-    for dataset_info in active_datasets:
-        print(f"  Processing {dataset_info['dataset_name']}...")
-        stats = calculate_dataset_statistics(dataset_info)
-        all_stats.append(stats)
-
-        if stats.get("error"):
-            failed_datasets.append(stats)
+    all_stats = compute_cached(
+        calculate_dataset_statistics,
+        active_datasets,
+        dataset_path=formatted_dataset_path,
+        cache_file=FORECAST_DIR / "dataset_statistics_cache.json",
+        code_files=[__file__],
+    )
+    failed_datasets = [stats for stats in all_stats if stats.get("error")]
 
     print(f"\nProcessed {len(all_stats)} datasets")
     if failed_datasets:
@@ -12,17 +12,19 @@ The output includes both CSV and LaTeX table formats grouped by dataset category
 import sys
 from pathlib import Path
 import polars as pl
-import tomli
 
 # Add paths for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 sys.path.insert(0, str(Path(__file__).parent.parent / "forecasting"))
 
 from settings import config
+from dataset_registry import load_registry
+from dataset_stats_cache import compute_cached
 
 from forecast_utils import (
     get_test_size_from_frequency,
     determine_cv_windows,
+    load_panel,
     MAX_CV_WINDOWS,
 )
 from robust_preprocessing import (
@@ -44,37 +46,22 @@ PAPER_DIR = FORECAST_DIR / "paper"
 
 def load_active_datasets():
     """Load active (uncommented) datasets from datasets.toml"""
-    datasets_toml_path = Path(__file__).parent.parent.parent / "datasets.toml"
+    registry = load_registry(Path(__file__).parent.parent.parent / "datasets.toml")
 
-    if not datasets_toml_path.exists():
-        raise FileNotFoundError(f"datasets.toml not found at {datasets_toml_path}")
-
-    with open(datasets_toml_path, "rb") as f:
-        datasets_config = tomli.load(f)
-
-    # Extract active dataset information
+    # Extract active dataset information (sensitivity-only datasets excluded)
     active_datasets = []
-
-    for module_name, module_config in datasets_config.items():
-        if isinstance(module_config, dict):
-            # Look for dataset entries within each module
-            for key, value in module_config.items():
-                if isinstance(value, dict) and key.startswith("ftsfr_"):
-                    # Skip sensitivity-only datasets: they belong to the
-                    # dedicated cleaning-sensitivity section, not the main
-                    # results tables.
-                    if value.get("paper_use") == "sensitivity_only":
-                        continue
-                    dataset_info = {
-                        "dataset_name": key,
-                        "table_name": value.get("table_name", key),
-                        "short_name": value.get("short_name", key),
-                        "group": value.get("group", "other"),
-                        "frequency": value.get("frequency", "ME"),
-                        "seasonality": value.get("seasonality", 12),
-                        "module_name": module_name,
-                    }
-                    active_datasets.append(dataset_info)
+    for dataset_name in registry.active():
+        entry = registry[dataset_name]
+        dataset_info = {
+            "dataset_name": dataset_name,
+            "table_name": entry.get("table_name", dataset_name),
+            "short_name": entry.get("short_name", dataset_name),
+            "group": entry.get("group", "other"),
+            "frequency": entry.get("frequency", "ME"),
+            "seasonality": entry.get("seasonality", 12),
+            "module_name": entry["module"],
+        }
+        active_datasets.append(dataset_info)
 
     print(f"Found {len(active_datasets)} active datasets in datasets.toml")
     return active_datasets
@@ -107,6 +94,16 @@ def simplify_frequency(freq_code):
     return freq_mapping.get(freq_code, freq_code)  # Return original if not found
 
 
+def formatted_dataset_path(dataset_info):
+    """Path to a dataset's parquet file in the formatted directory"""
+    return (
+        DATA_DIR
+        / "formatted"
+        / dataset_info["module_name"]
+        / f"{dataset_info['dataset_name']}.parquet"
+    )
+
+
 def format_date_range(min_date, max_date):
     """Format a date range for display in the table."""
     if min_date is None or max_date is None:
@@ -136,10 +133,9 @@ def calculate_filtering_statistics(dataset_info):
         Dictionary containing all calculated statistics (before and after filtering)
     """
     dataset_name = dataset_info["dataset_name"]
-    module_name = dataset_info["module_name"]
 
     # Construct path to parquet file in formatted directory
-    dataset_path = DATA_DIR / "formatted" / module_name / f"{dataset_name}.parquet"
+    dataset_path = formatted_dataset_path(dataset_info)
 
     if not dataset_path.exists():
         print(f"  Warning: Parquet file not found for {dataset_name} at {dataset_path}")
@@ -157,24 +153,8 @@ def calculate_filtering_statistics(dataset_info):
         }
 
     try:
-        # Load the dataset with Polars
-        df = pl.read_parquet(dataset_path)
-
-        # Basic cleanup matching forecasting pipeline
-        if "id" in df.columns:
-            df = df.rename({"id": "unique_id"})
-        drop_cols = [c for c in df.columns if c.startswith("__index_level_")]
-        if drop_cols:
-            df = df.drop(drop_cols)
-        df = df.select(["unique_id", "ds", "y"])
-
-        df = df.with_columns(pl.col("y").cast(pl.Float32))
-        df = df.with_columns(
-            pl.when((pl.col("y").is_infinite()) | (pl.col("y").is_nan()))
-            .then(None)
-            .otherwise(pl.col("y"))
-            .alias("y")
-        )
+        # Load only the columns the forecasting pipeline uses, as it does
+        df = load_panel(dataset_path)
 
         frequency = dataset_info["frequency"]
         seasonality = dataset_info["seasonality"]
@@ -531,16 +511,24 @@ def main():
         print("No active datasets found in datasets.toml")
         return
 
-    # Calculate filtering statistics for each dataset
-    all_stats = []
+    # Calculate filtering statistics for each dataset (in parallel, cached by
+    # file fingerprint and the code of the filtering pipeline)
     failed_datasets = []
 
     print("Calculating before/after filtering statistics for each dataset...")
-    for dataset_info in active_datasets:
-        print(f"  Processing {dataset_info['dataset_name']}...")
-        stats = calculate_filtering_statistics(dataset_info)
-        all_stats.append(stats)
-
+    all_stats = compute_cached(
+        calculate_filtering_statistics,
+        active_datasets,
+        dataset_path=formatted_dataset_path,
+        cache_file=FORECAST_DIR / "filtered_dataset_statistics_cache.json",
+        code_files=[
+            __file__,
+            Path(__file__).parent / "forecast_utils.py",
+            Path(__file__).parent / "robust_preprocessing.py",
+        ],
+    )
+    for dataset_info, stats in zip(active_datasets, all_stats):
+        print(f"  {dataset_info['dataset_name']}:")
         if stats.get("error"):
             failed_datasets.append(stats)
         else:
@@ -10,12 +10,12 @@ sys.path.insert(0, str(SRC_DIR))
 
 import pandas as pd
 import numpy as np
-import tomli
 import matplotlib.pyplot as plt
 import seaborn as sns
 
 from settings import config
 from dodo_common import load_models_config
+from dataset_registry import load_registry
 
 OUTPUT_DIR = Path(config("OUTPUT_DIR"))
 FORECAST_DIR = OUTPUT_DIR / "forecasting"  # New forecasting output directory
@@ -53,32 +53,28 @@ def get_model_display_mapping():
     return mapping
 
 
+def _load_registry():
+    """The datasets.toml registry, or None (with a warning) if the file is missing."""
+    datasets_toml_path = BASE_DIR / "datasets.toml"
+    try:
+        return load_registry(datasets_toml_path)
+    except FileNotFoundError:
+        print(f"Warning: datasets.toml not found at {datasets_toml_path}")
+        return None
+
+
 @lru_cache(maxsize=None)
 def load_dataset_short_names():
     """Load dataset short names from datasets.toml"""
-    datasets_toml_path = Path(__file__).parent.parent.parent / "datasets.toml"
-
-    if not datasets_toml_path.exists():
-        print(f"Warning: datasets.toml not found at {datasets_toml_path}")
+    registry = _load_registry()
+    if registry is None:
         return {}
 
-    with open(datasets_toml_path, "rb") as f:
-        datasets_config = tomli.load(f)
-
-    # Create mapping from full dataset name to short name
-    name_mapping = {}
-
-    for module_name, module_config in datasets_config.items():
-        if isinstance(module_config, dict):
-            # Look for dataset entries within each module
-            for key, value in module_config.items():
-                if isinstance(value, dict) and key.startswith("ftsfr_"):
-                    # This is a dataset entry
-                    dataset_name = key
-                    short_name = value.get(
-                        "short_name", dataset_name
-                    )  # fallback to full name
-                    name_mapping[dataset_name] = short_name
+    # Create mapping from full dataset name to short name (fallback: full name)
+    name_mapping = {
+        dataset_name: entry.get("short_name", dataset_name)
+        for dataset_name, entry in registry.items()
+    }
 
     print(f"Loaded {len(name_mapping)} dataset short names")
     return name_mapping
@@ -87,32 +83,19 @@ def load_dataset_short_names():
 @lru_cache(maxsize=None)
 def load_dataset_groups_and_names():
     """Load dataset groups and table names from datasets.toml"""
-    datasets_toml_path = Path(__file__).parent.parent.parent / "datasets.toml"
-
-    if not datasets_toml_path.exists():
-        print(f"Warning: datasets.toml not found at {datasets_toml_path}")
+    registry = _load_registry()
+    if registry is None:
         return {}, {}
 
-    with open(datasets_toml_path, "rb") as f:
-        datasets_config = tomli.load(f)
-
     # Create mappings from full dataset name to group and table name
     group_mapping = {}
     table_name_mapping = {}
 
-    for module_name, module_config in datasets_config.items():
-        if isinstance(module_config, dict):
-            # Look for dataset entries within each module
-            for key, value in module_config.items():
-                if isinstance(value, dict) and key.startswith("ftsfr_"):
-                    # This is a dataset entry
-                    dataset_name = key
-                    group = value.get("group", "other")
-                    table_name = value.get(
-                        "table_name", value.get("short_name", dataset_name)
-                    )
-                    group_mapping[dataset_name] = group
-                    table_name_mapping[dataset_name] = table_name
+    for dataset_name, entry in registry.items():
+        group_mapping[dataset_name] = entry.get("group", "other")
+        table_name_mapping[dataset_name] = entry.get(
+            "table_name", entry.get("short_name", dataset_name)
+        )
 
     print(f"Loaded {len(group_mapping)} dataset groups and table names")
     return group_mapping, table_name_mapping
@@ -392,27 +375,13 @@ def filter_results_by_active_models(results_df):
 @lru_cache(maxsize=None)
 def get_active_dataset_names():
     """Get list of active dataset names from datasets.toml (excluding commented out datasets)"""
-    datasets_toml_path = Path(__file__).parent.parent.parent / "datasets.toml"
-
-    if not datasets_toml_path.exists():
-        print(f"Warning: datasets.toml not found at {datasets_toml_path}")
+    registry = _load_registry()
+    if registry is None:
         return []
 
-    with open(datasets_toml_path, "rb") as f:
-        datasets_config = tomli.load(f)
-
-    active_datasets = []
-    for module_name, module_config in datasets_config.items():
-        if isinstance(module_config, dict):
-            # Look for dataset entries within each module
-            for key, value in module_config.items():
-                if isinstance(value, dict) and key.startswith("ftsfr_"):
-                    # Skip sensitivity-only datasets: they belong to the
-                    # dedicated cleaning-sensitivity section, not the main
-                    # results tables.
-                    if value.get("paper_use") == "sensitivity_only":
-                        continue
-                    active_datasets.append(key)
+    # Sensitivity-only datasets are excluded: they belong to the dedicated
+    # cleaning-sensitivity section, not the main results tables.
+    active_datasets = registry.active()
 
     print(f"Found {len(active_datasets)} active datasets: {sorted(active_datasets)}")
     return active_datasets
@@ -0,0 +1,118 @@
+"""
+dataset_stats_cache.py
+
+Parallel, fingerprint-cached evaluation of per-dataset statistics for
+create_dataset_statistics.py and create_filtered_dataset_statistics.py.
+
+Each dataset's result is cached in a JSON file keyed by the formatted
+parquet's path, size and mtime, the dataset's datasets.toml entry, and a
+hash of the code that computes the statistics. A rerun after one dataset
+changed only recomputes that dataset; an unchanged rerun reads everything
+from the cache.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+CACHE_VERSION = 1
+
+# Datasets are processed concurrently; Polars releases the GIL while it
+# scans and aggregates.
+MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def file_fingerprint(path):
+    """[size, mtime_ns] of ``path``, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def code_fingerprint(code_files):
+    """Hash of the contents of the files that compute the statistics."""
+    digest = hashlib.md5()
+    for code_file in code_files:
+        digest.update(Path(code_file).read_bytes())
+    return digest.hexdigest()
+
+
+def load_cache(cache_file):
+    """Cached results ({cache key: stats}); empty if missing or stale."""
+    try:
+        with open(cache_file, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("version") != CACHE_VERSION:
+        return {}
+    return cache.get("results", {})
+
+
+def save_cache(results, cache_file):
+    """Write cached results atomically."""
+    cache_file = Path(cache_file)
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_name(cache_file.name + ".tmp")
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "results": results}, f, default=str)
+    tmp_file.replace(cache_file)
+
+
+def compute_cached(
+    func,
+    datasets,
+    dataset_path,
+    cache_file,
+    code_files,
+    max_workers=MAX_WORKERS,
+):
+    """Apply ``func`` to every dataset, in parallel, reusing cached results.
+
+    Args:
+        func: Callable taking a dataset_info dict and returning a stats dict
+            (with an "error" entry that is None on success)
+        datasets: List of dataset_info dicts from datasets.toml
+        dataset_path: Callable mapping a dataset_info dict to its parquet path
+        cache_file: Path of the JSON cache
+        code_files: Files whose contents determine ``func``'s output
+
+    Returns:
+        List of stats dicts in the order of ``datasets``
+    """
+    code_hash = code_fingerprint(code_files)
+    keys = [
+        json.dumps(
+            [
+                str(dataset_path(info)),
+                file_fingerprint(dataset_path(info)),
+                info,
+                code_hash,
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        for info in datasets
+    ]
+
+    cache = load_cache(cache_file)
+    results = [cache.get(key) for key in keys]
+    missing = [i for i, stats in enumerate(results) if stats is None]
+    print(f"  {len(datasets) - len(missing)} datasets cached, computing {len(missing)}")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        computed = pool.map(func, [datasets[i] for i in missing])
+        for i, stats in zip(missing, computed):
+            results[i] = stats
+
+    # Keep only entries for the current datasets; failures are not cached.
+    new_cache = {
+        key: stats for key, stats in zip(keys, results) if not stats.get("error")
+    }
+    if new_cache != cache:
+        save_cache(new_cache, cache_file)
+    return results
@@ -96,6 +96,7 @@ from forecast_neural_auto import (
     create_auto_config_kan,
     detect_hardware,
 )
+from model_store import load_matching_forecaster, save_neural_forecaster
 
 
 # Helper function to save and show plots
@@ -410,14 +411,27 @@ stats_forecasts_df.head()
 
 Run the Optuna-powered auto neural networks using the same training window.
 The helper configs from `forecast_neural_auto.py` provide tuned search spaces
-and hardware-aware Lightning settings.
-"""
-
-# %%
-nf = NeuralForecast(models=neural_models, freq="BME")
-nf.fit(df=train_df, val_size=test_size)
-
-neural_forecasts_df = nf.predict()
+and hardware-aware Lightning settings. The fitted models are kept in the model
+store (`model_store.py`), so re-running the notebook on the same training
+window reuses them instead of repeating the search.
+"""
+
+# %%
+neural_setup = {
+    "train_end": str(train_df["ds"].max().date()),
+    "horizon": test_size,
+    "n_series": int(train_df["unique_id"].nunique()),
+    "models": neural_model_aliases,
+}
+stored = load_matching_forecaster(data_path.stem, "example_neural", neural_setup)
+if stored is not None:
+    print(f"Neural models loaded from {stored.path}")
+    neural_forecasts_df = stored.predict(train_df).to_pandas()
+else:
+    nf = NeuralForecast(models=neural_models, freq="BME")
+    nf.fit(df=train_df, val_size=test_size)
+    save_neural_forecaster(nf, data_path.stem, "example_neural", metadata=neural_setup)
+    neural_forecasts_df = nf.predict()
 neural_forecasts_df.head()
 
 # %%
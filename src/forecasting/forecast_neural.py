@@ -13,17 +13,14 @@ import warnings
 import time
 import argparse
 import polars as pl
-import pandas as pd
 from pathlib import Path
 from tabulate import tabulate
 import os
-import multiprocessing
-import torch
 
 import sys
 
 sys.path.append(str(Path(__file__).parent))
-sys.path.append(str(Path(__file__).parent.parent / "src"))
+sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from forecast_utils import (
     align_train_data_with_cutoffs,
@@ -38,25 +35,19 @@ from forecast_utils import (
     CLIP_IQR_MULTIPLIER,
     MAX_CV_WINDOWS,
     read_dataset_config,
+    load_panel,
     should_skip_forecast,
 )
-from robust_preprocessing import robust_preprocess_pipeline
-
-from neuralforecast import NeuralForecast
-from neuralforecast.models import (
-    DeepAR,
-    NBEATS,
-    NHITS,
-    DLinear,
-    NLinear,
-    VanillaTransformer,
-    TiDE,
-    KAN,
+from thread_budget import (
+    apply_thread_budget,
+    available_cpus,
+    describe_thread_budget,
+    plan_thread_budget,
 )
-from neuralforecast.losses.pytorch import MAE, DistributionLoss
 
-from statsforecast import StatsForecast
-from statsforecast.models import HistoricAverage, SeasonalNaive
+# NOTE: torch, neuralforecast and statsforecast are imported inside the
+# functions that use them, after the --skip-existing check, so no-op jobs
+# exit without paying their import time (see forecast_neural_auto.py).
 
 warnings.filterwarnings("ignore")
 
@@ -66,8 +57,14 @@ warnings.filterwarnings("ignore")
 
 # Hardware detection functions
 def detect_hardware():
-    """Detect available hardware and configure optimal settings."""
-    cpu_count = os.cpu_count() or multiprocessing.cpu_count()
+    """Detect available hardware and configure optimal settings.
+
+    CPUs are counted within the job's SLURM/cgroup limits and split by the
+    thread budget (thread_budget.py), which is applied here.
+    """
+    import torch
+
+    cpu_count, cpu_source = available_cpus()
 
     # Check for different GPU backends
     cuda_available = torch.cuda.is_available()
@@ -76,7 +73,7 @@ def detect_hardware():
     mps_available = hasattr(torch.backends, "mps") and torch.backends.mps.is_available()
 
     print("Hardware detected:")
-    print(f"  CPUs: {cpu_count}")
+    print(f"  CPUs: {cpu_count} ({cpu_source}; node has {os.cpu_count()})")
     print(f"  CUDA GPUs: {cuda_count}")
     print(f"  MPS available: {mps_available}")
 
@@ -102,18 +99,13 @@ def detect_hardware():
         strategy = "auto"
         print("  Using CPU training")
 
-    # Configure workers and parallel jobs based on CPU count
-    # Conservative estimates to avoid overwhelming the system
+    # Data loading workers as before; thread counts from the budget
     num_workers = max(1, min(cpu_count // 4, 16))
-    optuna_jobs = max(1, min(cpu_count // 8, 8))
-
-    # For high-core systems, be more aggressive with Optuna parallelization
-    if cpu_count >= 32:
-        optuna_jobs = min(cpu_count // 4, 16)
-    elif cpu_count >= 16:
-        optuna_jobs = min(cpu_count // 4, 8)
+    thread_budget = plan_thread_budget(cpu_count, source=cpu_source)
+    apply_thread_budget(thread_budget)
 
     print(f"  Data loading workers: {num_workers}")
+    print(f"  Thread budget: {describe_thread_budget(thread_budget)}")
 
     return {
         "cpu_count": cpu_count,
@@ -123,6 +115,7 @@ def detect_hardware():
         "devices": devices,
         "strategy": strategy,
         "num_workers": num_workers,
+        "thread_budget": thread_budget,
     }
 
 
@@ -432,6 +425,25 @@ def main():
         print(f"Skipping {MODEL_NAME} for {DATASET_NAME} - valid metrics already exist")
         sys.exit(0)
 
+    # Past the skip check: this job will actually train, so load the heavy
+    # frameworks now.
+    import pandas as pd
+    from robust_preprocessing import robust_preprocess_pipeline
+    from neuralforecast import NeuralForecast
+    from neuralforecast.models import (
+        DeepAR,
+        NBEATS,
+        NHITS,
+        DLinear,
+        NLinear,
+        VanillaTransformer,
+        TiDE,
+        KAN,
+    )
+    from neuralforecast.losses.pytorch import MAE, DistributionLoss
+    from statsforecast import StatsForecast
+    from statsforecast.models import HistoricAverage, SeasonalNaive
+
     # Debug mode affects training time, not hyperparameter search
 
     print("=" * 60)
@@ -475,24 +487,8 @@ def main():
     print("-" * 40)
 
     # Load raw data
-    df_raw = pl.read_parquet(dataset_config["data_path"])
-    if "id" in df_raw.columns:
-        df_raw = df_raw.rename({"id": "unique_id"})
-
-    # Clean column names and basic preprocessing
-    drop_cols = [c for c in df_raw.columns if c.startswith("__index_level_")]
-    if drop_cols:
-        df_raw = df_raw.drop(drop_cols)
-    df_raw = df_raw.select(["unique_id", "ds", "y"])
-
-    # Ensure proper dtypes
-    df_raw = df_raw.with_columns(pl.col("y").cast(pl.Float32))
-    df_raw = df_raw.with_columns(
-        pl.when((pl.col("y").is_infinite()) | (pl.col("y").is_nan()))
-        .then(None)
-        .otherwise(pl.col("y"))
-        .alias("y")
-    )
+    # Canonical unique_id/ds/y panel with Float32 y and inf/nan as null
+    df_raw = load_panel(dataset_config["data_path"])
 
     print(
         f"Raw data loaded: {len(df_raw)} observations, {df_raw['unique_id'].n_unique()} series"
@@ -863,7 +859,10 @@ def main():
     validate_data_for_training(df_baseline, "baseline")
 
     sf = StatsForecast(
-        models=baseline_models, freq=polars_frequency, n_jobs=-1, verbose=True
+        models=baseline_models,
+        freq=polars_frequency,
+        n_jobs=hardware_config["thread_budget"]["statsforecast_jobs"],
+        verbose=True,
     )
 
     cv_windows = determine_cv_windows(df_baseline, test_size)
@@ -10,21 +10,17 @@ Usage:
 """
 
 import warnings
-import time
 import argparse
 import polars as pl
-import pandas as pd
 from copy import deepcopy
 from pathlib import Path
 from tabulate import tabulate
 import os
-import multiprocessing
-import torch
 
 import sys
 
 sys.path.append(str(Path(__file__).parent))
-sys.path.append(str(Path(__file__).parent.parent / "src"))
+sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from forecast_utils import (
     align_train_data_with_cutoffs,
@@ -32,6 +28,8 @@ from forecast_utils import (
     evaluate_cv,
     get_test_size_from_frequency,
     get_val_size_from_frequency,
+    get_pruner_config_from_frequency,
+    get_training_sampler_config,
     determine_cv_windows,
     compute_clip_bounds,
     clip_cv_forecasts,
@@ -39,35 +37,40 @@ from forecast_utils import (
     CLIP_IQR_MULTIPLIER,
     MAX_CV_WINDOWS,
     read_dataset_config,
+    load_panel,
     should_skip_forecast,
 )
-from robust_preprocessing import robust_preprocess_pipeline
-
-from neuralforecast import NeuralForecast
-from neuralforecast.auto import (
-    AutoDeepAR,
-    AutoNBEATS,
-    AutoNHITS,
-    AutoDLinear,
-    AutoNLinear,
-    AutoVanillaTransformer,
-    AutoTiDE,
-    AutoKAN,
+from global_panel import (
+    dataset_cv_windows,
+    dataset_frame,
+    dataset_of,
+    group_datasets,
+    group_name,
+    load_global_panel,
+    series_shares,
 )
-from neuralforecast.models import (
-    DeepAR,
-    NBEATS,
-    NHITS,
-    DLinear,
-    NLinear,
-    VanillaTransformer,
-    TiDE,
-    KAN,
+from hpo_storage import use_parallel_trials, use_persistent_study, use_pruner
+from instrumentation import configure_trace, stage
+from model_store import (
+    MEMBERS_DIR,
+    discard_staging,
+    save_neural_artifact,
+    staging_dir,
 )
-from neuralforecast.losses.pytorch import MAE, MSE, DistributionLoss
+from seed_ensemble import fit_seed_members
+from thread_budget import (
+    apply_thread_budget,
+    available_cpus,
+    describe_thread_budget,
+    plan_thread_budget,
+)
+from training_sampler import tail_panel, use_training_sampler
 
-from statsforecast import StatsForecast
-from statsforecast.models import HistoricAverage, SeasonalNaive
+# NOTE: torch, neuralforecast, statsforecast (and, through them, optuna) are
+# imported inside the functions that use them, after argument parsing and the
+# --skip-existing/--skip-daily checks. Most jobs in forecasting_jobs.txt are
+# no-ops on reruns and should exit without paying several seconds of import
+# time. test_forecast_skip_path.py guards this.
 
 warnings.filterwarnings("ignore")
 
@@ -75,23 +78,30 @@ warnings.filterwarnings("ignore")
 NUM_SAMPLES = 20
 
 # Plain (non-Auto) model classes used for the seed-ensemble refit of the best
-# Optuna config. Keys match the --model CLI choices.
+# Optuna config, by name in neuralforecast.models. Keys match the --model CLI
+# choices.
 PLAIN_MODEL_CLASSES = {
-    "auto_deepar": DeepAR,
-    "auto_nbeats": NBEATS,
-    "auto_nhits": NHITS,
-    "auto_dlinear": DLinear,
-    "auto_nlinear": NLinear,
-    "auto_vanilla_transformer": VanillaTransformer,
-    "auto_tide": TiDE,
-    "auto_kan": KAN,
+    "auto_deepar": "DeepAR",
+    "auto_nbeats": "NBEATS",
+    "auto_nhits": "NHITS",
+    "auto_dlinear": "DLinear",
+    "auto_nlinear": "NLinear",
+    "auto_vanilla_transformer": "VanillaTransformer",
+    "auto_tide": "TiDE",
+    "auto_kan": "KAN",
 }
 
 
 # Hardware detection functions
-def detect_hardware():
-    """Detect available hardware and configure optimal settings."""
-    cpu_count = os.cpu_count() or multiprocessing.cpu_count()
+def detect_hardware(optuna_jobs=1):
+    """Detect available hardware and configure optimal settings.
+
+    CPUs are counted within the job's SLURM/cgroup limits and split by the
+    thread budget (thread_budget.py), which is applied here.
+    """
+    import torch
+
+    cpu_count, cpu_source = available_cpus()
 
     # Check for different GPU backends
     cuda_available = torch.cuda.is_available()
@@ -100,7 +110,7 @@ def detect_hardware():
     mps_available = hasattr(torch.backends, "mps") and torch.backends.mps.is_available()
 
     print("Hardware detected:")
-    print(f"  CPUs: {cpu_count}")
+    print(f"  CPUs: {cpu_count} ({cpu_source}; node has {os.cpu_count()})")
     print(f"  CUDA GPUs: {cuda_count}")
     print(f"  MPS available: {mps_available}")
 
@@ -126,19 +136,13 @@ def detect_hardware():
         strategy = "auto"
         print("  Using CPU training")
 
-    # Configure workers and parallel jobs based on CPU count
-    # Conservative estimates to avoid overwhelming the system
+    # Data loading workers as before; thread counts from the budget
     num_workers = max(1, min(cpu_count // 4, 16))
-    optuna_jobs = max(1, min(cpu_count // 8, 8))
-
-    # For high-core systems, be more aggressive with Optuna parallelization
-    if cpu_count >= 32:
-        optuna_jobs = min(cpu_count // 4, 16)
-    elif cpu_count >= 16:
-        optuna_jobs = min(cpu_count // 4, 8)
+    thread_budget = plan_thread_budget(cpu_count, optuna_jobs, source=cpu_source)
+    apply_thread_budget(thread_budget)
 
     print(f"  Data loading workers: {num_workers}")
-    print(f"  Optuna parallel jobs: {optuna_jobs}")
+    print(f"  Thread budget: {describe_thread_budget(thread_budget)}")
 
     return {
         "cpu_count": cpu_count,
@@ -148,7 +152,8 @@ def detect_hardware():
         "devices": devices,
         "strategy": strategy,
         "num_workers": num_workers,
-        "optuna_jobs": optuna_jobs,
+        "optuna_jobs": thread_budget["optuna_jobs"],
+        "thread_budget": thread_budget,
     }
 
 
@@ -604,9 +609,7 @@ def main():
     parser = argparse.ArgumentParser(
         description="Neural Forecasting with Auto Hyperparameter Optimization"
     )
-    parser.add_argument(
-        "--dataset", required=True, help="Dataset name from datasets.toml"
-    )
+    parser.add_argument("--dataset", help="Dataset name from datasets.toml")
     parser.add_argument(
         "--model",
         required=True,
@@ -660,7 +663,76 @@ def main():
         "The Auto refit (class-default seed 1) counts as the first member; "
         "n-1 additional refits are trained and the point forecasts averaged.",
     )
+    parser.add_argument(
+        "--hpo-storage",
+        action="store_true",
+        help="Persist the Optuna search to a journal under _output/forecasting/hpo/ "
+        "keyed by dataset/model/loss/scale. A rerun resumes from the completed "
+        "trials, and a new search warm-starts from the best configs of the "
+        "other --loss variant.",
+    )
+    parser.add_argument(
+        "--pruner",
+        choices=["auto", "median", "hyperband", "none"],
+        default="auto",
+        help="Optuna pruner for the hyperparameter search. 'auto' uses the "
+        "per-frequency setting in PRUNER_BY_FREQUENCY (forecast_utils.py); "
+        "'none' trains every trial to its full max_steps.",
+    )
+    parser.add_argument(
+        "--max-train-length",
+        type=int,
+        default=None,
+        help="Train on at most the last N observations of each series "
+        "(default: TRAINING_SAMPLER_BY_FREQUENCY in forecast_utils.py; "
+        "0 uses the full history).",
+    )
+    parser.add_argument(
+        "--hpo-max-series",
+        type=int,
+        default=None,
+        help="Run the hyperparameter search on a length-stratified sample of "
+        "at most N series; the final refit uses all of them (default: "
+        "TRAINING_SAMPLER_BY_FREQUENCY; 0 searches on every series).",
+    )
+    parser.add_argument(
+        "--no-save-model",
+        action="store_true",
+        help="Don't keep the fitted models. By default the Auto model, its "
+        "best config and the seed members are stored under "
+        "_output/forecasting/models/ for load_forecaster (model_store.py).",
+    )
+    parser.add_argument(
+        "--optuna-jobs",
+        type=int,
+        default=1,
+        help="Optuna trials to run at once. The job's CPUs (within its "
+        "SLURM/cgroup limits) are split evenly between them as torch threads "
+        "(see thread_budget.py).",
+    )
+    parser.add_argument(
+        "--global-frequency",
+        help="Instead of --dataset, train one model (one HPO search) over the "
+        "series of every active dataset with this frequency, e.g. ME. Metrics "
+        "and CV forecasts are still written per dataset, with a __global "
+        "suffix. Implies --scale-entity (see global_panel.py).",
+    )
+    parser.add_argument(
+        "--global-seasonality",
+        type=int,
+        default=None,
+        help="With --global-frequency: pool only datasets with this "
+        "seasonality (default: the most common one).",
+    )
+    parser.add_argument(
+        "--global-datasets",
+        default=None,
+        help="With --global-frequency: comma-separated datasets to pool "
+        "(default: all active datasets of that frequency).",
+    )
     args = parser.parse_args()
+    if bool(args.dataset) == bool(args.global_frequency):
+        parser.error("Pass exactly one of --dataset and --global-frequency")
 
     DATASET_NAME = args.dataset
     MODEL_NAME = args.model
@@ -670,21 +742,85 @@ def main():
     LOSS_NAME = args.loss
     SCALE_ENTITY = args.scale_entity
     N_ENSEMBLE_SEEDS = max(1, args.n_seeds)
+    HPO_STORAGE = args.hpo_storage
+    PRUNER_NAME = args.pruner
+    MAX_TRAIN_LENGTH = args.max_train_length
+    HPO_MAX_SERIES = args.hpo_max_series
+    SAVE_MODEL = not args.no_save_model
+    OPTUNA_JOBS = max(1, args.optuna_jobs)
     if DEBUG_MODE:
         N_ENSEMBLE_SEEDS = min(N_ENSEMBLE_SEEDS, 2)
 
+    # Global mode: the pooled datasets stand in for the single dataset, and
+    # DATASET_NAME names the group for logs, the HPO journal and the stored
+    # models. Pooled panels differ in scale, so entity scaling is always on.
+    GLOBAL_DATASETS = None
+    if args.global_frequency:
+        GLOBAL_DATASETS, global_seasonality = group_datasets(
+            args.global_frequency,
+            seasonality=args.global_seasonality,
+            datasets=args.global_datasets.split(",") if args.global_datasets else None,
+        )
+        DATASET_NAME = group_name(args.global_frequency, global_seasonality)
+        SCALE_ENTITY = True
+        print(f"Global group {DATASET_NAME}: {', '.join(GLOBAL_DATASETS)}")
+
     # Output filename suffix encoding the run variant
     run_suffix = f"__{LOSS_NAME}"
     if SCALE_ENTITY:
         run_suffix += "__entityscale"
+    if GLOBAL_DATASETS:
+        run_suffix += "__global"
 
     # Check if we should skip this forecast
-    if SKIP_EXISTING and should_skip_forecast(
-        DATASET_NAME, MODEL_NAME, run_suffix=run_suffix, verbose=True
+    if SKIP_EXISTING and all(
+        should_skip_forecast(name, MODEL_NAME, run_suffix=run_suffix, verbose=True)
+        for name in GLOBAL_DATASETS or [DATASET_NAME]
     ):
         print(f"Skipping {MODEL_NAME}{run_suffix} for {DATASET_NAME} - valid metrics already exist")
         sys.exit(0)
 
+    # Load dataset configuration (only datasets.toml is read here, so the
+    # daily-frequency skip below stays cheap)
+    if GLOBAL_DATASETS:
+        dataset_config = None
+        frequency = args.global_frequency
+        seasonality = global_seasonality
+    else:
+        dataset_config = read_dataset_config(DATASET_NAME)
+        frequency = dataset_config["frequency"]
+        seasonality = dataset_config["seasonality"]
+
+    # Check if we should skip daily frequency datasets
+    if SKIP_DAILY and frequency in ["B", "D"]:
+        print(
+            f"Skipping {MODEL_NAME} for {DATASET_NAME} - daily frequency dataset (frequency: {frequency})"
+        )
+        sys.exit(0)
+
+    configure_trace(
+        "forecast_neural_auto", dataset=DATASET_NAME, model=MODEL_NAME + run_suffix
+    )
+
+    # Past the skip checks: this job will actually train, so load the
+    # heavy frameworks now.
+    import pandas as pd
+    from robust_preprocessing import robust_preprocess_pipeline
+    from neuralforecast import NeuralForecast
+    from neuralforecast.auto import (
+        AutoDeepAR,
+        AutoNBEATS,
+        AutoNHITS,
+        AutoDLinear,
+        AutoNLinear,
+        AutoVanillaTransformer,
+        AutoTiDE,
+        AutoKAN,
+    )
+    from neuralforecast.losses.pytorch import MAE, MSE, DistributionLoss
+    from statsforecast import StatsForecast
+    from statsforecast.models import HistoricAverage, SeasonalNaive
+
     print("=" * 60)
     print("Neural Forecast with Cross-Validation")
     if DEBUG_MODE:
@@ -696,23 +832,11 @@ def main():
     # Detect hardware and configure settings
     print("\n0. Hardware Detection")
     print("-" * 40)
-    hardware_config = detect_hardware()
+    hardware_config = detect_hardware(optuna_jobs=OPTUNA_JOBS)
 
     print(f"\n1. Loading Dataset: {DATASET_NAME}")
     print("-" * 40)
 
-    # Load dataset configuration
-    dataset_config = read_dataset_config(DATASET_NAME)
-    frequency = dataset_config["frequency"]
-    seasonality = dataset_config["seasonality"]
-
-    # Check if we should skip daily frequency datasets
-    if SKIP_DAILY and frequency in ["B", "D"]:
-        print(
-            f"Skipping {MODEL_NAME} for {DATASET_NAME} - daily frequency dataset (frequency: {frequency})"
-        )
-        sys.exit(0)
-
     # Convert frequency to Polars format
     polars_frequency = convert_pandas_freq_to_polars(frequency)
 
@@ -748,38 +872,32 @@ def main():
     print("-" * 40)
 
     # Load raw data
-    df_raw = pl.read_parquet(dataset_config["data_path"])
-    if "id" in df_raw.columns:
-        df_raw = df_raw.rename({"id": "unique_id"})
-
-    # Clean column names and basic preprocessing
-    drop_cols = [c for c in df_raw.columns if c.startswith("__index_level_")]
-    if drop_cols:
-        df_raw = df_raw.drop(drop_cols)
-    df_raw = df_raw.select(["unique_id", "ds", "y"])
-
-    # Ensure proper dtypes
-    df_raw = df_raw.with_columns(pl.col("y").cast(pl.Float32))
-    df_raw = df_raw.with_columns(
-        pl.when((pl.col("y").is_infinite()) | (pl.col("y").is_nan()))
-        .then(None)
-        .otherwise(pl.col("y"))
-        .alias("y")
-    )
+    # Canonical unique_id/ds/y panel with Float32 y and inf/nan as null
+    with stage("load") as st:
+        if GLOBAL_DATASETS:
+            df_raw = load_global_panel(
+                GLOBAL_DATASETS, max_series_per_dataset=20 if DEBUG_MODE else None
+            )
+        else:
+            df_raw = load_panel(dataset_config["data_path"])
+        st.rows = len(df_raw)
 
     print(
         f"Raw data loaded: {len(df_raw)} observations, {df_raw['unique_id'].n_unique()} series"
     )
 
     # Apply robust preprocessing pipeline
-    train_df, test_df = robust_preprocess_pipeline(
-        df_raw,
-        frequency=frequency,
-        test_size=test_size,
-        seasonality=seasonality,
-        apply_train_imputation=True,
-        debug_limit=20 if DEBUG_MODE else None,
-    )
+    with stage("preprocess") as st:
+        train_df, test_df = robust_preprocess_pipeline(
+            df_raw,
+            frequency=frequency,
+            test_size=test_size,
+            seasonality=seasonality,
+            apply_train_imputation=True,
+            # Global panels are limited per dataset when loaded
+            debug_limit=20 if DEBUG_MODE and not GLOBAL_DATASETS else None,
+        )
+        st.rows = len(train_df) + len(test_df)
 
     # Prepare two synchronized views of the panel:
     #  - df_baseline uses imputed values for baseline models (StatsForecast models need complete data)
@@ -964,6 +1082,28 @@ def main():
             train_df = train_df.filter(pl.col("unique_id").is_in(common_series))
             test_df = test_df.filter(pl.col("unique_id").is_in(common_series))
 
+    # A global run scores each dataset on the CV windows of its own run. The
+    # pooled CV can only run as many windows as its shortest series allows,
+    # so datasets whose own run uses fewer windows than the rest of the
+    # group are left out of the pool (they keep their per-dataset runs).
+    short_datasets = {}
+    if GLOBAL_DATASETS:
+        windows = dataset_cv_windows(df_baseline, test_size)
+        pooled_windows = max(windows.values())
+        short_datasets = {name: n for name, n in windows.items() if n < pooled_windows}
+        if short_datasets:
+            print(
+                f"  Warning: leaving {len(short_datasets)} datasets out of the "
+                f"pool, their own runs use fewer than {pooled_windows} CV windows:"
+            )
+            for name, n in short_datasets.items():
+                print(f"    {name}: {n} windows")
+            pooled = dataset_of(pl.col("unique_id")).is_in(list(short_datasets)).not_()
+            df_baseline = df_baseline.filter(pooled)
+            df_neural = df_neural.filter(pooled)
+            train_df = train_df.filter(pooled)
+            test_df = test_df.filter(pooled)
+
     print("Final synchronized data for CV:")
     print(
         f"  Baseline: {len(df_baseline):,} observations, {df_baseline['unique_id'].n_unique()} series"
@@ -1159,6 +1299,27 @@ def main():
     selected_neural_model = model_mapping[MODEL_NAME]
     neural_models = [selected_neural_model]
 
+    if HPO_STORAGE:
+        hpo_path = use_persistent_study(
+            selected_neural_model, DATASET_NAME, MODEL_NAME, LOSS_NAME, SCALE_ENTITY
+        )
+        print(f"Optuna study persisted to: {hpo_path}")
+
+    pruner_config = get_pruner_config_from_frequency(frequency, PRUNER_NAME)
+    use_pruner(selected_neural_model, pruner_config)
+    print(f"Optuna pruner: {pruner_config}")
+    use_parallel_trials(selected_neural_model, hardware_config["optuna_jobs"])
+
+    # Installed last: the HPO series subsample wraps the search set up above.
+    sampler_config = get_training_sampler_config(frequency)
+    if MAX_TRAIN_LENGTH is not None:
+        sampler_config["max_train_length"] = MAX_TRAIN_LENGTH or None
+    if HPO_MAX_SERIES is not None:
+        sampler_config["hpo_max_series"] = HPO_MAX_SERIES or None
+    if sampler_config["max_train_length"] or sampler_config["hpo_max_series"]:
+        use_training_sampler(selected_neural_model, sampler_config)
+        print(f"Training sampler: {sampler_config}")
+
     baseline_model_names = [type(model).__name__ for model in baseline_models]
     neural_model_names = [type(model).__name__ for model in neural_models]
 
@@ -1213,7 +1374,10 @@ def main():
     validate_data_for_training(df_baseline, "baseline")
 
     sf = StatsForecast(
-        models=baseline_models, freq=polars_frequency, n_jobs=-1, verbose=True
+        models=baseline_models,
+        freq=polars_frequency,
+        n_jobs=hardware_config["thread_budget"]["statsforecast_jobs"],
+        verbose=True,
     )
 
     cv_windows = determine_cv_windows(df_baseline, test_size)
@@ -1221,11 +1385,12 @@ def main():
     if cv_windows < MAX_CV_WINDOWS:
         print("  Shortest baseline series length limits the number of windows.")
 
-    start_time = time.time()
-    baseline_cv_df = sf.cross_validation(
-        df=df_baseline, h=test_size, step_size=test_size, n_windows=cv_windows
-    )
-    baseline_time = time.time() - start_time
+    with stage("baseline_cross_validation", n_windows=cv_windows) as st:
+        baseline_cv_df = sf.cross_validation(
+            df=df_baseline, h=test_size, step_size=test_size, n_windows=cv_windows
+        )
+        st.rows = len(baseline_cv_df)
+    baseline_time = st.wall_s
     print(f"Baseline cross-validation completed in {baseline_time:.2f} seconds")
 
     # Perform cross-validation with neural models
@@ -1280,15 +1445,17 @@ def main():
     val_size = get_val_size_from_frequency(frequency, test_size, panel_df=df_neural)
     print(f"  Neural validation window (HPO/early-stop): {val_size}")
 
-    start_time = time.time()
     try:
-        neural_cv_df = nf.cross_validation(
-            df=df_neural,
-            val_size=val_size,
-            n_windows=cv_windows,
-            step_size=test_size,
-        )
-        neural_time = time.time() - start_time
+        with stage("neural_cross_validation", n_windows=cv_windows) as st:
+            neural_cv_df = nf.cross_validation(
+                df=df_neural,
+                val_size=val_size,
+                n_windows=cv_windows,
+                step_size=test_size,
+            )
+            st.rows = len(neural_cv_df)
+        neural_time = st.wall_s
+        hpo_summary = getattr(nf.models[0], "_hpo_summary", {})
         print(f"Neural cross-validation completed in {neural_time:.2f} seconds")
 
     except Exception as e:
@@ -1319,28 +1486,58 @@ def main():
     # so it serves as the first ensemble member for free.
     neural_model_name = neural_model_names[0]
     member_cols = []
+    # The fitted models are staged next to their artifact directory and
+    # published together with the metrics at the end (see model_store.py).
+    artifact_staging = (
+        staging_dir(DATASET_NAME, MODEL_NAME, run_suffix) if SAVE_MODEL else None
+    )
     if N_ENSEMBLE_SEEDS > 1:
         print("\n5.5 Seed-Ensemble Refit of Best Config")
         print("-" * 40)
-        ens_start = time.time()
         try:
             auto_model = nf.models[0]
             best_cfg = dict(auto_model.results.best_trial.user_attrs["ALL_PARAMS"])
             best_cfg.pop("random_seed", None)
+            # ALL_PARAMS carries no loss objects; members train and validate
+            # on the run's losses, like the Auto model's own refit.
+            best_cfg["loss"] = auto_model.loss
+            best_cfg["valid_loss"] = auto_model.valid_loss
             extra_seeds = list(range(2, N_ENSEMBLE_SEEDS + 1))
-            members = []
+            member_cfgs = []
             for seed in extra_seeds:
                 cfg = deepcopy(best_cfg)
                 cfg["random_seed"] = seed
                 cfg["alias"] = f"{neural_model_name}_seed{seed}"
-                members.append(PLAIN_MODEL_CLASSES[MODEL_NAME](**cfg))
-            nf_ens = NeuralForecast(models=members, freq=polars_frequency)
-            ens_cv_df = nf_ens.cross_validation(
-                df=df_neural,
-                val_size=val_size,
-                n_windows=cv_windows,
-                step_size=test_size,
-            )
+                member_cfgs.append(cfg)
+            # Same lookback cap as the Auto refit; the CV cutoffs only depend
+            # on the end of each series, so the forecasts line up.
+            ens_df = df_neural
+            if sampler_config["max_train_length"]:
+                ens_df = tail_panel(
+                    df_neural,
+                    sampler_config["max_train_length"]
+                    + val_size
+                    + cv_windows * test_size,
+                )
+            # Members train concurrently in separate processes on CPU nodes
+            # (see seed_ensemble.py); on GPU they run in-process, in sequence.
+            with stage("seed_ensemble", members=len(member_cfgs)) as ens_stage:
+                ens_cv_df = fit_seed_members(
+                    PLAIN_MODEL_CLASSES[MODEL_NAME],
+                    member_cfgs,
+                    ens_df,
+                    polars_frequency,
+                    val_size,
+                    cv_windows,
+                    test_size,
+                    hardware_config,
+                    save_dir=(
+                        artifact_staging / MEMBERS_DIR
+                        if artifact_staging is not None
+                        else None
+                    ),
+                )
+                ens_stage.rows = len(ens_cv_df)
             member_cols = [f"{neural_model_name}_seed{seed}" for seed in extra_seeds]
             neural_cv_df = neural_cv_df.join(
                 ens_cv_df.select(["unique_id", "ds", "cutoff"] + member_cols),
@@ -1366,10 +1563,12 @@ def main():
             )
             print(
                 f"Averaged {len(ensemble_inputs)} seed members into "
-                f"{neural_model_name} in {time.time() - ens_start:.2f} seconds"
+                f"{neural_model_name} in {ens_stage.wall_s:.2f} seconds"
             )
         except Exception as e:
             member_cols = []
+            if artifact_staging is not None:
+                discard_staging(artifact_staging / MEMBERS_DIR)
             print(
                 f"Warning: seed-ensemble refit failed ({e}); "
                 "continuing with single-seed forecasts"
@@ -1405,200 +1604,278 @@ def main():
             f"  Inverse-transformed {len(inverse_cols)} columns in cv_df back to raw units"
         )
 
-    # Persist raw CV forecasts, then clip to leak-safe per-series train bounds.
-    # Persisting BEFORE clipping (with the bounds attached) lets post-hoc
-    # experiments re-derive both the clipped and unclipped metrics without
-    # refitting anything.
-    print("\n6.5 Forecast Clipping and CV-Forecast Persistence")
-    print("-" * 40)
-    id_cols = ["unique_id", "ds", "cutoff", "y"]
-    model_cols_all = [c for c in cv_df.columns if c not in id_cols]
-    clip_bounds = compute_clip_bounds(df_baseline_raw, cv_df, k=CLIP_IQR_MULTIPLIER)
-    save_cv_forecasts(
-        cv_df.join(clip_bounds, on="unique_id", how="left"),
-        DATASET_NAME,
-        MODEL_NAME,
-        run_suffix=run_suffix,
-    )
-    cv_df = clip_cv_forecasts(cv_df, clip_bounds, model_cols_all)
-    print(
-        f"  Clipped {len(model_cols_all)} forecast columns to "
-        f"[train_min - {CLIP_IQR_MULTIPLIER}*IQR, train_max + {CLIP_IQR_MULTIPLIER}*IQR]"
-    )
-
-    # Restrict metric evaluation to the baselines and the (ensembled) headline
-    # column; seed members and any distributional extras stay in the parquet.
-    keep_cols = id_cols + baseline_model_names + [neural_model_name]
-    cv_df = cv_df.select([c for c in keep_cols if c in cv_df.columns])
-
-    # Create training data aligned with per-series cutoffs
-    if "y_imputed" in train_df.columns:
-        train_data_for_eval = train_df.select(["unique_id", "ds", "y_imputed"]).rename(
-            {"y_imputed": "y"}
+    def evaluate_and_save(
+        dataset_name, cv_df, df_baseline_raw, train_df, time_taken, extra_metrics=None
+    ):
+        """Steps 6.5-10 for one dataset; returns the neural model's metrics."""
+        # Persist raw CV forecasts, then clip to leak-safe per-series train bounds.
+        # Persisting BEFORE clipping (with the bounds attached) lets post-hoc
+        # experiments re-derive both the clipped and unclipped metrics without
+        # refitting anything.
+        print("\n6.5 Forecast Clipping and CV-Forecast Persistence")
+        print("-" * 40)
+        id_cols = ["unique_id", "ds", "cutoff", "y"]
+        model_cols_all = [c for c in cv_df.columns if c not in id_cols]
+        clip_bounds = compute_clip_bounds(df_baseline_raw, cv_df, k=CLIP_IQR_MULTIPLIER)
+        save_cv_forecasts(
+            cv_df.join(clip_bounds, on="unique_id", how="left"),
+            dataset_name,
+            MODEL_NAME,
+            run_suffix=run_suffix,
+        )
+        cv_df = clip_cv_forecasts(cv_df, clip_bounds, model_cols_all)
+        print(
+            f"  Clipped {len(model_cols_all)} forecast columns to "
+            f"[train_min - {CLIP_IQR_MULTIPLIER}*IQR, train_max + {CLIP_IQR_MULTIPLIER}*IQR]"
         )
-    else:
-        train_data_for_eval = train_df.select(["unique_id", "ds", "y"])
-    train_data = align_train_data_with_cutoffs(train_data_for_eval, cv_df)
 
-    # Evaluate all models
-    print("\n7. Evaluating Model Performance")
-    print("-" * 40)
+        # Restrict metric evaluation to the baselines and the (ensembled) headline
+        # column; seed members and any distributional extras stay in the parquet.
+        keep_cols = id_cols + baseline_model_names + [neural_model_name]
+        cv_df = cv_df.select([c for c in keep_cols if c in cv_df.columns])
 
-    (
-        mase_scores,
-        mse_scores,
-        rmse_scores,
-        r2oos_scores,
-        r2oos_pooled,
-        actual_model_cols,
-    ) = evaluate_cv(cv_df, train_data, seasonality)
-
-    # Calculate average metrics across all series
-    avg_metrics = {}
-    for model_col in actual_model_cols:
-        # Count how many series have valid (non-null) metrics
-        valid_mase = mase_scores[model_col].drop_nulls().len()
-        valid_mse = mse_scores[model_col].drop_nulls().len()
-        total_series = len(mase_scores)
-
-        # Check if we have enough valid metrics
-        if valid_mase == 0 or valid_mse == 0:
-            raise ValueError(
-                f"No valid metrics could be calculated for model {model_col}. "
-                f"All series have null test periods or invalid predictions. "
-                f"Valid MASE: {valid_mase}/{total_series}, Valid MSE: {valid_mse}/{total_series}"
+        # Create training data aligned with per-series cutoffs
+        if "y_imputed" in train_df.columns:
+            train_data_for_eval = train_df.select(["unique_id", "ds", "y_imputed"]).rename(
+                {"y_imputed": "y"}
             )
+        else:
+            train_data_for_eval = train_df.select(["unique_id", "ds", "y"])
+        train_data = align_train_data_with_cutoffs(train_data_for_eval, cv_df)
 
-        if valid_mase < total_series * 0.1:  # Less than 10% valid
-            print(
-                f"  Warning: Only {valid_mase}/{total_series} series have valid MASE scores"
-            )
+        # Evaluate all models
+        print("\n7. Evaluating Model Performance")
+        print("-" * 40)
 
-        avg_metrics[model_col] = {
-            "MASE": mase_scores[model_col].mean(),
-            "MSE": mse_scores[model_col].mean(),
-            "RMSE": rmse_scores[model_col].mean(),
-            # Headline R²oos is the pooled (panel-wide) value as of 2026-06.
-            # The per-series-mean is kept alongside for sensitivity reporting.
-            "R2oos": r2oos_pooled.get(model_col, float("nan")),
-            "R2oos_per_series_mean": r2oos_scores[model_col].mean(),
-        }
+        with stage("evaluate", rows=len(cv_df)):
+            (
+                mase_scores,
+                mse_scores,
+                rmse_scores,
+                r2oos_scores,
+                r2oos_pooled,
+                actual_model_cols,
+            ) = evaluate_cv(cv_df, train_data, seasonality)
+
+        # Calculate average metrics across all series
+        avg_metrics = {}
+        for model_col in actual_model_cols:
+            # Count how many series have valid (non-null) metrics
+            valid_mase = mase_scores[model_col].drop_nulls().len()
+            valid_mse = mse_scores[model_col].drop_nulls().len()
+            total_series = len(mase_scores)
+
+            # Check if we have enough valid metrics
+            if valid_mase == 0 or valid_mse == 0:
+                raise ValueError(
+                    f"No valid metrics could be calculated for model {model_col}. "
+                    f"All series have null test periods or invalid predictions. "
+                    f"Valid MASE: {valid_mase}/{total_series}, Valid MSE: {valid_mse}/{total_series}"
+                )
 
-    # Create comparison table
-    print("\n8. Model Performance Summary")
-    print("-" * 40)
+            if valid_mase < total_series * 0.1:  # Less than 10% valid
+                print(
+                    f"  Warning: Only {valid_mase}/{total_series} series have valid MASE scores"
+                )
 
-    comparison_data = [
-        ["Model", "Type", "Avg MASE", "Avg MSE", "Avg RMSE", "Avg R2oos"]
-    ]
+            avg_metrics[model_col] = {
+                "MASE": mase_scores[model_col].mean(),
+                "MSE": mse_scores[model_col].mean(),
+                "RMSE": rmse_scores[model_col].mean(),
+                # Headline R²oos is the pooled (panel-wide) value as of 2026-06.
+                # The per-series-mean is kept alongside for sensitivity reporting.
+                "R2oos": r2oos_pooled.get(model_col, float("nan")),
+                "R2oos_per_series_mean": r2oos_scores[model_col].mean(),
+            }
+
+        # Create comparison table
+        print("\n8. Model Performance Summary")
+        print("-" * 40)
 
-    # Add baseline models
-    for model_col in actual_model_cols:
-        if model_col in baseline_model_names:
-            model_type = "Baseline"
-        else:
-            model_type = "Neural"
-
-        comparison_data.append(
-            [
-                model_col,
-                model_type,
-                f"{avg_metrics[model_col]['MASE']:.4f}",
-                f"{avg_metrics[model_col]['MSE']:.4f}",
-                f"{avg_metrics[model_col]['RMSE']:.4f}",
-                f"{avg_metrics[model_col]['R2oos']:.4f}",
-            ]
-        )
+        comparison_data = [
+            ["Model", "Type", "Avg MASE", "Avg MSE", "Avg RMSE", "Avg R2oos"]
+        ]
 
-    print(tabulate(comparison_data, headers="firstrow", tablefmt="grid"))
+        # Add baseline models
+        for model_col in actual_model_cols:
+            if model_col in baseline_model_names:
+                model_type = "Baseline"
+            else:
+                model_type = "Neural"
 
-    # Find best model by each metric
-    print("\n9. Best Models by Metric")
-    print("-" * 40)
+            comparison_data.append(
+                [
+                    model_col,
+                    model_type,
+                    f"{avg_metrics[model_col]['MASE']:.4f}",
+                    f"{avg_metrics[model_col]['MSE']:.4f}",
+                    f"{avg_metrics[model_col]['RMSE']:.4f}",
+                    f"{avg_metrics[model_col]['R2oos']:.4f}",
+                ]
+            )
 
-    best_models = {}
-    for metric in ["MASE", "MSE", "RMSE"]:
-        best_model = min(avg_metrics.items(), key=lambda x: x[1][metric])[0]
-        best_models[metric] = best_model
-        print(f"Best {metric}: {best_model} ({avg_metrics[best_model][metric]:.4f})")
+        print(tabulate(comparison_data, headers="firstrow", tablefmt="grid"))
 
-    # For R2oos, higher is better
-    best_model = max(avg_metrics.items(), key=lambda x: x[1]["R2oos"])[0]
-    best_models["R2oos"] = best_model
-    print(f"Best R2oos: {best_model} ({avg_metrics[best_model]['R2oos']:.4f})")
+        # Find best model by each metric
+        print("\n9. Best Models by Metric")
+        print("-" * 40)
 
-    # Save CSV error metrics for the neural model
-    print("\n10. Saving Error Metrics")
-    print("-" * 40)
+        best_models = {}
+        for metric in ["MASE", "MSE", "RMSE"]:
+            best_model = min(avg_metrics.items(), key=lambda x: x[1][metric])[0]
+            best_models[metric] = best_model
+            print(f"Best {metric}: {best_model} ({avg_metrics[best_model][metric]:.4f})")
 
-    # Create error metrics directory
-    error_metrics_dir = f"./_output/forecasting/error_metrics/{DATASET_NAME}"
-    os.makedirs(error_metrics_dir, exist_ok=True)
-
-    # Get the neural model's metrics (exclude baseline models for now)
-    neural_model_name = neural_model_names[0]  # Should be only one model
-    if neural_model_name in avg_metrics:
-        # Validate metrics before saving
-        mase_val = avg_metrics[neural_model_name]["MASE"]
-        mse_val = avg_metrics[neural_model_name]["MSE"]
-        rmse_val = avg_metrics[neural_model_name]["RMSE"]
-        r2oos_val = avg_metrics[neural_model_name]["R2oos"]
-        r2oos_legacy_val = avg_metrics[neural_model_name]["R2oos_per_series_mean"]
-
-        # Check for invalid metric values
-        import numpy as np
+        # For R2oos, higher is better
+        best_model = max(avg_metrics.items(), key=lambda x: x[1]["R2oos"])[0]
+        best_models["R2oos"] = best_model
+        print(f"Best R2oos: {best_model} ({avg_metrics[best_model]['R2oos']:.4f})")
 
-        if mase_val == 0.0:
-            print(
-                f"Warning: MASE is exactly 0.0 for model {neural_model_name}. This typically indicates:"
-            )
-            print("  - The model produces constant predictions")
-            print("  - Data quality issues with training/test series")
-            print("  - Insufficient variation in the time series")
-            print("  Continuing with other metrics, but results may not be meaningful.")
-            # Don't raise an error, just warn and continue
-
-        if (
-            np.isnan(mase_val)
-            or np.isnan(mse_val)
-            or np.isnan(rmse_val)
-            or np.isnan(r2oos_val)
-        ):
-            print(
-                f"Warning: NaN values detected in metrics for model {neural_model_name}:"
-            )
-            print(f"  MASE: {mase_val}")
-            print(f"  MSE: {mse_val}")
-            print(f"  RMSE: {rmse_val}")
-            print(f"  R2oos: {r2oos_val}")
-            print(
-                "  This typically indicates insufficient valid data for metric calculation."
-            )
-            print("  Saving available metrics and continuing.")
-            # Don't raise an error, just warn and continue
-
-        metrics_data = {
-            "model_name": [MODEL_NAME],
-            "dataset_name": [DATASET_NAME],
-            "MASE": [mase_val],
-            "MSE": [mse_val],
-            "RMSE": [rmse_val],
-            "R2oos": [r2oos_val],  # pooled / panel-wide, paper headline (2026-06)
-            "R2oos_per_series_mean": [r2oos_legacy_val],  # legacy formula, kept for sensitivity
-            "time_taken": [neural_time],
-            "loss": [LOSS_NAME],
-            "scale_entity": [SCALE_ENTITY],
-            "val_size": [val_size],
-            "n_ensemble_seeds": [1 + len(member_cols)],
-            "clip_k": [CLIP_IQR_MULTIPLIER],
-        }
+        # Save CSV error metrics for the neural model
+        print("\n10. Saving Error Metrics")
+        print("-" * 40)
 
-        metrics_df = pl.DataFrame(metrics_data)
-        csv_path = f"{error_metrics_dir}/{MODEL_NAME}{run_suffix}.csv"
-        metrics_df.write_csv(csv_path)
-        print(f"Error metrics saved to: {csv_path}")
+        # Create error metrics directory
+        error_metrics_dir = f"./_output/forecasting/error_metrics/{dataset_name}"
+        os.makedirs(error_metrics_dir, exist_ok=True)
+
+        # Get the neural model's metrics (exclude baseline models for now)
+        if neural_model_name in avg_metrics:
+            # Validate metrics before saving
+            mase_val = avg_metrics[neural_model_name]["MASE"]
+            mse_val = avg_metrics[neural_model_name]["MSE"]
+            rmse_val = avg_metrics[neural_model_name]["RMSE"]
+            r2oos_val = avg_metrics[neural_model_name]["R2oos"]
+            r2oos_legacy_val = avg_metrics[neural_model_name]["R2oos_per_series_mean"]
+
+            # Check for invalid metric values
+            import numpy as np
+
+            if mase_val == 0.0:
+                print(
+                    f"Warning: MASE is exactly 0.0 for model {neural_model_name}. This typically indicates:"
+                )
+                print("  - The model produces constant predictions")
+                print("  - Data quality issues with training/test series")
+                print("  - Insufficient variation in the time series")
+                print("  Continuing with other metrics, but results may not be meaningful.")
+                # Don't raise an error, just warn and continue
+
+            if (
+                np.isnan(mase_val)
+                or np.isnan(mse_val)
+                or np.isnan(rmse_val)
+                or np.isnan(r2oos_val)
+            ):
+                print(
+                    f"Warning: NaN values detected in metrics for model {neural_model_name}:"
+                )
+                print(f"  MASE: {mase_val}")
+                print(f"  MSE: {mse_val}")
+                print(f"  RMSE: {rmse_val}")
+                print(f"  R2oos: {r2oos_val}")
+                print(
+                    "  This typically indicates insufficient valid data for metric calculation."
+                )
+                print("  Saving available metrics and continuing.")
+                # Don't raise an error, just warn and continue
+
+            metrics_data = {
+                "model_name": [MODEL_NAME],
+                "dataset_name": [dataset_name],
+                "MASE": [mase_val],
+                "MSE": [mse_val],
+                "RMSE": [rmse_val],
+                "R2oos": [r2oos_val],  # pooled / panel-wide, paper headline (2026-06)
+                "R2oos_per_series_mean": [r2oos_legacy_val],  # legacy formula, kept for sensitivity
+                "time_taken": [time_taken],
+                "loss": [LOSS_NAME],
+                "scale_entity": [SCALE_ENTITY],
+                "val_size": [val_size],
+                "n_ensemble_seeds": [1 + len(member_cols)],
+                "clip_k": [CLIP_IQR_MULTIPLIER],
+                "pruner": [pruner_config["type"]],
+                "hpo_pruned_trials": [hpo_summary.get("n_pruned")],
+                "hpo_steps_saved": [hpo_summary.get("steps_saved")],
+            }
+            if extra_metrics:
+                metrics_data.update(extra_metrics)
+
+            metrics_df = pl.DataFrame(metrics_data)
+            csv_path = f"{error_metrics_dir}/{MODEL_NAME}{run_suffix}.csv"
+            metrics_df.write_csv(csv_path)
+            print(f"Error metrics saved to: {csv_path}")
+        else:
+            print(f"Warning: Could not find metrics for {neural_model_name}")
+        return avg_metrics.get(neural_model_name)
+
+    if GLOBAL_DATASETS:
+        # One model was trained on the pooled panel; report it per dataset,
+        # under each dataset's own ids, as if it had been trained alone.
+        # Run time is apportioned by share of series.
+        shares = series_shares(cv_df)
+        neural_metrics = {}
+        for name in GLOBAL_DATASETS:
+            if name in short_datasets:
+                print(
+                    f"\nSkipping {name}: not pooled, its own run uses "
+                    f"{short_datasets[name]} CV windows"
+                )
+                continue
+            if name not in shares:
+                print(f"\nWarning: no series of {name} survived preprocessing")
+                continue
+            print("\n" + "=" * 60)
+            print(f"Dataset: {name} ({shares[name]:.1%} of pooled series)")
+            print("=" * 60)
+            try:
+                neural_metrics[name] = evaluate_and_save(
+                    name,
+                    dataset_frame(cv_df, name),
+                    dataset_frame(df_baseline_raw, name),
+                    dataset_frame(train_df, name),
+                    time_taken=neural_time * shares[name],
+                    extra_metrics={
+                        "global_group": [DATASET_NAME],
+                        "global_time_taken": [neural_time],
+                    },
+                )
+            except ValueError as e:
+                print(f"Warning: could not evaluate {name}: {e}")
     else:
-        print(f"Warning: Could not find metrics for {neural_model_name}")
+        neural_metrics = evaluate_and_save(
+            DATASET_NAME, cv_df, df_baseline_raw, train_df, neural_time
+        )
+
+    if artifact_staging is not None:
+        print("\n11. Saving Fitted Models")
+        print("-" * 40)
+        with stage("save_models"):
+            model_path = save_neural_artifact(
+                artifact_staging,
+                nf,
+                DATASET_NAME,
+                MODEL_NAME,
+                run_suffix=run_suffix,
+                ensembles={neural_model_name: member_cols} if member_cols else None,
+                scalers=scalers_df,
+                metadata={
+                    "frequency": frequency,
+                    "seasonality": seasonality,
+                    "test_size": test_size,
+                    "val_size": val_size,
+                    "cv_windows": cv_windows,
+                    "loss": LOSS_NAME,
+                    "scale_entity": SCALE_ENTITY,
+                    "n_ensemble_seeds": 1 + len(member_cols),
+                    "pruner": pruner_config["type"],
+                    "sampler": sampler_config,
+                    "debug": DEBUG_MODE,
+                    "metrics": neural_metrics,
+                    "datasets": GLOBAL_DATASETS,
+                },
+            )
+        print(f"Fitted models saved to: {model_path}")
 
     print("\n" + "=" * 60)
     print("Neural Forecast Complete!")
@@ -9,7 +9,6 @@ Usage:
 """
 
 import warnings
-import time
 import argparse
 import polars as pl
 from pathlib import Path
@@ -19,7 +18,7 @@ import os
 import sys
 
 sys.path.append(str(Path(__file__).parent))
-sys.path.append(str(Path(__file__).parent.parent / "src"))
+sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from forecast_utils import (
     align_train_data_with_cutoffs,
@@ -33,23 +32,16 @@ from forecast_utils import (
     CLIP_IQR_MULTIPLIER,
     MAX_CV_WINDOWS,
     read_dataset_config,
+    load_panel,
     should_skip_forecast,
 )
-from robust_preprocessing import robust_preprocess_pipeline
-
-from statsforecast import StatsForecast
-from statsforecast.models import (
-    AutoARIMA,
-    AutoETS,
-    HoltWinters,
-    SeasonalNaive,
-    HistoricAverage,
-    DynamicOptimizedTheta as DOT,
-    CrostonClassic as Croston,
-    SimpleExponentialSmoothing,
-    Theta,
-    AutoCES,
-)
+from instrumentation import configure_trace, stage
+from batched_baselines import BATCHED_MODELS
+from arima_order_reuse import REUSE_MODES
+from thread_budget import apply_thread_budget, describe_thread_budget, plan_thread_budget
+
+# NOTE: statsforecast is imported inside main() after the --skip-existing
+# check so no-op jobs exit without paying its (numba-heavy) import time.
 
 warnings.filterwarnings("ignore")
 
@@ -91,18 +83,98 @@ def main():
         action="store_true",
         help="Skip if valid error metrics already exist",
     )
+    parser.add_argument(
+        "--engine",
+        choices=["auto", "statsforecast", "batched"],
+        default="auto",
+        help=(
+            "Cross-validation engine. 'batched' computes all series and "
+            "windows at once (historic_average, seasonal_naive, ses, theta); "
+            "'auto' uses it for those models and StatsForecast otherwise"
+        ),
+    )
+    parser.add_argument(
+        "--arima-order-reuse",
+        choices=["off", *REUSE_MODES],
+        default="off",
+        help=(
+            "auto_arima only: select the order once per series at the first "
+            "CV cutoff, then 'refit' its coefficients or 'forward'-filter the "
+            "fitted model at later cutoffs. Results get an __order_<mode> suffix"
+        ),
+    )
+    parser.add_argument(
+        "--compare-order-reuse",
+        action="store_true",
+        help=(
+            "auto_arima only: run both full re-selection and order reuse "
+            "(--arima-order-reuse, default refit) and save the metric and "
+            "time differences"
+        ),
+    )
+    parser.add_argument(
+        "--save-model",
+        action="store_true",
+        help=(
+            "After cross-validation, fit the model on the full panel and store "
+            "it under _output/forecasting/models/ for load_forecaster "
+            "(model_store.py)"
+        ),
+    )
     args = parser.parse_args()
+    if args.engine == "batched" and args.model not in BATCHED_MODELS:
+        parser.error(f"--engine batched supports only: {', '.join(BATCHED_MODELS)}")
+    if (
+        args.arima_order_reuse != "off" or args.compare_order_reuse
+    ) and args.model != "auto_arima":
+        parser.error(
+            "--arima-order-reuse/--compare-order-reuse need --model auto_arima"
+        )
 
     DATASET_NAME = args.dataset
     MODEL_NAME = args.model
     DEBUG_MODE = args.debug
     SKIP_EXISTING = args.skip_existing
+    ORDER_REUSE = args.arima_order_reuse
+    # Order-reuse results are kept apart from the full re-selection ones
+    run_suffix = f"__order_{ORDER_REUSE}" if ORDER_REUSE != "off" else ""
 
     # Check if we should skip this forecast
-    if SKIP_EXISTING and should_skip_forecast(DATASET_NAME, MODEL_NAME, verbose=True):
-        print(f"Skipping {MODEL_NAME} for {DATASET_NAME} - valid metrics already exist")
+    if SKIP_EXISTING and should_skip_forecast(
+        DATASET_NAME, MODEL_NAME, run_suffix=run_suffix, verbose=True
+    ):
+        print(
+            f"Skipping {MODEL_NAME}{run_suffix} for {DATASET_NAME} - valid metrics already exist"
+        )
         sys.exit(0)
 
+    configure_trace(
+        "forecast_stats", dataset=DATASET_NAME, model=MODEL_NAME + run_suffix
+    )
+
+    # One StatsForecast worker per CPU the job may use (SLURM/cgroup limits,
+    # not the node's core count), each with single-threaded BLAS. Exported
+    # before statsforecast is imported so its workers inherit it.
+    thread_budget = plan_thread_budget()
+    apply_thread_budget(thread_budget)
+
+    # Past the skip check: this job will actually fit, so load the heavy
+    # frameworks now.
+    from robust_preprocessing import robust_preprocess_pipeline
+    from statsforecast import StatsForecast
+    from statsforecast.models import (
+        AutoARIMA,
+        AutoETS,
+        HoltWinters,
+        SeasonalNaive,
+        HistoricAverage,
+        DynamicOptimizedTheta as DOT,
+        CrostonClassic as Croston,
+        SimpleExponentialSmoothing,
+        Theta,
+        AutoCES,
+    )
+
     print("=" * 60)
     print("Simple Forecast Statistics with Cross-Validation")
     if DEBUG_MODE:
@@ -110,6 +182,7 @@ def main():
     print("=" * 60)
     print(f"Dataset: {DATASET_NAME}")
     print(f"Model: {MODEL_NAME}")
+    print(f"Threads: {describe_thread_budget(thread_budget)}")
 
     print(f"\n1. Loading Dataset: {DATASET_NAME}")
     print("-" * 40)
@@ -138,38 +211,26 @@ def main():
     print("-" * 40)
 
     # Load raw data
-    df_raw = pl.read_parquet(dataset_config["data_path"])
-    if "id" in df_raw.columns:
-        df_raw = df_raw.rename({"id": "unique_id"})
-
-    # Clean column names and basic preprocessing
-    drop_cols = [c for c in df_raw.columns if c.startswith("__index_level_")]
-    if drop_cols:
-        df_raw = df_raw.drop(drop_cols)
-    df_raw = df_raw.select(["unique_id", "ds", "y"])
-
-    # Ensure proper dtypes
-    df_raw = df_raw.with_columns(pl.col("y").cast(pl.Float32))
-    df_raw = df_raw.with_columns(
-        pl.when((pl.col("y").is_infinite()) | (pl.col("y").is_nan()))
-        .then(None)
-        .otherwise(pl.col("y"))
-        .alias("y")
-    )
+    # Canonical unique_id/ds/y panel with Float32 y and inf/nan as null
+    with stage("load") as st:
+        df_raw = load_panel(dataset_config["data_path"])
+        st.rows = len(df_raw)
 
     print(
         f"Raw data loaded: {len(df_raw)} observations, {df_raw['unique_id'].n_unique()} series"
     )
 
     # Apply robust preprocessing pipeline
-    train_df, test_df = robust_preprocess_pipeline(
-        df_raw,
-        frequency=frequency,
-        test_size=test_size,
-        seasonality=seasonality,
-        apply_train_imputation=True,
-        debug_limit=20 if DEBUG_MODE else None,
-    )
+    with stage("preprocess") as st:
+        train_df, test_df = robust_preprocess_pipeline(
+            df_raw,
+            frequency=frequency,
+            test_size=test_size,
+            seasonality=seasonality,
+            apply_train_imputation=True,
+            debug_limit=20 if DEBUG_MODE else None,
+        )
+        st.rows = len(train_df) + len(test_df)
 
     # For cross-validation, we need the full dataset (train + test combined)
     # Use imputed values if available for training portion
@@ -323,7 +384,7 @@ def main():
     sf = StatsForecast(
         models=models,
         freq=polars_frequency,
-        n_jobs=-1,
+        n_jobs=thread_budget["statsforecast_jobs"],
         fallback_model=SeasonalNaive(season_length=seasonality),
         verbose=True,
     )
@@ -337,13 +398,121 @@ def main():
     if cv_windows < MAX_CV_WINDOWS:
         print("  Shortest series length limits the number of windows.")
 
-    start_time = time.time()
-    cv_df = sf.cross_validation(
-        df=df, h=test_size, step_size=test_size, n_windows=cv_windows
-    )
-    cv_time = time.time() - start_time
+    cv_df = None
+    if args.engine != "statsforecast" and MODEL_NAME in BATCHED_MODELS:
+        from batched_baselines import cross_validation as batched_cross_validation
+
+        try:
+            with stage(
+                "cross_validation", n_windows=cv_windows, engine="batched"
+            ) as st:
+                cv_df = batched_cross_validation(
+                    df,
+                    MODEL_NAME,
+                    h=test_size,
+                    n_windows=cv_windows,
+                    step_size=test_size,
+                    season_length=seasonality,
+                    alpha=0.1,
+                )
+                st.rows = len(cv_df)
+        except ValueError as e:
+            if args.engine == "batched":
+                raise
+            print(f"  Batched engine not applicable ({e}); using StatsForecast")
+    reuse_mode = ORDER_REUSE
+    if args.compare_order_reuse and reuse_mode == "off":
+        reuse_mode = "refit"
+    if reuse_mode != "off":
+        import arima_order_reuse
+
+        print(
+            f"  AutoARIMA order reuse ({reuse_mode}): order selected at the first cutoff"
+        )
+        with stage(
+            "cross_validation", n_windows=cv_windows, engine=f"order_reuse:{reuse_mode}"
+        ) as st:
+            reuse_cv_df, arima_orders = arima_order_reuse.cross_validation(
+                df,
+                h=test_size,
+                n_windows=cv_windows,
+                season_length=seasonality,
+                mode=reuse_mode,
+                step_size=test_size,
+                n_jobs=thread_budget["statsforecast_jobs"],
+            )
+            st.rows = len(reuse_cv_df)
+        reuse_time = st.wall_s
+
+        orders_path = (
+            arima_order_reuse.ORDERS_DIR
+            / DATASET_NAME
+            / f"{MODEL_NAME}__order_{reuse_mode}.csv"
+        )
+        orders_path.parent.mkdir(parents=True, exist_ok=True)
+        arima_orders.write_csv(orders_path)
+        print(
+            f"  {arima_orders['order'].n_unique()} distinct orders over "
+            f"{len(arima_orders)} series; selection {arima_orders['select_s'].sum():.1f}s, "
+            f"reuse {arima_orders['reuse_s'].sum():.1f}s (summed over series)"
+        )
+        print(f"  Orders and timings saved to: {orders_path}")
+        if ORDER_REUSE != "off":
+            cv_df = reuse_cv_df
+
+    if cv_df is None or args.compare_order_reuse:
+        with stage(
+            "cross_validation", n_windows=cv_windows, engine="statsforecast"
+        ) as st:
+            full_cv_df = sf.cross_validation(
+                df=df, h=test_size, step_size=test_size, n_windows=cv_windows
+            )
+            st.rows = len(full_cv_df)
+        full_time = st.wall_s
+        if cv_df is None:
+            cv_df = full_cv_df
+    cv_time = reuse_time if ORDER_REUSE != "off" else st.wall_s
     print(f"Cross-validation completed in {cv_time:.2f} seconds")
 
+    if args.compare_order_reuse:
+        # Same clipping and metrics as below, for both runs
+        if "y_imputed" in train_df.columns:
+            train_for_metrics = train_df.select(
+                ["unique_id", "ds", "y_imputed"]
+            ).rename({"y_imputed": "y"})
+        else:
+            train_for_metrics = train_df.select(["unique_id", "ds", "y"])
+        comparison = arima_order_reuse.compare_runs(
+            full_cv_df,
+            reuse_cv_df,
+            df,
+            train_for_metrics,
+            seasonality,
+            full_time=full_time,
+            reuse_time=reuse_time,
+        ).select(
+            pl.lit(DATASET_NAME).alias("dataset_name"),
+            pl.lit(reuse_mode).alias("mode"),
+            pl.lit(len(arima_orders)).alias("n_series"),
+            pl.all(),
+        )
+        print(f"\n  Order reuse ({reuse_mode}) vs. full re-selection:")
+        print(
+            tabulate(
+                comparison.drop("dataset_name", "mode").to_pandas(),
+                headers="keys",
+                tablefmt="grid",
+                showindex=False,
+                floatfmt=".4f",
+            )
+        )
+        comparison_path = (
+            arima_order_reuse.COMPARISON_DIR / f"{DATASET_NAME}__{reuse_mode}.csv"
+        )
+        comparison_path.parent.mkdir(parents=True, exist_ok=True)
+        comparison.write_csv(comparison_path)
+        print(f"  Comparison saved to: {comparison_path}")
+
     # Persist raw CV forecasts, then clip to leak-safe per-series train bounds
     # (same rule applied to every model in the benchmark, classical and neural).
     print("\n4.5 Forecast Clipping and CV-Forecast Persistence")
@@ -355,6 +524,7 @@ def main():
         cv_df.join(clip_bounds, on="unique_id", how="left"),
         DATASET_NAME,
         MODEL_NAME,
+        run_suffix=run_suffix,
     )
     cv_df = clip_cv_forecasts(cv_df, clip_bounds, model_cols_all)
     print(
@@ -375,14 +545,15 @@ def main():
         train_data_for_eval = train_df.select(["unique_id", "ds", "y"])
     train_data = align_train_data_with_cutoffs(train_data_for_eval, cv_df)
 
-    (
-        mase_scores,
-        mse_scores,
-        rmse_scores,
-        r2oos_scores,
-        r2oos_pooled,
-        actual_model_cols,
-    ) = evaluate_cv(cv_df, train_data, seasonality)
+    with stage("evaluate", rows=len(cv_df)):
+        (
+            mase_scores,
+            mse_scores,
+            rmse_scores,
+            r2oos_scores,
+            r2oos_pooled,
+            actual_model_cols,
+        ) = evaluate_cv(cv_df, train_data, seasonality)
 
     # Calculate average metrics across all series
     avg_metrics = {}
@@ -495,7 +666,7 @@ def main():
         }
 
         metrics_df = pl.DataFrame(metrics_data)
-        csv_path = f"{error_metrics_dir}/{MODEL_NAME}.csv"
+        csv_path = f"{error_metrics_dir}/{MODEL_NAME}{run_suffix}.csv"
         metrics_df.write_csv(csv_path)
         print(f"Error metrics saved to: {csv_path}")
     else:
@@ -503,6 +674,31 @@ def main():
             f"Warning: Could not find metrics for model. Looking for key '{metrics_key}' in {list(avg_metrics.keys())}"
         )
 
+    if args.save_model:
+        from model_store import save_stats_forecaster
+
+        print("\n8. Saving Fitted Model")
+        print("-" * 40)
+        # Cross-validation keeps no fitted models, so fit once more on the
+        # whole panel: the stored model forecasts past its last observation.
+        with stage("save_models", rows=len(df)) as st:
+            sf.fit(df=df)
+            model_path = save_stats_forecaster(
+                sf,
+                DATASET_NAME,
+                MODEL_NAME,
+                run_suffix=run_suffix,
+                h=test_size,
+                metadata={
+                    "frequency": frequency,
+                    "seasonality": seasonality,
+                    "test_size": test_size,
+                    "debug": DEBUG_MODE,
+                    "metrics": avg_metrics.get(metrics_key),
+                },
+            )
+        print(f"Fitted model saved to: {model_path} ({st.wall_s:.2f} seconds)")
+
     print("\n" + "=" * 60)
     print("Forecast Statistics Complete!")
     print("=" * 60)
@@ -5,14 +5,17 @@ This module contains utility functions extracted from forecast.py for reuse
 across forecast_stats.py and forecast_neural.py scripts.
 """
 
-import tomli
+import math
+import sys
 import polars as pl
 from pathlib import Path
-from utilsforecast.preprocessing import fill_gaps
-from utilsforecast.losses import mase, mse, rmse
+
+# utilsforecast (and the pandas stack it pulls in) is imported inside the
+# functions that need it, so the CLIs' --skip-existing path stays light.
 
 FILE_DIR = Path(__file__).resolve().parent
 REPO_ROOT = FILE_DIR.parent.parent
+SRC_DIR = REPO_ROOT / "src"
 
 MAX_CV_WINDOWS = 6
 
@@ -35,6 +38,36 @@ VAL_SIZE_BY_FREQUENCY = {
     "D": 90,  # Calendar day: ~3 months
 }
 
+# Training-data sampler for the neural models (see training_sampler.py).
+# max_train_length caps the history each training fit sees per series;
+# hpo_max_series caps the number of series used during the Optuna search
+# only (stratified by history length). The final refit and CV forecasts
+# always cover every series. Frequencies not listed train on everything.
+TRAINING_SAMPLER_BY_FREQUENCY = {
+    "B": {"max_train_length": 756, "hpo_max_series": 100},  # ~3 trading years
+    "D": {"max_train_length": 1095, "hpo_max_series": 100},  # ~3 years
+}
+
+# Optuna pruner for the neural hyperparameter search. Trials report
+# ptl/val_loss every val_check_steps and are stopped once clearly behind the
+# other trials; step thresholds are in training steps. Daily panels use
+# Hyperband (successive halving over max_steps) so that most configurations
+# only pay for a fraction of their budget; monthly/quarterly ones use the
+# median rule after a few unpruned trials.
+PRUNER_SETTINGS = {
+    "median": {"type": "median", "n_startup_trials": 5, "n_warmup_steps": 200},
+    "hyperband": {"type": "hyperband", "min_resource": 100, "reduction_factor": 3},
+    "none": {"type": "none"},
+}
+PRUNER_BY_FREQUENCY = {
+    "ME": "median",
+    "MS": "median",
+    "QE": "median",
+    "QS": "median",
+    "B": "hyperband",
+    "D": "hyperband",
+}
+
 
 def convert_frequency_to_statsforecast(frequency):
     """Convert pandas/dataset frequency to StatsForecast frequency format."""
@@ -60,44 +93,17 @@ def convert_frequency_to_statsforecast(frequency):
 
 def read_dataset_config(dataset_name):
     """Read dataset configuration from datasets.toml file."""
-    datasets_path = REPO_ROOT / "datasets.toml"
-    if not datasets_path.exists():
-        raise FileNotFoundError(f"datasets.toml not found at {datasets_path}")
-    with open(datasets_path, "rb") as f:
-        config = tomli.load(f)
-
-    dataset_config = None
-    data_path = None
-    for module_name, module_config in config.items():
-        if isinstance(module_config, dict) and not module_name.startswith("_"):
-            for dataset_key, dataset_info in module_config.items():
-                if dataset_key == dataset_name and isinstance(dataset_info, dict):
-                    dataset_config = dataset_info
-                    data_path = (
-                        REPO_ROOT
-                        / "_data"
-                        / "formatted"
-                        / module_name
-                        / f"{dataset_name}.parquet"
-                    )
-                    break
-            if dataset_config:
-                break
+    if str(SRC_DIR) not in sys.path:
+        sys.path.append(str(SRC_DIR))
+    from dataset_registry import load_registry
 
-    if not dataset_config:
-        available_datasets = []
-        for module_name, module_config in config.items():
-            if isinstance(module_config, dict) and not module_name.startswith("_"):
-                for dataset_key in module_config.keys():
-                    if not dataset_key.startswith("_") and dataset_key not in [
-                        "data_module_name",
-                        "data_module_description",
-                        "required_data_sources",
-                    ]:
-                        available_datasets.append(dataset_key)
+    registry = load_registry(REPO_ROOT / "datasets.toml")
+    dataset_config = registry.get(dataset_name)
+    if dataset_config is None:
         raise ValueError(
-            f"Dataset '{dataset_name}' not found. Available datasets: {available_datasets}"
+            f"Dataset '{dataset_name}' not found. Available datasets: {registry.names()}"
         )
+    data_path = registry.formatted_path(dataset_name, REPO_ROOT / "_data")
 
     return {
         "data_path": str(data_path),
@@ -200,31 +206,40 @@ def filter_series_for_forecasting(data, forecast_horizon, seasonality, min_buffe
     return filtered_data, original_count, final_count, min_required_length
 
 
+def load_panel(data_path, unique_ids=None):
+    """Load a formatted dataset as unique_id/ds/y, with Float32 y and inf/nan as null.
+
+    Reads the canonical layout written by organize_ftsfr_datasets.py (see
+    src/panel_storage.py) as well as legacy files. With ``unique_ids``, only
+    those series are read.
+    """
+    if str(SRC_DIR) not in sys.path:
+        sys.path.append(str(SRC_DIR))
+    from panel_storage import scan_panel
+
+    return (
+        scan_panel(data_path, unique_ids)
+        .with_columns(
+            pl.when((pl.col("y").is_infinite()) | (pl.col("y").is_nan()))
+            .then(None)
+            .otherwise(pl.col("y"))
+            .alias("y")
+        )
+        .collect()
+    )
+
+
 def load_and_preprocess_data(data_path, frequency="D", test_split=0.2, seasonality=252):
     """Load and preprocess the dataset using Polars throughout with consistent filtering."""
-    print("Loading and preprocessing data...")
+    from utilsforecast.preprocessing import fill_gaps
 
-    df = pl.read_parquet(data_path)
-    # Rename 'id' to 'unique_id' if needed
-    if "id" in df.columns:
-        df = df.rename({"id": "unique_id"})
+    print("Loading and preprocessing data...")
 
-    drop_cols = [c for c in df.columns if c.startswith("__index_level_")]
-    if drop_cols:
-        df = df.drop(drop_cols)
-    df = df.select(["unique_id", "ds", "y"])
+    # Proper dtypes, inf/nan guarded
+    df = load_panel(data_path)
 
     print(f"Initial dataset: {len(df['unique_id'].unique())} entities")
 
-    # Ensure proper dtypes & guard against inf/nan
-    df = df.with_columns(pl.col("y").cast(pl.Float32))
-    df = df.with_columns(
-        pl.when((pl.col("y").is_infinite()) | (pl.col("y").is_nan()))
-        .then(None)
-        .otherwise(pl.col("y"))
-        .alias("y")
-    )
-
     # Calculate forecast horizon based on ORIGINAL entity lengths before fill_gaps
     # This prevents fill_gaps from artificially inflating entity lengths
     original_entity_lengths = df.group_by("unique_id").agg(pl.len().alias("length"))
@@ -332,6 +347,30 @@ def get_val_size_from_frequency(frequency, test_size, panel_df=None):
     return max(target, test_size)
 
 
+def get_training_sampler_config(frequency):
+    """Neural training-sampler settings (see TRAINING_SAMPLER_BY_FREQUENCY).
+
+    Returns a dict with ``max_train_length`` and ``hpo_max_series``, both
+    None when the frequency trains on the full panel.
+    """
+
+    config = {"max_train_length": None, "hpo_max_series": None}
+    config.update(TRAINING_SAMPLER_BY_FREQUENCY.get(frequency, {}))
+    return config
+
+
+def get_pruner_config_from_frequency(frequency, pruner="auto"):
+    """Optuna pruner settings for the neural HPO.
+
+    ``pruner="auto"`` picks the PRUNER_BY_FREQUENCY entry (median for
+    unlisted frequencies); any PRUNER_SETTINGS key forces that pruner.
+    """
+
+    if pruner == "auto":
+        pruner = PRUNER_BY_FREQUENCY.get(frequency, "median")
+    return dict(PRUNER_SETTINGS[pruner])
+
+
 def compute_clip_bounds(panel_df, cv_df, k=CLIP_IQR_MULTIPLIER):
     """Leak-safe per-series clip bounds for CV forecasts.
 
@@ -526,6 +565,7 @@ def calculate_oos_r2(cv_df, train_df, models, benchmark_model="HistoricAverage")
 
 def evaluate_cv(cv_df, train_df, seasonality):
     """Evaluate cross-validation results using multiple metrics."""
+    from utilsforecast.losses import mase, mse, rmse
 
     # Get actual column names from cv_df (excluding metadata columns)
     metadata_cols = ["unique_id", "ds", "cutoff", "y"]
@@ -700,9 +740,8 @@ def should_skip_forecast(dataset_name, model_name, run_suffix="", verbose=True):
     Returns:
         bool: True if valid metrics exist and forecast can be skipped, False otherwise
     """
-    import pandas as pd
-    import numpy as np
-    from pathlib import Path
+    # Plain polars/math only: this runs on the fast-exit path of every CLI,
+    # before any heavy framework is imported.
 
     # Construct the path to the error metrics CSV
     csv_path = Path(
@@ -717,9 +756,9 @@ def should_skip_forecast(dataset_name, model_name, run_suffix="", verbose=True):
 
     try:
         # Read the CSV file
-        df = pd.read_csv(csv_path)
+        df = pl.read_csv(csv_path)
 
-        if df.empty:
+        if df.is_empty():
             if verbose:
                 print(f"  Metrics file is empty: {csv_path}")
             return False
@@ -733,16 +772,11 @@ def should_skip_forecast(dataset_name, model_name, run_suffix="", verbose=True):
             return False
 
         # Get the first row of metrics
-        if len(df) == 0:
-            if verbose:
-                print(f"  No metrics rows in file: {csv_path}")
-            return False
-
-        metrics = df.iloc[0]
+        metrics = df.row(0, named=True)
 
         # Check that metrics are not null
         for col in required_cols:
-            if pd.isna(metrics[col]):
+            if metrics[col] is None or math.isnan(float(metrics[col])):
                 if verbose:
                     print(f"  Metric {col} is null in file: {csv_path}")
                 return False
@@ -758,7 +792,7 @@ def should_skip_forecast(dataset_name, model_name, run_suffix="", verbose=True):
 
         # Check for invalid values (inf)
         for col in required_cols:
-            if np.isinf(metrics[col]):
+            if math.isinf(float(metrics[col])):
                 if verbose:
                     print(f"  Metric {col} is infinite in file: {csv_path}")
                 return False
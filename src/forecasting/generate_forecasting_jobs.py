@@ -17,6 +17,10 @@ import sys
 from pathlib import Path
 from typing import List, Dict, Any
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from dataset_registry import load_registry
+
 
 def load_toml_file(filepath: Path) -> Dict[str, Any]:
     """Load and parse a TOML file."""
@@ -31,18 +35,15 @@ def load_toml_file(filepath: Path) -> Dict[str, Any]:
         sys.exit(1)
 
 
-def extract_datasets(datasets_config: Dict[str, Any]) -> List[str]:
+def extract_datasets(datasets_file: Path) -> List[str]:
     """Extract active dataset names from datasets.toml."""
-    datasets = []
-
-    for module_name, module_config in datasets_config.items():
-        if isinstance(module_config, dict):
-            for key, value in module_config.items():
-                # Skip module-level metadata (strings)
-                if isinstance(value, dict) and key.startswith("ftsfr_"):
-                    datasets.append(key)
+    try:
+        registry = load_registry(datasets_file)
+    except FileNotFoundError:
+        print(f"Error: {datasets_file} not found")
+        sys.exit(1)
 
-    return sorted(datasets)
+    return sorted(registry.names())
 
 
 def extract_models(models_config: Dict[str, Any]) -> List[Dict[str, str]]:
@@ -70,6 +71,7 @@ def generate_job_commands(
     skip_daily: bool = False,
     losses: List[str] = ("mae", "mse"),
     scale_entity: bool = False,
+    hpo_storage: bool = False,
 ) -> List[str]:
     """Generate job commands for all dataset x model combinations.
 
@@ -83,6 +85,8 @@ def generate_job_commands(
             models (forecast_stats.py) are emitted once per (dataset, model) since
             they do not expose a loss choice.
         scale_entity: If True, add --scale-entity to neural-model commands.
+        hpo_storage: If True, add --hpo-storage to neural-model commands so
+            their Optuna searches persist under _output/forecasting/hpo/.
     """
     commands = []
 
@@ -102,6 +106,8 @@ def generate_job_commands(
                     command += f" --loss {loss}"
                 if is_neural and scale_entity:
                     command += " --scale-entity"
+                if is_neural and hpo_storage:
+                    command += " --hpo-storage"
                 if skip_existing:
                     command += " --skip-existing"
                 # Add --skip-daily flag only to auto models (forecast_neural_auto.py)
@@ -154,6 +160,11 @@ def main():
         action="store_true",
         help="Append --scale-entity to all neural model commands.",
     )
+    parser.add_argument(
+        "--hpo-storage",
+        action="store_true",
+        help="Append --hpo-storage to all neural model commands.",
+    )
     args = parser.parse_args()
 
     # Define file paths
@@ -169,11 +180,10 @@ def main():
     print(f"Reading models from: {models_file}")
 
     # Load configuration files
-    datasets_config = load_toml_file(datasets_file)
     models_config = load_toml_file(models_file)
 
     # Extract active datasets and models
-    datasets = extract_datasets(datasets_config)
+    datasets = extract_datasets(datasets_file)
     models = extract_models(models_config)
 
     print(f"\nFound {len(datasets)} datasets:")
@@ -192,6 +202,7 @@ def main():
         skip_daily=args.skip_daily,
         losses=args.losses,
         scale_entity=args.scale_entity,
+        hpo_storage=args.hpo_storage,
     )
     total_jobs = len(commands)
 
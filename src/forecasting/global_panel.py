@@ -0,0 +1,148 @@
+"""
+Pooled panels for cross-dataset ("global") neural training.
+
+``forecast_neural_auto.py --global-frequency ME`` trains one model, with one
+Optuna search, over the union of the series of every active dataset with
+that frequency and seasonality, instead of one model per dataset. This module
+builds that union and splits results back into the datasets.
+
+Series are kept apart by prefixing each unique_id with its dataset name
+(``{dataset}::{unique_id}``). The pooled datasets differ widely in scale
+(returns vs. basis spreads in bps), so global runs always apply the
+leak-safe per-entity scaling of ``--scale-entity``.
+
+CV windows are anchored at each series' end, so a dataset's cutoffs only
+depend on how many windows are run. Only the datasets whose own run would
+use the most windows of the group are pooled (``dataset_cv_windows``); the
+others keep their per-dataset runs, so every ``__global`` metric is scored
+on the same windows as the dataset's standalone run.
+
+Usage (see forecast_neural_auto.py):
+
+    datasets = group_datasets("ME", seasonality=1)
+    df_raw = load_global_panel(datasets)
+    ...
+    for dataset_name in datasets:
+        dataset_cv_df = dataset_frame(cv_df, dataset_name)
+"""
+
+import sys
+from collections import Counter
+
+import polars as pl
+
+from forecast_utils import (
+    REPO_ROOT,
+    SRC_DIR,
+    determine_cv_windows,
+    load_panel,
+    read_dataset_config,
+)
+
+GLOBAL_ID_SEP = "::"
+
+
+def group_name(frequency, seasonality):
+    """Name of a global group, used where a run needs a dataset name
+    (logs, HPO journal, stored models, trace), e.g. ``global_ME_s12``."""
+    return f"global_{frequency}_s{seasonality}"
+
+
+def group_datasets(frequency, seasonality=None, datasets=None):
+    """Active datasets of ``frequency`` (and ``seasonality``) to pool.
+
+    ``datasets`` restricts the group to those names. Without
+    ``seasonality``, the most common one among the matching datasets is
+    used, since one model can only take one seasonality.
+
+    Returns:
+        (dataset names in datasets.toml order, seasonality)
+    """
+    if str(SRC_DIR) not in sys.path:
+        sys.path.append(str(SRC_DIR))
+    from dataset_registry import load_registry
+
+    registry = load_registry(REPO_ROOT / "datasets.toml")
+    if datasets:
+        unknown = [name for name in datasets if name not in registry]
+        if unknown:
+            raise ValueError(f"Datasets not found in datasets.toml: {unknown}")
+    candidates = [
+        name
+        for name in registry.active()
+        if registry[name].get("frequency", "D") == frequency
+        and (not datasets or name in datasets)
+    ]
+    if not candidates:
+        raise ValueError(f"No active datasets with frequency '{frequency}'")
+    if seasonality is None:
+        counts = Counter(registry[name].get("seasonality", 252) for name in candidates)
+        seasonality = counts.most_common(1)[0][0]
+    names = [
+        name
+        for name in candidates
+        if registry[name].get("seasonality", 252) == seasonality
+    ]
+    return names, seasonality
+
+
+def load_global_panel(dataset_names, max_series_per_dataset=None):
+    """Union of the datasets' panels with dataset-prefixed unique_ids."""
+    parts = []
+    for dataset_name in dataset_names:
+        df = load_panel(read_dataset_config(dataset_name)["data_path"])
+        if max_series_per_dataset:
+            keep = df["unique_id"].unique(maintain_order=True)[:max_series_per_dataset]
+            df = df.filter(pl.col("unique_id").is_in(keep.implode()))
+        print(
+            f"  {dataset_name}: {len(df):,} observations, "
+            f"{df['unique_id'].n_unique()} series"
+        )
+        parts.append(
+            df.select(
+                pl.concat_str(
+                    pl.lit(f"{dataset_name}{GLOBAL_ID_SEP}"),
+                    pl.col("unique_id").cast(pl.String),
+                ).alias("unique_id"),
+                "ds",
+                "y",
+            )
+        )
+    return pl.concat(parts, how="vertical_relaxed")
+
+
+def dataset_of(unique_id):
+    """Expression: the dataset a prefixed unique_id belongs to."""
+    return unique_id.str.split(GLOBAL_ID_SEP).list.first()
+
+
+def dataset_frame(df, dataset_name):
+    """Rows of ``dataset_name`` in a pooled frame, with its own unique_ids."""
+    prefix = f"{dataset_name}{GLOBAL_ID_SEP}"
+    return df.filter(pl.col("unique_id").str.starts_with(prefix)).with_columns(
+        pl.col("unique_id").str.strip_prefix(prefix)
+    )
+
+
+def series_shares(df):
+    """{dataset: share of the pooled series}, used to apportion run time."""
+    counts = (
+        df.select(dataset_of(pl.col("unique_id").unique()).alias("dataset"))
+        .group_by("dataset")
+        .len()
+    )
+    total = counts["len"].sum()
+    return {row["dataset"]: row["len"] / total for row in counts.iter_rows(named=True)}
+
+
+def dataset_cv_windows(df, horizon):
+    """{dataset: CV windows of its standalone run}, from a pooled frame.
+
+    Uses ``determine_cv_windows`` on each dataset's series, as the
+    per-dataset pipeline does on its own panel.
+    """
+    names = df.select(dataset_of(pl.col("unique_id")).unique(maintain_order=True))
+    return {
+        name: determine_cv_windows(dataset_frame(df, name), horizon)
+        for name in names.to_series()
+    }
@@ -0,0 +1,436 @@
+"""
+Optuna search helpers for the neural Auto* models: persistent storage and
+trial pruning.
+
+By default ``BaseAuto`` keeps its Optuna study in memory, so a SLURM job killed
+mid-search loses every completed trial, and the ``--loss mae`` / ``--loss mse``
+runs search the same architecture space from scratch. ``use_persistent_study``
+swaps an Auto model's search for one backed by an on-disk journal under
+``_output/forecasting/hpo/`` so that:
+
+- a rerun resumes the study and only trains the trials still missing
+  (interrupted trials are re-queued first), and
+- a fresh study warm-starts from the best configurations the sibling loss
+  variant already found (enqueued as its first trials; their losses are
+  re-measured under this run's objective).
+
+One journal file holds every loss variant of a (dataset, model, scale) pair;
+each variant is its own study inside it, named by ``hpo_study_name``.
+
+``use_pruner`` additionally reports each trial's validation loss to Optuna at
+every validation check and stops trials the pruner (median or Hyperband, see
+``PRUNER_BY_FREQUENCY`` in forecast_utils.py) flags as hopeless. The pruned
+trial count and the training steps saved are left on the Auto model as
+``_hpo_summary``.
+
+``use_parallel_trials`` runs that many trials at once in threads (the
+``optuna_jobs`` of the thread budget, see thread_budget.py).
+
+Usage (see forecast_neural_auto.py):
+
+    use_persistent_study(
+        auto_model, dataset_name, model_name, loss_name, scale_entity
+    )
+    use_pruner(auto_model, get_pruner_config_from_frequency(frequency))
+    use_parallel_trials(auto_model, budget["optuna_jobs"])
+"""
+
+import types
+from copy import deepcopy
+
+from forecast_utils import REPO_ROOT
+
+HPO_DIR = REPO_ROOT / "_output" / "forecasting" / "hpo"
+
+# Number of best sibling-study configurations enqueued into a new study.
+HPO_WARM_START_TRIALS = 3
+
+# Loss variants searched over the identical space by the forecasting grid.
+HPO_LOSSES = ("mae", "mse")
+
+# Config keys injected by BaseAuto that hold torch objects; they can't be
+# written to the journal and are rebuilt from the live config instead.
+_NON_PERSISTED_KEYS = ("loss", "valid_loss")
+
+
+def hpo_run_suffix(loss_name, scale_entity):
+    """Run suffix used in output filenames, e.g. ``__mse__entityscale``."""
+    suffix = f"__{loss_name}"
+    if scale_entity:
+        suffix += "__entityscale"
+    return suffix
+
+
+def hpo_study_name(dataset_name, model_name, loss_name, scale_entity):
+    """Study name for one (dataset, model, loss, scale) search."""
+    return f"{dataset_name}__{model_name}{hpo_run_suffix(loss_name, scale_entity)}"
+
+
+def hpo_storage_path(dataset_name, model_name, scale_entity, hpo_dir=HPO_DIR):
+    """Journal file shared by all loss variants of a (dataset, model, scale)."""
+    scale_suffix = "__entityscale" if scale_entity else ""
+    return hpo_dir / dataset_name / f"{model_name}{scale_suffix}.journal"
+
+
+def open_journal_storage(path):
+    """Open (creating parent dirs) an Optuna journal storage at ``path``.
+
+    Journal files, unlike SQLite, are safe on the cluster's network
+    filesystem and for the concurrent mae/mse jobs writing to one file.
+    """
+    import optuna
+
+    try:
+        from optuna.storages.journal import JournalFileBackend
+    except ImportError:  # optuna < 4.0
+        from optuna.storages import JournalFileStorage as JournalFileBackend
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return optuna.storages.JournalStorage(JournalFileBackend(str(path)))
+
+
+def count_finished_trials(study):
+    """Trials that count towards ``num_samples`` (completed or pruned)."""
+    from optuna.trial import TrialState
+
+    return len(
+        study.get_trials(
+            deepcopy=False, states=(TrialState.COMPLETE, TrialState.PRUNED)
+        )
+    )
+
+
+def _best_params(study, n):
+    """Params of the ``n`` best completed trials of ``study``."""
+    from optuna.trial import TrialState
+
+    completed = study.get_trials(deepcopy=False, states=(TrialState.COMPLETE,))
+    completed = sorted(completed, key=lambda t: t.value)
+    return [t.params for t in completed[:n]]
+
+
+def warm_start_study(
+    study, storage, sibling_study_names, n_trials=HPO_WARM_START_TRIALS
+):
+    """Enqueue the best configurations of sibling studies into ``study``.
+
+    Only applies to a study with no trials yet. Returns the number of
+    configurations enqueued.
+    """
+    import optuna
+
+    if n_trials <= 0 or study.get_trials(deepcopy=False):
+        return 0
+
+    existing = {s.study_name for s in storage.get_all_studies()}
+    enqueued = 0
+    for sibling_name in sibling_study_names:
+        if sibling_name not in existing:
+            continue
+        sibling = optuna.load_study(study_name=sibling_name, storage=storage)
+        for params in _best_params(sibling, n_trials - enqueued):
+            study.enqueue_trial(params, skip_if_exists=True)
+            enqueued += 1
+    return enqueued
+
+
+def requeue_interrupted_trials(study):
+    """Re-queue the params of trials left RUNNING by a killed job.
+
+    Each study is driven by a single job at a time, so any RUNNING trial
+    found when the study is opened was interrupted. Its params are enqueued
+    unless an earlier restart already re-ran or re-queued them. Returns the
+    number of trials re-queued.
+    """
+    from optuna.trial import TrialState
+
+    running, others = [], []
+    for trial in study.get_trials(deepcopy=False):
+        if trial.state == TrialState.RUNNING:
+            running.append(trial.params)
+        else:
+            others.append(trial.system_attrs.get("fixed_params", trial.params))
+
+    requeued = 0
+    for params in running:
+        if params and params not in others:
+            study.enqueue_trial(params)
+            others.append(params)
+            requeued += 1
+    return requeued
+
+
+def build_pruner(pruner_config):
+    """Optuna pruner from a ``PRUNER_SETTINGS`` entry (forecast_utils.py)."""
+    import optuna
+
+    settings = dict(pruner_config)
+    pruner_type = settings.pop("type")
+    if pruner_type == "median":
+        return optuna.pruners.MedianPruner(**settings)
+    if pruner_type == "hyperband":
+        settings.setdefault("max_resource", "auto")
+        return optuna.pruners.HyperbandPruner(**settings)
+    if pruner_type == "none":
+        return optuna.pruners.NopPruner()
+    raise ValueError(f"Unknown pruner type: {pruner_type}")
+
+
+def make_pruning_callback(trial):
+    """Lightning callback reporting ``ptl/val_loss`` to ``trial``.
+
+    When the trial should be pruned the trainer is asked to stop after the
+    current step; the objective then raises ``optuna.TrialPruned``. The last
+    global step is kept on the callback because NeuralForecast detaches the
+    trainer from the model after fitting.
+    """
+    import pytorch_lightning as pl
+
+    class ValidationPruningCallback(pl.Callback):
+        def __init__(self):
+            self.pruned = False
+            self.steps_trained = 0
+
+        def on_validation_end(self, trainer, pl_module):
+            if trainer.sanity_checking:
+                return
+            val_loss = trainer.callback_metrics.get("ptl/val_loss")
+            if val_loss is None:
+                return
+            trial.report(float(val_loss), step=trainer.global_step)
+            if trial.should_prune():
+                self.pruned = True
+                trainer.should_stop = True
+
+        def on_train_end(self, trainer, pl_module):
+            self.steps_trained = trainer.global_step
+
+    return ValidationPruningCallback()
+
+
+def pruning_summary(study):
+    """Pruned-trial count and training steps saved by pruning in ``study``.
+
+    Steps saved are each pruned trial's ``max_steps`` minus the steps it
+    actually trained.
+    """
+    from optuna.trial import TrialState
+
+    trials = study.get_trials(
+        deepcopy=False, states=(TrialState.COMPLETE, TrialState.PRUNED)
+    )
+    pruned = [t for t in trials if t.state == TrialState.PRUNED]
+    budget = sum(t.user_attrs.get("max_steps", 0) for t in trials)
+    saved = sum(
+        t.user_attrs.get("max_steps", 0) - t.user_attrs.get("steps_trained", 0)
+        for t in pruned
+    )
+    return {
+        "n_trials": len(trials),
+        "n_pruned": len(pruned),
+        "steps_budget": budget,
+        "steps_saved": saved,
+    }
+
+
+class ResumedStudy:
+    """Thin wrapper around a persisted study for ``BaseAuto.fit``.
+
+    ``BaseAuto.fit`` and the seed-ensemble refit read the full model config
+    from ``results.best_trial.user_attrs["ALL_PARAMS"]``. The journal only
+    stores the JSON-safe part, so ``best_trial`` rebuilds the config by
+    replaying the best params through the live config function (which also
+    picks up this node's accelerator/devices instead of the original job's).
+    As in the stock ``ALL_PARAMS``, the loss objects are left out;
+    ``BaseAuto.fit`` re-attaches them from the Auto model.
+    """
+
+    def __init__(self, study, config):
+        self._study = study
+        self._config = config
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._study, name)
+
+    @property
+    def best_trial(self):
+        from optuna.trial import FixedTrial
+
+        trial = deepcopy(self._study.best_trial)
+        config = self._config(FixedTrial(trial.params))
+        trial.user_attrs["ALL_PARAMS"] = {
+            k: v for k, v in config.items() if k not in _NON_PERSISTED_KEYS
+        }
+        return trial
+
+
+def _optuna_tune_model(
+    self,
+    cls_model,
+    dataset,
+    val_size,
+    test_size,
+    verbose,
+    num_samples,
+    search_alg,
+    config,
+    distributed_config,
+    time_budget=None,
+):
+    """Drop-in for ``BaseAuto._optuna_tune_model`` with storage and pruning.
+
+    Uses the journal set up by ``use_persistent_study`` (in-memory otherwise)
+    and the pruner set up by ``use_pruner`` (none otherwise). ``time_budget``
+    (seconds, passed by newer NeuralForecast releases) bounds the search.
+    """
+    import optuna
+
+    pruner_config = getattr(self, "_hpo_pruner", None)
+
+    def objective(trial):
+        user_cfg = config(trial)
+        fit_cfg = deepcopy(user_cfg)
+        callback = None
+        if pruner_config is not None:
+            callback = make_pruning_callback(trial)
+            fit_cfg["callbacks"] = list(fit_cfg.get("callbacks") or []) + [callback]
+        model = self._fit_model(
+            cls_model=cls_model,
+            config=fit_cfg,
+            dataset=dataset,
+            val_size=val_size,
+            test_size=test_size,
+            distributed_config=distributed_config,
+        )
+        trial.set_user_attr(
+            "ALL_PARAMS",
+            {k: v for k, v in user_cfg.items() if k not in _NON_PERSISTED_KEYS},
+        )
+        trial.set_user_attr("max_steps", int(user_cfg.get("max_steps", 0)))
+        if callback is not None:
+            trial.set_user_attr("steps_trained", int(callback.steps_trained))
+            if callback.pruned:
+                raise optuna.TrialPruned()
+        metrics = model.metrics
+        trial.set_user_attr(
+            "METRICS",
+            {
+                "loss": float(metrics["ptl/val_loss"]),
+                "train_loss": float(metrics["train_loss"]),
+            },
+        )
+        return trial.user_attrs["METRICS"]["loss"]
+
+    sampler = (
+        search_alg if isinstance(search_alg, optuna.samplers.BaseSampler) else None
+    )
+    pruner = build_pruner(pruner_config) if pruner_config is not None else None
+    hpo = getattr(self, "_hpo_storage", None)
+    storage = open_journal_storage(hpo["path"]) if hpo is not None else None
+    study = optuna.create_study(
+        study_name=hpo["study_name"] if hpo is not None else None,
+        storage=storage,
+        sampler=sampler,
+        pruner=pruner,
+        direction="minimize",
+        load_if_exists=True,
+    )
+
+    finished = count_finished_trials(study)
+    remaining = max(0, num_samples - finished)
+    if hpo is not None:
+        requeued = requeue_interrupted_trials(study)
+        warm = warm_start_study(
+            study, storage, hpo["sibling_study_names"], hpo["warm_start_trials"]
+        )
+        print(
+            f"  HPO study '{hpo['study_name']}' at {hpo['path']}: "
+            f"{finished} finished trials, {requeued} re-queued, "
+            f"{warm} warm-start configs, {remaining} trials to run"
+        )
+
+    if remaining > 0:
+        study.optimize(
+            objective,
+            n_trials=remaining,
+            show_progress_bar=verbose,
+            callbacks=self.callbacks,
+            n_jobs=getattr(self, "_hpo_n_jobs", 1),
+            timeout=time_budget,
+        )
+
+    if pruner_config is not None:
+        self._hpo_summary = pruning_summary(study)
+        summary = self._hpo_summary
+        print(
+            f"  HPO pruning ({pruner_config['type']}): "
+            f"{summary['n_pruned']}/{summary['n_trials']} trials pruned, "
+            f"{summary['steps_saved']} of {summary['steps_budget']} "
+            f"training steps saved"
+        )
+    return ResumedStudy(study, config)
+
+
+def use_persistent_study(
+    auto_model,
+    dataset_name,
+    model_name,
+    loss_name,
+    scale_entity,
+    warm_start_trials=HPO_WARM_START_TRIALS,
+    hpo_dir=HPO_DIR,
+):
+    """Back ``auto_model``'s Optuna search with the on-disk journal.
+
+    Must be called before ``NeuralForecast.fit``/``cross_validation``; only
+    the optuna backend is supported. Returns the journal path.
+    """
+    if getattr(auto_model, "backend", "optuna") != "optuna":
+        raise ValueError("Persistent HPO storage requires backend='optuna'")
+
+    path = hpo_storage_path(dataset_name, model_name, scale_entity, hpo_dir=hpo_dir)
+    auto_model._hpo_storage = {
+        "path": path,
+        "study_name": hpo_study_name(dataset_name, model_name, loss_name, scale_entity),
+        "sibling_study_names": [
+            hpo_study_name(dataset_name, model_name, other, scale_entity)
+            for other in HPO_LOSSES
+            if other != loss_name
+        ],
+        "warm_start_trials": warm_start_trials,
+    }
+    auto_model._optuna_tune_model = types.MethodType(_optuna_tune_model, auto_model)
+    return path
+
+
+def use_pruner(auto_model, pruner_config):
+    """Prune ``auto_model``'s Optuna trials on intermediate validation loss.
+
+    ``pruner_config`` is a ``PRUNER_SETTINGS`` entry; ``{"type": "none"}``
+    leaves the search unpruned. Can be combined with
+    ``use_persistent_study``; only the optuna backend is supported.
+    """
+    if getattr(auto_model, "backend", "optuna") != "optuna":
+        raise ValueError("HPO pruning requires backend='optuna'")
+    if pruner_config.get("type") == "none":
+        return
+    build_pruner(pruner_config)  # fail fast on a bad config
+    auto_model._hpo_pruner = dict(pruner_config)
+    auto_model._optuna_tune_model = types.MethodType(_optuna_tune_model, auto_model)
+
+
+def use_parallel_trials(auto_model, n_jobs):
+    """Run ``n_jobs`` of ``auto_model``'s Optuna trials at a time.
+
+    Trials run in threads of this process and share torch's intra-op pool,
+    so size that pool per trial (``plan_thread_budget``). ``n_jobs=1`` keeps
+    the search sequential; only the optuna backend is supported.
+    """
+    if getattr(auto_model, "backend", "optuna") != "optuna":
+        raise ValueError("Parallel HPO trials require backend='optuna'")
+    if n_jobs <= 1:
+        return
+    auto_model._hpo_n_jobs = int(n_jobs)
+    auto_model._optuna_tune_model = types.MethodType(_optuna_tune_model, auto_model)
@@ -0,0 +1,474 @@
+"""
+On-disk store of fitted forecasting models, so notebooks and new
+out-of-sample predictions reuse the grid's models instead of re-running the
+hyperparameter search.
+
+Each run writes one artifact directory,
+``_output/forecasting/models/{dataset}/{model}{run_suffix}/``, holding
+
+- ``manifest.json``: what was fitted (kind, model aliases, frequency,
+  horizon, ensemble members, metrics, library versions, run metadata),
+- ``best_config.json``: the best Optuna trial's params, validation loss and
+  the JSON-safe part of its full config (neural runs),
+- ``neuralforecast/``: the fitted Auto model, i.e. its refit of the best
+  config,
+- ``members/``: the seed-ensemble refits, one NeuralForecast save each,
+- ``scalers.parquet``: the per-entity scalers of ``--scale-entity`` runs,
+- ``statsforecast.pkl``: a fitted StatsForecast (statistical runs).
+
+Artifacts are written to a staging directory and swapped in only once
+complete, so a killed job never leaves a half-written model behind.
+
+Usage:
+
+    forecaster = load_forecaster("ftsfr_treasury_sf_basis", "auto_nhits")
+    forecast_df = forecaster.predict(panel_df)
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+import polars as pl
+
+from forecast_utils import REPO_ROOT
+
+MODELS_DIR = REPO_ROOT / "_output" / "forecasting" / "models"
+
+MANIFEST_FILE = "manifest.json"
+BEST_CONFIG_FILE = "best_config.json"
+SCALERS_FILE = "scalers.parquet"
+STATS_FILE = "statsforecast.pkl"
+NEURAL_DIR = "neuralforecast"
+MEMBERS_DIR = "members"
+
+# Run suffixes tried, in order, when load_forecaster is given none: the plain
+# model name (forecast_stats.py) and the default neural loss variant.
+DEFAULT_RUN_SUFFIXES = ("", "__mae")
+
+_UNSAFE = object()
+
+
+def artifact_dir(dataset_name, model_name, run_suffix="", models_dir=MODELS_DIR):
+    """Artifact directory of one (dataset, model, run variant)."""
+    return models_dir / dataset_name / f"{model_name}{run_suffix}"
+
+
+def staging_dir(dataset_name, model_name, run_suffix="", models_dir=MODELS_DIR):
+    """Empty directory to write an artifact into before ``publish_artifact``.
+
+    Staging directories left by killed runs of the same artifact are removed
+    (the grid runs each (dataset, model, variant) in one job at a time).
+    """
+    final = artifact_dir(dataset_name, model_name, run_suffix, models_dir)
+    final.parent.mkdir(parents=True, exist_ok=True)
+    for stale in final.parent.glob(f"{final.name}.*.tmp"):
+        shutil.rmtree(stale, ignore_errors=True)
+    staging = final.with_name(f"{final.name}.{os.getpid()}.tmp")
+    staging.mkdir()
+    return staging
+
+
+def discard_staging(staging):
+    """Remove a staging directory (or part of one) that won't be published."""
+    shutil.rmtree(staging, ignore_errors=True)
+
+
+def _json_safe(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, (list, tuple)):
+        items = [_json_safe(v) for v in value]
+        return _UNSAFE if any(i is _UNSAFE for i in items) else items
+    if isinstance(value, dict):
+        return json_safe_config(value)
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    return _UNSAFE
+
+
+def json_safe_config(config):
+    """``config`` without the entries JSON can't hold (losses, callbacks)."""
+    safe = {}
+    for key, value in config.items():
+        value = _json_safe(value)
+        if value is not _UNSAFE:
+            safe[str(key)] = value
+    return safe
+
+
+def _library_versions(*names):
+    from importlib.metadata import PackageNotFoundError, version
+
+    versions = {}
+    for name in names:
+        try:
+            versions[name] = version(name)
+        except PackageNotFoundError:
+            pass
+    return versions
+
+
+def publish_artifact(staging, manifest):
+    """Write ``manifest`` into ``staging`` and swap it in as the artifact.
+
+    ``manifest`` must hold model and run_suffix. Any earlier artifact of the
+    same run is replaced. Returns the final artifact directory.
+    """
+    manifest = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "versions": _library_versions(
+            "neuralforecast", "statsforecast", "torch", "polars"
+        ),
+        **manifest,
+    }
+    with open(staging / MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, default=str)
+
+    final = staging.with_name(f"{manifest['model']}{manifest['run_suffix']}")
+    previous = final.with_name(f"{final.name}.{os.getpid()}.old")
+    if final.exists():
+        final.replace(previous)
+    staging.replace(final)
+    shutil.rmtree(previous, ignore_errors=True)
+    return final
+
+
+def save_neuralforecast(nf, path):
+    """Save a fitted NeuralForecast's models (not its training panel)."""
+    nf.save(path=str(path), save_dataset=False, overwrite=True)
+
+
+def save_neural_artifact(
+    staging,
+    nf,
+    dataset_name,
+    model_name,
+    run_suffix="",
+    ensembles=None,
+    scalers=None,
+    metadata=None,
+):
+    """Store a NeuralForecast fitted by ``fit``/``cross_validation``.
+
+    Seed-ensemble members are expected under ``staging / MEMBERS_DIR`` (see
+    ``fit_seed_members(save_dir=...)``). ``ensembles`` maps a headline alias
+    to the member aliases averaged into it; ``scalers`` is the per-entity
+    unique_id/_loc/_scale frame the panel was standardized with. Returns the
+    artifact directory.
+    """
+    try:
+        save_neuralforecast(nf, staging / NEURAL_DIR)
+
+        best = {}
+        for model in nf.models:
+            results = getattr(model, "results", None)
+            if results is None:
+                continue
+            trial = results.best_trial
+            best[repr(model)] = {
+                "params": json_safe_config(trial.params),
+                "value": trial.value,
+                "config": json_safe_config(trial.user_attrs.get("ALL_PARAMS", {})),
+            }
+        if best:
+            with open(staging / BEST_CONFIG_FILE, "w", encoding="utf-8") as f:
+                json.dump(best, f, indent=2)
+
+        if scalers is not None:
+            scalers.write_parquet(staging / SCALERS_FILE)
+
+        members_dir = staging / MEMBERS_DIR
+        member_dirs = (
+            sorted(p.name for p in members_dir.iterdir() if p.is_dir())
+            if members_dir.exists()
+            else []
+        )
+        manifest = {
+            "kind": "neural",
+            "dataset": dataset_name,
+            "model": model_name,
+            "run_suffix": run_suffix,
+            "aliases": [repr(m) for m in nf.models],
+            "freq": str(nf.freq),
+            # predict() must get the frame type the models were fit on, since
+            # pandas and polars runs use different freq strings
+            "frame": "polars" if isinstance(nf.uids, pl.Series) else "pandas",
+            "h": nf.h,
+            "member_dirs": member_dirs,
+            "ensembles": ensembles or {},
+            "scaled": scalers is not None,
+            "metadata": metadata or {},
+        }
+        return publish_artifact(staging, manifest)
+    except BaseException:
+        discard_staging(staging)
+        raise
+
+
+def save_stats_forecaster(
+    sf,
+    dataset_name,
+    model_name,
+    run_suffix="",
+    h=None,
+    metadata=None,
+    models_dir=MODELS_DIR,
+):
+    """Store a fitted StatsForecast. Returns the artifact directory."""
+    staging = staging_dir(dataset_name, model_name, run_suffix, models_dir)
+    try:
+        sf.save(path=staging / STATS_FILE)
+        manifest = {
+            "kind": "stats",
+            "dataset": dataset_name,
+            "model": model_name,
+            "run_suffix": run_suffix,
+            "aliases": [repr(m) for m in sf.models],
+            "freq": str(sf.freq),
+            "h": h,
+            "n_series": len(sf.uids),
+            "metadata": metadata or {},
+        }
+        return publish_artifact(staging, manifest)
+    except BaseException:
+        discard_staging(staging)
+        raise
+
+
+def save_neural_forecaster(
+    nf, dataset_name, model_name, run_suffix="", metadata=None, models_dir=MODELS_DIR
+):
+    """Store a fitted NeuralForecast without seed members (notebooks)."""
+    staging = staging_dir(dataset_name, model_name, run_suffix, models_dir)
+    return save_neural_artifact(
+        staging, nf, dataset_name, model_name, run_suffix, metadata=metadata
+    )
+
+
+def available_artifacts(dataset_name, models_dir=MODELS_DIR):
+    """Names (``{model}{run_suffix}``) of the artifacts stored for a dataset."""
+    dataset_dir = models_dir / dataset_name
+    if not dataset_dir.exists():
+        return []
+    return sorted(p.name for p in dataset_dir.iterdir() if (p / MANIFEST_FILE).exists())
+
+
+def _resolve(dataset_name, model_name, run_suffix, models_dir):
+    suffixes = DEFAULT_RUN_SUFFIXES if run_suffix is None else (run_suffix,)
+    for suffix in suffixes:
+        path = artifact_dir(dataset_name, model_name, suffix, models_dir)
+        if (path / MANIFEST_FILE).exists():
+            return path
+
+    available = available_artifacts(dataset_name, models_dir)
+    if run_suffix is None:
+        variants = [name for name in available if name.startswith(f"{model_name}__")]
+        if len(variants) == 1:
+            return models_dir / dataset_name / variants[0]
+        if variants:
+            raise ValueError(
+                f"Several stored runs of {model_name} for {dataset_name}: "
+                f"{variants}. Pass run_suffix to pick one."
+            )
+    raise FileNotFoundError(
+        f"No stored model {model_name}{run_suffix or ''} for {dataset_name} "
+        f"in {models_dir} (stored: {available or 'none'})"
+    )
+
+
+def _as_panel(df):
+    df = df if isinstance(df, pl.DataFrame) else pl.from_pandas(df)
+    return df.select("unique_id", "ds", "y").sort("unique_id", "ds")
+
+
+class NeuralForecaster:
+    """Fitted neural models of one run, loaded from the store."""
+
+    def __init__(self, path, manifest):
+        from neuralforecast import NeuralForecast
+
+        self.path = path
+        self.manifest = manifest
+        self.nf = NeuralForecast.load(path=str(path / NEURAL_DIR))
+        self.members = [
+            NeuralForecast.load(path=str(path / MEMBERS_DIR / name))
+            for name in manifest["member_dirs"]
+        ]
+        self.scalers = (
+            pl.read_parquet(path / SCALERS_FILE) if manifest["scaled"] else None
+        )
+
+    def predict(self, df, h=None):
+        """Forecast the ``h`` steps (fixed at fit time) after each series in ``df``.
+
+        ``df`` holds unique_id, ds, y. Seed members are averaged into their
+        headline alias as in the grid, and scaled runs are returned in raw
+        units.
+        """
+        if h is not None and h != self.manifest["h"]:
+            raise ValueError(
+                f"Stored neural models forecast h={self.manifest['h']} steps, not {h}"
+            )
+        df = _as_panel(df)
+        if self.scalers is not None:
+            df = (
+                df.join(self.scalers, on="unique_id", how="left")
+                .with_columns((pl.col("y") - pl.col("_loc")) / pl.col("_scale"))
+                .drop("_loc", "_scale")
+            )
+
+        keys = ["unique_id", "ds"]
+        fit_df = df.to_pandas() if self.manifest["frame"] == "pandas" else df
+        fcst = pl.DataFrame(self.nf.predict(df=fit_df))
+        for member in self.members:
+            member_fcst = pl.DataFrame(member.predict(df=fit_df))
+            fcst = fcst.join(member_fcst, on=keys, how="left")
+
+        # NaN -> null so mean_horizontal skips a bad member value
+        for alias, member_cols in self.manifest["ensembles"].items():
+            inputs = [alias] + member_cols
+            fcst = fcst.with_columns(
+                pl.when(pl.col(c).is_nan()).then(None).otherwise(pl.col(c)).alias(c)
+                for c in inputs
+            ).with_columns(pl.mean_horizontal(inputs).alias(alias))
+
+        if self.scalers is not None:
+            value_cols = [c for c in fcst.columns if c not in keys]
+            fcst = (
+                fcst.join(self.scalers, on="unique_id", how="left")
+                .with_columns(
+                    pl.col(c) * pl.col("_scale") + pl.col("_loc") for c in value_cols
+                )
+                .drop("_loc", "_scale")
+            )
+        return fcst
+
+
+class StatsForecaster:
+    """A fitted StatsForecast loaded from the store."""
+
+    def __init__(self, path, manifest):
+        from statsforecast import StatsForecast
+
+        self.path = path
+        self.manifest = manifest
+        self.sf = StatsForecast.load(path=path / STATS_FILE)
+
+    def predict(self, df=None, h=None):
+        """Forecast ``h`` steps (default: the run's horizon, else 1).
+
+        Without ``df`` the forecasts start after the fitted series. With
+        ``df`` (unique_id, ds, y) each series' fitted models are run forward
+        over its new history, without re-selecting orders or parameters;
+        series the store holds no model for are dropped.
+        """
+        h = h or self.manifest.get("h") or 1
+        if df is None:
+            return self.sf.predict(h=h)
+
+        import numpy as np
+        from utilsforecast.processing import make_future_dataframe
+
+        fitted = dict(zip(self.sf.uids.to_list(), self.sf.fitted_))
+        df = _as_panel(df).filter(pl.col("unique_id").is_in(list(fitted)))
+        last = df.group_by("unique_id", maintain_order=True).agg(pl.col("ds").last())
+        fcst = make_future_dataframe(
+            last["unique_id"], last["ds"], freq=self.sf.freq, h=h
+        )
+        aliases = [repr(m) for m in self.sf.models]
+        values = {alias: [] for alias in aliases}
+        for (uid,), group in df.group_by("unique_id", maintain_order=True):
+            y = group["y"].to_numpy().astype(np.float64)
+            for alias, model in zip(aliases, fitted[uid]):
+                values[alias].append(model.forward(y=y, h=h)["mean"])
+        return fcst.with_columns(
+            pl.Series(alias, np.concatenate(v) if v else [], dtype=pl.Float64)
+            for alias, v in values.items()
+        )
+
+
+def load_forecaster(dataset_name, model_name, run_suffix=None, models_dir=MODELS_DIR):
+    """Load the stored fitted models of one run for prediction.
+
+    ``run_suffix`` picks the run variant (e.g. ``"__mse__entityscale"``).
+    Without it the plain and the default ``__mae`` runs are tried, then the
+    only stored variant. Raises FileNotFoundError when nothing is stored.
+    """
+    path = _resolve(dataset_name, model_name, run_suffix, models_dir)
+    with open(path / MANIFEST_FILE, encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest["kind"] == "neural":
+        return NeuralForecaster(path, manifest)
+    return StatsForecaster(path, manifest)
+
+
+def load_matching_forecaster(
+    dataset_name, model_name, metadata, run_suffix="", models_dir=MODELS_DIR
+):
+    """``load_forecaster``, or None if nothing is stored or the stored run's
+    metadata differs from ``metadata`` (e.g. another training cutoff).
+
+    Lets a notebook fit once and reuse the models on every re-run.
+    """
+    try:
+        path = _resolve(dataset_name, model_name, run_suffix, models_dir)
+    except FileNotFoundError:
+        return None
+    with open(path / MANIFEST_FILE, encoding="utf-8") as f:
+        stored = json.load(f)["metadata"]
+    if stored != json.loads(json.dumps(metadata, default=str)):
+        return None
+    return load_forecaster(dataset_name, model_name, run_suffix, models_dir)
+
+
+def main(argv=None):
+    import argparse
+
+    from tabulate import tabulate
+
+    parser = argparse.ArgumentParser(description="List stored forecasting models")
+    parser.add_argument("--dataset", help="Only this dataset")
+    args = parser.parse_args(argv)
+
+    datasets = (
+        [args.dataset]
+        if args.dataset
+        else (
+            sorted(p.name for p in MODELS_DIR.iterdir() if p.is_dir())
+            if MODELS_DIR.exists()
+            else []
+        )
+    )
+    rows = []
+    for dataset in datasets:
+        for name in available_artifacts(dataset):
+            with open(
+                MODELS_DIR / dataset / name / MANIFEST_FILE, encoding="utf-8"
+            ) as f:
+                manifest = json.load(f)
+            rows.append(
+                [
+                    dataset,
+                    name,
+                    manifest["kind"],
+                    ", ".join(manifest["aliases"]),
+                    len(manifest.get("member_dirs", [])),
+                    manifest["created"],
+                ]
+            )
+    if not rows:
+        print(f"No stored models in {MODELS_DIR}")
+        return
+    print(
+        tabulate(
+            rows,
+            headers=["Dataset", "Run", "Kind", "Models", "Member dirs", "Created"],
+            tablefmt="grid",
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
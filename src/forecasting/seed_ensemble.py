@@ -0,0 +1,151 @@
+"""
+Seed-ensemble refits for forecast_neural_auto.py (step 5.5).
+
+After the Auto search, the best configuration is refit under extra random
+seeds and the point forecasts are averaged. On GPU nodes the members share
+the device, so they are trained one after another in-process as before. On
+CPU-only nodes each member is trained in its own process with a pinned
+thread budget: a single NeuralForecast fit uses only a handful of cores
+efficiently, so running the members side by side makes the whole ensemble
+take about as long as one member.
+
+Usage:
+
+    ens_cv_df = fit_seed_members(
+        "NHITS", member_cfgs, df_neural, freq, val_size, cv_windows, test_size,
+        hardware_config,
+    )
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+
+
+# Smallest torch thread budget worth giving a member; below this the
+# per-process overhead outweighs running more members at once.
+MIN_THREADS_PER_MEMBER = 2
+
+CV_KEYS = ["unique_id", "ds", "cutoff"]
+
+
+def plan_seed_workers(hardware_config, n_members):
+    """(number of worker processes, torch threads per worker) for the refit.
+
+    Returns ``(1, None)`` (sequential, in-process, default threading) on
+    GPU/MPS nodes or when there is a single member.
+    """
+    if n_members <= 1 or hardware_config.get("accelerator", "cpu") != "cpu":
+        return 1, None
+    cpu_count = max(1, hardware_config.get("cpu_count") or os.cpu_count() or 1)
+    n_workers = min(n_members, max(1, cpu_count // MIN_THREADS_PER_MEMBER))
+    return n_workers, max(1, cpu_count // n_workers)
+
+
+def _init_worker(n_threads):
+    """Pin BLAS/OpenMP and torch intra-op threads before any model work."""
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(n_threads)
+    import torch
+
+    torch.set_num_threads(n_threads)
+
+
+def _cross_validate(
+    model_class_name, cfgs, df, freq, val_size, n_windows, step_size, save_path=None
+):
+    import neuralforecast.models as nf_models
+    from neuralforecast import NeuralForecast
+
+    model_class = getattr(nf_models, model_class_name)
+    nf = NeuralForecast(models=[model_class(**cfg) for cfg in cfgs], freq=freq)
+    cv_df = nf.cross_validation(
+        df=df, val_size=val_size, n_windows=n_windows, step_size=step_size
+    )
+    if save_path is not None:
+        from model_store import save_neuralforecast
+
+        save_neuralforecast(nf, save_path)
+    return cv_df.select(CV_KEYS + [cfg["alias"] for cfg in cfgs])
+
+
+def _fit_member(
+    model_class_name, cfg, df, freq, val_size, n_windows, step_size, save_path=None
+):
+    return _cross_validate(
+        model_class_name, [cfg], df, freq, val_size, n_windows, step_size, save_path
+    )
+
+
+def fit_seed_members(
+    model_class_name,
+    member_cfgs,
+    df,
+    freq,
+    val_size,
+    n_windows,
+    step_size,
+    hardware_config,
+    save_dir=None,
+):
+    """Cross-validate every seed member and return their forecasts.
+
+    ``member_cfgs`` are full model configs, each with a distinct
+    ``random_seed`` and ``alias``. Returns a Polars frame keyed by
+    unique_id/ds/cutoff with one column per member alias. With ``save_dir``
+    the fitted members are kept there too (see model_store.py): one
+    NeuralForecast directory per worker process, or one for all members when
+    they train in-process.
+    """
+    n_workers, n_threads = plan_seed_workers(hardware_config, len(member_cfgs))
+    if n_workers == 1:
+        return _cross_validate(
+            model_class_name,
+            member_cfgs,
+            df,
+            freq,
+            val_size,
+            n_windows,
+            step_size,
+            save_path=Path(save_dir) / "seeds" if save_dir is not None else None,
+        )
+
+    print(
+        f"  Training {len(member_cfgs)} seed members in {n_workers} processes "
+        f"({n_threads} torch threads each)"
+    )
+    member_cfgs = [dict(cfg) for cfg in member_cfgs]
+    for cfg in member_cfgs:
+        # Separate Lightning log dirs so concurrent fits don't race on the
+        # version_N directory numbering.
+        if cfg.get("default_root_dir"):
+            cfg["default_root_dir"] = str(Path(cfg["default_root_dir"]) / cfg["alias"])
+
+    # spawn, not fork: torch's thread pools and CUDA state aren't fork-safe.
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(n_threads,),
+    ) as pool:
+        futures = [
+            pool.submit(
+                _fit_member,
+                model_class_name,
+                cfg,
+                df,
+                freq,
+                val_size,
+                n_windows,
+                step_size,
+                Path(save_dir) / cfg["alias"] if save_dir is not None else None,
+            )
+            for cfg in member_cfgs
+        ]
+        member_dfs = [future.result() for future in futures]
+
+    merged = member_dfs[0]
+    for member_df in member_dfs[1:]:
+        merged = merged.join(member_df, on=CV_KEYS, how="left")
+    return merged
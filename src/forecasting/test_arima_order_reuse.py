@@ -0,0 +1,82 @@
+"""
+Tests for AutoARIMA order reuse across CV windows in arima_order_reuse.py.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent))
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import arima_order_reuse  # noqa: E402
+from synthetic_data import ftsfr_panel  # noqa: E402
+
+pytest.importorskip("statsforecast")
+
+H, N_WINDOWS = 2, 3
+
+
+@pytest.fixture(scope="module")
+def panel():
+    return ftsfr_panel(n_series=3, n_obs=48, seed=11, missing_frac=0.0)
+
+
+@pytest.fixture(scope="module")
+def full_cv(panel):
+    from statsforecast import StatsForecast
+    from statsforecast.models import AutoARIMA
+
+    sf = StatsForecast(models=[AutoARIMA(season_length=12)], freq="1mo", n_jobs=1)
+    return sf.cross_validation(df=panel, h=H, step_size=H, n_windows=N_WINDOWS)
+
+
+@pytest.mark.parametrize("mode", arima_order_reuse.REUSE_MODES)
+def test_first_window_is_the_full_selection(panel, full_cv, mode):
+    cv_df, orders = arima_order_reuse.cross_validation(
+        panel, h=H, n_windows=N_WINDOWS, season_length=12, mode=mode, n_jobs=1
+    )
+
+    assert cv_df.schema == full_cv.schema
+    assert cv_df.select("unique_id", "ds", "cutoff", "y").equals(
+        full_cv.select("unique_id", "ds", "cutoff", "y")
+    )
+    first = pl.col("cutoff") == pl.col("cutoff").min().over("unique_id")
+    np.testing.assert_allclose(
+        cv_df.filter(first)["AutoARIMA"].to_numpy(),
+        full_cv.filter(first)["AutoARIMA"].to_numpy(),
+        rtol=1e-5,
+    )
+    assert cv_df["AutoARIMA"].is_finite().all()
+
+    # One order per series, with the time spent selecting and reusing it
+    assert orders["unique_id"].to_list() == sorted(panel["unique_id"].unique())
+    assert (orders["mode"] == mode).all()
+    assert orders["order"].str.starts_with("ARIMA(").all()
+    assert (orders["select_s"] > 0).all()
+    assert (orders["reuse_s"] >= 0).all()
+
+
+def test_comparison_reports_reuse_minus_full(panel, full_cv):
+    train = panel.join(
+        full_cv.group_by("unique_id").agg(pl.col("cutoff").max()), on="unique_id"
+    ).filter(pl.col("ds") <= pl.col("cutoff"))
+    shifted = full_cv.with_columns(pl.col("AutoARIMA") + 0.5)
+
+    comparison = arima_order_reuse.compare_runs(
+        full_cv,
+        shifted,
+        panel,
+        train.select("unique_id", "ds", "y"),
+        12,
+        full_time=4.0,
+        reuse_time=1.0,
+    )
+
+    row = comparison.row(0, named=True)
+    assert row["MSE_diff"] == pytest.approx(row["MSE_reuse"] - row["MSE_full"])
+    assert row["MSE_diff"] > 0
+    assert row["speedup"] == pytest.approx(4.0)
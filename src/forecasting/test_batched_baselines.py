@@ -0,0 +1,110 @@
+"""
+Tests for the batched baseline engine in batched_baselines.py.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent))
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import batched_baselines  # noqa: E402
+from synthetic_data import ftsfr_panel  # noqa: E402
+
+pytest.importorskip("statsforecast")
+
+
+def _statsforecast_cv(panel, model, h, n_windows, season_length, freq):
+    from statsforecast import StatsForecast
+    from statsforecast.models import (
+        HistoricAverage,
+        SeasonalNaive,
+        SimpleExponentialSmoothing,
+        Theta,
+    )
+
+    models = {
+        "historic_average": HistoricAverage(),
+        "seasonal_naive": SeasonalNaive(season_length=season_length),
+        "ses": SimpleExponentialSmoothing(alpha=0.1),
+        "theta": Theta(season_length=season_length),
+    }
+    sf = StatsForecast(models=[models[model]], freq=freq, n_jobs=1)
+    return sf.cross_validation(df=panel, h=h, step_size=h, n_windows=n_windows)
+
+
+@pytest.mark.parametrize("model", list(batched_baselines.BATCHED_MODELS))
+@pytest.mark.parametrize(
+    "frequency, freq, season_length, shift",
+    [
+        ("ME", "1mo", 12, 0.0),
+        # Positive series exercise the multiplicative Theta decomposition
+        ("ME", "1mo", 12, 5.0),
+        ("QE", "1q", 4, 0.0),
+    ],
+)
+def test_batched_cv_matches_statsforecast(model, frequency, freq, season_length, shift):
+    panel = ftsfr_panel(
+        n_series=40, n_obs=96, frequency=frequency, seed=7, missing_frac=0.0
+    ).with_columns(pl.col("y") + shift)
+    h, n_windows = 3, 4
+
+    expected = _statsforecast_cv(panel, model, h, n_windows, season_length, freq)
+    result = batched_baselines.cross_validation(
+        panel, model, h=h, n_windows=n_windows, season_length=season_length
+    )
+
+    assert result.schema == expected.schema
+    assert result.select("unique_id", "ds", "cutoff", "y").equals(
+        expected.select("unique_id", "ds", "cutoff", "y")
+    )
+    alias = batched_baselines.BATCHED_MODELS[model]
+    np.testing.assert_allclose(
+        result[alias].to_numpy(), expected[alias].to_numpy(), rtol=1e-4, atol=1e-5
+    )
+
+
+@pytest.mark.parametrize("model", list(batched_baselines.BATCHED_MODELS))
+def test_batched_cv_matches_statsforecast_on_short_series(model):
+    panel = ftsfr_panel(n_series=30, n_obs=60, seed=3, missing_frac=0.0)
+    # A third of the series keep only 16-23 observations, so their first
+    # training windows (4-11) are shorter than one season. StatsForecast's
+    # Theta raises on 3 or fewer.
+    keep = {
+        uid: 16 + i % 8 if i % 3 == 0 else 60
+        for i, uid in enumerate(panel["unique_id"].unique(maintain_order=True))
+    }
+    panel = panel.filter(
+        pl.int_range(pl.len()).reverse().over("unique_id")
+        < pl.col("unique_id").replace_strict(keep)
+    )
+    h, n_windows = 3, 4
+
+    expected = _statsforecast_cv(panel, model, h, n_windows, 12, "1mo")
+    result = batched_baselines.cross_validation(
+        panel, model, h=h, n_windows=n_windows, season_length=12
+    )
+
+    assert result.select("unique_id", "ds", "cutoff", "y").equals(
+        expected.select("unique_id", "ds", "cutoff", "y")
+    )
+    alias = batched_baselines.BATCHED_MODELS[model]
+    np.testing.assert_allclose(
+        result[alias].to_numpy(), expected[alias].to_numpy(), rtol=1e-4, atol=1e-5
+    )
+
+
+def test_null_training_values_are_rejected():
+    panel = ftsfr_panel(n_series=3, n_obs=48, missing_frac=0.0)
+    panel = panel.with_columns(
+        pl.when(pl.int_range(pl.len()) == 5)
+        .then(None)
+        .otherwise(pl.col("y"))
+        .alias("y")
+    )
+    with pytest.raises(ValueError, match="Null y values"):
+        batched_baselines.cross_validation(panel, "ses", h=2, n_windows=2)
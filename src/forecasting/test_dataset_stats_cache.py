@@ -0,0 +1,90 @@
+"""
+Tests for the cached dataset statistics (dataset_stats_cache.py) and the
+row-group date range of create_dataset_statistics.py.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent))
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+import create_dataset_statistics as stats  # noqa: E402
+from dataset_stats_cache import compute_cached  # noqa: E402
+from synthetic_data import ftsfr_panel  # noqa: E402
+
+
+def _dataset_info(name):
+    return {
+        "dataset_name": name,
+        "table_name": name,
+        "short_name": name,
+        "group": "returns",
+        "frequency": "ME",
+        "seasonality": 12,
+        "module_name": "synthetic",
+    }
+
+
+@pytest.fixture
+def datasets(tmp_path, monkeypatch):
+    monkeypatch.setattr(stats, "DATA_DIR", tmp_path)
+    infos = [_dataset_info("ftsfr_a"), _dataset_info("ftsfr_b")]
+    for seed, info in enumerate(infos):
+        path = stats.formatted_dataset_path(info)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        ftsfr_panel(n_series=4, n_obs=36, seed=seed).write_parquet(path)
+    return infos
+
+
+def test_rerun_reads_the_cache_and_recomputes_only_changed_files(datasets, tmp_path):
+    computed = []
+
+    def counting_stats(info):
+        computed.append(info["dataset_name"])
+        return stats.calculate_dataset_statistics(info)
+
+    def run():
+        computed.clear()
+        return compute_cached(
+            counting_stats,
+            datasets,
+            dataset_path=stats.formatted_dataset_path,
+            cache_file=tmp_path / "cache.json",
+            code_files=[stats.__file__],
+            max_workers=2,
+        )
+
+    first = run()
+    assert sorted(computed) == ["ftsfr_a", "ftsfr_b"]
+    assert all(result["error"] is None for result in first)
+
+    assert run() == first
+    assert computed == []
+
+    path = stats.formatted_dataset_path(datasets[1])
+    mtime_ns = os.stat(path).st_mtime_ns
+    os.utime(path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+    assert run() == first
+    assert computed == ["ftsfr_b"]
+
+
+def test_date_range_falls_back_without_row_group_statistics(datasets):
+    info = datasets[0]
+    path = stats.formatted_dataset_path(info)
+    df = pl.read_parquet(path)
+    expected = (df["ds"].min(), df["ds"].max())
+    assert stats.parquet_date_range(path, "ds") == expected
+
+    pq.write_table(df.to_arrow(), path, write_statistics=False)
+    assert stats.parquet_date_range(path, "ds") is None
+
+    result = stats.calculate_dataset_statistics(info)
+    assert result["error"] is None
+    assert (result["min_date"], result["max_date"]) == tuple(map(str, expected))
@@ -0,0 +1,155 @@
+"""
+Tests that the forecasting CLIs exit on --skip-existing / --skip-daily without
+importing the heavy model frameworks.
+
+Most lines in forecasting_jobs.txt are no-ops on a rerun, so the skip path is
+measured with ``python -X importtime`` and checked against an import budget.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import polars as pl
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# Top-level packages that must never be imported before the skip decision.
+HEAVY_MODULES = {
+    "torch",
+    "neuralforecast",
+    "optuna",
+    "statsforecast",
+    "lightning",
+    "pytorch_lightning",
+    "numba",
+    "pandas",
+}
+
+# Cumulative import-time budget for the skip path, in seconds. Polars alone
+# takes ~0.2s; torch + neuralforecast take several seconds.
+IMPORT_TIME_BUDGET_SECONDS = 1.5
+
+DAILY_DATASET = "ftsfr_french_portfolios_25_daily_size_and_bm"
+MONTHLY_DATASET = "ftsfr_CDS_bond_basis_non_aggregated"
+
+
+def _write_valid_metrics(cwd, dataset, filename):
+    metrics_dir = cwd / "_output" / "forecasting" / "error_metrics" / dataset
+    metrics_dir.mkdir(parents=True, exist_ok=True)
+    pl.DataFrame(
+        {
+            "model_name": ["m"],
+            "dataset_name": [dataset],
+            "MASE": [0.9],
+            "MSE": [1.2],
+            "RMSE": [1.1],
+            "R2oos": [0.01],
+        }
+    ).write_csv(metrics_dir / filename)
+
+
+def _run_with_importtime(cwd, script, *args):
+    """Run a CLI under ``-X importtime`` and parse the report.
+
+    Returns (returncode, stdout, imported top-level packages, total seconds).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", str(SCRIPTS_DIR / script), *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    imported = set()
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header row
+        imported.add(name.strip().split(".")[0])
+        # Un-indented entries are direct imports whose cumulative time already
+        # includes everything they pulled in.
+        if not name.startswith("  "):
+            total_us += int(cumulative)
+    return result.returncode, result.stdout, imported, total_us / 1e6
+
+
+def _assert_light(imported, total_seconds):
+    heavy = sorted(HEAVY_MODULES & imported)
+    assert not heavy, f"Skip path imported heavy modules: {heavy}"
+    assert total_seconds < IMPORT_TIME_BUDGET_SECONDS, (
+        f"Skip-path import time {total_seconds:.2f}s exceeds "
+        f"{IMPORT_TIME_BUDGET_SECONDS}s budget"
+    )
+
+
+def test_neural_auto_skip_existing_is_light(tmp_path):
+    """--skip-existing exits 0 before torch/neuralforecast are imported."""
+    _write_valid_metrics(tmp_path, MONTHLY_DATASET, "auto_nlinear__mae.csv")
+    code, stdout, imported, total_seconds = _run_with_importtime(
+        tmp_path,
+        "forecast_neural_auto.py",
+        "--dataset",
+        MONTHLY_DATASET,
+        "--model",
+        "auto_nlinear",
+        "--loss",
+        "mae",
+        "--skip-existing",
+    )
+    assert code == 0
+    assert "valid metrics already exist" in stdout
+    _assert_light(imported, total_seconds)
+
+
+def test_neural_auto_skip_daily_is_light(tmp_path):
+    """--skip-daily exits 0 for a daily panel before any framework import."""
+    code, stdout, imported, total_seconds = _run_with_importtime(
+        tmp_path,
+        "forecast_neural_auto.py",
+        "--dataset",
+        DAILY_DATASET,
+        "--model",
+        "auto_nhits",
+        "--skip-daily",
+    )
+    assert code == 0
+    assert "daily frequency dataset" in stdout
+    _assert_light(imported, total_seconds)
+
+
+def test_neural_skip_existing_is_light(tmp_path):
+    """forecast_neural.py's --skip-existing path is equally light."""
+    _write_valid_metrics(tmp_path, MONTHLY_DATASET, "nhits.csv")
+    code, stdout, imported, total_seconds = _run_with_importtime(
+        tmp_path,
+        "forecast_neural.py",
+        "--dataset",
+        MONTHLY_DATASET,
+        "--model",
+        "nhits",
+        "--skip-existing",
+    )
+    assert code == 0
+    assert "valid metrics already exist" in stdout
+    _assert_light(imported, total_seconds)
+
+
+def test_stats_skip_existing_is_light(tmp_path):
+    """forecast_stats.py's --skip-existing path does not import statsforecast."""
+    _write_valid_metrics(tmp_path, MONTHLY_DATASET, "theta.csv")
+    code, stdout, imported, total_seconds = _run_with_importtime(
+        tmp_path,
+        "forecast_stats.py",
+        "--dataset",
+        MONTHLY_DATASET,
+        "--model",
+        "theta",
+        "--skip-existing",
+    )
+    assert code == 0
+    assert "valid metrics already exist" in stdout
+    _assert_light(imported, total_seconds)
@@ -0,0 +1,135 @@
+"""
+Tests for the pooled cross-dataset panels in global_panel.py.
+"""
+
+import sys
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent))
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import dataset_registry  # noqa: E402
+import global_panel  # noqa: E402
+from synthetic_data import ftsfr_panel  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def registry_snapshot(tmp_path, monkeypatch):
+    """Keep the registry snapshot out of the repo's _output."""
+    monkeypatch.setattr(
+        dataset_registry,
+        "default_snapshot_path",
+        lambda: tmp_path / dataset_registry.SNAPSHOT_NAME,
+    )
+    dataset_registry.clear_cache()
+    yield
+    dataset_registry.clear_cache()
+
+
+def test_group_datasets_share_frequency_and_seasonality():
+    names, seasonality = global_panel.group_datasets("ME")
+    assert len(names) > 1
+
+    from dataset_registry import load_registry
+
+    registry = load_registry(global_panel.REPO_ROOT / "datasets.toml")
+    for name in names:
+        assert registry[name]["frequency"] == "ME"
+        assert registry[name].get("seasonality", 252) == seasonality
+
+    subset, _ = global_panel.group_datasets(
+        "ME", seasonality=seasonality, datasets=names[:2]
+    )
+    assert subset == names[:2]
+    assert global_panel.group_name("ME", seasonality) == f"global_ME_s{seasonality}"
+
+
+def test_group_datasets_rejects_unknown_names():
+    with pytest.raises(ValueError, match="not found"):
+        global_panel.group_datasets("ME", datasets=["ftsfr_no_such_dataset"])
+    with pytest.raises(ValueError, match="No active datasets"):
+        global_panel.group_datasets("no_such_frequency")
+
+
+def test_pooled_panel_splits_back_into_datasets(monkeypatch):
+    panels = {
+        "ftsfr_a": ftsfr_panel(n_series=3, n_obs=24, seed=1, missing_frac=0.0),
+        "ftsfr_b": ftsfr_panel(n_series=1, n_obs=36, seed=2, missing_frac=0.0),
+    }
+    monkeypatch.setattr(
+        global_panel, "read_dataset_config", lambda name: {"data_path": name}
+    )
+    monkeypatch.setattr(global_panel, "load_panel", lambda path: panels[path])
+
+    pooled = global_panel.load_global_panel(["ftsfr_a", "ftsfr_b"])
+    assert len(pooled) == sum(len(panel) for panel in panels.values())
+    assert pooled["unique_id"].str.starts_with("ftsfr_a::").sum() == len(
+        panels["ftsfr_a"]
+    )
+
+    for name, panel in panels.items():
+        assert global_panel.dataset_frame(pooled, name).equals(
+            panel.select("unique_id", "ds", "y")
+        )
+    assert global_panel.series_shares(pooled) == {"ftsfr_a": 0.75, "ftsfr_b": 0.25}
+
+    limited = global_panel.load_global_panel(
+        ["ftsfr_a", "ftsfr_b"], max_series_per_dataset=2
+    )
+    assert limited.select(
+        global_panel.dataset_of(pl.col("unique_id")).alias("dataset"),
+        "unique_id",
+    ).unique().group_by("dataset").len().sort("dataset")["len"].to_list() == [2, 1]
+
+
+def test_pooled_cv_cutoffs_match_the_per_dataset_runs():
+    from statsforecast import StatsForecast
+    from statsforecast.models import Naive
+
+    from forecast_utils import determine_cv_windows
+
+    horizon = 6
+    panels = {
+        "ftsfr_a": ftsfr_panel(n_series=3, n_obs=80, seed=1, missing_frac=0.0),
+        "ftsfr_b": ftsfr_panel(n_series=2, n_obs=100, seed=2, missing_frac=0.0),
+        "ftsfr_c": ftsfr_panel(n_series=2, n_obs=30, seed=3, missing_frac=0.0),
+    }
+    pooled = pl.concat(
+        [
+            panel.with_columns(
+                pl.concat_str(pl.lit(f"{name}::"), pl.col("unique_id")).alias(
+                    "unique_id"
+                )
+            )
+            for name, panel in panels.items()
+        ]
+    )
+
+    windows = global_panel.dataset_cv_windows(pooled, horizon)
+    assert windows == {
+        name: determine_cv_windows(panel, horizon) for name, panel in panels.items()
+    }
+    # ftsfr_c is too short for the group's windows, so it stays out of the pool
+    assert windows["ftsfr_c"] < windows["ftsfr_a"] == windows["ftsfr_b"]
+    pooled = pooled.filter(
+        global_panel.dataset_of(pl.col("unique_id")).is_in(["ftsfr_a", "ftsfr_b"])
+    )
+
+    def cutoffs(df):
+        sf = StatsForecast(models=[Naive()], freq="1mo")
+        cv = sf.cross_validation(
+            df=df,
+            h=horizon,
+            step_size=horizon,
+            n_windows=determine_cv_windows(df, horizon),
+        )
+        return cv.select("unique_id", "ds", "cutoff").sort("unique_id", "ds")
+
+    pooled_cutoffs = cutoffs(pooled)
+    for name in ["ftsfr_a", "ftsfr_b"]:
+        assert global_panel.dataset_frame(pooled_cutoffs, name).equals(
+            cutoffs(panels[name])
+        )
@@ -0,0 +1,285 @@
+"""
+Tests for the persistent Optuna storage behind ``forecast_neural_auto.py --hpo-storage``.
+
+The Auto model is replaced by a stand-in exposing the attributes
+``BaseAuto._optuna_tune_model`` uses, so these run without torch. The
+pruning callback is also run inside a real NeuralForecast/Lightning fit when
+those are installed.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+optuna = pytest.importorskip("optuna")
+
+import hpo_storage  # noqa: E402
+from hpo_storage import (  # noqa: E402
+    build_pruner,
+    hpo_storage_path,
+    hpo_study_name,
+    open_journal_storage,
+    use_persistent_study,
+    use_pruner,
+)
+
+optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+DATASET = "ftsfr_test_dataset"
+MODEL = "auto_nlinear"
+
+
+def _config(trial):
+    return {
+        "input_size": trial.suggest_int("input_size", 1, 50),
+        "learning_rate": trial.suggest_float("learning_rate", 1e-4, 1e-1, log=True),
+        "max_steps": 500,
+        "loss": object(),
+        "valid_loss": object(),
+    }
+
+
+class _Fitted:
+    def __init__(self, val_loss):
+        self.metrics = {"ptl/val_loss": val_loss, "train_loss": val_loss + 1.0}
+
+
+class FakeAuto:
+    """Stand-in for ``BaseAuto`` with a deterministic validation loss."""
+
+    backend = "optuna"
+    callbacks = None
+
+    def __init__(self):
+        self.fitted_configs = []
+
+    def _fit_model(self, cls_model, config, dataset, val_size, test_size, **kwargs):
+        self.fitted_configs.append(config)
+        final_loss = abs(config["input_size"] - 20) + config["learning_rate"]
+        # Mimic the Lightning loop: validate every 50 steps, loss decaying
+        # towards final_loss, and honor trainer.should_stop.
+        trainer = SimpleNamespace(
+            sanity_checking=False, global_step=0, should_stop=False, callback_metrics={}
+        )
+        callbacks = config.get("callbacks") or []
+        for step in range(50, config["max_steps"] + 1, 50):
+            trainer.global_step = step
+            trainer.callback_metrics = {"ptl/val_loss": final_loss + 100.0 / step}
+            for callback in callbacks:
+                callback.on_validation_end(trainer, None)
+            if trainer.should_stop:
+                break
+        for callback in callbacks:
+            callback.on_train_end(trainer, None)
+        return _Fitted(trainer.callback_metrics["ptl/val_loss"])
+
+    def tune(self, num_samples):
+        return self._optuna_tune_model(
+            cls_model=None,
+            dataset=None,
+            val_size=1,
+            test_size=1,
+            verbose=False,
+            num_samples=num_samples,
+            search_alg=optuna.samplers.TPESampler(seed=0),
+            config=_config,
+            distributed_config=None,
+        )
+
+
+def _persistent(tmp_path, loss="mae"):
+    auto = FakeAuto()
+    use_persistent_study(auto, DATASET, MODEL, loss, False, hpo_dir=tmp_path)
+    return auto
+
+
+def _load(tmp_path, loss):
+    storage = open_journal_storage(hpo_storage_path(DATASET, MODEL, False, tmp_path))
+    return optuna.load_study(
+        study_name=hpo_study_name(DATASET, MODEL, loss, False), storage=storage
+    )
+
+
+def test_resume_runs_only_missing_trials(tmp_path):
+    first = _persistent(tmp_path)
+    first.tune(num_samples=3)
+    assert len(first.fitted_configs) == 3
+
+    second = _persistent(tmp_path)
+    second.tune(num_samples=5)
+    assert len(second.fitted_configs) == 2
+
+    third = _persistent(tmp_path)
+    third.tune(num_samples=5)
+    assert third.fitted_configs == []
+
+
+def test_best_trial_rebuilds_full_config(tmp_path):
+    results = _persistent(tmp_path).tune(num_samples=3)
+    all_params = results.best_trial.user_attrs["ALL_PARAMS"]
+
+    assert all_params["max_steps"] == 500
+    # Like the stock ALL_PARAMS: BaseAuto.fit re-attaches the loss objects.
+    assert "loss" not in all_params and "valid_loss" not in all_params
+    assert all_params["input_size"] == results.best_trial.params["input_size"]
+
+
+def test_interrupted_trial_is_requeued(tmp_path):
+    _persistent(tmp_path).tune(num_samples=2)
+    # A SLURM kill leaves the in-flight trial RUNNING in the journal.
+    killed = _load(tmp_path, "mae").ask()
+    _config(killed)
+
+    resumed = _persistent(tmp_path)
+    resumed.tune(num_samples=4)
+    assert len(resumed.fitted_configs) == 2
+    assert resumed.fitted_configs[0]["input_size"] == killed.params["input_size"]
+
+
+def test_new_loss_variant_warm_starts_from_sibling(tmp_path):
+    _persistent(tmp_path, loss="mae").tune(num_samples=6)
+    mae_best = _load(tmp_path, "mae").best_params
+
+    mse = _persistent(tmp_path, loss="mse")
+    mse.tune(num_samples=4)
+
+    assert len(mse.fitted_configs) == 4
+    assert mse.fitted_configs[0]["input_size"] == mae_best["input_size"]
+    # Both variants live in the same journal file.
+    assert hpo_storage_path(DATASET, MODEL, False, tmp_path).exists()
+
+
+def test_rejects_non_optuna_backend(tmp_path):
+    auto = FakeAuto()
+    auto.backend = "ray"
+    with pytest.raises(ValueError):
+        use_persistent_study(auto, DATASET, MODEL, "mae", False, hpo_dir=tmp_path)
+
+
+def _fake_pruning_callback(trial):
+    """Same protocol as hpo_storage's Lightning callback, without Lightning."""
+
+    class _Callback:
+        pruned = False
+        steps_trained = 0
+
+        def on_validation_end(self, trainer, pl_module):
+            trial.report(
+                trainer.callback_metrics["ptl/val_loss"], step=trainer.global_step
+            )
+            if trial.should_prune():
+                self.pruned = True
+                trainer.should_stop = True
+
+        def on_train_end(self, trainer, pl_module):
+            self.steps_trained = trainer.global_step
+
+    return _Callback()
+
+
+def test_pruner_stops_bad_trials_and_reports_savings(tmp_path, monkeypatch):
+    monkeypatch.setattr(hpo_storage, "make_pruning_callback", _fake_pruning_callback)
+    auto = _persistent(tmp_path)
+    use_pruner(auto, {"type": "median", "n_startup_trials": 2, "n_warmup_steps": 0})
+    results = auto.tune(num_samples=10)
+
+    summary = auto._hpo_summary
+    assert summary["n_trials"] == 10
+    assert summary["n_pruned"] > 0
+    assert summary["steps_budget"] == 10 * 500
+    trained = sum(
+        t.user_attrs["steps_trained"]
+        for t in results.get_trials(deepcopy=False)
+        if t.state.name == "PRUNED"
+    )
+    assert summary["steps_saved"] == summary["n_pruned"] * 500 - trained
+    assert summary["steps_saved"] > 0
+    # Pruned trials never become the incumbent.
+    assert results.best_trial.state.name == "COMPLETE"
+
+
+def test_none_pruner_leaves_search_untouched(tmp_path):
+    auto = FakeAuto()
+    use_pruner(auto, {"type": "none"})
+    assert not hasattr(auto, "_hpo_pruner")
+    assert "_optuna_tune_model" not in vars(auto)
+
+
+def test_build_pruner_from_frequency_settings():
+    from forecast_utils import get_pruner_config_from_frequency
+
+    daily = build_pruner(get_pruner_config_from_frequency("B"))
+    monthly = build_pruner(get_pruner_config_from_frequency("ME"))
+    assert isinstance(daily, optuna.pruners.HyperbandPruner)
+    assert isinstance(monthly, optuna.pruners.MedianPruner)
+    assert isinstance(
+        build_pruner(get_pruner_config_from_frequency("ME", "none")),
+        optuna.pruners.NopPruner,
+    )
+    with pytest.raises(ValueError):
+        build_pruner({"type": "asha"})
+
+
+def test_lightning_trainer_prunes_a_bad_trial(tmp_path):
+    """The real callback inside a NeuralForecast/Lightning fit."""
+    pytest.importorskip("pytorch_lightning")
+    pytest.importorskip("neuralforecast")
+    import numpy as np
+    import pandas as pd
+    from neuralforecast import NeuralForecast
+    from neuralforecast.auto import AutoNLinear
+    from optuna.trial import TrialState
+
+    def config(trial):
+        return {
+            "input_size": 12,
+            "learning_rate": trial.suggest_categorical("learning_rate", [1e-2, 1e-9]),
+            "max_steps": 40,
+            "val_check_steps": 5,
+            "random_seed": 1,
+            "enable_progress_bar": False,
+            "enable_model_summary": False,
+            "logger": False,
+            "enable_checkpointing": False,
+            "accelerator": "cpu",
+        }
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "unique_id": np.repeat(["a", "b"], 120),
+            "ds": np.tile(pd.date_range("2000-01-31", periods=120, freq="ME"), 2),
+            "y": np.sin(np.arange(240) / 3.0) + 5.0 + rng.normal(0, 0.05, 240),
+        }
+    )
+    auto = AutoNLinear(h=6, config=config, num_samples=2, backend="optuna")
+    use_persistent_study(auto, DATASET, MODEL, "mae", False, hpo_dir=tmp_path)
+    use_pruner(auto, {"type": "median", "n_startup_trials": 1, "n_warmup_steps": 0})
+    # First a learning config, then one that can't move off its initial loss.
+    study = optuna.create_study(
+        study_name=hpo_study_name(DATASET, MODEL, "mae", False),
+        storage=open_journal_storage(hpo_storage_path(DATASET, MODEL, False, tmp_path)),
+        direction="minimize",
+    )
+    study.enqueue_trial({"learning_rate": 1e-2})
+    study.enqueue_trial({"learning_rate": 1e-9})
+
+    nf = NeuralForecast(models=[auto], freq="ME")
+    nf.fit(df, val_size=12)
+    fitted = nf.models[0]
+
+    good, bad = _load(tmp_path, "mae").get_trials(deepcopy=False)
+    assert good.state == TrialState.COMPLETE
+    assert bad.state == TrialState.PRUNED
+    # A pruned trial leaves no metrics, only its progress (Optuna keeps its
+    # last reported loss as the value).
+    assert "METRICS" not in bad.user_attrs
+    assert bad.value == bad.intermediate_values[max(bad.intermediate_values)]
+    assert 0 < bad.user_attrs["steps_trained"] < bad.user_attrs["max_steps"]
+    assert fitted._hpo_summary["n_pruned"] == 1
+    assert fitted.results.best_trial.number == good.number
+    assert fitted.model.learning_rate == 1e-2
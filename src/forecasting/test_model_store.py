@@ -0,0 +1,121 @@
+"""
+Tests for the fitted-model artifact store in model_store.py.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent))
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import model_store  # noqa: E402
+from synthetic_data import ftsfr_panel  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def fitted_sf():
+    pytest.importorskip("statsforecast")
+    from statsforecast import StatsForecast
+    from statsforecast.models import AutoARIMA, SeasonalNaive, Theta
+
+    panel = ftsfr_panel(n_series=3, n_obs=48, seed=5, missing_frac=0.0)
+    sf = StatsForecast(
+        models=[AutoARIMA(season_length=12), Theta(season_length=12)],
+        freq="1mo",
+        fallback_model=SeasonalNaive(season_length=12),
+        n_jobs=1,
+    )
+    sf.fit(df=panel)
+    return sf, panel
+
+
+def test_stats_round_trip(tmp_path, fitted_sf):
+    sf, panel = fitted_sf
+    path = model_store.save_stats_forecaster(
+        sf, "ftsfr_x", "auto_arima", h=2, metadata={"seed": 5}, models_dir=tmp_path
+    )
+
+    assert path == tmp_path / "ftsfr_x" / "auto_arima"
+    assert not list(path.parent.glob("*.tmp"))
+    manifest = json.loads((path / model_store.MANIFEST_FILE).read_text())
+    assert manifest["kind"] == "stats"
+    assert manifest["aliases"] == ["AutoARIMA", "Theta"]
+
+    forecaster = model_store.load_forecaster(
+        "ftsfr_x", "auto_arima", models_dir=tmp_path
+    )
+    assert forecaster.predict().equals(sf.predict(h=2))
+
+    # Running the fitted models forward over their own history reproduces
+    # the stored forecasts, without re-selecting any order
+    forward = forecaster.predict(panel)
+    expected = sf.predict(h=2)
+    assert forward.select("unique_id", "ds").equals(expected.select("unique_id", "ds"))
+    for alias in ("AutoARIMA", "Theta"):
+        np.testing.assert_allclose(
+            forward[alias].to_numpy(), expected[alias].to_numpy(), rtol=1e-4
+        )
+
+
+def test_republish_replaces_and_matches_metadata(tmp_path, fitted_sf):
+    sf, _ = fitted_sf
+    for seed in (1, 2):
+        model_store.save_stats_forecaster(
+            sf, "ftsfr_x", "theta", metadata={"seed": seed}, models_dir=tmp_path
+        )
+
+    assert model_store.available_artifacts("ftsfr_x", tmp_path) == ["theta"]
+    assert (
+        model_store.load_matching_forecaster(
+            "ftsfr_x", "theta", {"seed": 1}, models_dir=tmp_path
+        )
+        is None
+    )
+    stored = model_store.load_matching_forecaster(
+        "ftsfr_x", "theta", {"seed": 2}, models_dir=tmp_path
+    )
+    assert stored.manifest["metadata"] == {"seed": 2}
+
+
+def test_run_suffix_resolution(tmp_path):
+    def publish(name):
+        staging = model_store.staging_dir("ftsfr_x", name, models_dir=tmp_path)
+        model_store.publish_artifact(
+            staging, {"kind": "stats", "model": name, "run_suffix": ""}
+        )
+
+    with pytest.raises(FileNotFoundError):
+        model_store._resolve("ftsfr_x", "auto_nhits", None, tmp_path)
+
+    publish("auto_nhits__mse")
+    assert model_store._resolve("ftsfr_x", "auto_nhits", None, tmp_path).name == (
+        "auto_nhits__mse"
+    )
+    publish("auto_nhits__mse__entityscale")
+    with pytest.raises(ValueError, match="Pass run_suffix"):
+        model_store._resolve("ftsfr_x", "auto_nhits", None, tmp_path)
+    publish("auto_nhits__mae")
+    assert model_store._resolve("ftsfr_x", "auto_nhits", None, tmp_path).name == (
+        "auto_nhits__mae"
+    )
+
+
+def test_json_safe_config_drops_objects():
+    config = {
+        "input_size": np.int64(24),
+        "lr": 1e-3,
+        "loss": object(),
+        "n_blocks": [1, 1, 1],
+        "callbacks": [object()],
+        "scaler": {"type": "robust", "fn": object()},
+    }
+    assert model_store.json_safe_config(config) == {
+        "input_size": 24,
+        "lr": 1e-3,
+        "n_blocks": [1, 1, 1],
+        "scaler": {"type": "robust"},
+    }
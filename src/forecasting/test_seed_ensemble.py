@@ -0,0 +1,83 @@
+"""
+Tests for the seed-ensemble refits in seed_ensemble.py.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent))
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from seed_ensemble import plan_seed_workers  # noqa: E402
+
+
+def test_cpu_node_runs_members_concurrently():
+    n_workers, n_threads = plan_seed_workers(
+        {"accelerator": "cpu", "cpu_count": 32}, n_members=4
+    )
+    assert n_workers == 4
+    assert n_threads == 8
+
+
+def test_small_cpu_node_keeps_minimum_thread_budget():
+    n_workers, n_threads = plan_seed_workers(
+        {"accelerator": "cpu", "cpu_count": 4}, n_members=4
+    )
+    assert n_workers == 2
+    assert n_threads == 2
+
+
+def test_gpu_and_single_member_stay_in_process():
+    assert plan_seed_workers({"accelerator": "gpu", "cpu_count": 32}, 4) == (1, None)
+    assert plan_seed_workers({"accelerator": "cpu", "cpu_count": 32}, 1) == (1, None)
+
+
+def test_worker_processes_match_in_process_fit(capsys):
+    pytest.importorskip("neuralforecast")
+    import numpy as np
+    from neuralforecast.losses.pytorch import MAE
+
+    from seed_ensemble import CV_KEYS, fit_seed_members
+    from synthetic_data import ftsfr_panel
+
+    df = ftsfr_panel(n_series=3, n_obs=60, seed=0, missing_frac=0.0)
+    # Full member configs as forecast_neural_auto.py builds them, loss
+    # objects included: those have to be pickled into the spawned workers.
+    cfgs = [
+        {
+            "h": 2,
+            "input_size": 12,
+            "max_steps": 10,
+            "val_check_steps": 5,
+            "loss": MAE(),
+            "valid_loss": MAE(),
+            "random_seed": seed,
+            "alias": f"NLinear_seed{seed}",
+            "enable_progress_bar": False,
+            "enable_model_summary": False,
+            "logger": False,
+            "enable_checkpointing": False,
+            "accelerator": "cpu",
+        }
+        for seed in (2, 3)
+    ]
+    args = ("NLinear", cfgs, df, "1mo", 6, 2, 2)
+
+    in_process = fit_seed_members(*args, {"accelerator": "gpu"})
+    # 4 CPUs, 2 members: two worker processes with 2 threads each
+    workers = fit_seed_members(*args, {"accelerator": "cpu", "cpu_count": 4})
+    assert "2 seed members in 2 processes" in capsys.readouterr().out
+
+    aliases = [cfg["alias"] for cfg in cfgs]
+    assert workers.columns == CV_KEYS + aliases
+    assert workers.height == in_process.height == 3 * 2 * 2
+    workers = workers.sort(CV_KEYS)
+    in_process = in_process.sort(CV_KEYS)
+    assert workers.select(CV_KEYS).equals(in_process.select(CV_KEYS))
+    for alias in aliases:
+        assert workers[alias].null_count() == 0
+        np.testing.assert_allclose(
+            workers[alias].to_numpy(), in_process[alias].to_numpy(), rtol=1e-4
+        )
@@ -0,0 +1,80 @@
+"""
+Tests for the CPU thread budget in thread_budget.py.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent))
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import thread_budget  # noqa: E402
+
+
+def test_cgroup_limits(tmp_path):
+    assert thread_budget.cgroup_cpu_limit(tmp_path) is None
+
+    (tmp_path / "cpu.max").write_text("max 100000\n")
+    assert thread_budget.cgroup_cpu_limit(tmp_path) is None
+    (tmp_path / "cpu.max").write_text("250000 100000\n")
+    assert thread_budget.cgroup_cpu_limit(tmp_path) == 3
+
+    v1 = tmp_path / "v1"
+    (v1 / "cpu,cpuacct").mkdir(parents=True)
+    (v1 / "cpu,cpuacct" / "cpu.cfs_quota_us").write_text("-1\n")
+    (v1 / "cpu,cpuacct" / "cpu.cfs_period_us").write_text("100000\n")
+    assert thread_budget.cgroup_cpu_limit(v1) is None
+    (v1 / "cpu,cpuacct" / "cpu.cfs_quota_us").write_text("800000\n")
+    assert thread_budget.cgroup_cpu_limit(v1) == 8
+
+
+def test_available_cpus_takes_the_tightest_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        thread_budget.os, "sched_getaffinity", lambda pid: set(range(64)), raising=False
+    )
+    (tmp_path / "cpu.max").write_text("1600000 100000\n")
+
+    assert thread_budget.available_cpus({}, tmp_path) == (16, "cgroup")
+    assert thread_budget.available_cpus({"SLURM_CPUS_PER_TASK": "8"}, tmp_path) == (
+        8,
+        "slurm",
+    )
+    assert thread_budget.available_cpus(
+        {"SLURM_CPUS_PER_TASK": "8", "FTSFR_CPUS": "32"}, tmp_path
+    ) == (32, "FTSFR_CPUS")
+    assert thread_budget.available_cpus({}, tmp_path / "missing") == (64, "affinity")
+
+
+def test_plan_splits_cpus_between_trials():
+    budget = thread_budget.plan_thread_budget(16, optuna_jobs=4, source="slurm")
+    assert budget["statsforecast_jobs"] == 16
+    assert budget["blas_threads"] == 1
+    assert budget["optuna_jobs"] * budget["torch_threads"] == 16
+    assert budget["torch_interop_threads"] == 1
+
+    small = thread_budget.plan_thread_budget(2, optuna_jobs=8)
+    assert small["optuna_jobs"] == 2
+    assert small["torch_threads"] == 1
+    assert small["cpu_source"] == "given"
+
+
+def test_apply_exports_and_traces(tmp_path, monkeypatch):
+    trace_file = tmp_path / "trace.jsonl"
+    # Leave a loaded torch's process-wide pools alone
+    monkeypatch.delitem(sys.modules, "torch", raising=False)
+    import instrumentation
+
+    monkeypatch.setitem(instrumentation._trace, "file", trace_file)
+    monkeypatch.setenv("FTSFR_TRACE", "1")
+    environ = {"OMP_NUM_THREADS": "64"}
+
+    budget = thread_budget.plan_thread_budget(8, source="slurm")
+    thread_budget.apply_thread_budget(budget, environ)
+
+    assert {environ[var] for var in thread_budget.THREAD_ENV_VARS} == {"1"}
+    record = json.loads(trace_file.read_text().splitlines()[-1])
+    assert record["stage"] == "thread_budget"
+    assert record["cpus"] == 8
+    assert record["cpu_source"] == "slurm"
+    assert record["torch_threads"] == 8
@@ -0,0 +1,104 @@
+"""
+Tests for the row/series selection behind training_sampler.py and for its
+Auto-model hooks.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent))
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from training_sampler import (  # noqa: E402
+    series_rows,
+    stratified_series_sample,
+    tail_panel,
+    tail_rows,
+)
+
+
+def test_tail_rows_keeps_last_observations_per_series():
+    indptr = np.array([0, 5, 7, 17])  # lengths 5, 2, 10
+    rows, new_indptr = tail_rows(indptr, 3)
+    assert new_indptr.tolist() == [0, 3, 5, 8]
+    assert rows.tolist() == [2, 3, 4, 5, 6, 14, 15, 16]
+
+
+def test_series_rows_selects_whole_series():
+    indptr = np.array([0, 5, 7, 17])
+    rows, new_indptr = series_rows(indptr, [0, 2])
+    assert new_indptr.tolist() == [0, 5, 15]
+    assert rows.tolist() == list(range(5)) + list(range(7, 17))
+
+
+def test_stratified_sample_covers_every_length_stratum():
+    lengths = np.concatenate([np.full(80, 100), np.full(20, 5000)])
+    idx = stratified_series_sample(lengths, 10, seed=1)
+    assert len(idx) == 10
+    assert len(set(idx.tolist())) == 10
+    assert (lengths[idx] == 5000).sum() == 2
+    assert stratified_series_sample(lengths, 500).tolist() == list(range(100))
+
+
+def test_tail_panel_matches_tail_rows():
+    df = pl.DataFrame(
+        {
+            "unique_id": ["a"] * 5 + ["b"] * 2,
+            "ds": list(range(5)) + list(range(2)),
+            "y": [float(i) for i in range(7)],
+        }
+    )
+    out = tail_panel(df, 3)
+    assert out["y"].to_list() == [2.0, 3.0, 4.0, 5.0, 6.0]
+
+
+def test_auto_fit_with_sampler(monkeypatch):
+    pytest.importorskip("neuralforecast")
+    from neuralforecast import NeuralForecast
+    from neuralforecast.auto import AutoNLinear
+    from neuralforecast.common._base_auto import BaseAuto
+
+    from synthetic_data import ftsfr_panel
+    from training_sampler import use_training_sampler
+
+    # 8 series of 40-80 observations
+    df = ftsfr_panel(n_series=8, n_obs=80, seed=0, missing_frac=0.0)
+    h, val_size, max_train_length = 2, 6, 20
+
+    seen = []
+    fit_model = BaseAuto._fit_model
+
+    def recording_fit_model(self, cls_model, config, dataset, *args, **kwargs):
+        seen.append((dataset.n_groups, int(np.diff(dataset.indptr).max())))
+        return fit_model(self, cls_model, config, dataset, *args, **kwargs)
+
+    monkeypatch.setattr(BaseAuto, "_fit_model", recording_fit_model)
+
+    def config(trial):
+        return {
+            "input_size": trial.suggest_categorical("input_size", [4, 8]),
+            "max_steps": 5,
+            "val_check_steps": 5,
+            "enable_progress_bar": False,
+            "enable_model_summary": False,
+            "logger": False,
+            "enable_checkpointing": False,
+            "accelerator": "cpu",
+        }
+
+    auto = AutoNLinear(h=h, config=config, num_samples=2, backend="optuna")
+    use_training_sampler(
+        auto, {"max_train_length": max_train_length, "hpo_max_series": 3}
+    )
+    NeuralForecast(models=[auto], freq="1mo").fit(df, val_size=val_size)
+
+    # HPO fits: the sampled series, capped lookback plus the validation tail.
+    # The final refit (refit_with_val=False, so no validation tail) sees
+    # every series.
+    *hpo_fits, refit = seen
+    assert hpo_fits == [(3, max_train_length + val_size)] * 2
+    assert refit == (8, max_train_length)
@@ -0,0 +1,169 @@
+"""
+CPU thread budget for the forecasting jobs.
+
+``os.cpu_count()`` reports every core of the node, not what the job may use.
+A SLURM task with 8 CPUs on a 64-core node still sees 64. StatsForecast's
+``n_jobs=-1`` then starts 64 workers, each with an OpenMP/MKL pool of its
+own, and torch's intra-op pool also claims all 64 cores. When several jobs
+share a node, this oversubscribes it heavily.
+
+This module reads the CPUs the job actually has (``FTSFR_CPUS`` override,
+SLURM allocation, cgroup quota, CPU affinity) and splits them:
+
+- StatsForecast (and the AutoARIMA order-reuse pool) get one worker per CPU,
+  each with single-threaded BLAS/OpenMP;
+- Optuna runs ``optuna_jobs`` trials at a time (1 unless asked for);
+- each trial's torch gets an equal share of intra-op threads, plus a few
+  inter-op threads.
+
+``apply_thread_budget`` exports the OMP/MKL/OpenBLAS variables (inherited by
+worker processes), sets torch's thread pools if torch is loaded, and writes
+the allocation to the job trace as a ``thread_budget`` stage.
+
+Usage:
+
+    budget = plan_thread_budget(optuna_jobs=2)
+    apply_thread_budget(budget)
+    sf = StatsForecast(..., n_jobs=budget["statsforecast_jobs"])
+"""
+
+import math
+import os
+import sys
+from pathlib import Path
+
+CGROUP_ROOT = Path("/sys/fs/cgroup")
+
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+# torch inter-op threads only run independent ops side by side; a few are
+# plenty, and each one is a full thread competing with the intra-op pool.
+MAX_INTEROP_THREADS = 4
+
+
+def slurm_cpu_limit(environ=None):
+    """CPUs SLURM allocated to this task, or None outside SLURM."""
+    environ = os.environ if environ is None else environ
+    for var in ("SLURM_CPUS_PER_TASK", "SLURM_CPUS_ON_NODE"):
+        try:
+            return max(1, int(environ[var]))
+        except (KeyError, ValueError):
+            continue
+    return None
+
+
+def cgroup_cpu_limit(root=CGROUP_ROOT):
+    """CPU quota of this process's cgroup (v2 or v1), or None if unlimited."""
+    root = Path(root)
+    try:
+        quota, period = (root / "cpu.max").read_text().split()[:2]
+        if quota == "max":
+            return None
+        return max(1, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    for cpu_dir in ("cpu", "cpu,cpuacct"):
+        try:
+            quota = int((root / cpu_dir / "cpu.cfs_quota_us").read_text())
+            period = int((root / cpu_dir / "cpu.cfs_period_us").read_text())
+        except (OSError, ValueError):
+            continue
+        if quota > 0 and period > 0:
+            return max(1, math.ceil(quota / period))
+    return None
+
+
+def available_cpus(environ=None, cgroup_root=CGROUP_ROOT):
+    """CPUs this job may use, and which limit decided it.
+
+    ``FTSFR_CPUS`` wins when set. Otherwise the tightest of the SLURM
+    allocation, the cgroup quota and the CPU affinity mask is used, falling
+    back to ``os.cpu_count()``.
+
+    Returns:
+        (number of CPUs, source) where source is "FTSFR_CPUS", "slurm",
+        "cgroup", "affinity" or "cpu_count"
+    """
+    environ = os.environ if environ is None else environ
+    if environ.get("FTSFR_CPUS"):
+        return max(1, int(environ["FTSFR_CPUS"])), "FTSFR_CPUS"
+
+    limits = {
+        "slurm": slurm_cpu_limit(environ),
+        "cgroup": cgroup_cpu_limit(cgroup_root),
+    }
+    if hasattr(os, "sched_getaffinity"):
+        limits["affinity"] = len(os.sched_getaffinity(0))
+    limits = {source: n for source, n in limits.items() if n}
+    if not limits:
+        return os.cpu_count() or 1, "cpu_count"
+    source = min(limits, key=limits.get)
+    return limits[source], source
+
+
+def plan_thread_budget(cpus=None, optuna_jobs=1, source=None):
+    """Split ``cpus`` (default: ``available_cpus()``) across the frameworks.
+
+    Returns a dict with ``cpus``, ``cpu_source``, ``statsforecast_jobs``,
+    ``blas_threads`` (per StatsForecast worker), ``optuna_jobs``,
+    ``torch_threads`` (intra-op, per trial) and ``torch_interop_threads``.
+    """
+    if cpus is None:
+        cpus, source = available_cpus()
+    cpus = max(1, int(cpus))
+    optuna_jobs = max(1, min(int(optuna_jobs), cpus))
+    torch_threads = max(1, cpus // optuna_jobs)
+    return {
+        "cpus": cpus,
+        "cpu_source": source or "given",
+        "statsforecast_jobs": cpus,
+        "blas_threads": 1,
+        "optuna_jobs": optuna_jobs,
+        "torch_threads": torch_threads,
+        "torch_interop_threads": max(1, min(MAX_INTEROP_THREADS, torch_threads // 4)),
+    }
+
+
+def apply_thread_budget(budget, environ=None):
+    """Export the budget's thread variables, pin torch, and trace it.
+
+    The environment variables take effect in libraries loaded afterwards
+    and in worker processes (StatsForecast, seed members). torch reads
+    them only at import, so its pools are also set directly when it is
+    already loaded.
+    """
+    environ = os.environ if environ is None else environ
+    for var in THREAD_ENV_VARS:
+        environ[var] = str(budget["blas_threads"])
+
+    if "torch" in sys.modules:
+        torch = sys.modules["torch"]
+        torch.set_num_threads(budget["torch_threads"])
+        try:
+            torch.set_num_interop_threads(budget["torch_interop_threads"])
+        except RuntimeError:
+            # Only settable once, before any inter-op parallel work ran
+            pass
+
+    from instrumentation import stage
+
+    with stage("thread_budget", **budget):
+        pass
+
+
+def describe_thread_budget(budget):
+    """One-line summary for the job log."""
+    return (
+        f"{budget['cpus']} CPUs ({budget['cpu_source']}): "
+        f"StatsForecast {budget['statsforecast_jobs']} workers x "
+        f"{budget['blas_threads']} BLAS thread, "
+        f"Optuna {budget['optuna_jobs']} parallel trial(s) x "
+        f"{budget['torch_threads']} torch threads "
+        f"(+{budget['torch_interop_threads']} inter-op)"
+    )
@@ -0,0 +1,180 @@
+"""
+Training-data sampler for the neural models on long (daily) panels.
+
+NeuralForecast left-pads every series to the longest history in the panel
+before unfolding training windows, so the cost of a training step grows with
+panel length even though each step only samples ``windows_batch_size``
+random windows. For the ``B``/``D`` datasets (decades of trading days) that
+made every Optuna trial too slow. ``use_training_sampler`` bounds it:
+
+- every training fit (HPO trials and the final refit) sees only the last
+  ``max_train_length`` observations of each series, plus the validation and
+  test tail NeuralForecast holds out, so the random windows are drawn from a
+  fixed-size slab regardless of how far back the data go;
+- during the hyperparameter search only, at most ``hpo_max_series`` series
+  are used, sampled proportionally from length strata so short and long
+  histories stay represented.
+
+Forecasts are unaffected by the lookback cap: prediction windows only need
+``input_size`` lags, and the final refit and CV forecasts cover every series.
+Settings live in ``TRAINING_SAMPLER_BY_FREQUENCY`` (forecast_utils.py).
+"""
+
+import types
+
+import numpy as np
+
+# Number of series-length strata used by the HPO subsample.
+N_LENGTH_STRATA = 5
+
+
+def tail_rows(indptr, max_length):
+    """Row indices keeping the last ``max_length`` rows of each series.
+
+    ``indptr`` is the CSR-style series offset array of a TimeSeriesDataset.
+    Returns (row indices, new indptr).
+    """
+    indptr = np.asarray(indptr, dtype=np.int64)
+    lengths = np.diff(indptr)
+    kept = np.minimum(lengths, max_length)
+    starts = indptr[1:] - kept
+    new_indptr = np.concatenate([[0], np.cumsum(kept)])
+    rows = np.repeat(starts - new_indptr[:-1], kept) + np.arange(new_indptr[-1])
+    return rows, new_indptr
+
+
+def series_rows(indptr, series_idx):
+    """Row indices of the series in ``series_idx`` (in that order).
+
+    Returns (row indices, new indptr).
+    """
+    indptr = np.asarray(indptr, dtype=np.int64)
+    series_idx = np.asarray(series_idx, dtype=np.int64)
+    starts = indptr[series_idx]
+    lengths = indptr[series_idx + 1] - starts
+    new_indptr = np.concatenate([[0], np.cumsum(lengths)])
+    rows = np.repeat(starts - new_indptr[:-1], lengths) + np.arange(new_indptr[-1])
+    return rows, new_indptr
+
+
+def stratified_series_sample(lengths, n_series, seed=0, n_strata=N_LENGTH_STRATA):
+    """Sorted indices of ``n_series`` series drawn across length strata.
+
+    Series are split into ``n_strata`` quantile bins of history length and
+    each bin contributes in proportion to its size (at least one series per
+    non-empty bin while the budget allows).
+    """
+    lengths = np.asarray(lengths)
+    n_total = len(lengths)
+    if n_series >= n_total:
+        return np.arange(n_total)
+
+    rng = np.random.default_rng(seed)
+    order = np.argsort(lengths, kind="stable")
+    strata = [s for s in np.array_split(order, min(n_strata, n_total)) if len(s)]
+    quotas = [max(1, round(n_series * len(s) / n_total)) for s in strata]
+    # Trim or top up the rounding so the quotas sum exactly to n_series.
+    while sum(quotas) > n_series:
+        quotas[int(np.argmax(quotas))] -= 1
+    while sum(quotas) < n_series:
+        spare = [len(s) - q for s, q in zip(strata, quotas)]
+        quotas[int(np.argmax(spare))] += 1
+
+    picked = [rng.choice(s, size=q, replace=False) for s, q in zip(strata, quotas)]
+    return np.sort(np.concatenate(picked))
+
+
+def _select_rows(dataset, rows, new_indptr, series_idx=None):
+    import torch
+    from neuralforecast.tsdataset import TimeSeriesDataset
+
+    static = dataset.static
+    if static is not None and series_idx is not None:
+        static = static[series_idx]
+    return TimeSeriesDataset(
+        temporal=dataset.temporal[torch.as_tensor(rows)],
+        temporal_cols=dataset.temporal_cols.copy(),
+        indptr=new_indptr.astype(np.int32),
+        y_idx=dataset.y_idx,
+        static=static,
+        static_cols=dataset.static_cols,
+    )
+
+
+def tail_dataset(dataset, max_length):
+    """TimeSeriesDataset with only the last ``max_length`` rows per series."""
+    if dataset.max_size <= max_length:
+        return dataset
+    rows, new_indptr = tail_rows(dataset.indptr, max_length)
+    return _select_rows(dataset, rows, new_indptr)
+
+
+def subsample_dataset(dataset, n_series, seed=0):
+    """TimeSeriesDataset restricted to a stratified sample of series."""
+    if dataset.n_groups <= n_series:
+        return dataset
+    series_idx = stratified_series_sample(np.diff(dataset.indptr), n_series, seed)
+    rows, new_indptr = series_rows(dataset.indptr, series_idx)
+    return _select_rows(dataset, rows, new_indptr, series_idx)
+
+
+def tail_panel(df, max_length):
+    """Polars panel keeping the last ``max_length`` rows of each series."""
+    return (
+        df.sort(["unique_id", "ds"])
+        .group_by("unique_id", maintain_order=True)
+        .tail(max_length)
+    )
+
+
+def _windowed_fit_model(
+    self, cls_model, config, dataset, val_size, test_size, distributed_config=None
+):
+    """``BaseAuto._fit_model`` on the last ``max_train_length`` observations.
+
+    The validation and test tails NeuralForecast masks out of training are
+    kept on top of the lookback cap.
+    """
+    max_length = self._training_sampler.get("max_train_length")
+    if max_length:
+        dataset = tail_dataset(dataset, max_length + val_size + test_size)
+    return type(self)._fit_model(
+        self,
+        cls_model=cls_model,
+        config=config,
+        dataset=dataset,
+        val_size=val_size,
+        test_size=test_size,
+        distributed_config=distributed_config,
+    )
+
+
+def _subsampled_optuna_tune_model(self, cls_model, dataset, *args, **kwargs):
+    """Run the wrapped search on a stratified subset of the series."""
+    n_series = self._training_sampler.get("hpo_max_series")
+    if n_series and dataset.n_groups > n_series:
+        print(
+            f"  HPO on {n_series} of {dataset.n_groups} series "
+            "(stratified by history length)"
+        )
+        dataset = subsample_dataset(
+            dataset, n_series, seed=self._training_sampler.get("seed", 0)
+        )
+    return self._unsampled_optuna_tune_model(cls_model, dataset, *args, **kwargs)
+
+
+def use_training_sampler(auto_model, sampler_config):
+    """Bound ``auto_model``'s training cost with the windowed sampler.
+
+    ``sampler_config`` holds ``max_train_length`` and ``hpo_max_series``
+    (either may be None/0 to disable it) and an optional ``seed``. Call after
+    ``use_persistent_study``/``use_pruner``: the HPO subsample wraps
+    whichever search those installed.
+    """
+    auto_model._training_sampler = dict(sampler_config)
+    auto_model._fit_model = types.MethodType(_windowed_fit_model, auto_model)
+    if sampler_config.get("hpo_max_series"):
+        auto_model._unsampled_optuna_tune_model = auto_model._optuna_tune_model
+        auto_model._optuna_tune_model = types.MethodType(
+            _subsampled_optuna_tune_model, auto_model
+        )
@@ -22,6 +22,7 @@ Data Sources:
 Code adapted with permission from https://github.com/Kunj121/CIP
 """
 
+import os
 import pandas as pd
 import matplotlib.pyplot as plt
 import sys
@@ -36,6 +37,10 @@ DATA_DIR = config("DATA_DIR")
 
 CURRENCIES = ["AUD", "CAD", "CHF", "EUR", "GBP", "JPY", "NZD", "SEK", "USD"]
 
+# Trailing dates of the previous output recomputed by an incremental update,
+# so that revised Bloomberg values near the end are picked up
+REFRESH_ROWS = 10
+
 
 def prepare_fx_data(spot_rates, interest_rates):
     """
@@ -235,35 +240,24 @@ def graph_fx_returns(fx_df, currency_list, region_name):
     plt.show()
 
 
-def calculate_fx(end_date="2025-03-01", data_dir=DATA_DIR):
-    """
-    Calculate foreign exchange daily returns for USD invested in foreign currencies.
-
-    Parameters
-    ----------
-    end_date : str
-        End date for the data
-    data_dir : Path, optional
-        Directory containing the FX data files. If None, uses DATA_DIR from settings.
-
-    Returns
-    -------
-    pd.DataFrame
-        DataFrame with FX returns for each currency
-        the formatting will be in long format, with the currency returns in a column
-    """
+def load_merged_fx_data(end_date="2025-03-01", data_dir=DATA_DIR):
+    """Load the Bloomberg FX data and prepare it with ``prepare_fx_data``."""
     data_dir = Path(data_dir)
-    # Load data
     spot_rates = pull_bbg_foreign_exchange.load_fx_spot_rates(data_dir=data_dir)
     interest_rates = pull_bbg_foreign_exchange.load_fx_interest_rates(data_dir=data_dir)
 
-    # Prepare data
     df_merged = prepare_fx_data(spot_rates, interest_rates)
     # Filter by end date
     if end_date:
         date = pd.Timestamp(end_date).date()
         df_merged = df_merged.loc[:date]
+    return df_merged
+
 
+def fx_returns_from_merged(df_merged):
+    """
+    Long FX returns (currency, date, returns) from ``prepare_fx_data`` output.
+    """
     # Compute FX
     df_merged = implied_daily_fx_returns(df_merged, CURRENCIES)
 
@@ -280,10 +274,105 @@ def calculate_fx(end_date="2025-03-01", data_dir=DATA_DIR):
     return df_long
 
 
+def calculate_fx(end_date="2025-03-01", data_dir=DATA_DIR):
+    """
+    Calculate foreign exchange daily returns for USD invested in foreign currencies.
+
+    Parameters
+    ----------
+    end_date : str
+        End date for the data
+    data_dir : Path, optional
+        Directory containing the FX data files. If None, uses DATA_DIR from settings.
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame with FX returns for each currency
+        the formatting will be in long format, with the currency returns in a column
+    """
+    df_merged = load_merged_fx_data(end_date=end_date, data_dir=data_dir)
+    return fx_returns_from_merged(df_merged)
+
+
+def update_fx_returns(previous, df_merged, refresh_rows=REFRESH_ROWS):
+    """
+    Extend previously computed FX returns to the dates of ``df_merged``.
+
+    Only the new dates and the last ``refresh_rows`` previous dates are
+    recomputed. A return at t needs the forward-filled spot and rate at t
+    and the spot at t-1, so the recomputation starts from one seed row that
+    holds the forward-filled values of the date before. Earlier returns are
+    taken from ``previous`` unchanged. If the currencies differ from
+    ``previous``, everything is recomputed.
+
+    Parameters
+    ----------
+    previous : pd.DataFrame
+        Earlier output of ``calculate_fx`` (or of this function)
+    df_merged : pd.DataFrame
+        Output of ``prepare_fx_data`` covering at least the previous dates
+
+    Returns
+    -------
+    pd.DataFrame
+        Equal to ``fx_returns_from_merged(df_merged)``
+    """
+    last_date = previous["date"].max() if not previous.empty else None
+    n_previous = 0 if last_date is None else int((df_merged.index <= last_date).sum())
+    start = max(0, n_previous - refresh_rows)
+    if start == 0:
+        return fx_returns_from_merged(df_merged)
+
+    seed = df_merged.iloc[:start].ffill().iloc[[-1]]
+    tail = fx_returns_from_merged(pd.concat([seed, df_merged.iloc[start:]]))
+    tail = tail[tail["date"] != seed.index[0]]
+    if set(tail["currency"]) != set(previous["currency"]):
+        return fx_returns_from_merged(df_merged)
+
+    # Same row order as a full rebuild: by currency, then date
+    order = {currency: i for i, currency in enumerate(tail["currency"].unique())}
+    kept = previous[previous["date"] < df_merged.index[start]]
+    return (
+        pd.concat([kept, tail])
+        .sort_values("currency", key=lambda s: s.map(order), kind="stable")
+        .reset_index(drop=True)
+    )
+
+
+def update_fx(previous, end_date="2025-03-01", data_dir=DATA_DIR):
+    """Incremental ``calculate_fx``: see ``update_fx_returns``."""
+    df_merged = load_merged_fx_data(end_date=end_date, data_dir=data_dir)
+    return update_fx_returns(previous, df_merged)
+
+
+def check_incremental(updated, end_date="2025-03-01", data_dir=DATA_DIR):
+    """Raise AssertionError unless ``updated`` equals a full rebuild."""
+    pd.testing.assert_frame_equal(
+        updated, calculate_fx(end_date=end_date, data_dir=data_dir)
+    )
+
+
+def write_parquet_atomic(df, path):
+    """Write ``df`` next to ``path`` and move it into place."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    df.to_parquet(tmp_path)
+    os.replace(tmp_path, path)
+
+
 if __name__ == "__main__":
-    # Calculate fx returns
-    fx_returns = calculate_fx()
+    path = DATA_DIR / "fx_returns.parquet"
+
+    # --INCREMENTAL=1 extends the existing output instead of rebuilding it
+    if config("INCREMENTAL", default="0") != "0" and path.exists():
+        fx_returns = update_fx(pd.read_parquet(path))
+        if config("CHECK_INCREMENTAL", default="0") != "0":
+            check_incremental(fx_returns)
+    else:
+        # Calculate fx returns
+        fx_returns = calculate_fx()
 
     # Save to parquet
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    fx_returns.to_parquet(DATA_DIR / "fx_returns.parquet")
+    write_parquet_atomic(fx_returns, path)
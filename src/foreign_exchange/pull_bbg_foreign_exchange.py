@@ -12,6 +12,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 import pandas as pd
 from settings import config
+from data_sources import bloomberg
 
 DATA_DIR = config("DATA_DIR")
 END_DATE = pd.Timestamp.today().strftime("%Y-%m-%d")
@@ -37,7 +38,7 @@ def pull_fx_data(start_date="1950-01-01", end_date=END_DATE):
         - 'interest_rates': Interest rates (OIS)
     """
     # import here to enchance compatibility with devices that don't support xbbg
-    from xbbg import blp
+    blp = bloomberg()
 
     # Tickers for interest rates (OIS)
     interest_rate_tickers = [
@@ -0,0 +1,67 @@
+"""
+Tests for the incremental update of the FX returns in calc_fx.py.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import calc_fx  # noqa: E402
+
+SPOT = ["AUD", "CAD", "CHF", "EUR", "GBP", "JPY", "NZD", "SEK"]
+RATES = ["ADS", "CDS", "SFS", "EUS", "BPS", "JYS", "NDS", "SKS", "USS"]
+
+
+def bloomberg_frame(dates, tickers, values):
+    df = pd.DataFrame(values, columns=[f"{t} Curncy_PX_LAST" for t in tickers])
+    df.insert(0, "index", [d.date() for d in dates])
+    return df
+
+
+@pytest.fixture
+def df_merged():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2020-01-01", periods=120)
+    n = len(dates)
+    spot = np.exp(rng.normal(0, 0.005, (n, len(SPOT))).cumsum(axis=0))
+    rates = 1.5 + rng.normal(0, 0.02, (n, len(RATES))).cumsum(axis=0)
+    # Gaps that are forward-filled across the update boundaries
+    spot[[0, 95, 96, 97, 108], [1, 3, 3, 3, 6]] = np.nan
+    rates[[96, 109], [0, 8]] = np.nan
+
+    return calc_fx.prepare_fx_data(
+        bloomberg_frame(dates, SPOT, spot),
+        bloomberg_frame(dates, [f"{r}OA" for r in RATES], rates),
+    )
+
+
+@pytest.mark.parametrize("n_previous", [1, 60, 108])
+def test_update_matches_a_full_rebuild(df_merged, n_previous):
+    full = calc_fx.fx_returns_from_merged(df_merged)
+    previous = calc_fx.fx_returns_from_merged(df_merged.iloc[:n_previous])
+
+    updated = calc_fx.update_fx_returns(previous, df_merged)
+    pd.testing.assert_frame_equal(updated, full)
+    # An update without new dates changes nothing
+    pd.testing.assert_frame_equal(calc_fx.update_fx_returns(full, df_merged), full)
+
+
+def test_revised_values_in_the_refresh_window_are_picked_up(df_merged):
+    previous = calc_fx.fx_returns_from_merged(df_merged.iloc[:108])
+
+    revised = df_merged.copy()
+    revised.iloc[103, revised.columns.get_loc("JPY_spot")] *= 1.01
+    updated = calc_fx.update_fx_returns(previous, revised)
+
+    pd.testing.assert_frame_equal(updated, calc_fx.fx_returns_from_merged(revised))
+
+    def jpy_return(df):
+        row = (df["currency"] == "JPY_return") & (df["date"] == revised.index[103])
+        return df.loc[row, "returns"].item()
+
+    assert jpy_return(updated) != pytest.approx(jpy_return(previous))
@@ -0,0 +1,424 @@
+"""
+instrumentation.py - Per-stage wall time, CPU time, memory and row traces
+
+Pipeline scripts and forecasting jobs record their named stages here
+instead of printing ``time.time()`` differences:
+
+    from instrumentation import configure_trace, stage, timed
+
+    configure_trace("forecast_stats", dataset="ftsfr_cip", model="auto_arima")
+
+    with stage("load") as st:
+        df = load_panel(path)
+        st.rows = len(df)
+
+    @timed()
+    def calc_returns(df):
+        ...
+
+Every finished stage appends one JSON line to
+``_output/traces/{script}.jsonl`` (``FTSFR_TRACE_DIR`` overrides the
+directory, ``FTSFR_TRACE=0`` disables writing) with:
+
+- ``run_id``, ``script``, ``stage`` and ``parent`` (the enclosing stage),
+  plus the context given to ``configure_trace`` (dataset, model, ...);
+- ``wall_s`` and ``cpu_s`` (this process), ``children_cpu_s`` (finished
+  worker processes, e.g. StatsForecast's n_jobs pool);
+- ``peak_rss_mb`` (process high-water mark when the stage ended) and
+  ``rss_growth_mb`` (how much the stage raised it);
+- ``rows`` when the stage reports them, and ``status`` ("ok"/"error").
+
+The report aggregates all trace files, shows which stages dominate each
+dataset, and flags stages whose latest run is much slower than before:
+
+    python ./src/instrumentation.py report
+    python ./src/instrumentation.py report --script forecast_stats --by dataset
+    python ./src/instrumentation.py report --csv _output/traces/summary.csv
+"""
+
+import argparse
+import functools
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# A stage is flagged when its latest run takes REGRESSION_FACTOR times the
+# median of the earlier runs (and at least REGRESSION_MIN_SECONDS longer)
+REGRESSION_FACTOR = 1.5
+REGRESSION_MIN_SECONDS = 1.0
+
+_trace = {
+    "script": Path(sys.argv[0]).stem or "python",
+    "run_id": uuid.uuid4().hex[:12],
+    "context": {},
+    "file": None,
+}
+_local = threading.local()
+_write_lock = threading.Lock()
+
+
+def trace_dir():
+    """Directory of the JSONL trace files."""
+    if os.environ.get("FTSFR_TRACE_DIR"):
+        return Path(os.environ["FTSFR_TRACE_DIR"])
+    from settings import config
+
+    return Path(config("OUTPUT_DIR")) / "traces"
+
+
+def configure_trace(script=None, trace_file=None, **context):
+    """Name the current run and attach context (dataset, model, ...).
+
+    Args:
+        script: Trace name; defaults to the running script's stem
+        trace_file: Explicit JSONL file (default: ``trace_dir()/{script}.jsonl``)
+        **context: Fields added to every record of this run
+    """
+    if script is not None:
+        _trace["script"] = script
+    if trace_file is not None:
+        _trace["file"] = Path(trace_file)
+    _trace["context"].update(context)
+
+
+def peak_rss_mb():
+    """High-water resident memory of this process in MB (None if unknown)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 2**20
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return usage.ru_maxrss / (2**20 if sys.platform == "darwin" else 1024)
+
+
+def _children_cpu():
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+class Stage:
+    """Measurements of one running stage; set ``rows`` inside the block."""
+
+    def __init__(self, name, parent, fields):
+        self.name = name
+        self.parent = parent
+        self.fields = fields
+        self.rows = None
+        self.wall_s = None
+        self.cpu_s = None
+
+    def record(self, status):
+        return {
+            "run_id": _trace["run_id"],
+            "script": _trace["script"],
+            "stage": self.name,
+            "parent": self.parent,
+            **_trace["context"],
+            **self.fields,
+            "start": self.start_time,
+            "wall_s": self.wall_s,
+            "cpu_s": self.cpu_s,
+            "children_cpu_s": self.children_cpu_s,
+            "peak_rss_mb": self.peak_rss_mb,
+            "rss_growth_mb": self.rss_growth_mb,
+            "rows": self.rows,
+            "status": status,
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+        }
+
+
+def _write(record):
+    if os.environ.get("FTSFR_TRACE", "1") == "0":
+        return
+    path = _trace["file"] or trace_dir() / f"{_trace['script']}.jsonl"
+    line = json.dumps(record, default=str) + "\n"
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with _write_lock, open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+    except OSError as e:
+        print(f"  Warning: could not write trace to {path}: {e}")
+
+
+@contextmanager
+def stage(name, rows=None, **fields):
+    """Time the enclosed block as stage ``name`` and append its trace record.
+
+    Nested stages record the enclosing stage's name as ``parent``.
+    """
+    stack = _stack()
+    st = Stage(name, stack[-1].name if stack else None, fields)
+    st.rows = rows
+    st.start_time = datetime.now().isoformat(timespec="milliseconds")
+    rss_before = peak_rss_mb()
+    children_before = _children_cpu()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    stack.append(st)
+    status = "error"
+    try:
+        yield st
+        status = "ok"
+    finally:
+        stack.pop()
+        st.wall_s = time.perf_counter() - wall_start
+        st.cpu_s = time.process_time() - cpu_start
+        st.children_cpu_s = _children_cpu() - children_before
+        st.peak_rss_mb = peak_rss_mb()
+        st.rss_growth_mb = (
+            st.peak_rss_mb - rss_before if rss_before is not None else None
+        )
+        _write(st.record(status))
+
+
+def _count_rows(result):
+    if isinstance(result, tuple) and result:
+        result = result[0]
+    shape = getattr(result, "shape", None)
+    if shape:
+        return int(shape[0])
+    return None
+
+
+def timed(name=None):
+    """Decorator recording each call as a stage (rows from the result's shape)."""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name or func.__name__) as st:
+                result = func(*args, **kwargs)
+                st.rows = _count_rows(result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+# --------------------------------------------------------------------
+# Report
+# --------------------------------------------------------------------
+def load_traces(directory=None, scripts=None):
+    """All trace records in ``directory`` as one polars DataFrame."""
+    import polars as pl
+
+    directory = Path(directory) if directory is not None else trace_dir()
+    frames = []
+    for path in sorted(directory.glob("*.jsonl")):
+        if scripts and path.stem not in scripts:
+            continue
+        records = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue  # partially written line
+        if records:
+            frames.append(pl.DataFrame(records, infer_schema_length=None))
+    if not frames:
+        return pl.DataFrame()
+    return pl.concat(frames, how="diagonal_relaxed")
+
+
+def summarize(df, by=()):
+    """Per-stage totals over all runs, slowest first."""
+    import polars as pl
+
+    keys = ["script", *[c for c in by if c in df.columns], "stage"]
+    return (
+        df.group_by(keys)
+        .agg(
+            pl.col("run_id").n_unique().alias("runs"),
+            pl.col("wall_s").sum().alias("wall_total_s"),
+            pl.col("wall_s").median().alias("wall_median_s"),
+            pl.col("cpu_s").sum().alias("cpu_total_s"),
+            pl.col("children_cpu_s").sum().alias("children_cpu_s"),
+            pl.col("peak_rss_mb").max().alias("peak_rss_mb"),
+            pl.col("rows").median().alias("rows_median"),
+            (pl.col("status") == "error").sum().alias("errors"),
+        )
+        .sort("wall_total_s", descending=True)
+    )
+
+
+def dominant_stages(df, by="dataset", top=3):
+    """The ``top`` stages by wall time within each ``by`` group, with shares.
+
+    Only top-level stages (no ``parent``) are compared, so a stage and its
+    sub-stages are not counted twice.
+    """
+    import polars as pl
+
+    if by not in df.columns:
+        return pl.DataFrame()
+    per_stage = (
+        df.filter(pl.col(by).is_not_null() & pl.col("parent").is_null())
+        .group_by(by, "script", "stage")
+        .agg(pl.col("wall_s").median().alias("wall_median_s"))
+    )
+    return (
+        per_stage.with_columns(
+            (pl.col("wall_median_s") / pl.col("wall_median_s").sum().over(by)).alias(
+                "share"
+            )
+        )
+        .sort([by, "wall_median_s"], descending=[False, True])
+        .group_by(by, maintain_order=True)
+        .head(top)
+    )
+
+
+def find_regressions(
+    df,
+    by=(),
+    factor=REGRESSION_FACTOR,
+    min_seconds=REGRESSION_MIN_SECONDS,
+):
+    """Stages whose latest run is ``factor`` times slower than their history.
+
+    The latest run of each (script, *by, stage) is compared with the median
+    wall time of all earlier runs.
+    """
+    import polars as pl
+
+    keys = ["script", *[c for c in by if c in df.columns], "stage"]
+    per_run = (
+        df.filter(pl.col("status") == "ok")
+        .group_by(*keys, "run_id")
+        .agg(pl.col("wall_s").sum(), pl.col("start").min())
+        .sort("start")
+    )
+    history = per_run.group_by(keys, maintain_order=True).agg(
+        pl.col("wall_s").last().alias("latest_s"),
+        pl.col("wall_s").head(pl.len() - 1).median().alias("baseline_s"),
+        (pl.len() - 1).alias("earlier_runs"),
+    )
+    return (
+        history.filter(pl.col("earlier_runs") > 0)
+        .with_columns((pl.col("latest_s") / pl.col("baseline_s")).alias("ratio"))
+        .filter(
+            (pl.col("ratio") >= factor)
+            & (pl.col("latest_s") - pl.col("baseline_s") >= min_seconds)
+        )
+        .sort("ratio", descending=True)
+    )
+
+
+def report(
+    directory=None,
+    scripts=None,
+    by=("dataset",),
+    top=3,
+    csv=None,
+    min_seconds=REGRESSION_MIN_SECONDS,
+):
+    """Print the summary, dominant stages and regressions; return exit code."""
+    import polars as pl
+
+    df = load_traces(directory, scripts)
+    if df.is_empty():
+        print(f"No traces found in {directory or trace_dir()}")
+        return 0
+    for column in ("dataset", "model", "parent"):
+        if column not in df.columns:
+            df = df.with_columns(pl.lit(None, dtype=pl.String).alias(column))
+
+    with pl.Config(tbl_rows=-1, tbl_cols=-1, tbl_width_chars=200, float_precision=3):
+        print("=" * 60)
+        print(f"Stage summary ({df['run_id'].n_unique()} runs)")
+        print("=" * 60)
+        summary = summarize(df, by)
+        print(summary)
+
+        for column in by:
+            dominant = dominant_stages(df, column, top)
+            if dominant.is_empty():
+                continue
+            print(f"\nDominant stages per {column} (top {top})")
+            print("-" * 40)
+            print(dominant)
+
+        regressions = find_regressions(df, by, min_seconds=min_seconds)
+        print(f"\nRegressions (latest run >= {REGRESSION_FACTOR}x earlier median)")
+        print("-" * 40)
+        if regressions.is_empty():
+            print("None")
+        else:
+            print(regressions)
+
+    if csv:
+        Path(csv).parent.mkdir(parents=True, exist_ok=True)
+        summary.write_csv(csv)
+        print(f"\nSummary written to {csv}")
+    return 1 if not regressions.is_empty() else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stage trace report")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    report_parser = subparsers.add_parser(
+        "report", help="Aggregate traces, show dominant stages and regressions"
+    )
+    report_parser.add_argument("--trace-dir", type=Path, default=None)
+    report_parser.add_argument(
+        "--script", action="append", help="Only these trace files (repeatable)"
+    )
+    report_parser.add_argument(
+        "--by",
+        action="append",
+        help="Context fields to group by (default: dataset; repeatable)",
+    )
+    report_parser.add_argument("--top", type=int, default=3)
+    report_parser.add_argument("--csv", type=Path, default=None)
+    report_parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=REGRESSION_MIN_SECONDS,
+        help="Ignore slowdowns smaller than this many seconds",
+    )
+    report_parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit with status 1 if any regression is found",
+    )
+    args = parser.parse_args()
+
+    status = report(
+        args.trace_dir,
+        scripts=args.script,
+        by=tuple(args.by or ["dataset"]),
+        top=args.top,
+        csv=args.csv,
+        min_seconds=args.min_seconds,
+    )
+    return status if args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
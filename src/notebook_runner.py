@@ -0,0 +1,436 @@
+"""
+notebook_runner.py - Execute summary notebooks in a pool of warm kernels
+
+`dodo_common.notebook_subtask` used to turn every summary ``*_ipynb.py`` into
+a notebook with ``ipynb-py-convert``, execute it with
+``jupyter nbconvert --execute`` in a fresh kernel and run nbconvert a second
+time for the HTML. Each notebook paid for several Python start-ups and
+re-imported pandas/polars/matplotlib from scratch.
+
+This module executes notebooks in long-lived kernels instead:
+
+- the ``# %%`` source is split into cells in-process (same rules as
+  ipynb-py-convert), so nothing is written next to the source;
+- kernels are started once per process, warmed with the heavy imports and
+  reused for every notebook; each notebook runs in its own working
+  directory with a clean user namespace, and ``sys.path`` entries and
+  project modules it added are removed afterwards;
+- matplotlib rcParams and pandas options a notebook changes are reset
+  when it ends;
+- ``pandas.read_parquet`` and ``polars.read_parquet`` are memoized inside
+  the kernel (keyed by path, size and mtime), so notebooks reading the same
+  data files load them once; callers get copies. The cache is an LRU bounded
+  by ``NOTEBOOK_READ_CACHE_MB`` (default 2048) of frame memory;
+- the HTML and the executed ``.ipynb`` are rendered from the executed
+  notebook in memory.
+
+doit uses it with ``NOTEBOOK_RUNNER=kernel`` (see
+``dodo_common.notebook_subtask``); by default notebooks still run through
+``jupyter nbconvert --execute``::
+
+    (run_notebook_action, [source_path, name, output_dir])
+
+or standalone, executing several notebooks on a pool of kernels::
+
+    python ./src/notebook_runner.py src/cip/summary_cip_ipynb.py ... --workers 4
+"""
+
+import argparse
+import atexit
+import functools
+import os
+import queue
+import sys
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+KERNEL_NAME = "ftsfr"
+CELL_MARKER = "# %%\n"
+
+# Code run in a kernel when it starts and around every notebook. It calls
+# back into this module, which the kernel imports from src/ (PYTHONPATH).
+WARMUP_CODE = "import notebook_runner; notebook_runner.kernel_warmup()"
+ENTER_CODE = "import notebook_runner; notebook_runner.kernel_enter({cwd!r})"
+EXIT_CODE = "import notebook_runner; notebook_runner.kernel_exit()"
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# Default memory budget of the in-kernel read cache
+READ_CACHE_MB = 2048
+
+
+# --------------------------------------------------------------------
+# Source conversion
+# --------------------------------------------------------------------
+def split_py_cells(py_source):
+    """[(cell_type, source)] of a ``# %%`` script, as ipynb-py-convert reads it.
+
+    Chunks that start with a triple-quoted string are markdown cells.
+    """
+    if py_source.startswith(CELL_MARKER):
+        py_source = py_source[len(CELL_MARKER) :]
+    cells = []
+    for chunk in py_source.split("\n\n" + CELL_MARKER):
+        if chunk.startswith("'''"):
+            cells.append(("markdown", chunk.strip("'\n")))
+        elif chunk.startswith('"""'):
+            cells.append(("markdown", chunk.strip('"\n')))
+        else:
+            cells.append(("code", chunk.strip("\n")))
+    return cells
+
+
+def read_notebook(source_path):
+    """nbformat notebook for a ``.py`` (``# %%``) or ``.ipynb`` source."""
+    import nbformat
+
+    source_path = Path(source_path)
+    if source_path.suffix == ".ipynb":
+        return nbformat.read(source_path, as_version=4)
+    nb = nbformat.v4.new_notebook()
+    for cell_type, source in split_py_cells(source_path.read_text()):
+        if cell_type == "markdown":
+            nb.cells.append(nbformat.v4.new_markdown_cell(source))
+        else:
+            nb.cells.append(nbformat.v4.new_code_cell(source))
+    return nb
+
+
+# --------------------------------------------------------------------
+# Kernel-side helpers (executed inside the warm kernels)
+# --------------------------------------------------------------------
+_kernel_state = {}
+
+
+def cached_reader(read, copy, size, max_bytes=READ_CACHE_MB * 1024**2):
+    """Memoize a ``read(path, ...)`` data loader on path, size and mtime.
+
+    Non-path sources (buffers, URLs, globs) are passed through. Each call
+    returns ``copy(frame)`` so callers can't modify the cached frame. The
+    least recently used frames are dropped once their ``size(frame)`` adds
+    up to more than ``max_bytes``; a larger frame isn't cached at all.
+    """
+    cache = OrderedDict()
+    sizes = {}
+
+    @functools.wraps(read)
+    def cached(source, *args, **kwargs):
+        try:
+            stat = os.stat(source)
+        except (OSError, TypeError, ValueError):
+            return read(source, *args, **kwargs)
+        key = (
+            os.path.abspath(source),
+            stat.st_size,
+            stat.st_mtime_ns,
+            repr(args),
+            repr(sorted(kwargs.items())),
+        )
+        if key in cache:
+            cache.move_to_end(key)
+            return copy(cache[key])
+
+        frame = read(source, *args, **kwargs)
+        frame_size = size(frame)
+        if frame_size > max_bytes:
+            return frame
+        cache[key] = frame
+        sizes[key] = frame_size
+        while sum(sizes.values()) > max_bytes:
+            oldest, _ = cache.popitem(last=False)
+            del sizes[oldest]
+        return copy(frame)
+
+    cached.cache = cache
+    return cached
+
+
+def kernel_warmup():
+    """Import the heavy libraries and install the data-load cache."""
+    import matplotlib.pyplot  # noqa: F401
+    import numpy  # noqa: F401
+    import pandas
+    import polars
+
+    from settings import config
+
+    max_bytes = int(config("NOTEBOOK_READ_CACHE_MB", default=READ_CACHE_MB)) * 1024**2
+    if not hasattr(pandas.read_parquet, "cache"):
+        pandas.read_parquet = cached_reader(
+            pandas.read_parquet,
+            lambda df: df.copy(),
+            lambda df: int(df.memory_usage(index=True, deep=True).sum()),
+            max_bytes=max_bytes,
+        )
+        polars.read_parquet = cached_reader(
+            polars.read_parquet,
+            lambda df: df.clone(),
+            lambda df: int(df.estimated_size()),
+            max_bytes=max_bytes,
+        )
+    _kernel_state["home"] = os.getcwd()
+
+
+def kernel_enter(cwd):
+    """Start a notebook: snapshot sys.path/sys.modules/rcParams, move to ``cwd``."""
+    import matplotlib
+
+    _kernel_state["sys_path"] = list(sys.path)
+    _kernel_state["modules"] = set(sys.modules)
+    # Restored in kernel_exit, like leaving a ``with matplotlib.rc_context()``
+    rc_context = matplotlib.rc_context()
+    rc_context.__enter__()
+    _kernel_state["rc_context"] = rc_context
+    os.chdir(cwd)
+
+
+def kernel_exit():
+    """End a notebook: clear its namespace, settings, sys.path and project modules."""
+    try:
+        from IPython import get_ipython
+
+        shell = get_ipython()
+    except ImportError:
+        shell = None
+    if shell is not None:
+        shell.run_line_magic("reset", "-f")
+    try:
+        import matplotlib.pyplot as plt
+
+        plt.close("all")
+    except ImportError:
+        pass
+    rc_context = _kernel_state.pop("rc_context", None)
+    if rc_context is not None:
+        rc_context.__exit__(None, None, None)
+    try:
+        import pandas
+
+        # A fresh kernel has the defaults; resetting also sets the
+        # deprecated options, which warn
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", FutureWarning)
+            pandas.reset_option("all", silent=True)
+    except ImportError:
+        pass
+
+    sys.path[:] = _kernel_state.pop("sys_path", sys.path)
+    # Project modules are dropped so that, e.g., two modules' misc_tools.py
+    # never shadow each other; third-party imports stay warm
+    known = _kernel_state.pop("modules", set(sys.modules))
+    for name in set(sys.modules) - known:
+        module_file = getattr(sys.modules[name], "__file__", None) or ""
+        if module_file and Path(module_file).resolve().is_relative_to(PROJECT_DIR):
+            del sys.modules[name]
+    os.chdir(_kernel_state.get("home", os.getcwd()))
+
+
+# --------------------------------------------------------------------
+# Kernel pool (client side)
+# --------------------------------------------------------------------
+class KernelPool:
+    """Warm kernels handed out to one notebook at a time."""
+
+    def __init__(self, size=1, kernel_name=KERNEL_NAME):
+        self.size = size
+        self.kernel_name = kernel_name
+        self._idle = queue.Queue()
+        self._kernels = []
+        self._lock = threading.Lock()
+        self._n_started = 0
+
+    def _start_kernel(self):
+        from jupyter_client.manager import KernelManager
+
+        km = KernelManager(kernel_name=self.kernel_name)
+        km.start_kernel(
+            cwd=str(PROJECT_DIR), env={**os.environ, "PYTHONPATH": _pythonpath()}
+        )
+        kc = km.client()
+        kc.start_channels()
+        kc.wait_for_ready(timeout=120)
+        _run_hidden(kc, WARMUP_CODE)
+        with self._lock:
+            self._kernels.append((km, kc))
+        return km, kc
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            start = self._n_started < self.size
+            if start:
+                self._n_started += 1
+        if start:
+            try:
+                return self._start_kernel()
+            except BaseException:
+                with self._lock:
+                    self._n_started -= 1
+                raise
+        return self._idle.get()
+
+    def release(self, kernel):
+        self._idle.put(kernel)
+
+    def discard(self, kernel):
+        """Shut down a kernel left in an unknown state (e.g. after an error)."""
+        km, kc = kernel
+        with self._lock:
+            self._kernels.remove(kernel)
+            self._n_started -= 1
+        kc.stop_channels()
+        km.shutdown_kernel(now=True)
+
+    def shutdown(self):
+        for km, kc in self._kernels:
+            kc.stop_channels()
+            km.shutdown_kernel(now=True)
+        self._kernels = []
+        self._n_started = 0
+        self._idle = queue.Queue()
+
+
+def _pythonpath():
+    src = str(PROJECT_DIR / "src")
+    existing = os.environ.get("PYTHONPATH")
+    return src + (os.pathsep + existing if existing else "")
+
+
+def _run_hidden(kc, code):
+    """Run setup code in the kernel outside the notebook's history."""
+    reply = kc.execute_interactive(
+        code, store_history=False, output_hook=lambda msg: None, timeout=600
+    )
+    if reply["content"]["status"] != "ok":
+        content = reply["content"]
+        raise RuntimeError(f"{content.get('ename')}: {content.get('evalue')}")
+
+
+def _renumber_execution_counts(nb):
+    """Start In[]/Out[] numbering at 1 despite the kernel being reused."""
+    count = 0
+    for cell in nb.cells:
+        if cell.cell_type != "code" or cell.get("execution_count") is None:
+            continue
+        count += 1
+        cell.execution_count = count
+        for output in cell.outputs:
+            if output.get("output_type") == "execute_result":
+                output.execution_count = count
+
+
+_default_pool = None
+
+
+def default_pool():
+    """Process-wide pool (one kernel) shared by the doit notebook tasks."""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = KernelPool(size=1)
+        atexit.register(_default_pool.shutdown)
+    return _default_pool
+
+
+def run_notebook(source_path, name, output_dir, pool=None):
+    """Execute a notebook on a warm kernel and write its HTML and .ipynb.
+
+    Writes ``output_dir/{name}.html`` and
+    ``output_dir/_notebook_build/{name}.ipynb``. Cells run with the source's
+    directory as working directory, as they did under nbconvert.
+    """
+    import nbformat
+    from nbclient import NotebookClient
+    from nbconvert import HTMLExporter
+    from nbconvert.preprocessors import ClearMetadataPreprocessor
+
+    source_path = Path(source_path).resolve()
+    output_dir = Path(output_dir)
+    pool = pool or default_pool()
+    nb = read_notebook(source_path)
+
+    kernel = pool.acquire()
+    km, kc = kernel
+    try:
+        _run_hidden(kc, ENTER_CODE.format(cwd=str(source_path.parent)))
+        # No per-cell timeout, as with nbconvert --execute before
+        client = NotebookClient(nb, km=km, timeout=None, allow_errors=False)
+        client.kc = kc
+        client.execute()
+        _run_hidden(kc, EXIT_CODE)
+    except BaseException:
+        pool.discard(kernel)
+        raise
+    pool.release(kernel)
+
+    _renumber_execution_counts(nb)
+    nb, _ = ClearMetadataPreprocessor(enabled=True).preprocess(nb, {})
+    nb.metadata["kernelspec"] = {
+        "name": pool.kernel_name,
+        "display_name": "Python (ftsfr)",
+        "language": "python",
+    }
+
+    build_dir = output_dir / "_notebook_build"
+    build_dir.mkdir(parents=True, exist_ok=True)
+    nbformat.write(nb, build_dir / f"{name}.ipynb")
+    html, _ = HTMLExporter().from_notebook_node(nb)
+    (output_dir / f"{name}.html").write_text(html, encoding="utf-8")
+
+
+def run_notebook_action(source_path, name, output_dir):
+    """doit python-action wrapper around ``run_notebook``."""
+    start = time.time()
+    print(f"Start {name}", file=sys.stderr)
+    try:
+        run_notebook(source_path, name, output_dir)
+    except Exception as e:
+        print(f"Error executing {name}: {e}", file=sys.stderr)
+        return False
+    print(f"End {name}: {time.time() - start:.1f}s", file=sys.stderr)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Execute summary notebooks on a pool of warm kernels"
+    )
+    parser.add_argument("notebooks", type=Path, nargs="+")
+    parser.add_argument("--output-dir", type=Path, default=None)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    if args.output_dir is None:
+        from settings import config
+
+        args.output_dir = Path(config("OUTPUT_DIR"))
+
+    pool = KernelPool(size=args.workers)
+
+    def run(path):
+        name = path.stem
+        start = time.time()
+        try:
+            run_notebook(path, name, args.output_dir, pool=pool)
+        except Exception as e:
+            print(f"  {name}: FAILED ({e})")
+            return False
+        print(f"  {name}: {time.time() - start:.1f}s")
+        return True
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            ok = list(executor.map(run, args.notebooks))
+    finally:
+        pool.shutdown()
+    return 0 if all(ok) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -19,7 +19,9 @@ DATA_DIR = config("DATA_DIR")
 
 
 ## nyu_call_report_leverage
-df_all = pull_nyu_call_report.load_nyu_call_report(data_dir=DATA_DIR)
+df_all = pull_nyu_call_report.load_nyu_call_report(
+    data_dir=DATA_DIR, columns=pull_nyu_call_report.FTSFR_COLUMNS
+)
 # df_all.info(verbose=True)
 
 # Filter out invalid equity values before division
@@ -3,6 +3,9 @@ Download, unzip, and format the NYU Call Report data found here:
 https://pages.stern.nyu.edu/~pschnabl/data/data_callreport.htm
 
 The data dictionary alongside the source code
+
+The .dta is converted to parquet in chunks (``convert_call_report_dta``), so
+the full file is never held in memory.
 """
 
 import sys
@@ -21,36 +24,46 @@ from settings import config
 
 DATA_DIR = config("DATA_DIR")
 
+NYU_CALL_REPORT_URL = (
+    "https://pages.stern.nyu.edu/~pschnabl/research/callreports_1976_2020_WRDS.dta.zip"
+)
+
+# Rows read from the .dta (and written as one parquet row group) at a time
+CHUNKSIZE = 250_000
+
+# Identifier and date columns, stored as strings (missing as null)
+COLUMNS_TO_CONVERT_TO_INT = [
+    "rssdid",
+    "chartertype",
+    "cert",
+    "bhcid",
+    "date",
+    "year",
+    "month",
+    "quarter",
+    "day",
+]
+
+# Columns used by create_ftsfr_datasets.py
+FTSFR_COLUMNS = ["rssdid", "bhcid", "date", "assets", "equity", "cash"]
+
 
-def pull_nyu_call_report(data_dir=DATA_DIR, delete_temp_files=True):
-    # Download the file
-    url = "https://pages.stern.nyu.edu/~pschnabl/research/callreports_1976_2020_WRDS.dta.zip"
+def download_nyu_call_report(data_dir=DATA_DIR):
+    """Downloads and unzips the call report; returns the path of the .dta."""
     zip_path = data_dir / "callreports_1976_2020_WRDS.dta.zip"
     os.makedirs(data_dir, exist_ok=True)
-    urllib.request.urlretrieve(url, zip_path)
+    urllib.request.urlretrieve(NYU_CALL_REPORT_URL, zip_path)
 
-    # Unzip the file
     with zipfile.ZipFile(zip_path, "r") as zip_ref:
         zip_ref.extractall(data_dir)
+    os.remove(zip_path)
+    return data_dir / "callreports_1976_2020_WRDS.dta"
 
-    # Load the file into a pandas dataframe
-    data_path = data_dir / "callreports_1976_2020_WRDS.dta"
-    df = pd.read_stata(data_path)
-
-    if delete_temp_files:
-        os.remove(zip_path)
-        os.remove(data_path)
 
+def format_call_report(df):
+    """Casts the identifier and date columns present in ``df``."""
     columns_to_convert_to_int = [
-        "rssdid",
-        "chartertype",
-        "cert",
-        "bhcid",
-        "date",
-        "year",
-        "month",
-        "quarter",
-        "day",
+        col for col in COLUMNS_TO_CONVERT_TO_INT if col in df.columns
     ]
     df[columns_to_convert_to_int] = (
         df[columns_to_convert_to_int].fillna(99999).astype("int")
@@ -64,14 +77,99 @@ def pull_nyu_call_report(data_dir=DATA_DIR, delete_temp_files=True):
     # df[columns_to_convert_to_int].head()
     # df[columns_to_convert_to_int].isna().sum()
 
-    df["date"] = pd.to_datetime(df["date"])
-
+    if "date" in df.columns:
+        df["date"] = pd.to_datetime(df["date"])
     return df
 
 
-def load_nyu_call_report(data_dir=DATA_DIR):
+def _chunk_schema(table):
+    """Schema for every chunk, taken from the first one.
+
+    A column that is entirely missing in the first chunk comes out as the
+    null type; its values are strings in the chunks that have any.
+    """
+    import pyarrow as pa
+
+    fields = [
+        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+        for field in table.schema
+    ]
+    return pa.schema(fields)
+
+
+def convert_call_report_dta(dta_path, parquet_path, columns=None, chunksize=CHUNKSIZE):
+    """
+    Converts the call report .dta to parquet one chunk at a time.
+
+    Each chunk of ``chunksize`` rows is read (only ``columns``, if given),
+    formatted with ``format_call_report`` and written as its own row group,
+    so peak memory is bounded by the chunk size rather than the file.
+    The parquet file is written next to its destination and moved into
+    place at the end.
+
+    Returns:
+        int: Number of rows written.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parquet_path = Path(parquet_path)
+    parquet_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = parquet_path.with_suffix(f".{os.getpid()}.tmp")
+
+    writer = None
+    schema = None
+    n_rows = 0
+    try:
+        with pd.read_stata(dta_path, columns=columns, chunksize=chunksize) as reader:
+            for chunk in reader:
+                chunk = format_call_report(chunk.reset_index(drop=True))
+                if schema is None:
+                    schema = _chunk_schema(
+                        pa.Table.from_pandas(chunk, preserve_index=False)
+                    )
+                    writer = pq.ParquetWriter(tmp_path, schema)
+                table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+                writer.write_table(table, row_group_size=chunksize)
+                n_rows += len(chunk)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+    if writer is None:
+        raise ValueError(f"No rows in {dta_path}")
+    writer.close()
+    os.replace(tmp_path, parquet_path)
+    return n_rows
+
+
+def pull_nyu_call_report(
+    data_dir=DATA_DIR, delete_temp_files=True, columns=None, chunksize=CHUNKSIZE
+):
+    """
+    Downloads the call report and converts it to ``nyu_call_report.parquet``
+    in ``data_dir`` (see ``convert_call_report_dta``).
+
+    Returns:
+        Path: The parquet file.
+    """
+    data_path = download_nyu_call_report(data_dir=data_dir)
+    parquet_path = data_dir / "nyu_call_report.parquet"
+    n_rows = convert_call_report_dta(
+        data_path, parquet_path, columns=columns, chunksize=chunksize
+    )
+    print(f"Wrote {n_rows:,} rows to {parquet_path}")
+
+    if delete_temp_files:
+        os.remove(data_path)
+    return parquet_path
+
+
+def load_nyu_call_report(data_dir=DATA_DIR, columns=None):
     parquet_path = data_dir / "nyu_call_report.parquet"
-    df = pd.read_parquet(parquet_path)
+    df = pd.read_parquet(parquet_path, columns=columns)
     return df
 
 
@@ -82,8 +180,4 @@ def _demo():
 
 
 if __name__ == "__main__":
-    df = pull_nyu_call_report(data_dir=DATA_DIR)
-    # Save the dataframe as a parquet file
-    os.makedirs(DATA_DIR, exist_ok=True)
-    parquet_path = DATA_DIR / "nyu_call_report.parquet"
-    df.to_parquet(parquet_path)
+    pull_nyu_call_report(data_dir=DATA_DIR)
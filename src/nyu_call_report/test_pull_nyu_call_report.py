@@ -0,0 +1,89 @@
+"""
+Tests for the chunked .dta to parquet conversion in pull_nyu_call_report.py.
+
+The fixture is a small generated .dta with the call report's column types.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import pull_nyu_call_report  # noqa: E402
+
+N_ROWS = 23
+
+
+@pytest.fixture
+def dta_path(tmp_path):
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2019-03-31", periods=4, freq="QE")
+    date = dates[np.arange(N_ROWS) % 4]
+    rssdid = rng.integers(1, 10_000, N_ROWS).astype("float64")
+    bhcid = np.where(np.arange(N_ROWS) < 9, np.nan, rng.integers(1, 500, N_ROWS))
+    df = pd.DataFrame(
+        {
+            "rssdid": rssdid,
+            "chartertype": np.full(N_ROWS, 200.0),
+            "cert": rng.integers(1, 50_000, N_ROWS).astype("float64"),
+            # Missing for the whole first chunk when chunksize < 9
+            "bhcid": bhcid,
+            "date": date.strftime("%Y%m%d").astype(int).astype("float64"),
+            "year": date.year.astype("float64"),
+            "month": date.month.astype("float64"),
+            "quarter": date.quarter.astype("float64"),
+            "day": date.day.astype("float64"),
+            "assets": rng.uniform(1e3, 1e6, N_ROWS),
+            "equity": rng.uniform(1e2, 1e5, N_ROWS),
+            "cash": rng.uniform(0, 1e4, N_ROWS),
+            "nm_lgl": [f"BANK {i}" for i in range(N_ROWS)],
+        }
+    )
+    path = tmp_path / "callreports.dta"
+    df.to_stata(path, write_index=False)
+    return path
+
+
+def test_chunked_conversion_matches_a_full_read(dta_path, tmp_path):
+    parquet_path = tmp_path / "nyu_call_report.parquet"
+    n_rows = pull_nyu_call_report.convert_call_report_dta(
+        dta_path, parquet_path, chunksize=5
+    )
+
+    assert n_rows == N_ROWS
+    assert pq.ParquetFile(parquet_path).num_row_groups == 5
+    # What the previous in-memory pull wrote
+    expected_path = tmp_path / "expected.parquet"
+    pull_nyu_call_report.format_call_report(pd.read_stata(dta_path)).to_parquet(
+        expected_path
+    )
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(parquet_path), pd.read_parquet(expected_path)
+    )
+    assert pd.read_parquet(parquet_path)["bhcid"].iloc[:9].isna().all()
+
+
+def test_column_projection(dta_path, tmp_path):
+    parquet_path = tmp_path / "nyu_call_report.parquet"
+    pull_nyu_call_report.convert_call_report_dta(
+        dta_path, parquet_path, columns=pull_nyu_call_report.FTSFR_COLUMNS
+    )
+
+    df = pull_nyu_call_report.load_nyu_call_report(data_dir=tmp_path)
+    assert list(df.columns) == pull_nyu_call_report.FTSFR_COLUMNS
+    assert pd.api.types.is_datetime64_any_dtype(df["date"])
+    assert df["rssdid"].str.isdigit().all()
+
+
+def test_failed_conversion_leaves_no_file(tmp_path):
+    parquet_path = tmp_path / "nyu_call_report.parquet"
+    with pytest.raises(Exception):
+        pull_nyu_call_report.convert_call_report_dta(
+            tmp_path / "missing.dta", parquet_path
+        )
+    assert list(tmp_path.iterdir()) == []
@@ -35,8 +35,9 @@ from pathlib import Path
 
 # project files
 from settings import config
+from instrumentation import stage
 
-import time
+import functools
 
 # Add the src directory to the path in order to import config
 current_directory = Path.cwd()
@@ -62,6 +63,9 @@ def functimer(func):
     """
     A decorator function that measures the execution time of a given function.
 
+    Each call is also recorded as a stage in the instrumentation trace
+    (wall/CPU time, peak memory and output rows).
+
     Parameters:
     func (function): The function to be timed.
 
@@ -70,11 +74,13 @@ def functimer(func):
 
     """
 
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        end_time = time.time()
-        execution_time = end_time - start_time
+        with stage(func.__name__) as st:
+            result = func(*args, **kwargs)
+            if hasattr(result, "shape"):
+                st.rows = result.shape[0]
+        execution_time = st.wall_s
         print(
             f" |-- !! Execution time: {func.__name__} --> {execution_time:,.5f} seconds"
         )
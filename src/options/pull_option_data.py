@@ -5,8 +5,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from datetime import date
 import pandas as pd
-import wrds
 from settings import config
+from data_sources import wrds_connection
 import time
 
 OUTPUT_DIR = Path(config("OUTPUT_DIR"))
@@ -86,7 +86,7 @@ def pull_Year_Range(
     start="1996-01-01",
     end="2012-01-31",
 ):
-    db = wrds.Connection(wrds_username=wrds_username, verbose=False)
+    db = wrds_connection(wrds_username=wrds_username, verbose=False)
     dlist = []
     for year in range(yearStart, yearEnd + 1):
         t0 = time.time()
@@ -4,7 +4,8 @@ organize_ftsfr_datasets.py - Organize and filter ftsfr datasets
 
 This script scans the DATA_DIR for all ftsfr_*.parquet files, filters out entities
 with fewer than MIN_OBSERVATIONS time observations, and saves the filtered datasets to
-_data/formatted/ while preserving the module folder structure.
+_data/formatted/ while preserving the module folder structure. The formatted files
+use the canonical panel layout described in panel_storage.py.
 """
 
 import polars as pl
@@ -14,6 +15,8 @@ import argparse
 
 # Import config from settings
 from settings import config
+from panel_storage import write_canonical_panel
+from instrumentation import stage
 
 DATA_DIR = config("DATA_DIR")
 MIN_OBSERVATIONS = 1
@@ -46,6 +49,60 @@ def find_ftsfr_files(data_dir: Path) -> Dict[str, List[Path]]:
     return ftsfr_files
 
 
+ENTITY_CANDIDATES = ["unique_id", "id", "entity_id", "series_id"]
+
+
+def formatted_path(data_dir: Path, source_file: Path) -> Path:
+    """Destination of ``source_file`` in the formatted structure."""
+    return data_dir / "formatted" / source_file.parent.name / source_file.name
+
+
+def filter_and_save_dataset(source_file: Path, destination_file: Path) -> None:
+    """
+    Write one ftsfr dataset to ``destination_file`` in the canonical panel
+    layout (see panel_storage.py), dropping entities with <MIN_OBSERVATIONS
+    observations.
+
+    The parquet is scanned lazily: only the entity column is read to count
+    observations, and the filtered, sorted and re-typed panel is streamed
+    straight to disk, so large panels never have to fit in memory. The
+    output is written to a temporary file and moved into place.
+
+    Args:
+        source_file: Path to the ftsfr_*.parquet file
+        destination_file: Path of the filtered file to create
+    """
+    destination_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = destination_file.with_name(destination_file.name + ".tmp")
+
+    lf = pl.scan_parquet(source_file)
+    columns = lf.collect_schema().names()
+
+    # Identify entity column
+    entity_col = next((col for col in ENTITY_CANDIDATES if col in columns), None)
+
+    if entity_col is None or "ds" not in columns or "y" not in columns:
+        print(
+            f"  Warning: No entity/ds/y columns found in {source_file.name}, copying without filtering"
+        )
+        # If it is not a unique_id/ds/y panel, just copy the file
+        lf.sink_parquet(tmp_file)
+        tmp_file.replace(destination_file)
+        return
+
+    entity_counts = write_canonical_panel(
+        lf, tmp_file, entity_col, min_observations=MIN_OBSERVATIONS
+    )
+    tmp_file.replace(destination_file)
+
+    # Print filtering stats
+    original_entities = entity_counts.height
+    kept_entities = entity_counts.filter(pl.col("len") >= MIN_OBSERVATIONS).height
+    print(
+        f"  {source_file.name}: kept {kept_entities}/{original_entities} entities (filtered out {original_entities - kept_entities} with <MIN_OBSERVATIONS observations)"
+    )
+
+
 def filter_and_save_datasets(
     data_dir: Path, ftsfr_files: Dict[str, List[Path]]
 ) -> List[Path]:
@@ -59,65 +116,19 @@ def filter_and_save_datasets(
     Returns:
         List of created file paths in the formatted directory
     """
-    formatted_dir = data_dir / "formatted"
     created_files = []
 
     # Create the main formatted directory
-    formatted_dir.mkdir(exist_ok=True)
+    (data_dir / "formatted").mkdir(exist_ok=True)
 
-    # Process each module
+    # Process each ftsfr file of each module
     for module_name, files in ftsfr_files.items():
-        # Create module directory in formatted structure
-        module_formatted_dir = formatted_dir / module_name
-        module_formatted_dir.mkdir(exist_ok=True)
-
-        # Process each ftsfr file
         for source_file in files:
-            destination_file = module_formatted_dir / source_file.name
-
+            destination_file = formatted_path(data_dir, source_file)
             try:
-                # Load dataset with Polars
-                df = pl.read_parquet(source_file)
-
-                # Identify entity column
-                entity_col = None
-                entity_candidates = ["unique_id", "id", "entity_id", "series_id"]
-                for col in entity_candidates:
-                    if col in df.columns:
-                        entity_col = col
-                        break
-
-                if entity_col is None:
-                    print(
-                        f"  Warning: No entity column found in {source_file.name}, copying without filtering"
-                    )
-                    # If no entity column found, just copy the file
-                    df.write_parquet(destination_file)
-                    created_files.append(destination_file)
-                    continue
-
-                # Count observations per entity
-                entity_counts = df.group_by(entity_col).len().sort(entity_col)
-
-                # Get entities with >=MIN_OBSERVATIONS observations
-                valid_entities = entity_counts.filter(
-                    pl.col("len") >= MIN_OBSERVATIONS
-                )[entity_col]
-
-                # Filter the dataset
-                filtered_df = df.filter(pl.col(entity_col).is_in(valid_entities))
-
-                # Save filtered dataset
-                filtered_df.write_parquet(destination_file)
+                with stage("format", dataset=source_file.stem, module=module_name):
+                    filter_and_save_dataset(source_file, destination_file)
                 created_files.append(destination_file)
-
-                # Print filtering stats
-                original_entities = len(entity_counts)
-                kept_entities = len(valid_entities)
-                print(
-                    f"  {source_file.name}: kept {kept_entities}/{original_entities} entities (filtered out {original_entities - kept_entities} with <MIN_OBSERVATIONS observations)"
-                )
-
             except Exception as e:
                 print(f"  Error processing {source_file.name}: {e}")
                 continue
@@ -136,6 +147,13 @@ def main():
         default=DATA_DIR,
         help=f"Data directory to scan (default: {DATA_DIR})",
     )
+    parser.add_argument(
+        "--files",
+        type=Path,
+        nargs="+",
+        default=None,
+        help="Only organize these ftsfr_*.parquet files (used by the per-file doit subtasks)",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -149,8 +167,13 @@ def main():
     if not data_dir.exists():
         raise ValueError(f"Error: Data directory {data_dir} does not exist!")
 
-    # Find all ftsfr files
-    ftsfr_files = find_ftsfr_files(data_dir)
+    # Find all ftsfr files (or just the requested ones)
+    if args.files:
+        ftsfr_files = {}
+        for file_path in args.files:
+            ftsfr_files.setdefault(file_path.parent.name, []).append(file_path)
+    else:
+        ftsfr_files = find_ftsfr_files(data_dir)
 
     # Report what was found
     total_files = sum(len(files) for files in ftsfr_files.values())
@@ -160,7 +183,12 @@ def main():
         return 0
 
     # Filter datasets and save to formatted structure
-    _ = filter_and_save_datasets(data_dir, ftsfr_files)
+    created_files = filter_and_save_datasets(data_dir, ftsfr_files)
+
+    # Explicitly requested files must all succeed so doit doesn't record a
+    # failed subtask as done
+    if args.files and len(created_files) < total_files:
+        return 1
 
     return 0
 
@@ -0,0 +1,162 @@
+"""
+panel_storage.py - Canonical storage layout of the formatted FTSFR panels
+
+organize_ftsfr_datasets.py writes every
+``_data/formatted/{module}/{dataset}.parquet`` in one layout, whatever
+dtypes the producing module used:
+
+- ``unique_id`` as a dictionary-encoded String column, ``ds`` as a Date
+  (kept as Datetime only when the data have a time-of-day component) and
+  ``y`` as Float32, followed by any other data columns; pandas
+  ``__index_level_*`` columns are dropped. The ids stay String rather than
+  Categorical in the schema: the forecasting code joins them against
+  String ids, and decoding the dictionary pages straight to String is
+  faster than reading a Categorical and casting it back;
+- rows sorted by (unique_id, ds), written in row groups of
+  ``ROW_GROUP_SIZE`` rows with min/max statistics, so readers filtering on
+  unique_id or ds skip the row groups they don't need;
+- a per-series offset index (each series' id and row count, in file order)
+  in the parquet footer metadata under ``SERIES_INDEX_KEY``.
+
+``scan_panel`` reads either this layout or a legacy file and returns the
+unique_id/ds/y frame the forecasting scripts use. For canonical files a
+subset of series is read as row slices located through the offset index,
+so the rest of the panel is never decoded.
+"""
+
+import json
+
+import polars as pl
+
+SERIES_INDEX_KEY = "ftsfr_series_index"
+SERIES_INDEX_VERSION = 1
+
+ROW_GROUP_SIZE = 65_536
+
+PANEL_COLUMNS = ["unique_id", "ds", "y"]
+
+
+def canonical_ds_dtype(lf, ds_col="ds"):
+    """Date unless ``ds`` is a Datetime with a time-of-day component."""
+    dtype = lf.collect_schema()[ds_col]
+    if dtype != pl.Datetime:
+        return dtype
+    has_time = (
+        lf.select((pl.col(ds_col) != pl.col(ds_col).dt.truncate("1d")).any())
+        .collect(engine="streaming")
+        .item()
+    )
+    return dtype if has_time else pl.Date
+
+
+def series_index_metadata(series_lengths):
+    """Footer metadata for ``series_lengths`` (unique_id, len; in file order)."""
+    index = {
+        "version": SERIES_INDEX_VERSION,
+        "unique_id": series_lengths["unique_id"].to_list(),
+        "length": series_lengths["len"].to_list(),
+    }
+    return {SERIES_INDEX_KEY: json.dumps(index, separators=(",", ":"))}
+
+
+def write_canonical_panel(lf, destination_file, entity_col, min_observations=1):
+    """Write ``lf`` to ``destination_file`` in the canonical layout.
+
+    Series with fewer than ``min_observations`` rows are dropped.
+
+    Args:
+        lf: LazyFrame with an entity column, ``ds`` and ``y``
+        destination_file: Parquet file to write
+        entity_col: Name of the entity column (renamed to unique_id)
+        min_observations: Minimum number of rows a series needs to be kept
+
+    Returns:
+        Frame of (unique_id, len) for every series in ``lf``, kept or not
+    """
+    if entity_col != "unique_id":
+        lf = lf.rename({entity_col: "unique_id"})
+    extra = [
+        c
+        for c in lf.collect_schema().names()
+        if c not in PANEL_COLUMNS and not c.startswith("__index_level_")
+    ]
+    ds_dtype = canonical_ds_dtype(lf)
+
+    # Ids are String so the file order matches the offset index and the
+    # row-group statistics (counting reads only the entity column)
+    lf = lf.with_columns(pl.col("unique_id").cast(pl.String))
+    entity_counts = (
+        lf.group_by("unique_id").len().sort("unique_id").collect(engine="streaming")
+    )
+    series_lengths = entity_counts.filter(pl.col("len") >= min_observations)
+    if series_lengths.height < entity_counts.height:
+        lf = lf.join(
+            series_lengths.lazy().select("unique_id"), on="unique_id", how="semi"
+        )
+
+    lf.sort(["unique_id", "ds"]).select(
+        "unique_id",
+        pl.col("ds").cast(ds_dtype),
+        pl.col("y").cast(pl.Float32),
+        *extra,
+    ).sink_parquet(
+        destination_file,
+        statistics=True,
+        row_group_size=ROW_GROUP_SIZE,
+        metadata=series_index_metadata(series_lengths),
+    )
+    return entity_counts
+
+
+def read_series_index(path):
+    """{unique_id: (first row, number of rows)}, or None for legacy files."""
+    raw = pl.read_parquet_metadata(path).get(SERIES_INDEX_KEY)
+    if raw is None:
+        return None
+    index = json.loads(raw)
+    if index.get("version") != SERIES_INDEX_VERSION:
+        return None
+    offsets = {}
+    offset = 0
+    for unique_id, length in zip(index["unique_id"], index["length"]):
+        offsets[unique_id] = (offset, length)
+        offset += length
+    return offsets
+
+
+def scan_panel(path, unique_ids=None):
+    """LazyFrame of unique_id (String), ds and y (Float32) from ``path``.
+
+    Works on canonical and legacy files alike (legacy files may call the
+    entity column ``id``). With ``unique_ids``, only those series are read:
+    as row slices through the offset index for canonical files, as a
+    pushed-down filter otherwise. Unknown ids are ignored.
+    """
+    index = read_series_index(path) if unique_ids is not None else None
+
+    if index is None:
+        lf = pl.scan_parquet(path)
+        if "id" in lf.collect_schema().names():
+            lf = lf.rename({"id": "unique_id"})
+        lf = lf.select(PANEL_COLUMNS)
+        if unique_ids is not None:
+            lf = lf.filter(pl.col("unique_id").cast(pl.String).is_in(unique_ids))
+    else:
+        ranges = []
+        for offset, n in sorted(index[u] for u in set(unique_ids) if u in index):
+            # Adjacent series are read as one slice
+            if ranges and ranges[-1][0] + ranges[-1][1] == offset:
+                ranges[-1][1] += n
+            else:
+                ranges.append([offset, n])
+        # One scan per slice: slices of a shared scan would be collected
+        # from a single cached full read
+        slices = [
+            pl.scan_parquet(path).slice(offset, n).select(PANEL_COLUMNS)
+            for offset, n in ranges
+        ]
+        lf = pl.concat(slices) if slices else pl.scan_parquet(path).head(0)
+
+    return lf.with_columns(
+        pl.col("unique_id").cast(pl.String), pl.col("y").cast(pl.Float32)
+    )
@@ -289,6 +289,9 @@ defaults = {
     "MANUAL_DATA_DIR": if_relative_make_abs(Path("data_manual")),
     "OUTPUT_DIR": if_relative_make_abs(Path("_output")),
     "DOCS_BUILD_DIR": if_relative_make_abs(Path("_docs")),
+    # Offline stand-ins for WRDS/Bloomberg (see data_sources.py)
+    "DATA_SOURCE_BACKEND": "vendor",
+    "LOCAL_SOURCE_DIR": if_relative_make_abs(Path("_data/_local_sources")),
     # Provide sane defaults for commonly used date bounds
     # Used by various modules/notebooks when an END_DATE is not explicitly set
     "END_DATE": "2025-06-01",
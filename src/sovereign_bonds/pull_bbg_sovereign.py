@@ -25,6 +25,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 import pandas as pd
 
 from settings import config
+from data_sources import bloomberg
 
 DATA_DIR = config("DATA_DIR")
 END_DATE = pd.Timestamp.today().strftime("%Y-%m-%d")
@@ -47,7 +48,7 @@ def pull_embi_composite_indices(start_date="1950-01-01", end_date=END_DATE):
         DataFrame with EMBI composite index levels and returns
     """
     # import here to enhance compatibility with devices that don't support xbbg
-    from xbbg import blp
+    blp = bloomberg(cached=True)
 
     # Main EMBI composite indices
     composite_tickers = [
@@ -95,7 +96,7 @@ def pull_embi_country_indices(start_date="1950-01-01", end_date=END_DATE):
         DataFrame with country-level EMBI index data
     """
     # import here to enhance compatibility with devices that don't support xbbg
-    from xbbg import blp
+    blp = bloomberg(cached=True)
 
     # Country sub-indices - using Bloomberg's EMBI country tickers
     # Format is typically JPEM{Country} Index or similar
@@ -181,7 +182,7 @@ def pull_embi_spreads(start_date="1950-01-01", end_date=END_DATE):
         DataFrame with EMBI spread data in basis points
     """
     # import here to enhance compatibility with devices that don't support xbbg
-    from xbbg import blp
+    blp = bloomberg(cached=True)
 
     # Spread tickers for major indices
     spread_tickers = [
@@ -0,0 +1,934 @@
+"""
+synthetic_data.py - Seeded synthetic stand-ins for the vendor and FTSFR data
+
+Every generator takes a ``seed`` and returns the same frame for the same
+arguments, with the columns and dtypes the pipeline code reads from the
+real files:
+
+- ``ftsfr_panel``: formatted FTSFR long panel (unique_id, ds, y), ragged
+  starts and scattered missing values, as returned by
+  ``forecast_utils.load_panel``;
+- ``cv_frame``: StatsForecast-style cross-validation output for a panel;
+- ``markit_cds_curves``: Markit CDS par-spread curves (``markit_cds.parquet``),
+  with ``fed_yield_curve`` and ``fred_rates`` for the discount curve;
+- ``optionmetrics_chain``: OptionMetrics option chains after the level 1/2
+  filters (calls and puts on a common strike grid);
+- ``crsp_treasury_quotes``: CRSP daily Treasury quotes
+  (``CRSP_TFZ_with_runness.parquet``), priced off a smooth yield curve;
+- ``trace_bond_months``: TRACE/WRDS bond-month rows of the merged CDS-bond
+  panel;
+- ``treasury_basis_spreads``: long Treasury spot-futures arbitrage spreads.
+
+Used by the benchmark suite (``benchmarks/``) and by tests that need
+realistic inputs without vendor access.
+"""
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+PANEL_INTERVALS = {"D": "1d", "B": "1d", "W": "1w", "ME": "1mo", "QE": "1mo"}
+CDS_TENORS = ["6M", "1Y", "2Y", "3Y", "4Y", "5Y", "7Y", "10Y", "15Y", "20Y", "30Y"]
+CDS_TENOR_YEARS = {t: (0.5 if t == "6M" else int(t[:-1])) for t in CDS_TENORS}
+
+
+def _dates(start, n, frequency):
+    """``n`` consecutive dates at ``frequency`` from ``start``."""
+    interval = PANEL_INTERVALS[frequency]
+    if frequency == "B":
+        # Enough calendar days to hold n weekdays
+        end = start + timedelta(days=n * 7 // 5 + 7)
+    elif frequency in ("ME", "QE"):
+        months = n * (3 if frequency == "QE" else 1)
+        end = date(start.year + (start.month + months) // 12 + 1, 1, 1)
+    else:
+        end = start + timedelta(days=n * (7 if frequency == "W" else 1))
+    ds = pl.date_range(start, end, interval, eager=True)
+    if frequency == "B":
+        ds = ds.filter(ds.dt.weekday() <= 5)
+    elif frequency == "ME":
+        ds = ds.dt.month_end()
+    elif frequency == "QE":
+        ds = ds.dt.month_end()
+        ds = ds.filter(ds.dt.month() % 3 == 0)
+    return ds[:n]
+
+
+def ftsfr_panel(
+    n_series=100,
+    n_obs=240,
+    frequency="ME",
+    seed=0,
+    missing_frac=0.02,
+    start=date(2000, 1, 1),
+):
+    """Long FTSFR panel of AR(1)-plus-seasonal series.
+
+    Series end on the same date but start at random points in the first
+    half of the sample; ``missing_frac`` of the observations are null.
+
+    Returns:
+        polars DataFrame of unique_id (String), ds (Date), y (Float32)
+    """
+    rng = np.random.default_rng(seed)
+    ds = _dates(start, n_obs, frequency)
+    season = {"ME": 12, "QE": 4, "W": 52, "B": 5, "D": 7}[frequency]
+
+    lengths = rng.integers(n_obs // 2, n_obs + 1, size=n_series)
+
+    # AR(1) paths on the full grid (one step for all series at a time), then
+    # each series keeps its last ``length`` observations
+    phi = rng.uniform(0.0, 0.9, n_series)
+    shocks = rng.normal(size=(n_series, n_obs))
+    paths = np.empty((n_series, n_obs))
+    paths[:, 0] = shocks[:, 0]
+    for t in range(1, n_obs):
+        paths[:, t] = phi * paths[:, t - 1] + shocks[:, t]
+    seasonal = np.sin(2 * np.pi * np.arange(n_obs) / season)
+    paths = rng.normal(0.0, 2.0, (n_series, 1)) + rng.lognormal(
+        0.0, 1.0, (n_series, 1)
+    ) * (paths + rng.uniform(0.0, 1.0, (n_series, 1)) * seasonal)
+
+    keep = np.arange(n_obs) >= (n_obs - lengths)[:, None]
+    series_index, time_index = np.nonzero(keep)
+    y = paths[keep]
+    y[rng.random(y.size) < missing_frac] = np.nan
+
+    width = len(str(n_series - 1))
+    ids = [f"series_{i:0{width}d}" for i in range(n_series)]
+    return pl.DataFrame(
+        {
+            "unique_id": np.asarray(ids)[series_index],
+            "ds": ds.gather(time_index),
+            "y": y.astype(np.float32),
+        }
+    ).with_columns(pl.col("y").fill_nan(None))
+
+
+def cv_frame(panel, h=12, n_windows=3, models=("AutoARIMA",), seed=0):
+    """Cross-validation output for ``panel``: the last ``n_windows * h`` rows
+    of every series with ``cutoff`` and noisy forecasts per model.
+
+    Returns:
+        (cv_df, train_df): cv_df with unique_id, ds, cutoff, y and one
+        column per model; train_df with the rows before each series'
+        first cutoff
+    """
+    rng = np.random.default_rng(seed)
+    panel = panel.sort("unique_id", "ds").with_columns(
+        pl.int_range(pl.len()).reverse().over("unique_id").alias("_from_end")
+    )
+    # Window w covers the h rows after the cutoff (n_windows - w) * h rows
+    # from the end, as StatsForecast's cross_validation with step_size=h
+    tail = panel.filter(pl.col("_from_end") < n_windows * h)
+    cutoffs = (
+        panel.filter(
+            pl.col("_from_end").is_between(h, n_windows * h),
+            pl.col("_from_end") % h == 0,
+        )
+        .with_columns((n_windows - pl.col("_from_end") // h).alias("_w"))
+        .select("unique_id", "_w", pl.col("ds").alias("cutoff"))
+    )
+    cv_df = (
+        tail.with_columns((n_windows - 1 - pl.col("_from_end") // h).alias("_w"))
+        .join(cutoffs, on=["unique_id", "_w"], how="left")
+        .select("unique_id", "ds", "cutoff", pl.col("y").cast(pl.Float64))
+    )
+    noise_scale = float(panel["y"].std() or 1.0)
+    cv_df = cv_df.with_columns(
+        (
+            pl.col("y").fill_null(0.0)
+            + pl.Series(rng.normal(0.0, noise_scale, cv_df.height))
+        ).alias(model)
+        for model in models
+    )
+    train_df = panel.filter(pl.col("_from_end") >= n_windows * h).select(
+        "unique_id", "ds", pl.col("y").cast(pl.Float64)
+    )
+    return cv_df, train_df
+
+
+def markit_cds_curves(
+    n_tickers=50,
+    n_days=250,
+    seed=0,
+    start=date(2005, 1, 3),
+    tenors=("1Y", "3Y", "5Y", "7Y", "10Y"),
+    us_share=0.8,
+):
+    """Daily Markit par-spread curves, one row per ticker/date/tenor.
+
+    Spreads (decimal) follow a log random walk around a lognormal
+    per-ticker level with an upward-sloping term structure.
+
+    Returns:
+        polars DataFrame with the columns of ``markit_cds.parquet``
+    """
+    rng = np.random.default_rng(seed)
+    dates = _dates(start, n_days, "B")
+    tickers = [f"TKR{i:04d}" for i in range(n_tickers)]
+    base = rng.lognormal(np.log(0.01), 0.8, n_tickers)
+    walk = np.exp(np.cumsum(rng.normal(0.0, 0.02, (n_tickers, n_days)), axis=1))
+    countries = np.where(
+        rng.random(n_tickers) < us_share, "United States", "United Kingdom"
+    )
+
+    frames = []
+    for tenor in tenors:
+        slope = 1.0 + 0.08 * np.log1p(CDS_TENOR_YEARS[tenor])
+        spread = base[:, None] * walk * slope
+        spread *= np.exp(rng.normal(0.0, 0.01, spread.shape))
+        frames.append(
+            pl.DataFrame(
+                {
+                    "date": np.tile(dates.to_numpy(), n_tickers),
+                    "ticker": np.repeat(tickers, n_days),
+                    "redcode": np.repeat([t[-4:] + "XX" for t in tickers], n_days),
+                    "parspread": spread.ravel(),
+                    "convspreard": spread.ravel() * 1.02,
+                    "tenor": tenor,
+                    "country": np.repeat(countries, n_days),
+                }
+            )
+        )
+    return (
+        pl.concat(frames)
+        .with_columns(
+            pl.col("date").cast(pl.Datetime("ns")),
+            pl.col("date").dt.year().alias("year"),
+            (pl.col("parspread") * 4.0).alias("riskypv01"),
+        )
+        .sort("date", "ticker", "tenor")
+    )
+
+
+def fed_yield_curve(dates, seed=0):
+    """Fed GSW zero-coupon yields (percent), SVENY01..SVENY30 by date."""
+    rng = np.random.default_rng(seed)
+    dates = pd.DatetimeIndex(pd.to_datetime(dates)).unique().sort_values()
+    level = 3.0 + np.cumsum(rng.normal(0.0, 0.03, len(dates)))
+    slope = 1.5 + np.cumsum(rng.normal(0.0, 0.02, len(dates)))
+    years = np.arange(1, 31)
+    curve = level[:, None] + slope[:, None] * (1 - np.exp(-years / 5.0))
+    return pd.DataFrame(
+        curve,
+        index=dates.rename(None),
+        columns=[f"SVENY{y:02d}" for y in years],
+    )
+
+
+def fred_rates(dates, seed=0):
+    """FRED short Treasury yields (percent) by date, as in ``fred.parquet``."""
+    rng = np.random.default_rng(seed + 1)
+    dates = pd.DatetimeIndex(pd.to_datetime(dates)).unique().sort_values()
+    short = 2.0 + np.cumsum(rng.normal(0.0, 0.03, len(dates)))
+    return pd.DataFrame(
+        {"DGS3MO": short, "DGS6MO": short + 0.1},
+        index=pd.Index(dates, name="DATE"),
+    )
+
+
+def optionmetrics_chain(
+    n_dates=20,
+    n_expiries=4,
+    n_strikes=20,
+    seed=0,
+    start=date(2010, 1, 4),
+):
+    """Daily S&P 500 option chains after the level 1/2 filters.
+
+    Every (date, exdate, strike) has a call and a put with the same strike
+    and underlying close; implied volatilities follow a noisy quadratic
+    smile in moneyness, with occasional outliers.
+
+    Returns:
+        pandas DataFrame with the OptionMetrics columns plus moneyness
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.to_datetime(_dates(start, n_dates, "B").to_numpy())
+    close = 1100.0 * np.exp(np.cumsum(rng.normal(0.0, 0.01, n_dates)))
+    tb_m3 = 0.001 + np.abs(np.cumsum(rng.normal(0.0, 0.0002, n_dates)))
+    moneyness = np.linspace(0.88, 1.12, n_strikes)
+
+    d, e, k, cp = np.meshgrid(
+        np.arange(n_dates),
+        np.arange(n_expiries),
+        np.arange(n_strikes),
+        np.array(["C", "P"]),
+        indexing="ij",
+    )
+    d, e, k, cp = d.ravel(), e.ravel(), k.ravel(), cp.ravel()
+    n = d.size
+    m = moneyness[k]
+    strike = np.round(close[d] * m, 0)
+    tau = 30.0 * (e + 1) / 365.0
+    iv = 0.2 - 0.3 * (m - 1.0) + 1.5 * (m - 1.0) ** 2 + 0.02 * np.sqrt(tau)
+    iv *= np.exp(rng.normal(0.0, 0.03, n))
+    outlier = rng.random(n) < 0.01
+    iv[outlier] *= rng.uniform(1.5, 3.0, outlier.sum())
+
+    intrinsic = np.where(
+        cp == "C", np.maximum(close[d] - strike, 0), np.maximum(strike - close[d], 0)
+    )
+    mid = intrinsic + close[d] * iv * np.sqrt(tau) * 0.4
+    half_spread = 0.05 + 0.01 * mid
+    return pd.DataFrame(
+        {
+            "secid": 108105,
+            "date": dates[d],
+            "open": close[d],
+            "close": close[d],
+            "cp_flag": cp,
+            "exdate": dates[d] + pd.to_timedelta(30 * (e + 1), unit="D"),
+            "IV": iv,
+            "tb_m3": tb_m3[d],
+            "volume": rng.integers(0, 5000, n),
+            "open_interest": rng.integers(0, 20000, n),
+            "best_bid": mid - half_spread,
+            "best_offer": mid + half_spread,
+            "strike_price": strike,
+            "contract_size": 100,
+            "moneyness": strike / close[d],
+        }
+    )
+
+
+def _nss_yield(t, level=0.04, slope=-0.015, tau=2.0):
+    """Smooth continuously-compounded zero yield at maturity ``t`` (years)."""
+    t = np.maximum(t, 1e-6)
+    return level + slope * (1 - np.exp(-t / tau)) / (t / tau)
+
+
+def crsp_treasury_quotes(dates, n_issues=60, seed=0):
+    """CRSP daily Treasury notes and bonds quoted on ``dates``.
+
+    Dirty prices are the issue's coupon cash flows discounted off a smooth
+    zero curve plus a small pricing error, so NSS fits converge.
+
+    Returns:
+        pandas DataFrame with the columns of ``CRSP_TFZ_with_runness.parquet``
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.DatetimeIndex(pd.to_datetime(dates)).unique().sort_values()
+    first = dates[0]
+    original = rng.choice([2, 3, 5, 7, 10, 20, 30], n_issues)
+    issued = first - pd.to_timedelta(
+        (rng.uniform(0.05, 0.95, n_issues) * original * 365).astype(int), unit="D"
+    )
+    maturity = issued + pd.to_timedelta((original * 365.25).astype(int), unit="D")
+    coupon = np.round(rng.uniform(1.0, 6.0, n_issues) * 8) / 8
+
+    rows = []
+    for caldt in dates:
+        live = np.flatnonzero(maturity > caldt + pd.Timedelta(days=30))
+        for i in live:
+            # Semiannual coupon schedule counted back from maturity
+            months = np.arange(0, original[i] * 12 + 1, 6)
+            schedule = pd.DatetimeIndex(
+                [maturity[i] - pd.DateOffset(months=int(m)) for m in months]
+            )
+            future = schedule[schedule > caldt]
+            past = schedule[schedule <= caldt]
+            t = (future - caldt).days.to_numpy() / 365.25
+            cash = np.full(len(t), coupon[i] / 2)
+            cash[np.argmax(t)] += 100.0
+            pv = cash * np.exp(-_nss_yield(t) * t)
+            dirty = pv.sum() + rng.normal(0.0, 0.02)
+            last = past.max() if len(past) else issued[i]
+            next_coupon = future.min()
+            accrued = (
+                coupon[i] / 2 * (caldt - last).days / max((next_coupon - last).days, 1)
+            )
+            clean = dirty - accrued
+            rows.append(
+                {
+                    "kytreasno": 200000 + i,
+                    "kycrspid": f"{maturity[i]:%Y%m%d}.{int(coupon[i] * 1000):06d}",
+                    "tcusip": f"912828{i:03d}",
+                    "caldt": caldt,
+                    "tdatdt": issued[i],
+                    "tmatdt": maturity[i],
+                    "tfcaldt": pd.Timestamp(0),
+                    "tdbid": clean - 1 / 64,
+                    "tdask": clean + 1 / 64,
+                    "tdaccint": accrued,
+                    "tdyld": _nss_yield(t.max()) / 2,
+                    "price": dirty,
+                    "tdpubout": 30000.0,
+                    "tdtotout": 30000.0,
+                    "tdpdint": 0.0,
+                    "tcouprt": coupon[i],
+                    "itype": 1 if original[i] >= 20 else 2,
+                    "original_maturity": float(original[i]),
+                    "years_to_maturity": round((maturity[i] - caldt).days / 365.0),
+                    "tdduratn": float((t * pv).sum() / pv.sum() * 365.25),
+                    "tdretnua": 0.0,
+                    "days_to_maturity": (maturity[i] - caldt).days,
+                    "callable": False,
+                }
+            )
+    df = pd.DataFrame(rows)
+    # On-the-run ranks by issue date within (quote date, original maturity);
+    # the two most recent issues are excluded by the GSW filters
+    df["run"] = (
+        df.groupby(["caldt", "original_maturity"])["tdatdt"]
+        .rank(method="first", ascending=False)
+        .astype(int)
+        - 1
+    )
+    return df
+
+
+def trace_bond_months(n_bonds=50, n_months=12, seed=0, start=date(2010, 1, 1)):
+    """Month-end corporate bond rows of the merged CDS-bond panel.
+
+    Returns:
+        pandas DataFrame with cusip, date (month end), maturity, coupon,
+        price_eom, day_count_basis, nextcoup, ncoups and coupacc
+    """
+    rng = np.random.default_rng(seed)
+    months = pd.to_datetime(_dates(start, n_months, "ME").to_numpy())
+    maturity = pd.Timestamp(start) + pd.to_timedelta(
+        rng.integers(2 * 365, 25 * 365, n_bonds), unit="D"
+    )
+    coupon = np.round(rng.uniform(2.0, 8.0, n_bonds) * 8) / 8
+    spread = rng.lognormal(np.log(0.015), 0.5, n_bonds)
+
+    b, m = np.meshgrid(np.arange(n_bonds), np.arange(n_months), indexing="ij")
+    b, m = b.ravel(), m.ravel()
+    dates = months[m]
+    years_left = (maturity[b] - dates).days.to_numpy() / 365.25
+    yld = _nss_yield(years_left) + spread[b]
+    # Approximate clean price of a semiannual bullet at yield yld
+    n_coupons = np.ceil(years_left * 2)
+    discount = (1 + yld / 2) ** -n_coupons
+    price = coupon[b] / yld * (1 - discount) + 100 * discount
+    price *= np.exp(rng.normal(0.0, 0.002, b.size))
+    months_to_next = ((maturity[b].month - dates.month) % 6).to_numpy()
+    nextcoup = dates + pd.to_timedelta(
+        np.where(months_to_next == 0, 6, months_to_next) * 30, unit="D"
+    )
+    return pd.DataFrame(
+        {
+            "cusip": [f"{i:06d}AB{i % 10}" for i in b],
+            "issue_id": 500000 + b,
+            "date": dates,
+            "maturity": maturity[b],
+            "coupon": coupon[b],
+            "price_eom": price,
+            "day_count_basis": "30/360",
+            "nextcoup": nextcoup,
+            "ncoups": 2.0,
+            "coupacc": coupon[b] / 2 * (6 - months_to_next % 6) / 6,
+        }
+    )
+
+
+def treasury_basis_spreads(
+    n_days=250,
+    tenors=("2Y", "5Y", "10Y", "30Y"),
+    seed=0,
+    start=date(2005, 1, 3),
+    outlier_frac=0.005,
+):
+    """Daily Treasury spot-futures arbitrage spreads (bps) by tenor, long.
+
+    Returns:
+        pandas DataFrame of Date, Tenor, arb with rare spikes and gaps
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.to_datetime(_dates(start, n_days, "B").to_numpy())
+    frames = []
+    for tenor in tenors:
+        arb = 20.0 + np.cumsum(rng.normal(0.0, 1.0, n_days))
+        spikes = rng.random(n_days) < outlier_frac
+        arb[spikes] += rng.choice([-1, 1], spikes.sum()) * rng.uniform(
+            100, 300, spikes.sum()
+        )
+        arb[rng.random(n_days) < 0.02] = np.nan
+        frames.append(pd.DataFrame({"Date": dates, "Tenor": tenor, "arb": arb}))
+    return pd.concat(frames, ignore_index=True)
+
+
+# --------------------------------------------------------------------
+# Raw vendor tables (local data-source backend)
+# --------------------------------------------------------------------
+MARKIT_YEARS = range(2001, 2025)
+OPTIONM_YEARS = range(1996, 2025)
+
+
+def _pl_dates(values):
+    """polars Date series of datetime-like ``values`` (NaT becomes null)."""
+    return pl.Series(pd.to_datetime(values).to_numpy()).cast(pl.Date)
+
+
+def _years(frame, column, years, name):
+    """{name.format(year): rows of ``frame`` in that year} for every year."""
+    by_year = frame.with_columns(pl.col(column).dt.year().alias("_year"))
+    for year in years:
+        yield name.format(year=year), by_year.filter(pl.col("_year") == year).drop(
+            "_year"
+        )
+
+
+def wrds_markit_tables(days, n_tickers=50, seed=0, permnos=None):
+    """Markit CDS tables: ``cds{year}``, ``redent`` and the CRSP header.
+
+    The yearly tables hold the columns the CDS pulls select and filter on,
+    with a share of non-USD and non-XR curves the filters drop. ``permnos``
+    (CRSP firms) are linked to the reference entities by CUSIP or ticker.
+
+    Returns:
+        {(library, table): polars DataFrame}
+    """
+    rng = np.random.default_rng(seed)
+    curves = markit_cds_curves(
+        n_tickers=n_tickers,
+        n_days=len(days),
+        seed=seed,
+        start=days[0],
+        tenors=("1Y", "2Y", "3Y", "5Y", "7Y", "10Y"),
+    ).drop("year")
+    n = curves.height
+    spread = curves["parspread"].to_numpy()
+    curves = curves.with_columns(
+        pl.col("date").cast(pl.Date),
+        pl.lit("USD").alias("currency"),
+        pl.lit("XR14").alias("docclause"),
+        pl.Series("compositedepth5y", rng.choice([2, 3, 4, 6, 9], n)),
+        pl.Series("creditdv01", -spread * rng.uniform(3.0, 5.0, n)),
+        pl.Series("irdv01", rng.normal(0.0, 1e-4, n)),
+        pl.Series("rec01", -spread * rng.uniform(0.1, 0.5, n)),
+        pl.Series("dp", 1.0 - np.exp(-spread * 5.0)),
+        pl.Series("jtd", rng.uniform(-0.7, -0.5, n)),
+        pl.Series("dtz", rng.uniform(-1.0, -0.9, n)),
+    )
+    # Other currencies/documentation clauses for a quarter of the names
+    other = curves.filter(pl.col("ticker").str.slice(-1).is_in(["1", "5", "9"]))
+    cds = pl.concat(
+        [
+            curves,
+            other.with_columns(pl.lit("MR14").alias("docclause")),
+            other.with_columns(pl.lit("EUR").alias("currency")),
+        ]
+    )
+    tables = {
+        ("markit", t): f for t, f in _years(cds, "date", MARKIT_YEARS, "cds{year}")
+    }
+
+    entities = curves.select("redcode", "ticker").unique().sort("redcode")
+    k = entities.height
+    entities = entities.with_columns(
+        pl.format("{} CORP", "ticker").alias("shortname"),
+        pl.Series("entity_cusip", [f"C{i:05d}" for i in range(k)]),
+    )
+    tables[("markit", "redent")] = entities
+
+    permnos = np.arange(10001, 10001 + k) if permnos is None else np.asarray(permnos)
+    # CUSIP links for 70% of the entities, ticker-only links for 15%
+    n_cusip, n_ticker = int(0.7 * k), int(0.85 * k)
+    rows = min(len(permnos), k)
+    hdrcusip = [
+        f"{c}10" if i < n_cusip else f"H{i:05d}10"
+        for i, c in enumerate(entities["entity_cusip"][:rows])
+    ]
+    ticker = [
+        t if i < n_ticker else f"X{i:04d}"
+        for i, t in enumerate(entities["ticker"][:rows])
+    ]
+    tables[("crsp", "stksecurityinfohdr")] = pl.DataFrame(
+        {
+            "permno": permnos[:rows],
+            "permco": permnos[:rows] + 40000,
+            "hdrcusip": hdrcusip,
+            "ticker": ticker,
+            "issuernm": [f"{t} CORP INC" for t in entities["ticker"][:rows]],
+        }
+    )
+    return tables
+
+
+def wrds_treasury_tables(days, n_issues=200, seed=0):
+    """CRSP Treasury ``tfz_iss`` (issues) and ``tfz_dly`` (daily quotes).
+
+    Notes and bonds are issued throughout and before ``days``, so every
+    date has on- and off-the-run issues; 5% are callable (itype 3/4).
+    Quotes are priced off a smooth zero curve.
+
+    Returns:
+        {(library, table): polars DataFrame}
+    """
+    rng = np.random.default_rng(seed)
+    days = pd.DatetimeIndex(pd.to_datetime(days))
+    original = rng.choice([2, 3, 5, 7, 10, 20, 30], n_issues)
+    # Issue dates so that each issue is alive during part of the window
+    span = (days[-1] - days[0]).days
+    issued = days[0] + pd.to_timedelta(
+        rng.uniform(-original * 365.25, span).astype(int), unit="D"
+    )
+    maturity = issued + pd.to_timedelta((original * 365.25).astype(int), unit="D")
+    coupon = np.round(rng.uniform(0.5, 6.0, n_issues) * 8) / 8
+    callable_ = rng.random(n_issues) < 0.05
+    itype = np.where(original >= 20, 1, 2) + 2 * callable_
+    kytreasno = 200000 + np.arange(n_issues)
+    kycrspid = [f"{m:%Y%m%d}.{int(c * 1000):06d}" for m, c in zip(maturity, coupon)]
+    tfz_iss = pl.DataFrame(
+        {
+            "kytreasno": kytreasno,
+            "kycrspid": kycrspid,
+            "tcusip": [f"912828{i:03X}" for i in range(n_issues)],
+            "tdatdt": _pl_dates(issued),
+            "tmatdt": _pl_dates(maturity),
+            "tfcaldt": _pl_dates(
+                np.where(callable_, maturity - pd.DateOffset(years=5), pd.NaT)
+            ),
+            "tcouprt": coupon,
+            "itype": itype,
+        }
+    )
+
+    d, i = np.meshgrid(np.arange(len(days)), np.arange(n_issues), indexing="ij")
+    d, i = d.ravel(), i.ravel()
+    live = (issued[i] <= days[d]) & (maturity[i] > days[d])
+    d, i = d[live], i[live]
+    caldt = days[d]
+    days_left = (maturity[i] - caldt).days.to_numpy()
+    t = days_left / 365.25
+    yld = _nss_yield(t) + rng.normal(0.0, 2e-4, d.size)
+    n_coupons = np.ceil(t * 2)
+    discount = (1 + yld / 2) ** -n_coupons
+    clean = coupon[i] / yld * (1 - discount) + 100 * discount
+    # Share of the current half-year coupon period already elapsed
+    elapsed = 1 - np.mod(days_left, 182.625) / 182.625
+    accrued = coupon[i] / 2 * elapsed
+    dirty = clean + accrued
+    order = np.lexsort((d, i))
+    ret = np.full(d.size, np.nan)
+    same = i[order][1:] == i[order][:-1]
+    ret[order[1:][same]] = dirty[order][1:][same] / dirty[order][:-1][same] - 1
+    tfz_dly = pl.DataFrame(
+        {
+            "kytreasno": kytreasno[i],
+            "kycrspid": np.asarray(kycrspid)[i],
+            "caldt": _pl_dates(caldt),
+            "tdbid": clean - 1 / 64,
+            "tdask": clean + 1 / 64,
+            "tdaccint": accrued,
+            "tdyld": yld / 365.0,
+            "tdduratn": t * 365.25 / (1 + yld / 2),
+            "tdretnua": ret,
+            "tdpubout": np.full(d.size, 30000.0),
+            "tdtotout": np.full(d.size, 35000.0),
+            "tdpdint": np.zeros(d.size),
+        }
+    )
+    return {("crspm", "tfz_iss"): tfz_iss, ("crspm", "tfz_dly"): tfz_dly}
+
+
+def wrds_optionm_tables(days, n_expiries=4, n_strikes=20, seed=0):
+    """OptionMetrics ``opprcd{year}``/``secprd{year}`` and FRB daily rates.
+
+    Raw vendor units: strikes times 1000, T-bill rates in percent.
+
+    Returns:
+        {(library, table): polars DataFrame}
+    """
+    chain = optionmetrics_chain(
+        n_dates=len(days),
+        n_expiries=n_expiries,
+        n_strikes=n_strikes,
+        seed=seed,
+        start=days[0],
+    )
+    chain = pl.from_pandas(chain).with_columns(pl.col("date", "exdate").cast(pl.Date))
+    opprcd = chain.select(
+        "secid",
+        "date",
+        pl.lit("SPX").alias("symbol"),
+        "exdate",
+        "cp_flag",
+        (pl.col("strike_price") * 1000).cast(pl.Int64).alias("strike_price"),
+        "best_bid",
+        "best_offer",
+        "volume",
+        "open_interest",
+        pl.col("IV").alias("impl_volatility"),
+        "contract_size",
+        pl.lit("E").alias("exercise_style"),
+    )
+    secprd = chain.select("secid", "date", "open", "close").unique().sort("date")
+    tables = {
+        ("optionm_all", t): f
+        for t, f in _years(opprcd, "date", OPTIONM_YEARS, "opprcd{year}")
+    }
+    tables.update(
+        {
+            ("optionm_all", t): f
+            for t, f in _years(secprd, "date", OPTIONM_YEARS, "secprd{year}")
+        }
+    )
+    tables[("frb_all", "rates_daily")] = (
+        chain.select("date", (pl.col("tb_m3") * 100).alias("dtb3"))
+        .unique()
+        .sort("date")
+    )
+    return tables
+
+
+def wrds_crsp_compustat_tables(months, n_firms=200, seed=0):
+    """CRSP monthly stock files (legacy and CIZ), CRSP index, Compustat
+    annual fundamentals, the CCM link table and the Fama-French factors.
+
+    Firms list and delist at random months; a tenth are not ordinary
+    common stock and are dropped by the share-code/CIZ filters.
+
+    Returns:
+        {(library, table): polars DataFrame}
+    """
+    rng = np.random.default_rng(seed)
+    months = pd.DatetimeIndex(pd.to_datetime(months))
+    n_months = len(months)
+    permno = np.arange(10001, 10001 + n_firms)
+    first = rng.integers(0, n_months // 2 + 1, n_firms)
+    last = np.where(
+        rng.random(n_firms) < 0.2,
+        rng.integers(n_months // 2, n_months, n_firms),
+        n_months - 1,
+    )
+    delisted = last < n_months - 1
+    common = rng.random(n_firms) >= 0.1
+
+    f, m = np.meshgrid(np.arange(n_firms), np.arange(n_months), indexing="ij")
+    f, m = f.ravel(), m.ravel()
+    alive = (m >= first[f]) & (m <= last[f])
+    f, m = f[alive], m[alive]
+    n = f.size
+    market = rng.normal(0.008, 0.045, n_months)
+    beta = rng.uniform(0.5, 1.5, n_firms)
+    ret = beta[f] * market[m] + rng.normal(0.0, 0.08, n)
+    retx = ret - rng.uniform(0.0, 0.003, n)
+    ret[rng.random(n) < 0.005] = np.nan
+    level = rng.lognormal(3.0, 1.0, n_firms)
+    # Price path per firm from the cumulative price returns
+    cum = pd.Series(np.nan_to_num(retx)).groupby(f).cumsum().to_numpy()
+    prc = level[f] * np.exp(cum)
+    # Negative prices mark bid/ask averages, as in CRSP
+    prc[rng.random(n) < 0.03] *= -1
+    shrout = rng.integers(5_000, 500_000, n_firms)[f].astype(float)
+    date = months[m]
+
+    msf = pl.DataFrame(
+        {
+            "date": _pl_dates(date),
+            "permno": permno[f],
+            "permco": permno[f] + 40000,
+            "ret": ret,
+            "retx": retx,
+            "prc": prc,
+            "altprc": prc,
+            "vol": rng.integers(1_000, 1_000_000, n).astype(float),
+            "shrout": shrout,
+            "cfacshr": np.ones(n),
+            "cfacpr": np.ones(n),
+        }
+    )
+    msenames = pl.DataFrame(
+        {
+            "permno": permno,
+            "namedt": _pl_dates(months[first]),
+            "nameendt": _pl_dates(months[last]),
+            "shrcd": np.where(common, rng.choice([10, 11], n_firms), 12),
+            "exchcd": rng.choice([1, 2, 3], n_firms, p=[0.4, 0.1, 0.5]),
+            "comnam": [f"FIRM {p} INC" for p in permno],
+            "shrcls": "A",
+            "naics": rng.integers(111110, 928120, n_firms).astype(str),
+            "siccd": rng.integers(100, 9999, n_firms),
+        }
+    )
+    n_delisted = int(delisted.sum())
+    dlret = rng.normal(-0.2, 0.2, n_delisted)
+    dlret[rng.random(n_delisted) < 0.3] = np.nan
+    msedelist = pl.DataFrame(
+        {
+            "permno": permno[delisted],
+            "dlstdt": _pl_dates(months[last[delisted]] + pd.Timedelta(days=1)),
+            "dlret": dlret,
+            "dlretx": dlret,
+            "dlstcd": rng.choice([231, 500, 552, 584], n_delisted),
+        }
+    )
+    exch = np.array(["N", "A", "Q"])[msenames["exchcd"].to_numpy() - 1]
+    msf_v2 = pl.DataFrame(
+        {
+            "permno": permno[f],
+            "permco": permno[f] + 40000,
+            "mthcaldt": _pl_dates(date),
+            "issuertype": "CORP",
+            "securitytype": "EQTY",
+            "securitysubtype": np.where(common[f], "COM", "PFD"),
+            "sharetype": "NS",
+            "usincflg": "Y",
+            "primaryexch": exch[f],
+            "conditionaltype": "RW",
+            "tradingstatusflg": "A",
+            "mthret": ret,
+            "mthretx": retx,
+            "shrout": shrout,
+            "mthprc": np.abs(prc),
+        }
+    )
+    msix = (
+        msf.with_columns((pl.col("prc").abs() * pl.col("shrout")).alias("me"))
+        .group_by("date")
+        .agg(
+            ((pl.col("ret") * pl.col("me")).sum() / pl.col("me").sum()).alias("vwretd"),
+            ((pl.col("retx") * pl.col("me")).sum() / pl.col("me").sum()).alias(
+                "vwretx"
+            ),
+            pl.col("ret").mean().alias("ewretd"),
+            pl.col("retx").mean().alias("ewretx"),
+            pl.col("me").sum().alias("totval"),
+            pl.len().alias("totcnt"),
+        )
+        .rename({"date": "caldt"})
+        .sort("caldt")
+    )
+
+    # Annual fundamentals for each firm-year alive at fiscal year end
+    gvkey = np.array([f"{i:06d}" for i in range(1000, 1000 + n_firms)])
+    years = np.unique(months.year)
+    fy, fi = np.meshgrid(years, np.arange(n_firms), indexing="ij")
+    fy, fi = fy.ravel(), fi.ravel()
+    datadate = pd.to_datetime([f"{y}-12-31" for y in fy])
+    keep = (datadate >= months[first[fi]]) & (
+        datadate <= months[last[fi]] + pd.offsets.YearEnd(0)
+    )
+    fy, fi, datadate = fy[keep], fi[keep], datadate[keep]
+    k = fy.size
+    at = rng.lognormal(6.0, 1.5, k)
+    funda = pl.DataFrame(
+        {
+            "gvkey": gvkey[fi],
+            "datadate": _pl_dates(datadate),
+            "at": at,
+            "pstkl": at * rng.uniform(0.0, 0.02, k),
+            "txditc": at * rng.uniform(0.0, 0.03, k),
+            "pstkrv": at * rng.uniform(0.0, 0.02, k),
+            "seq": at * rng.uniform(-0.05, 0.6, k),
+            "pstk": at * rng.uniform(0.0, 0.02, k),
+            "indfmt": np.where(rng.random(k) < 0.9, "INDL", "FS"),
+            "datafmt": "STD",
+            "popsrc": "D",
+            "consol": "C",
+        }
+    )
+    linktable = pl.DataFrame(
+        {
+            "gvkey": gvkey,
+            "lpermno": permno,
+            "linktype": rng.choice(["LC", "LU", "NU"], n_firms, p=[0.6, 0.3, 0.1]),
+            "linkprim": rng.choice(["P", "C", "J"], n_firms, p=[0.8, 0.1, 0.1]),
+            "linkdt": _pl_dates(months[first]),
+            "linkenddt": _pl_dates(np.where(delisted, months[last], pd.NaT)),
+        }
+    )
+    rf = np.abs(rng.normal(0.001, 0.0005, n_months))
+    factors = pl.DataFrame(
+        {
+            "date": _pl_dates(months),
+            "mktrf": market - rf,
+            "smb": rng.normal(0.002, 0.03, n_months),
+            "hml": rng.normal(0.003, 0.03, n_months),
+            "rf": rf,
+            "umd": rng.normal(0.006, 0.04, n_months),
+        }
+    )
+    return {
+        ("crsp", "msf"): msf,
+        ("crsp", "msenames"): msenames,
+        ("crsp", "msedelist"): msedelist,
+        ("crsp", "msf_v2"): msf_v2,
+        ("crsp_a_indexes", "msix"): msix,
+        ("comp", "funda"): funda,
+        ("crsp", "ccmxpf_linktable"): linktable,
+        ("ff", "factors_monthly"): factors,
+    }
+
+
+def wrds_tables(start=date(2015, 1, 1), end=date(2023, 12, 31), scale=1.0, seed=0):
+    """Every raw WRDS table the local backend serves, at ``scale`` times the
+    default number of entities, over ``start``..``end``.
+
+    Returns:
+        {(library, table): polars DataFrame}
+    """
+    days = [d.date() for d in pd.bdate_range(start, end)]
+    months = pd.date_range(start, end, freq="BME")
+    n_firms = max(int(200 * scale), 10)
+    tables = wrds_crsp_compustat_tables(months, n_firms=n_firms, seed=seed)
+    tables.update(
+        wrds_markit_tables(
+            days,
+            n_tickers=max(int(50 * scale), 5),
+            seed=seed,
+            permnos=tables[("crsp", "msenames")]["permno"],
+        )
+    )
+    tables.update(
+        wrds_treasury_tables(days, n_issues=max(int(200 * scale), 20), seed=seed)
+    )
+    tables.update(
+        wrds_optionm_tables(days, n_strikes=max(int(20 * scale), 4), seed=seed)
+    )
+    return tables
+
+
+# Fields that Bloomberg returns as text (contract months, CUSIPs, tickers)
+BLOOMBERG_TEXT_FIELDS = ("CUSIP", "TICKER", "MONTH_YR")
+
+
+def bloomberg_history(ticker, field, dates, seed=0):
+    """Daily history of one Bloomberg ``field`` for ``ticker`` on ``dates``.
+
+    Seeded by the ticker and field name, so every request for the same pair
+    returns the same series. Rates and yields (``*_RT``, ``YLD_*``, Govt and
+    swap tickers) move additively around a few percent, returns are small
+    daily changes, identifiers change each quarter and everything else is a
+    positive price path.
+    """
+    import zlib
+
+    key = zlib.crc32(f"{ticker}|{field}".encode()) ^ seed
+    rng = np.random.default_rng(key)
+    dates = pd.DatetimeIndex(pd.to_datetime(dates))
+    n = len(dates)
+    name = field.upper()
+
+    if any(tag in name for tag in BLOOMBERG_TEXT_FIELDS):
+        quarter = (dates.year * 4 + (dates.month - 1) // 3).to_numpy()
+        codes = np.asarray([f"{key % 1000:03d}{q % 100:02d}" for q in quarter])
+        if "MONTH_YR" in name:
+            return pd.Series(
+                [f"{m:%b} {m:%y}" for m in dates.to_period("Q").end_time], index=dates
+            ).str.upper()
+        return pd.Series(np.char.add("912828", codes), index=dates)
+    if "RETURN" in name:
+        return pd.Series(rng.normal(0.0, 0.3, n), index=dates)
+    upper = ticker.upper()
+    if (
+        "YLD" in name
+        or name.endswith("_RT")
+        or upper.endswith("GOVT")
+        or "CMPN" in upper
+        or "SWIT" in upper
+    ):
+        level = rng.uniform(0.5, 5.0)
+        return pd.Series(level + np.cumsum(rng.normal(0.0, 0.03, n)), index=dates)
+    if "VOL" in name or "OPEN_INT" in name:
+        return pd.Series(rng.integers(1_000, 500_000, n).astype(float), index=dates)
+    if "FACTOR" in name or "FRSK" in name:
+        return pd.Series(rng.uniform(0.6, 1.0) + np.zeros(n), index=dates)
+    level = rng.uniform(1.0, 200.0)
+    return pd.Series(level * np.exp(np.cumsum(rng.normal(0.0, 0.01, n))), index=dates)
@@ -0,0 +1,159 @@
+"""
+Tests for the incremental Bloomberg cache in bloomberg_cache.py.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+import data_sources  # noqa: E402
+from bloomberg_cache import BloombergCache  # noqa: E402
+
+TICKERS = ["CL1 Comdty", "CL2 Comdty", "GC1 Comdty"]
+DATES = pd.bdate_range("2020-01-01", "2020-12-31")
+
+
+class FakeBlp:
+    """Serves canned daily history and records every bdh request."""
+
+    def __init__(self):
+        self.requests = []
+        self.failures = 0
+        self.history = {
+            (ticker, field): pd.Series(
+                np.arange(len(DATES), dtype="float64") + 1000 * i + 100 * j,
+                index=DATES,
+            )
+            for i, ticker in enumerate(TICKERS)
+            for j, field in enumerate(["PX_LAST", "PX_VOLUME"])
+        }
+
+    def bdh(self, tickers, flds, start_date, end_date, **kwargs):
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        flds = [flds] if isinstance(flds, str) else list(flds)
+        self.requests.append((tickers, flds, start_date, end_date))
+        if self.failures:
+            # xbbg answers timeouts and errors with an empty frame
+            self.failures -= 1
+            return pd.DataFrame()
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        columns = {
+            (ticker, field): self.history[(ticker, field)].loc[start:end]
+            for ticker in tickers
+            for field in flds
+        }
+        df = pd.concat(columns, axis=1)
+        df.index.name = None
+        return df
+
+
+@pytest.fixture
+def fake():
+    return FakeBlp()
+
+
+def expected(fake, tickers, fields, start, end):
+    df = pd.concat(
+        {(t, f): fake.history[(t, f)].loc[start:end] for t in tickers for f in fields},
+        axis=1,
+    )
+    df.index.name = None
+    df.index.freq = None
+    return df
+
+
+def test_first_pull_is_batched_and_matches_the_client(tmp_path, fake):
+    cache = BloombergCache(fake, tmp_path, batch_size=2)
+    df = cache.bdh(TICKERS, ["PX_LAST"], "2020-01-01", "2020-06-30")
+
+    pd.testing.assert_frame_equal(
+        df, expected(fake, TICKERS, ["PX_LAST"], "2020-01-01", "2020-06-30")
+    )
+    assert [r[0] for r in fake.requests] == [TICKERS[:2], TICKERS[2:]]
+    assert (tmp_path / "PX_LAST" / "CL1_Comdty.parquet").exists()
+
+
+def test_later_pulls_request_only_the_tail_and_pick_up_revisions(tmp_path, fake):
+    cache = BloombergCache(fake, tmp_path, revision_days=5)
+    cache.bdh(TICKERS, ["PX_LAST", "PX_VOLUME"], "2020-01-01", "2020-06-30")
+    fake.requests.clear()
+
+    # A value inside the revision window changes at the source
+    fake.history[("CL1 Comdty", "PX_LAST")].loc["2020-06-29"] = -1.0
+    df = cache.bdh(TICKERS, ["PX_LAST", "PX_VOLUME"], "2020-01-01", "2020-09-30")
+
+    assert fake.requests == [
+        (TICKERS, ["PX_LAST", "PX_VOLUME"], "2020-06-25", "2020-09-30")
+    ]
+    assert df.loc["2020-06-29", ("CL1 Comdty", "PX_LAST")] == -1.0
+    pd.testing.assert_frame_equal(
+        df,
+        expected(fake, TICKERS, ["PX_LAST", "PX_VOLUME"], "2020-01-01", "2020-09-30"),
+    )
+
+    # Fully covered (and outside the revision window): no request at all
+    fake.requests.clear()
+    cache.bdh(TICKERS, ["PX_LAST"], "2020-02-01", "2020-03-31")
+    assert fake.requests == []
+
+
+def test_earlier_start_backfills_only_the_head(tmp_path, fake):
+    cache = BloombergCache(fake, tmp_path, revision_days=0)
+    cache.bdh(["GC1 Comdty"], "PX_LAST", "2020-06-01", "2020-06-30")
+    fake.requests.clear()
+
+    df = cache.bdh(["GC1 Comdty"], "PX_LAST", "2020-03-01", "2020-06-30")
+    assert fake.requests == [(["GC1 Comdty"], ["PX_LAST"], "2020-03-01", "2020-05-31")]
+    pd.testing.assert_frame_equal(
+        df, expected(fake, ["GC1 Comdty"], ["PX_LAST"], "2020-03-01", "2020-06-30")
+    )
+    assert cache.series()["observations"].tolist() == [len(df)]
+
+
+def test_failed_request_is_asked_for_again(tmp_path, fake):
+    cache = BloombergCache(fake, tmp_path)
+    fake.failures = 1
+    df = cache.bdh(TICKERS, ["PX_LAST"], "2020-01-01", "2020-12-31")
+    assert df.empty
+    assert not list(tmp_path.rglob("*.parquet"))
+
+    fake.requests.clear()
+    df = cache.bdh(TICKERS, ["PX_LAST"], "2020-01-01", "2020-12-31")
+    assert fake.requests == [(TICKERS, ["PX_LAST"], "2020-01-01", "2020-12-31")]
+    pd.testing.assert_frame_equal(
+        df, expected(fake, TICKERS, ["PX_LAST"], "2020-01-01", "2020-12-31")
+    )
+
+
+def test_failed_refresh_keeps_the_cached_history(tmp_path, fake):
+    cache = BloombergCache(fake, tmp_path, revision_days=5)
+    cache.bdh(["GC1 Comdty"], "PX_LAST", "2020-01-01", "2020-06-30")
+    fake.failures = 1
+    df = cache.bdh(["GC1 Comdty"], "PX_LAST", "2020-01-01", "2020-09-30")
+
+    # The cached part is still served, and the tail is requested again
+    pd.testing.assert_frame_equal(
+        df, expected(fake, ["GC1 Comdty"], ["PX_LAST"], "2020-01-01", "2020-06-30")
+    )
+    fake.requests.clear()
+    cache.bdh(["GC1 Comdty"], "PX_LAST", "2020-01-01", "2020-09-30")
+    assert fake.requests == [(["GC1 Comdty"], ["PX_LAST"], "2020-06-25", "2020-09-30")]
+
+
+def test_unsupported_options_bypass_the_cache(tmp_path, fake):
+    cache = BloombergCache(fake, tmp_path)
+    cache.bdh(["GC1 Comdty"], "PX_LAST", "2020-01-01", "2020-01-31", Per="W")
+    assert len(fake.requests) == 1
+    assert not list(tmp_path.rglob("*.parquet"))
+
+
+def test_bloomberg_client_can_be_cached(monkeypatch, tmp_path):
+    monkeypatch.setattr(data_sources, "LOCAL_SOURCE_DIR", tmp_path)
+    blp = data_sources.bloomberg(backend="local", cached=True)
+    assert isinstance(blp, BloombergCache)
+    assert isinstance(blp.client, data_sources.LocalBloomberg)
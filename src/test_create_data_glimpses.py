@@ -0,0 +1,50 @@
+"""
+Tests for the report cache in create_data_glimpses.py.
+"""
+
+import sys
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import polars as pl
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+import create_data_glimpses  # noqa: E402
+
+
+def test_cached_reports_equal_fresh_ones(tmp_path, monkeypatch):
+    path = tmp_path / "ftsfr_panel.parquet"
+    pl.DataFrame(
+        {
+            "unique_id": ["a", "a", "b"],
+            "ds": [date(2020, 1, 31), date(2020, 2, 29), date(2020, 1, 31)],
+            "stamp": [datetime(2020, 1, 31, 16, 30)] * 3,
+            "stamp_utc": pl.Series(
+                [datetime(2020, 1, 31, 16, 30)] * 3
+            ).dt.replace_time_zone("UTC"),
+            "close": [time(16, 0)] * 3,
+            "lag": [timedelta(days=1, microseconds=5)] * 3,
+            "amount": [Decimal("1.25"), Decimal("2.50"), None],
+            "y": [1.0, 2.0, 3.0],
+        }
+    ).write_parquet(path)
+    cache_file = tmp_path / "cache.json"
+    options = dict(max_columns=None, ftsfr_enhanced=True, cache_file=cache_file)
+
+    fresh = create_data_glimpses.get_dataset_reports([str(path)], **options)
+    assert "error" not in fresh[str(path)]
+
+    # The second call is served from the cache alone
+    def no_scan(*args, **kwargs):
+        raise AssertionError("report was recomputed")
+
+    monkeypatch.setattr(create_data_glimpses, "get_dataset_report", no_scan)
+    cached = create_data_glimpses.get_dataset_reports([str(path)], **options)
+
+    assert cached == fresh
+    report = cached[str(path)]
+    assert report["date_stats"][0]["min_raw"] == date(2020, 1, 31)
+    assert isinstance(report["sample_values"][0]["stamp"], datetime)
+    assert report["sample_values"][0]["lag"] == timedelta(days=1, microseconds=5)
@@ -0,0 +1,100 @@
+"""
+Tests for the local (offline) WRDS and Bloomberg backend in data_sources.py.
+"""
+
+import sys
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+import data_sources  # noqa: E402
+
+pytest.importorskip("duckdb")
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("local_sources")
+    data_sources.build_local_wrds(
+        directory, scale=0.1, start=date(2020, 1, 1), end=date(2020, 6, 30)
+    )
+    return directory
+
+
+@pytest.fixture
+def local_backend(store, monkeypatch):
+    monkeypatch.setattr(data_sources, "DATA_SOURCE_BACKEND", "local")
+    monkeypatch.setattr(data_sources, "LOCAL_SOURCE_DIR", store)
+    monkeypatch.setenv("WRDS_USERNAME", "")
+    return store
+
+
+def test_postgres_idioms_are_translated():
+    sql = data_sources.to_duckdb_sql(
+        "SELECT gvkey, at FROM comp.funda WHERE datadate >= '01/01/1959' "
+        "AND docclause LIKE 'XR%%' AND gvkey = %(gvkey)s"
+    )
+    assert sql == (
+        'SELECT gvkey, "at" FROM comp.funda WHERE datadate >= \'1959-01-01\' '
+        "AND docclause LIKE 'XR%' AND gvkey = $gvkey"
+    )
+
+
+def test_pull_queries_run_unchanged_on_the_local_store(local_backend):
+    sys.path.append(str(Path(__file__).resolve().parent / "us_treasury_returns"))
+    import pull_CRSP_treasury
+
+    df = pull_CRSP_treasury.pull_CRSP_treasury_consolidated(
+        start_date="2020-01-01", end_date="2020-06-30"
+    )
+    assert len(df) > 0
+    assert set(df["itype"]) <= {1, 2}
+    assert str(df["caldt"].dtype) == "datetime64[ns]"
+    assert (df["original_maturity"] > 0).all()
+    assert (df["price"] > df["tdbid"]).all()
+
+    with data_sources.wrds_connection() as db:
+        funda = db.raw_sql(
+            "SELECT gvkey, datadate, at FROM comp.funda "
+            "WHERE indfmt='INDL' AND datadate >= '01/01/1959'",
+            date_cols=["datadate"],
+        )
+        links = db.get_table("crsp", "ccmxpf_linktable")
+        assert "cds2001" in db.list_tables("markit")
+    assert list(funda.columns) == ["gvkey", "datadate", "at"]
+    # Open-ended links come back as missing values, as from WRDS
+    assert links["linkenddt"].isna().any()
+
+
+def test_local_bloomberg_is_deterministic_and_persisted(local_backend, tmp_path):
+    blp = data_sources.LocalBloomberg(tmp_path)
+    df = blp.bdh(
+        ["GT10 Govt", "TY1 Comdty"],
+        ["PX_LAST", "FUT_CTD_CUSIP"],
+        start_date="2020-01-01",
+        end_date="2020-03-31",
+    )
+
+    assert list(df.columns) == [
+        ("GT10 Govt", "PX_LAST"),
+        ("GT10 Govt", "FUT_CTD_CUSIP"),
+        ("TY1 Comdty", "PX_LAST"),
+        ("TY1 Comdty", "FUT_CTD_CUSIP"),
+    ]
+    assert df.index.min() >= pd.Timestamp("2020-01-01")
+    assert df.index.max() <= pd.Timestamp("2020-03-31")
+    assert df[("TY1 Comdty", "FUT_CTD_CUSIP")].str.startswith("912828").all()
+    assert (tmp_path / "bloomberg" / "GT10_Govt.parquet").exists()
+
+    # A new field is added to the stored history; old fields are unchanged
+    again = data_sources.LocalBloomberg(tmp_path).bdh(
+        "GT10 Govt", ["PX_LAST", "YLD_YTM_MID"], "2020-01-01", "2020-03-31"
+    )
+    pd.testing.assert_series_equal(
+        again[("GT10 Govt", "PX_LAST")], df[("GT10 Govt", "PX_LAST")]
+    )
+    assert data_sources.bloomberg().__class__ is data_sources.LocalBloomberg
@@ -0,0 +1,122 @@
+"""
+Tests for the datasets.toml registry in dataset_registry.py.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+import tomli
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+import dataset_registry  # noqa: E402
+
+DATASETS_TOML = """
+[alpha]
+data_module_name = "Alpha"
+required_data_sources = ["wrds_crsp"]
+
+[alpha.ftsfr_alpha_returns]
+description = "Alpha returns"
+group = "returns"
+frequency = "ME"
+seasonality = 12
+
+[alpha.ftsfr_alpha_sensitivity]
+description = "Alpha returns, alternative cleaning"
+group = "returns"
+frequency = "ME"
+paper_use = "sensitivity_only"
+
+[beta]
+required_data_sources = ["bloomberg_terminal", "fed_yield_curve"]
+
+[beta.ftsfr_beta_basis]
+description = "Beta basis"
+group = "basis_spreads"
+frequency = "B"
+"""
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    dataset_registry.clear_cache()
+    yield
+    dataset_registry.clear_cache()
+
+
+@pytest.fixture
+def datasets_toml(tmp_path):
+    path = tmp_path / "datasets.toml"
+    path.write_text(DATASETS_TOML)
+    return path
+
+
+def test_registry_indexes_datasets_by_name_module_and_group(datasets_toml):
+    registry = dataset_registry.load_registry(datasets_toml, snapshot_path=None)
+
+    assert registry.names() == [
+        "ftsfr_alpha_returns",
+        "ftsfr_alpha_sensitivity",
+        "ftsfr_beta_basis",
+    ]
+    assert registry["ftsfr_beta_basis"]["module"] == "beta"
+    assert registry.by_module == {
+        "alpha": ["ftsfr_alpha_returns", "ftsfr_alpha_sensitivity"],
+        "beta": ["ftsfr_beta_basis"],
+    }
+    assert registry.by_group["basis_spreads"] == ["ftsfr_beta_basis"]
+    assert registry.active() == ["ftsfr_alpha_returns", "ftsfr_beta_basis"]
+    assert registry.module_requirements() == {
+        "alpha": ["wrds_crsp"],
+        "beta": ["bloomberg_terminal", "fed_yield_curve"],
+    }
+    assert registry.formatted_path("ftsfr_alpha_returns", "/data") == Path(
+        "/data/formatted/alpha/ftsfr_alpha_returns.parquet"
+    )
+    # Parsed once per process
+    assert dataset_registry.load_registry(datasets_toml, snapshot_path=None) is registry
+
+
+def test_snapshot_is_reused_until_the_toml_changes(
+    datasets_toml, tmp_path, monkeypatch
+):
+    snapshot = tmp_path / "snapshot.json"
+    registry = dataset_registry.load_registry(datasets_toml, snapshot)
+    assert snapshot.exists()
+
+    # A new process reads the snapshot instead of parsing the TOML
+    dataset_registry.clear_cache()
+    with monkeypatch.context() as m:
+        m.setattr(tomli, "loads", None)
+        cached = dataset_registry.load_registry(datasets_toml, snapshot)
+    assert cached.to_json() == registry.to_json()
+
+    # Editing datasets.toml invalidates the snapshot
+    datasets_toml.write_text(
+        DATASETS_TOML + '\n[beta.ftsfr_beta_curve]\ndescription = "Curve"\n'
+    )
+    dataset_registry.clear_cache()
+    updated = dataset_registry.load_registry(datasets_toml, snapshot)
+    assert updated.by_module["beta"] == ["ftsfr_beta_basis", "ftsfr_beta_curve"]
+    assert updated.by_group["other"] == ["ftsfr_beta_curve"]
+
+
+def test_repo_datasets_toml_matches_a_direct_parse():
+    registry = dataset_registry.load_registry(snapshot_path=None)
+    with open(dataset_registry.DATASETS_TOML, "rb") as f:
+        raw = tomli.load(f)
+
+    expected = [
+        (module_name, key)
+        for module_name, module_config in raw.items()
+        for key, value in module_config.items()
+        if isinstance(value, dict) and key.startswith("ftsfr_")
+    ]
+    assert [(registry[name]["module"], name) for name in registry] == expected
+    assert registry.module_requirements() == {
+        module_name: module_config["required_data_sources"]
+        for module_name, module_config in raw.items()
+        if "required_data_sources" in module_config
+    }
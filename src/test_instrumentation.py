@@ -0,0 +1,81 @@
+"""
+Tests for the stage traces and report in instrumentation.py.
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+import polars as pl
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+import instrumentation  # noqa: E402
+from instrumentation import (  # noqa: E402
+    configure_trace,
+    find_regressions,
+    load_traces,
+    stage,
+    summarize,
+    timed,
+)
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        instrumentation,
+        "_trace",
+        {"script": "test", "run_id": "run0", "context": {}, "file": None},
+    )
+    monkeypatch.delenv("FTSFR_TRACE", raising=False)
+    path = tmp_path / "test.jsonl"
+    configure_trace("test", trace_file=path, dataset="ftsfr_demo")
+    return path
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_stage_records(trace_file):
+    @timed()
+    def build_frame(n):
+        return pl.DataFrame({"x": range(n)})
+
+    with stage("outer", model="m") as st:
+        build_frame(7)
+        st.rows = 3
+    with pytest.raises(ValueError):
+        with stage("failing"):
+            raise ValueError
+
+    inner, outer, failing = _records(trace_file)
+    assert inner["stage"] == "build_frame" and inner["parent"] == "outer"
+    assert inner["rows"] == 7
+    assert outer["rows"] == 3 and outer["parent"] is None
+    assert outer["dataset"] == "ftsfr_demo" and outer["model"] == "m"
+    assert outer["wall_s"] >= inner["wall_s"] >= 0
+    assert outer["cpu_s"] >= 0 and outer["peak_rss_mb"] > 0
+    assert failing["status"] == "error" and outer["status"] == "ok"
+
+
+def test_report_flags_regressions(trace_file):
+    for run, seconds in enumerate([0.01, 0.01, 0.01, 0.3]):
+        instrumentation._trace["run_id"] = f"run{run}"
+        with stage("fit"):
+            time.sleep(seconds)
+        with stage("load"):
+            pass
+
+    df = load_traces(trace_file.parent)
+    summary = summarize(df, by=("dataset",))
+    assert summary["stage"].to_list() == ["fit", "load"]
+    assert summary["runs"].to_list() == [4, 4]
+
+    regressions = find_regressions(df, by=("dataset",), min_seconds=0.1)
+    assert regressions["stage"].to_list() == ["fit"]
+    assert regressions["earlier_runs"].item() == 3
+    assert instrumentation.report(trace_file.parent, min_seconds=0.1) == 1
@@ -0,0 +1,191 @@
+"""
+Tests for notebook_runner.py. The kernel-backed test needs ipykernel.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import matplotlib
+import pandas as pd
+import polars as pl
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+import notebook_runner  # noqa: E402
+from notebook_runner import (  # noqa: E402
+    cached_reader,
+    kernel_enter,
+    kernel_exit,
+    split_py_cells,
+)
+
+
+def test_split_py_cells_matches_ipynb_py_convert():
+    source = (
+        '# %%\n"""\n# Title\n\nSome text\n"""\n\n'
+        "# %%\nimport pandas as pd\n\nx = 1\n\n"
+        "# %%\n''' \n## Section\n'''\n\n"
+        "# %%\nx + 1\n"
+    )
+    assert split_py_cells(source) == [
+        ("markdown", "# Title\n\nSome text"),
+        ("code", "import pandas as pd\n\nx = 1"),
+        ("markdown", " \n## Section"),
+        ("code", "x + 1"),
+    ]
+
+
+def test_cached_reader_reads_each_file_once(tmp_path):
+    path = tmp_path / "data.parquet"
+    pl.DataFrame({"a": [1, 2, 3]}).write_parquet(path)
+    calls = []
+
+    def read(source, **kwargs):
+        calls.append(source)
+        return pl.read_parquet(source, **kwargs)
+
+    cached = cached_reader(read, lambda df: df.clone(), lambda df: 1)
+    first = cached(path)
+    second = cached(str(path))
+    assert len(calls) == 1
+    assert first.equals(second) and first is not second
+
+    cached(path, columns=["a"])
+    assert len(calls) == 2
+
+    # Rewriting the file invalidates the entry
+    pl.DataFrame({"a": [4]}).write_parquet(path)
+    os.utime(path, ns=(0, 1))
+    assert cached(path)["a"].to_list() == [4]
+    assert len(calls) == 3
+
+
+def test_cached_reader_is_bounded_by_size(tmp_path):
+    paths = []
+    for i in range(3):
+        paths.append(tmp_path / f"data_{i}.parquet")
+        pl.DataFrame({"a": [i]}).write_parquet(paths[-1])
+    big = tmp_path / "big.parquet"
+    pl.DataFrame({"a": range(10)}).write_parquet(big)
+    calls = []
+
+    def read(source):
+        calls.append(Path(source).name)
+        return pl.read_parquet(source)
+
+    # Two one-row frames fit
+    cached = cached_reader(read, lambda df: df.clone(), len, max_bytes=2)
+    cached(paths[0])
+    cached(paths[1])
+    cached(paths[0])  # most recently used again
+    cached(paths[2])  # evicts data_1
+    assert [Path(key[0]).name for key in cached.cache] == [
+        "data_0.parquet",
+        "data_2.parquet",
+    ]
+
+    # Too large to cache at all
+    cached(big)
+    cached(big)
+    assert calls.count("big.parquet") == 2
+    assert len(cached.cache) == 2
+
+
+def test_kernel_exit_resets_rcparams_and_pandas_options(tmp_path, monkeypatch):
+    monkeypatch.setitem(notebook_runner._kernel_state, "home", os.getcwd())
+    linewidth = matplotlib.rcParams["lines.linewidth"]
+    max_rows = pd.get_option("display.max_rows")
+
+    kernel_enter(str(tmp_path))
+    matplotlib.rcParams["lines.linewidth"] = linewidth + 3
+    pd.set_option("display.max_rows", 3)
+    kernel_exit()
+
+    assert matplotlib.rcParams["lines.linewidth"] == linewidth
+    assert pd.get_option("display.max_rows") == max_rows
+
+
+def test_kernel_exit_restores_path_and_drops_project_modules(tmp_path, monkeypatch):
+    module_dir = tmp_path / "src" / "some_module"
+    module_dir.mkdir(parents=True)
+    (module_dir / "misc_tools_for_test.py").write_text("VALUE = 1\n")
+    monkeypatch.setattr(notebook_runner, "PROJECT_DIR", tmp_path)
+
+    home = os.getcwd()
+    monkeypatch.setitem(notebook_runner._kernel_state, "home", home)
+    path_before = list(sys.path)
+    kernel_enter(str(module_dir))
+    assert Path.cwd() == module_dir
+    sys.path.insert(0, ".")
+    import misc_tools_for_test  # noqa: F401
+
+    kernel_exit()
+    assert sys.path == path_before
+    assert "misc_tools_for_test" not in sys.modules
+    assert os.getcwd() == home
+
+
+NOTEBOOK_SET = """# %%
+\"\"\"
+# Sets state
+\"\"\"
+
+# %%
+import sys
+import matplotlib.pyplot as plt
+import pandas as pd
+
+leftover = 1
+sys.path.insert(0, "extra_dir")
+pd.set_option("display.max_rows", 3)
+plt.rcParams["lines.linewidth"] = 9.0
+plt.plot([1, 2])
+leftover
+"""
+
+NOTEBOOK_CHECK = """# %%
+import os
+import sys
+import matplotlib.pyplot as plt
+import pandas as pd
+
+assert "leftover" not in globals()
+assert "extra_dir" not in sys.path
+assert pd.get_option("display.max_rows") == 60
+assert plt.rcParams["lines.linewidth"] == 1.5
+assert plt.get_fignums() == []
+os.getcwd()
+"""
+
+
+def test_notebooks_on_a_shared_kernel_are_isolated(tmp_path):
+    pytest.importorskip("ipykernel")
+    pytest.importorskip("nbclient")
+    pytest.importorskip("nbconvert")
+    import nbformat
+
+    first = tmp_path / "first" / "summary_first_ipynb.py"
+    second = tmp_path / "second" / "summary_second_ipynb.py"
+    for path, source in [(first, NOTEBOOK_SET), (second, NOTEBOOK_CHECK)]:
+        path.parent.mkdir()
+        path.write_text(source)
+
+    pool = notebook_runner.KernelPool(size=1, kernel_name="python3")
+    try:
+        notebook_runner.run_notebook(first, "first", tmp_path / "out", pool=pool)
+        kernel = pool.acquire()
+        pool.release(kernel)
+        notebook_runner.run_notebook(second, "second", tmp_path / "out", pool=pool)
+        # Both ran on the same kernel
+        assert pool.acquire() is kernel
+    finally:
+        pool.shutdown()
+
+    nb = nbformat.read(tmp_path / "out" / "_notebook_build" / "second.ipynb", 4)
+    code = [cell for cell in nb.cells if cell.cell_type == "code"]
+    assert code[0].execution_count == 1
+    # Cells ran in the notebook's own directory
+    assert str(second.parent) in code[0].outputs[0]["data"]["text/plain"]
+    assert (tmp_path / "out" / "first.html").exists()
@@ -0,0 +1,116 @@
+"""
+Tests for the canonical formatted-panel layout in panel_storage.py.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import pyarrow.parquet as pq
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from panel_storage import (  # noqa: E402
+    ROW_GROUP_SIZE,
+    read_series_index,
+    scan_panel,
+    write_canonical_panel,
+)
+
+
+def _raw_panel(n_series=60, n_days=5000, seed=0):
+    """Unsorted panel as a module would write it from pandas."""
+    rng = np.random.default_rng(seed)
+    dates = pl.datetime_range(
+        datetime(2000, 1, 1),
+        datetime(2000, 1, 1) + (n_days - 1) * pl.duration(days=1),
+        "1d",
+        eager=True,
+        time_unit="ns",
+    )
+    frames = []
+    for i in range(n_series):
+        length = int(rng.integers(1, n_days))
+        frames.append(
+            pl.DataFrame(
+                {
+                    "id": f"series_{i}",
+                    "ds": dates[n_days - length :],
+                    "y": rng.normal(size=length),
+                }
+            )
+        )
+    df = pl.concat(frames).sample(fraction=1.0, shuffle=True, seed=seed)
+    return df.with_row_index("__index_level_0__")
+
+
+def test_canonical_layout(tmp_path):
+    raw = _raw_panel()
+    path = tmp_path / "ftsfr_panel.parquet"
+    counts = write_canonical_panel(raw.lazy(), path, "id", min_observations=100)
+
+    df = pl.read_parquet(path)
+    assert df.columns == ["unique_id", "ds", "y"]
+    assert df.schema["unique_id"] == pl.String
+    assert df.schema["ds"] == pl.Date
+    assert df.schema["y"] == pl.Float32
+    assert df.select("unique_id", "ds").equals(
+        df.select("unique_id", "ds").sort("unique_id", "ds")
+    )
+    kept = counts.filter(pl.col("len") >= 100)
+    assert df["unique_id"].n_unique() == kept.height < counts.height
+
+    metadata = pq.ParquetFile(path).metadata
+    assert metadata.num_rows == df.height
+    assert metadata.row_group(0).num_rows <= ROW_GROUP_SIZE
+    assert metadata.num_row_groups > 1
+    assert all(metadata.row_group(0).column(i).statistics.has_min_max for i in range(3))
+    assert "RLE_DICTIONARY" in metadata.row_group(0).column(0).encodings
+
+    index = read_series_index(path)
+    assert len(index) == kept.height
+    for unique_id, (offset, length) in index.items():
+        rows = df.slice(offset, length)
+        assert (rows["unique_id"] == unique_id).all()
+        assert length == kept.filter(pl.col("unique_id") == unique_id)["len"].item()
+
+
+def test_scan_subset_matches_full_read(tmp_path):
+    raw = _raw_panel()
+    legacy = tmp_path / "legacy.parquet"
+    canonical = tmp_path / "canonical.parquet"
+    raw.write_parquet(legacy)
+    write_canonical_panel(raw.lazy(), canonical, "id")
+
+    wanted = ["series_3", "series_4", "series_17", "missing"]
+    subset = scan_panel(canonical, wanted).collect()
+    full = scan_panel(canonical).collect()
+    assert subset.schema == {"unique_id": pl.String, "ds": pl.Date, "y": pl.Float32}
+    assert subset.equals(full.filter(pl.col("unique_id").is_in(wanted)))
+
+    from_legacy = scan_panel(legacy, wanted).collect()
+    assert read_series_index(legacy) is None
+    assert (
+        from_legacy.sort("unique_id", "ds")
+        .with_columns(pl.col("ds").cast(pl.Date))
+        .equals(subset)
+    )
+
+
+def test_intraday_timestamps_are_kept(tmp_path):
+    raw = pl.DataFrame(
+        {
+            "unique_id": ["a", "a", "b"],
+            "ds": [
+                datetime(2020, 1, 1, 9, 30),
+                datetime(2020, 1, 1, 16, 0),
+                datetime(2020, 1, 1, 9, 30),
+            ],
+            "y": [1.0, 2.0, 3.0],
+        }
+    )
+    path = tmp_path / "intraday.parquet"
+    write_canonical_panel(raw.lazy(), path, "unique_id")
+    assert pl.read_parquet(path).schema["ds"] == pl.Datetime("us")
@@ -0,0 +1,74 @@
+"""
+Tests for the seeded generators in synthetic_data.py.
+"""
+
+import sys
+from pathlib import Path
+
+import polars as pl
+from polars.testing import assert_frame_equal
+
+sys.path.append(str(Path(__file__).resolve().parent))
+
+import synthetic_data  # noqa: E402
+
+
+def test_ftsfr_panel_is_seeded_and_shaped_like_a_formatted_dataset():
+    panel = synthetic_data.ftsfr_panel(n_series=20, n_obs=60, seed=3)
+
+    assert_frame_equal(panel, synthetic_data.ftsfr_panel(n_series=20, n_obs=60, seed=3))
+    assert not panel.equals(synthetic_data.ftsfr_panel(n_series=20, n_obs=60, seed=4))
+    assert panel.schema == pl.Schema(
+        {"unique_id": pl.String, "ds": pl.Date, "y": pl.Float32}
+    )
+    assert panel["unique_id"].n_unique() == 20
+    # Ragged starts, common end date
+    per_series = panel.group_by("unique_id").agg(
+        pl.col("ds").min().alias("first"), pl.col("ds").max().alias("last")
+    )
+    assert per_series["last"].n_unique() == 1
+    assert per_series["first"].n_unique() > 1
+    assert panel["y"].null_count() > 0
+
+
+def test_cv_frame_windows_follow_the_cutoffs():
+    panel = synthetic_data.ftsfr_panel(n_series=5, n_obs=48, missing_frac=0.0)
+    h, n_windows = 4, 3
+
+    cv_df, train_df = synthetic_data.cv_frame(
+        panel, h=h, n_windows=n_windows, models=("Naive", "Theta")
+    )
+
+    assert cv_df.columns == ["unique_id", "ds", "cutoff", "y", "Naive", "Theta"]
+    assert cv_df.height == 5 * h * n_windows
+    assert cv_df["cutoff"].null_count() == 0
+    # Each window is the h periods after its cutoff, and the first cutoff is
+    # the last training date
+    windows = cv_df.group_by("unique_id", "cutoff").agg(
+        pl.len(), (pl.col("ds").min() > pl.col("cutoff").first()).alias("after")
+    )
+    assert windows["len"].to_list() == [h] * (5 * n_windows)
+    assert windows["after"].all()
+    first_cutoff = cv_df.group_by("unique_id").agg(pl.col("cutoff").min())
+    last_train = train_df.group_by("unique_id").agg(pl.col("ds").max())
+    joined = first_cutoff.join(last_train, on="unique_id")
+    assert (joined["cutoff"] == joined["ds"]).all()
+    assert train_df.height + cv_df.height == panel.height
+
+
+def test_vendor_stand_ins_have_the_pipeline_columns():
+    cds = synthetic_data.markit_cds_curves(n_tickers=4, n_days=10)
+    assert {"date", "ticker", "redcode", "parspread", "tenor", "country"} <= set(
+        cds.columns
+    )
+
+    chain = synthetic_data.optionmetrics_chain(n_dates=3)
+    assert set(chain["cp_flag"]) == {"C", "P"}
+    calls = chain[chain["cp_flag"] == "C"].set_index(["date", "exdate"])
+    puts = chain[chain["cp_flag"] == "P"].set_index(["date", "exdate"])
+    assert calls.index.equals(puts.index)
+
+    dates = cds["date"].unique().sort().to_pandas()
+    curve = synthetic_data.fed_yield_curve(dates)
+    assert list(curve.columns) == [f"SVENY{y:02d}" for y in range(1, 31)]
+    assert curve.index.name is None
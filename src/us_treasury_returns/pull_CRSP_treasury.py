@@ -33,9 +33,9 @@ from datetime import datetime
 from pathlib import Path
 
 import pandas as pd
-import wrds
 
 from settings import config
+from data_sources import wrds_connection
 
 DATA_DIR = Path(config("DATA_DIR"))
 WRDS_USERNAME = config("WRDS_USERNAME")
@@ -104,7 +104,7 @@ def pull_CRSP_treasury_daily(
         caldt BETWEEN '{start_date}' AND '{end_date}'
     """
 
-    db = wrds.Connection(wrds_username=wrds_username)
+    db = wrds_connection(wrds_username=wrds_username)
     df = db.raw_sql(query, date_cols=["caldt"])
     db.close()
     return df
@@ -152,7 +152,7 @@ def pull_CRSP_treasury_info(wrds_username=WRDS_USERNAME):
             iss.itype IN (1, 2)
     """
 
-    db = wrds.Connection(wrds_username=wrds_username)
+    db = wrds_connection(wrds_username=wrds_username)
     df = db.raw_sql(query, date_cols=["tdatdt", "tmatdt"])
     db.close()
     return df
@@ -346,7 +346,7 @@ def pull_CRSP_treasury_consolidated(
         {itype_clause}
     """
 
-    db = wrds.Connection(wrds_username=wrds_username)
+    db = wrds_connection(wrds_username=wrds_username)
     df = db.raw_sql(query, date_cols=["caldt", "tdatdt", "tmatdt", "tfcaldt"])
     df["days_to_maturity"] = (df["tmatdt"] - df["caldt"]).dt.days
     df["tfcaldt"] = pd.to_datetime(df["tfcaldt"]).fillna(pd.Timestamp(0))
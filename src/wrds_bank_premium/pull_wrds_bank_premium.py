@@ -9,16 +9,16 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from pathlib import Path
 
 import pandas as pd
-import wrds
 
 from settings import config
+from data_sources import wrds_connection
 
 DATA_DIR = Path(config("DATA_DIR"))
 WRDS_USERNAME_BANK_PREMIUM = config("WRDS_USERNAME_BANK_PREMIUM")
 
 
 def pull_selected_premium_tables(wrds_username=WRDS_USERNAME_BANK_PREMIUM):
-    db = wrds.Connection(wrds_username=wrds_username)
+    db = wrds_connection(wrds_username=wrds_username)
     # db.list_libraries()
     # db.list_tables(library='bank')
 
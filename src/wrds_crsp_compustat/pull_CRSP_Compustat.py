@@ -34,10 +34,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from pathlib import Path
 
 import pandas as pd
-import wrds
 from pandas.tseries.offsets import MonthEnd
 
 from settings import config
+from data_sources import wrds_connection
 
 DATA_DIR = Path(config("DATA_DIR"))
 WRDS_USERNAME = config("WRDS_USERNAME")
@@ -83,7 +83,7 @@ def pull_compustat(wrds_username=WRDS_USERNAME):
         """
     # with wrds.Connection(wrds_username=wrds_username) as db:
     #     comp = db.raw_sql(sql_query, date_cols=["datadate"])
-    db = wrds.Connection(wrds_username=wrds_username)
+    db = wrds_connection(wrds_username=wrds_username)
     comp = db.raw_sql(sql_query, date_cols=["datadate"])
     db.close()
 
@@ -127,7 +127,7 @@ def pull_CRSP_stock_ciz(wrds_username=WRDS_USERNAME):
         --    a.mthcaldt BETWEEN '01/01/1959' AND '12/31/2022'
         """
 
-    db = wrds.Connection(wrds_username=wrds_username)
+    db = wrds_connection(wrds_username=wrds_username)
     crsp_m = db.raw_sql(sql_query, date_cols=["mthcaldt"])
     db.close()
 
@@ -160,14 +160,14 @@ def pull_CRSP_Comp_Link_Table(wrds_username=WRDS_USERNAME):
             substr(linktype,1,1)='L' AND
             (linkprim ='C' OR linkprim='P')
         """
-    db = wrds.Connection(wrds_username=wrds_username)
+    db = wrds_connection(wrds_username=wrds_username)
     ccm = db.raw_sql(sql_query, date_cols=["linkdt", "linkenddt"])
     db.close()
     return ccm
 
 
 def pull_Fama_French_factors(wrds_username=WRDS_USERNAME):
-    conn = wrds.Connection(wrds_username=wrds_username)
+    conn = wrds_connection(wrds_username=wrds_username)
     ff = conn.get_table(library="ff", table="factors_monthly")
     conn.close()
     ff[["smb", "hml"]] = ff[["smb", "hml"]].astype(float)
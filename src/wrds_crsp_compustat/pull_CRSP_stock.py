@@ -27,9 +27,9 @@ from pathlib import Path
 
 import numpy as np
 import pandas as pd
-import wrds
 
 from settings import config
+from data_sources import wrds_connection
 
 DATA_DIR = Path(config("DATA_DIR"))
 WRDS_USERNAME = config("WRDS_USERNAME")
@@ -82,7 +82,7 @@ def pull_CRSP_monthly_file(
     #     df = db.raw_sql(
     #         query, date_cols=["date", "namedt", "nameendt", "dlstdt"]
     #     )
-    db = wrds.Connection(wrds_username=wrds_username)
+    db = wrds_connection(wrds_username=wrds_username)
     df = db.raw_sql(query, date_cols=["date", "namedt", "nameendt", "dlstdt"])
     db.close()
 
@@ -172,7 +172,7 @@ def pull_CRSP_index_files(
     """
     # with wrds.Connection(wrds_username=wrds_username) as db:
     #     df = db.raw_sql(query, date_cols=["month", "caldt"])
-    db = wrds.Connection(wrds_username=wrds_username)
+    db = wrds_connection(wrds_username=wrds_username)
     df = db.raw_sql(query, date_cols=["caldt"])
     db.close()
     return df